@@ -0,0 +1,100 @@
+"""
+Linha de comando - operações offline do gerador de dietas
+
+Uso:
+    python -m app.cli importar pacientes.csv -o planos.zip
+    python -m app.cli importar pacientes.parquet -o planos.zip --workers 4
+    python -m app.cli prever coorte.csv --pacientes-mes 2000
+"""
+import argparse
+import json
+import sys
+import time
+
+from app.services.bulk_import import BulkDietImporter
+
+
+def cmd_importar(args) -> int:
+    """Gera planos em lote a partir de CSV/Parquet"""
+    importer = BulkDietImporter(workers=args.workers, tamanho_bloco=args.bloco)
+
+    inicio = time.time()
+    with open(args.arquivo, 'rb') as origem, open(args.saida, 'wb') as destino:
+        resultado = importer.processar_arquivo(origem, args.arquivo, destino)
+    duracao = time.time() - inicio
+
+    print(
+        f"{resultado['planos_gerados']} planos gerados, "
+        f"{resultado['linhas_invalidas']} linhas inválidas, "
+        f"{resultado['erros_geracao']} erros de geração "
+        f"({resultado['total_linhas']} linhas em {duracao:.1f}s) -> {args.saida}"
+    )
+    return 0
+
+
+def cmd_prever(args) -> int:
+    """Previsão de complexidade e custo mensal de uma coorte"""
+    # Importados aqui: o comando importar não precisa do analisador nem do histórico
+    from app.services.cohort_forecast import CohortForecaster
+    from app.utils.cost_tracker import CostTracker
+
+    forecaster = CohortForecaster(cost_tracker=CostTracker())
+    with open(args.arquivo, 'rb') as origem:
+        try:
+            previsao = forecaster.prever_arquivo(origem, args.arquivo, args.pacientes_mes)
+        except ValueError as e:
+            print(f"Erro: {e}", file=sys.stderr)
+            return 1
+
+    if args.json:
+        print(json.dumps(previsao, ensure_ascii=False, indent=2))
+        return 0
+
+    n = previsao['pacientes_validos']
+    print(f"{n} pacientes válidos, {previsao['linhas_invalidas']} linhas inválidas ({previsao['duracao_s']}s)")
+    print(f"Score médio: {previsao['score_medio']}")
+    print("Histograma de score:")
+    for score, quantidade in previsao['histograma_score'].items():
+        print(f"  {score:>2} {quantidade:>8} {'#' * round(50 * quantidade / n)}")
+    print("Modos (AUTO, API disponível):")
+    for modo, dist in previsao['distribuicao_modos'].items():
+        print(f"  {modo:<12} {dist['pacientes']:>8} ({dist['percentual']}%)")
+
+    projecao = previsao['projecao_mensal']
+    print(f"Projeção para {projecao['pacientes_mes']} planos/mês:")
+    for modo, custo in projecao['custo_por_modo'].items():
+        print(
+            f"  {modo:<12} {custo['geracoes_mes']:>10} x ${custo['custo_unitario_usd']:.4f} "
+            f"({custo['fonte']}) = ${custo['custo_mes_usd']:.2f}"
+        )
+    print(f"  Total: ${projecao['custo_total_usd']:.2f}/mês")
+    if projecao['orcamento_mes_usd']:
+        situacao = "excede" if projecao['excede_orcamento'] else "dentro do"
+        print(f"  Orçamento: ${projecao['orcamento_mes_usd']:.2f} ({situacao} orçamento)")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Gerador de Dietas - CLI")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    importar = sub.add_parser("importar", help="Gera planos python_only a partir de CSV/Parquet")
+    importar.add_argument("arquivo", help="Planilha de pacientes (.csv ou .parquet)")
+    importar.add_argument("-o", "--saida", default="planos.zip", help="Arquivo zip de saída")
+    importar.add_argument("--workers", type=int, default=None, help="Processos (0 = sem pool)")
+    importar.add_argument("--bloco", type=int, default=None, help="Linhas validadas por bloco")
+    importar.set_defaults(func=cmd_importar)
+
+    prever = sub.add_parser("prever", help="Previsão de complexidade e custo mensal de uma coorte (CSV/Parquet)")
+    prever.add_argument("arquivo", help="Planilha de pacientes (.csv ou .parquet)")
+    prever.add_argument("--pacientes-mes", type=int, default=None,
+                        help="Planos gerados por mês (padrão: pacientes válidos da planilha)")
+    prever.add_argument("--json", action="store_true", help="Saída em JSON")
+    prever.set_defaults(func=cmd_prever)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
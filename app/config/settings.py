@@ -3,6 +3,7 @@ Configurações centralizadas do sistema híbrido
 """
 from enum import Enum
 from pydantic import BaseModel
+import json
 import os
 
 
@@ -14,6 +15,18 @@ class GenerationMode(str, Enum):
     API_FULL = "api_full"            # API completa
 
 
+def _precos_token_extras() -> dict:
+    """Preços de TOKEN_PRICES_JSON (JSON inválido é ignorado com aviso)"""
+    try:
+        precos = json.loads(os.getenv("TOKEN_PRICES_JSON", "{}"))
+        if not isinstance(precos, dict):
+            raise TypeError("esperado um objeto {modelo: preços}")
+    except (json.JSONDecodeError, TypeError) as e:
+        print(f"Aviso: TOKEN_PRICES_JSON inválido ({e}). Usando a tabela padrão.")
+        return {}
+    return precos
+
+
 class Settings(BaseModel):
     """Configurações globais"""
 
@@ -25,11 +38,40 @@ class Settings(BaseModel):
     complexity_threshold_medium: int = 6    # Score <= 6: API minimal
     # Score > 6: API full
 
-    # Custos em USD por dieta
+    # Custos em USD por dieta (estimativas; o custo registrado vem dos tokens, ver token_prices)
     cost_python_only: float = 0.0
     cost_api_minimal: float = 0.015
     cost_api_full: float = 0.048
 
+    # Preços em USD por milhão de tokens: entrada, saída, escrita e leitura de cache
+    # O modelo usa a entrada de prefixo mais longo; TOKEN_PRICES_JSON acrescenta ou substitui
+    # (ex.: {"claude-sonnet-4": {"input": 3, "output": 15, "cache_write": 3.75, "cache_read": 0.3}})
+    # Modelo sem preço: custo fixo do modo (cost_*)
+    token_prices: dict = {
+        "claude-sonnet-4": {"input": 3.0, "output": 15.0, "cache_write": 3.75, "cache_read": 0.30},
+        "claude-3-7-sonnet": {"input": 3.0, "output": 15.0, "cache_write": 3.75, "cache_read": 0.30},
+        "claude-3-5-sonnet": {"input": 3.0, "output": 15.0, "cache_write": 3.75, "cache_read": 0.30},
+        "claude-opus-4": {"input": 15.0, "output": 75.0, "cache_write": 18.75, "cache_read": 1.50},
+        "claude-opus-4-5": {"input": 5.0, "output": 25.0, "cache_write": 6.25, "cache_read": 0.50},
+        "claude-haiku-4-5": {"input": 1.0, "output": 5.0, "cache_write": 1.25, "cache_read": 0.10},
+        "claude-3-5-haiku": {"input": 0.80, "output": 4.0, "cache_write": 1.0, "cache_read": 0.08},
+        **_precos_token_extras(),
+    }
+
+    # Política adaptativa do AUTO (app/services/mode_policy.py)
+    monthly_budget_usd: float = float(os.getenv("MONTHLY_BUDGET_USD", "0"))    # 0 = sem limite
+    auto_budget_soft_limit: float = float(os.getenv("AUTO_BUDGET_SOFT_LIMIT", "0.8"))    # fração: api_full -> api_minimal
+    auto_max_error_rate: float = float(os.getenv("AUTO_MAX_ERROR_RATE", "0.5"))
+    auto_max_latency_minimal: float = float(os.getenv("AUTO_MAX_LATENCY_MINIMAL", "15"))    # p95 em segundos (0 = sem limite)
+    auto_max_latency_full: float = float(os.getenv("AUTO_MAX_LATENCY_FULL", "60"))
+    auto_stats_window: int = int(os.getenv("AUTO_STATS_WINDOW", "20"))    # últimas chamadas por modo
+    auto_min_samples: int = int(os.getenv("AUTO_MIN_SAMPLES", "5"))    # antes disso a saúde da API não rebaixa
+    auto_stats_max_age: float = float(os.getenv("AUTO_STATS_MAX_AGE", "300"))    # segundos em que a chamada conta
+
+    # Previsão de custos por coorte (app/services/cohort_forecast.py):
+    # gerações registradas por modo antes de trocar cost_* pelo custo medido
+    forecast_min_samples: int = int(os.getenv("FORECAST_MIN_SAMPLES", "10"))
+
     # Configuração API Anthropic
     anthropic_api_key: str = os.getenv("ANTHROPIC_API_KEY", "")
     anthropic_model: str = "claude-sonnet-4-5-20250929"
@@ -38,14 +80,111 @@ class Settings(BaseModel):
     feegow_api_token: str = os.getenv("FEEGOW_API_TOKEN", "")
     feegow_api_url: str = os.getenv("FEEGOW_API_URL", "https://api.feegow.com.br/api")
 
+    # Cache de get_patient (segundos): fresco por TTL e, depois, servido
+    # enquanto é revalidado em segundo plano por mais STALE segundos
+    feegow_patient_cache_ttl: float = float(os.getenv("FEEGOW_PATIENT_CACHE_TTL", "300"))
+    feegow_patient_cache_stale: float = float(os.getenv("FEEGOW_PATIENT_CACHE_STALE", "3600"))
+    feegow_patient_cache_max: int = int(os.getenv("FEEGOW_PATIENT_CACHE_MAX", "1000"))
+
+    # Chamadas à API Anthropic: timeout do SDK e circuit breaker
+    # (chamadas mais lentas que o limite do modo contam como falha)
+    api_timeout_seconds: float = float(os.getenv("API_TIMEOUT_SECONDS", "120"))
+    circuit_breaker_window: int = int(os.getenv("CIRCUIT_BREAKER_WINDOW", "20"))
+    circuit_breaker_min_calls: int = int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "5"))
+    circuit_breaker_failure_rate: float = float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5"))
+    circuit_breaker_open_seconds: float = float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "30"))
+    circuit_breaker_slow_minimal: float = float(os.getenv("CIRCUIT_BREAKER_SLOW_MINIMAL", "20"))
+    circuit_breaker_slow_full: float = float(os.getenv("CIRCUIT_BREAKER_SLOW_FULL", "90"))
+
+    # Modo hedged: o plano Python é renderizado em paralelo à chamada e
+    # devolvido se a API não responder no prazo (segundos; 0 = sem prazo)
+    api_hedge_enabled: bool = os.getenv("API_HEDGE", "1") != "0"
+    api_hedge_deadline_minimal: float = float(os.getenv("API_HEDGE_DEADLINE_MINIMAL", "12"))
+    api_hedge_deadline_full: float = float(os.getenv("API_HEDGE_DEADLINE_FULL", "75"))
+    api_hedge_workers: int = int(os.getenv("API_HEDGE_WORKERS", "4"))
+
+    # Requisições idênticas simultâneas a /gerar-dieta compartilham a geração
+    single_flight_enabled: bool = os.getenv("SINGLE_FLIGHT", "1") != "0"
+
+    # Jobs de geração com progresso por SSE (/api/jobs/gerar-dieta): segundos em que
+    # um job concluído continua consultável e nº máximo de jobs em memória
+    generation_jobs_ttl: float = float(os.getenv("GENERATION_JOBS_TTL", "600"))
+    generation_jobs_max: int = int(os.getenv("GENERATION_JOBS_MAX", "200"))
+    # Status e eventos dos jobs: "sqlite" (compartilhado entre workers) ou "memory"
+    # (no Vercel é sempre memória)
+    generation_jobs_backend: str = os.getenv("GENERATION_JOBS_BACKEND", "sqlite")
+    generation_jobs_path: str = os.getenv("GENERATION_JOBS_PATH", "data/generation_jobs.sqlite3")
+
     # Limites de tokens
     max_tokens_minimal: int = 800       # Para apresentação apenas
     max_tokens_full: int = 8000         # Para dieta completa
 
+    # Base de alimentos lida do snapshot binário (app/data/alimentos.snapshot)
+    food_snapshot_enabled: bool = os.getenv("FOOD_SNAPSHOT", "1") != "0"
+
+    # Carga glicêmica máxima por refeição (0 = sem limite)
+    max_glycemic_load_per_meal: float = float(os.getenv("MAX_GLYCEMIC_LOAD_PER_MEAL", "20"))
+
     # Features
     enable_cost_tracking: bool = True
     enable_statistics: bool = True
 
+    # Execução: "inline" (no processo do servidor) ou "process_pool"
+    # (modos sem API rodam em ProcessPoolExecutor)
+    execution_mode: str = os.getenv("EXECUTION_MODE", "inline")
+    process_pool_workers: int = int(os.getenv("PROCESS_POOL_WORKERS", os.cpu_count() or 1))
+
+    # Importação em lote (CSV/Parquet)
+    bulk_import_workers: int = int(os.getenv("BULK_IMPORT_WORKERS", os.cpu_count() or 1))
+    bulk_import_chunk_size: int = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "200"))
+
+    # Armazenamento dos planos gerados: "sqlite" (arquivo local) ou "memory"
+    # (no Vercel é sempre memória)
+    plan_store_backend: str = os.getenv("PLAN_STORE_BACKEND", "sqlite")
+    plan_store_path: str = os.getenv("PLAN_STORE_PATH", "data/planos.sqlite3")
+    plan_store_ttl_days: float = float(os.getenv("PLAN_STORE_TTL_DAYS", "30"))
+    plan_store_max_plans: int = int(os.getenv("PLAN_STORE_MAX_PLANS", "500"))    # backend memory
+
+    # Estatísticas de uso (CostTracker): "sqlite" (compartilhado entre workers) ou "json"
+    # (no Vercel é sempre memória)
+    usage_stats_backend: str = os.getenv("USAGE_STATS_BACKEND", "sqlite")
+    usage_stats_path: str = os.getenv("USAGE_STATS_PATH", "data/usage_stats.sqlite3")
+
+    # Registro das gerações fora da requisição (app/utils/telemetry.py): fila em memória
+    # gravada em lotes de BATCH_SIZE eventos ou a cada FLUSH_INTERVAL segundos
+    telemetry_max_queue: int = int(os.getenv("TELEMETRY_MAX_QUEUE", "10000"))
+    telemetry_batch_size: int = int(os.getenv("TELEMETRY_BATCH_SIZE", "100"))
+    telemetry_flush_interval: float = float(os.getenv("TELEMETRY_FLUSH_INTERVAL", "1.0"))
+
+    # Compressão das respostas (gzip; br com o pacote brotli instalado) a partir de
+    # COMPRESSION_MIN_SIZE bytes; streams (SSE, arquivos em partes) passam sem compressão
+    compression_enabled: bool = os.getenv("COMPRESSION", "1") != "0"
+    compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    compression_gzip_level: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    compression_brotli_quality: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
+    # Fila de uploads para o FEEGOW (SQLite local, workers assíncronos)
+    upload_queue_path: str = os.getenv(
+        "UPLOAD_QUEUE_PATH",
+        "/tmp/uploads.sqlite3" if os.environ.get("VERCEL") else "data/uploads.sqlite3"
+    )
+    upload_queue_workers: int = int(os.getenv("UPLOAD_QUEUE_WORKERS", "2"))
+    upload_max_attempts: int = int(os.getenv("UPLOAD_MAX_ATTEMPTS", "5"))
+    upload_backoff_base_seconds: float = float(os.getenv("UPLOAD_BACKOFF_BASE_SECONDS", "2"))
+    upload_backoff_max_seconds: float = float(os.getenv("UPLOAD_BACKOFF_MAX_SECONDS", "300"))
+    # Lease do job em envio (renovado durante o envio); vencido, o job volta para a fila
+    upload_lease_seconds: float = float(os.getenv("UPLOAD_LEASE_SECONDS", "60"))
+
+    # Repositório da base de alimentos: "memory" (base curada) ou "sqlite"
+    # (CSV estendido, ex. TACO completa, + base curada; ver app/data/food_repository.py)
+    food_repository_backend: str = os.getenv("FOOD_REPOSITORY", "memory")
+    food_csv_path: str = os.getenv("FOOD_CSV_PATH", "")    # vazio: CSV incluído no pacote
+    food_db_path: str = os.getenv(
+        "FOOD_DB_PATH",
+        "/tmp/alimentos.sqlite3" if os.environ.get("VERCEL") else "data/alimentos.sqlite3"
+    )
+    food_cache_size: int = int(os.getenv("FOOD_CACHE_SIZE", "256"))
+
     class Config:
         use_enum_values = True
 
@@ -0,0 +1,153 @@
+"""
+Compilação do snapshot binário da base de alimentos
+
+Lê ALIMENTOS, ALIMENTOS_POR_REFEICAO (app/data/fontes/alimentos.py) e
+SUBSTITUICOES (app/data/fontes/substituicoes.py) e grava
+app/data/alimentos.snapshot no formato lido por app/data/snapshot.py.
+Rodar sempre que as fontes forem alteradas (o snapshot desatualizado é
+ignorado em runtime):
+
+    python -m app.data.compilar_snapshot
+"""
+import os
+import struct
+from typing import Any, Dict, List
+
+from app.data.snapshot import (
+    ARQUIVO, CABECALHO, CAMPOS_NUMERICOS, F64, I64, MAGIC, ORDEM_CAMPOS, PAR,
+    REGISTRO, U32, VERSAO, Snapshot, checksum_fontes
+)
+
+
+class _Strings:
+    """Tabela de strings deduplicadas"""
+
+    def __init__(self):
+        self.indices: Dict[str, int] = {}
+        self.lista: List[str] = []
+
+    def __call__(self, s: str) -> int:
+        i = self.indices.get(s)
+        if i is None:
+            i = self.indices[s] = len(self.lista)
+            self.lista.append(s)
+        return i
+
+    def serializar(self) -> bytes:
+        dados = [s.encode('utf-8') for s in self.lista]
+        offsets = [0]
+        for d in dados:
+            offsets.append(offsets[-1] + len(d))
+        return (
+            U32.pack(len(dados))
+            + struct.pack(f'<{len(offsets)}I', *offsets)
+            + b''.join(dados)
+        )
+
+
+def _codificar_valor(valor: Any, strings: _Strings, saida: bytearray):
+    """Codificação com tags: d(ict), l(ist), s(tring), i(nt), f(loat), n(one), t/F (bool)"""
+    if isinstance(valor, dict):
+        saida += b'd' + U32.pack(len(valor))
+        for k, v in valor.items():
+            saida += U32.pack(strings(k))
+            _codificar_valor(v, strings, saida)
+    elif isinstance(valor, (list, tuple)):
+        saida += b'l' + U32.pack(len(valor))
+        for v in valor:
+            _codificar_valor(v, strings, saida)
+    elif isinstance(valor, str):
+        saida += b's' + U32.pack(strings(valor))
+    elif isinstance(valor, bool):
+        saida += b't' if valor else b'F'
+    elif isinstance(valor, int):
+        saida += b'i' + I64.pack(valor)
+    elif isinstance(valor, float):
+        saida += b'f' + F64.pack(valor)
+    elif valor is None:
+        saida += b'n'
+    else:
+        raise ValueError(f"Tipo não suportado no snapshot: {type(valor).__name__}")
+
+
+def _codificar_secao(secao: dict, strings: _Strings) -> bytes:
+    """Índice (chave, offset relativo) das entradas de primeiro nível + valores"""
+    valores = bytearray()
+    indice = []
+    for chave, valor in secao.items():
+        indice.append((strings(chave), len(valores)))
+        _codificar_valor(valor, strings, valores)
+    cabecalho = U32.pack(len(indice)) + b''.join(PAR.pack(*par) for par in indice)
+    return cabecalho + bytes(valores)
+
+
+def _codificar_alimentos(alimentos: dict, strings: _Strings) -> bytes:
+    registros = bytearray()
+    for chave, a in alimentos.items():
+        if tuple(a) != ORDEM_CAMPOS:
+            raise ValueError(
+                f"Alimento {chave}: campos {tuple(a)} diferentes do formato do snapshot {ORDEM_CAMPOS}"
+            )
+        mascara = 0
+        for bit, campo in enumerate(CAMPOS_NUMERICOS):
+            if isinstance(a[campo], int):
+                mascara |= 1 << bit
+        registros += REGISTRO.pack(
+            strings(chave), strings(a['nome']), strings(a['grupo']), strings(a['porcao_usual']),
+            *(float(a[campo]) for campo in CAMPOS_NUMERICOS),
+            a['ig'], mascara
+        )
+    return bytes(registros)
+
+
+def compilar(destino: str = ARQUIVO) -> dict:
+    """
+    Gera o snapshot a partir de app/data/fontes e confere a leitura
+
+    Returns:
+        Dict com tamanho do arquivo e contagens
+    """
+    from app.data.fontes.alimentos import ALIMENTOS, ALIMENTOS_POR_REFEICAO
+    from app.data.fontes.substituicoes import SUBSTITUICOES
+
+    strings = _Strings()
+    alimentos = _codificar_alimentos(ALIMENTOS, strings)
+    por_refeicao = _codificar_secao(ALIMENTOS_POR_REFEICAO, strings)
+    substituicoes = _codificar_secao(SUBSTITUICOES, strings)
+    tabela_strings = strings.serializar()
+
+    inicio = CABECALHO.size
+    offsets = [inicio]
+    for bloco in (tabela_strings, alimentos, por_refeicao):
+        offsets.append(offsets[-1] + len(bloco))
+    cabecalho = CABECALHO.pack(MAGIC, VERSAO, checksum_fontes(), *offsets, len(ALIMENTOS))
+
+    temporario = destino + '.tmp'
+    with open(temporario, 'wb') as f:
+        f.write(cabecalho + tabela_strings + alimentos + por_refeicao + substituicoes)
+    os.replace(temporario, destino)
+
+    # Conferência: o snapshot tem que reproduzir as fontes exatamente
+    snapshot = Snapshot(destino)
+    if (
+        dict(snapshot.alimentos) != ALIMENTOS
+        or dict(snapshot.alimentos_por_refeicao) != ALIMENTOS_POR_REFEICAO
+        or dict(snapshot.substituicoes) != SUBSTITUICOES
+        or any(
+            type(v) is not type(ALIMENTOS[k][c])
+            for k, a in snapshot.alimentos.items() for c, v in a.items()
+        )
+    ):
+        raise ValueError("Snapshot gerado não confere com as fontes")
+
+    return {
+        'arquivo': destino,
+        'bytes': os.path.getsize(destino),
+        'alimentos': len(ALIMENTOS),
+        'strings': len(strings.lista)
+    }
+
+
+if __name__ == "__main__":
+    info = compilar()
+    print(f"{info['arquivo']}: {info['bytes']} bytes, {info['alimentos']} alimentos, {info['strings']} strings")
@@ -0,0 +1,224 @@
+"""
+Repositório da base de alimentos
+
+ALIMENTOS (app/data/alimentos_base.py) é servido por um repositório
+plugável, escolhido por FOOD_REPOSITORY:
+- memory: a base curada (snapshot/literais), como sempre foi (padrão)
+- sqlite: arquivo SQLite gerado a partir de um CSV (ex.: exportação da
+  tabela TACO completa) somado à base curada, com índices por grupo,
+  macros e IG e cache LRU das linhas mais lidas
+  (app/data/food_repository_sqlite.py, importado só quando escolhido)
+
+Os dois backends expõem a mesma interface (mapping chave -> alimento, no
+formato de ALIMENTOS), de forma que MealBuilder, calcular_nutricao_porcao
+e os índices compilados no startup não precisam saber de onde vêm os dados.
+Ambos oferecem busca por nome sem acentos e tolerante a erros de digitação
+(buscar) e filtro por grupo, macros e IG (filtrar).
+
+CSV (cabeçalho obrigatório, valores por 100 g):
+    chave,nome,grupo,kcal,carb_g,prot_g,gord_g,fibra_g,porcao_usual,gramas_porcao,ig
+Colunas opcionais: chave (gerada a partir do nome), porcao_usual ("100g"),
+gramas_porcao (100) e ig (vazio = IG desconhecido, gravado como None/NULL:
+o alimento não passa no filtro ig_max nem no limite de carga glicêmica).
+Alimentos da base curada têm precedência sobre linhas do CSV com a mesma chave.
+"""
+import re
+import unicodedata
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+
+# Ordem dos campos no dicionário de cada alimento (a mesma de ALIMENTOS)
+CAMPOS = (
+    'nome', 'grupo', 'kcal', 'carb_g', 'prot_g', 'gord_g', 'fibra_g',
+    'porcao_usual', 'gramas_porcao', 'ig'
+)
+
+# Filtros de filtrar(): parâmetro -> (campo, operador)
+FILTROS = {
+    'ig_max': ('ig', '<='),
+    'kcal_max': ('kcal', '<='),
+    'carb_max': ('carb_g', '<='),
+    'prot_min': ('prot_g', '>='),
+    'gord_max': ('gord_g', '<='),
+    'fibra_min': ('fibra_g', '>='),
+}
+
+# Similaridade mínima (0-1) de cada palavra da busca com alguma palavra do nome
+SIMILARIDADE_MINIMA = 0.8
+
+
+def normalizar_nome(nome: str) -> str:
+    """Minúsculas e sem acentos (busca por nome)"""
+    sem_acento = unicodedata.normalize('NFKD', nome.strip().lower())
+    return ''.join(c for c in sem_acento if not unicodedata.combining(c))
+
+
+def palavras_do_nome(nome_normalizado: str) -> Tuple[str, ...]:
+    return tuple(p for p in re.split(r'[^a-z0-9]+', nome_normalizado) if p)
+
+
+class BuscaPorNome:
+    """
+    Índice de nomes normalizados para a busca aproximada
+
+    Cada palavra da busca casa com a palavra mais parecida do nome (prefixo
+    vale 1.0, senão a similaridade de caracteres, mínimo SIMILARIDADE_MINIMA);
+    nomes que começam pela busca inteira ganham bônus. A similaridade é
+    calculada uma vez por palavra distinta da base, não por alimento.
+    """
+
+    def __init__(self, nomes: List[Tuple[str, str, str]]):
+        # (chave, nome, grupo) -> (chave, grupo, nome normalizado, palavras)
+        self._entradas = []
+        vocabulario = set()
+        for chave, nome, grupo in nomes:
+            texto = normalizar_nome(nome)
+            palavras = palavras_do_nome(texto) + palavras_do_nome(chave.replace('_', ' '))
+            vocabulario.update(palavras)
+            self._entradas.append((chave, grupo, texto, palavras))
+        self._vocabulario = tuple(vocabulario)
+        # termo -> {palavra da base: similaridade} (termos repetidos nas buscas)
+        self._semelhantes: Dict[str, Dict[str, float]] = {}
+
+    def _semelhantes_a(self, termo: str) -> Dict[str, float]:
+        """Palavras da base que passam da similaridade mínima com o termo"""
+        # Importado aqui: o índice só é montado na primeira busca
+        from difflib import SequenceMatcher
+
+        pares = self._semelhantes.get(termo)
+        if pares is None:
+            pares = {}
+            for palavra in self._vocabulario:
+                if palavra.startswith(termo):
+                    pares[palavra] = 1.0
+                    continue
+                # ratio() <= 2*min/(soma): descarta pelo tamanho antes de comparar caracteres
+                if 2 * min(len(termo), len(palavra)) < SIMILARIDADE_MINIMA * (len(termo) + len(palavra)):
+                    continue
+                similaridade = SequenceMatcher(None, termo, palavra).ratio()
+                if similaridade >= SIMILARIDADE_MINIMA:
+                    pares[palavra] = similaridade
+            if len(self._semelhantes) >= 1024:
+                self._semelhantes.clear()
+            self._semelhantes[termo] = pares
+        return pares
+
+    def buscar(self, termo: str, grupo: str = None, limite: int = 10) -> List[str]:
+        consulta = palavras_do_nome(normalizar_nome(termo))
+        if not consulta:
+            return []
+        semelhantes = [self._semelhantes_a(t) for t in consulta]
+        if not all(semelhantes):
+            return []
+
+        frase = ' '.join(consulta)
+        resultados = []
+        for chave, grupo_alimento, texto, palavras in self._entradas:
+            if grupo and grupo_alimento != grupo:
+                continue
+            total = 0.0
+            for pares in semelhantes:
+                melhor = max((pares.get(p, 0.0) for p in palavras), default=0.0)
+                if not melhor:
+                    break
+                total += melhor
+            else:
+                pontos = total / len(consulta)
+                if texto == frase:
+                    pontos += 2.0
+                elif texto.startswith(frase):
+                    pontos += 1.0
+                resultados.append((-pontos, len(texto), chave))
+        resultados.sort()
+        return [chave for _, _, chave in resultados[:limite]]
+
+
+class MemoryFoodRepository:
+    """
+    Base curada em memória (snapshot ou literais de app/data/fontes)
+    """
+
+    backend = "memory"
+
+    def __init__(self, alimentos: Mapping):
+        self.alimentos = alimentos
+        self._busca: Optional[BuscaPorNome] = None
+
+    def por_grupo(self, grupo: str) -> Dict[str, dict]:
+        """Alimentos de um grupo, na ordem da base"""
+        return {k: v for k, v in self.alimentos.items() if v['grupo'] == grupo}
+
+    def filtrar(self, grupo: str = None, limite: int = 50, **filtros) -> Dict[str, dict]:
+        """
+        Alimentos que atendem aos filtros
+
+        Args:
+            grupo: Grupo do alimento
+            limite: Máximo de resultados
+            **filtros: ig_max, kcal_max, carb_max, prot_min, gord_max, fibra_min
+        """
+        condicoes = condicoes_filtro(filtros)
+        resultado = {}
+        for k, v in self.alimentos.items():
+            if grupo and v['grupo'] != grupo:
+                continue
+            # Campo ausente (IG desconhecido) não atende ao filtro, como NULL no SQLite
+            if all(v[campo] is not None and (v[campo] <= valor if op == '<=' else v[campo] >= valor)
+                   for campo, op, valor in condicoes):
+                resultado[k] = v
+                if len(resultado) >= limite:
+                    break
+        return resultado
+
+    def buscar(self, termo: str, grupo: str = None, limite: int = 10) -> Dict[str, dict]:
+        """
+        Busca aproximada por nome (sem acentos, tolerante a erros de digitação)
+
+        Returns:
+            Alimentos em ordem de relevância
+        """
+        if self._busca is None:
+            self._busca = BuscaPorNome([
+                (k, v['nome'], v['grupo']) for k, v in self.alimentos.items()
+            ])
+        return {k: self.alimentos[k] for k in self._busca.buscar(termo, grupo, limite)}
+
+    def stats(self) -> dict:
+        """Tamanho da base"""
+        return {
+            "backend": self.backend,
+            "alimentos": len(self.alimentos)
+        }
+
+
+def condicoes_filtro(filtros: dict) -> List[Tuple[str, str, float]]:
+    """Filtros informados -> (campo, operador, valor)"""
+    condicoes = []
+    for nome, valor in filtros.items():
+        if valor is None:
+            continue
+        if nome not in FILTROS:
+            raise ValueError(f"Filtro inválido: {nome}. Use: {', '.join(FILTROS)}")
+        campo, op = FILTROS[nome]
+        condicoes.append((campo, op, valor))
+    return condicoes
+
+
+def criar_repositorio(curados: Mapping):
+    """
+    Backend conforme FOOD_REPOSITORY
+
+    Args:
+        curados: Base curada (snapshot ou literais)
+    """
+    if settings.food_repository_backend != "sqlite":
+        return MemoryFoodRepository(curados)
+    import sqlite3
+    from app.data.food_repository_sqlite import SQLiteFoodRepository
+    try:
+        return SQLiteFoodRepository(curados)
+    except (sqlite3.Error, OSError, UnicodeDecodeError) as e:
+        print(f"Aviso: repositório SQLite de alimentos indisponível ({e}), usando a base curada")
+        return MemoryFoodRepository(curados)
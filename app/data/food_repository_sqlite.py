@@ -0,0 +1,255 @@
+"""
+Backend SQLite do repositório de alimentos (FOOD_REPOSITORY=sqlite)
+
+A base estendida (CSV, ex. exportação da TACO completa) somada à base
+curada é gravada em um arquivo SQLite com índices por grupo, macros e IG.
+Formato do CSV: ver app/data/food_repository.py.
+"""
+import csv
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import closing
+from typing import Dict, Optional
+
+from app.config.settings import settings
+from app.data.food_repository import (
+    CAMPOS, BuscaPorNome, condicoes_filtro, palavras_do_nome, normalizar_nome
+)
+
+CSV_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alimentos_taco.csv')
+
+# Campos numéricos obrigatórios do CSV
+CAMPOS_NUMERICOS = ('kcal', 'carb_g', 'prot_g', 'gord_g', 'fibra_g')
+
+# Versão da conversão CSV -> SQLite (entra na assinatura: mudou, o arquivo é regerado)
+# 2: IG vazio gravado como NULL (antes 0)
+VERSAO_FORMATO = 2
+
+
+class SQLiteFoodRepository(Mapping):
+    """
+    Base estendida em SQLite, gerada a partir do CSV
+
+    O arquivo é reconstruído quando o CSV ou a base curada mudam
+    (assinatura CRC32 gravada na tabela meta). As linhas lidas ficam em
+    um cache LRU; chaves e nomes (para a busca) são carregados uma vez.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, curados: Mapping, csv_path: str = None, path: str = None, cache: int = None):
+        """
+        Args:
+            curados: Base curada (tem precedência sobre o CSV)
+            csv_path: CSV com a tabela estendida
+            path: Arquivo SQLite gerado
+            cache: Linhas mantidas no cache LRU
+        """
+        self.csv_path = csv_path or settings.food_csv_path or CSV_PADRAO
+        self.path = path or settings.food_db_path
+        self.max_cache = cache if cache is not None else settings.food_cache_size
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._busca: Optional[BuscaPorNome] = None
+        self.hits = 0
+        self.misses = 0
+
+        self._preparar(curados)
+        with closing(self._conectar_leitura()) as conn:
+            self._chaves = tuple(r[0] for r in conn.execute("SELECT chave FROM alimentos ORDER BY pos"))
+        self._indice_chaves = frozenset(self._chaves)
+
+    @property
+    def alimentos(self) -> Mapping:
+        return self
+
+    # --- construção -------------------------------------------------------
+
+    def _preparar(self, curados: Mapping):
+        """Gera o arquivo SQLite se não existe ou está desatualizado"""
+        with open(self.csv_path, 'rb') as f:
+            conteudo_csv = f.read()
+        base = [(k, [curados[k][c] for c in CAMPOS]) for k in curados]
+        assinatura = f"{VERSAO_FORMATO}:{zlib.crc32(json.dumps(base).encode(), zlib.crc32(conteudo_csv))}"
+
+        if os.path.exists(self.path):
+            try:
+                with closing(self._conectar_leitura()) as conn:
+                    atual = conn.execute("SELECT valor FROM meta WHERE campo = 'assinatura'").fetchone()
+                if atual and atual[0] == assinatura:
+                    return
+            except sqlite3.Error:
+                pass
+
+        linhas = {k: valores for k, valores in base}
+        for registro in _ler_csv(conteudo_csv.decode('utf-8-sig')):
+            linhas.setdefault(registro[0], registro[1])
+
+        # Gera em arquivo temporário e troca: outros processos (pool) nunca
+        # leem um arquivo pela metade
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temporario = f"{self.path}.{os.getpid()}.tmp"
+        with closing(sqlite3.connect(temporario)) as conn, conn:
+            # Colunas sem tipo declarado: inteiros e floats voltam como foram gravados
+            conn.execute(
+                """
+                CREATE TABLE alimentos (
+                    pos INTEGER PRIMARY KEY,
+                    chave TEXT UNIQUE NOT NULL,
+                    nome, grupo, kcal, carb_g, prot_g, gord_g, fibra_g,
+                    porcao_usual, gramas_porcao, ig
+                )
+                """
+            )
+            conn.executemany(
+                f"INSERT INTO alimentos VALUES (?, ?, {', '.join('?' * len(CAMPOS))})",
+                ((pos, chave, *valores) for pos, (chave, valores) in enumerate(linhas.items()))
+            )
+            for campo in ('grupo', 'kcal', 'carb_g', 'prot_g', 'gord_g', 'fibra_g', 'ig'):
+                conn.execute(f"CREATE INDEX idx_alimentos_{campo} ON alimentos ({campo})")
+            conn.execute("CREATE TABLE meta (campo TEXT PRIMARY KEY, valor TEXT)")
+            conn.execute("INSERT INTO meta VALUES ('assinatura', ?)", (assinatura,))
+        os.replace(temporario, self.path)
+
+    # --- leitura ----------------------------------------------------------
+
+    def _conectar_leitura(self) -> sqlite3.Connection:
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+
+    def _conexao(self) -> sqlite3.Connection:
+        # Uma conexão somente leitura por thread (leituras no caminho quente)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._conectar_leitura()
+        return conn
+
+    def _consultar(self, where: str = "", parametros: tuple = (), limite: int = None) -> Dict[str, dict]:
+        sql = f"SELECT chave, {', '.join(CAMPOS)} FROM alimentos {where} ORDER BY pos"
+        if limite:
+            sql += f" LIMIT {int(limite)}"
+        rows = self._conexao().execute(sql, parametros).fetchall()
+        resultado = {}
+        with self._lock:
+            for chave, *valores in rows:
+                resultado[chave] = self._guardar(chave, dict(zip(CAMPOS, valores)))
+        return resultado
+
+    def _guardar(self, chave: str, alimento: dict) -> dict:
+        """Grava no cache LRU (chamado com o lock); mantém o objeto já cacheado"""
+        atual = self._cache.get(chave)
+        if atual is not None:
+            self._cache.move_to_end(chave)
+            return atual
+        self._cache[chave] = alimento
+        while len(self._cache) > self.max_cache:
+            self._cache.popitem(last=False)
+        return alimento
+
+    def __getitem__(self, chave: str) -> dict:
+        with self._lock:
+            alimento = self._cache.get(chave)
+            if alimento is not None:
+                self.hits += 1
+                self._cache.move_to_end(chave)
+                return alimento
+            self.misses += 1
+        if chave not in self._indice_chaves:
+            raise KeyError(chave)
+        return self._consultar("WHERE chave = ?", (chave,))[chave]
+
+    def __contains__(self, chave) -> bool:
+        return chave in self._indice_chaves
+
+    def __iter__(self):
+        return iter(self._chaves)
+
+    def __len__(self) -> int:
+        return len(self._chaves)
+
+    def por_grupo(self, grupo: str) -> Dict[str, dict]:
+        """Alimentos de um grupo, na ordem da base (índice por grupo)"""
+        return self._consultar("WHERE grupo = ?", (grupo,))
+
+    def filtrar(self, grupo: str = None, limite: int = 50, **filtros) -> Dict[str, dict]:
+        """
+        Alimentos que atendem aos filtros (consultas pelos índices)
+
+        Args:
+            grupo: Grupo do alimento
+            limite: Máximo de resultados
+            **filtros: ig_max, kcal_max, carb_max, prot_min, gord_max, fibra_min
+        """
+        clausulas, parametros = [], []
+        if grupo:
+            clausulas.append("grupo = ?")
+            parametros.append(grupo)
+        for campo, op, valor in condicoes_filtro(filtros):
+            clausulas.append(f"{campo} {op} ?")
+            parametros.append(valor)
+        where = f"WHERE {' AND '.join(clausulas)}" if clausulas else ""
+        return self._consultar(where, tuple(parametros), limite)
+
+    def buscar(self, termo: str, grupo: str = None, limite: int = 10) -> Dict[str, dict]:
+        """
+        Busca aproximada por nome (sem acentos, tolerante a erros de digitação)
+
+        Returns:
+            Alimentos em ordem de relevância
+        """
+        if self._busca is None:
+            rows = self._conexao().execute("SELECT chave, nome, grupo FROM alimentos ORDER BY pos").fetchall()
+            self._busca = BuscaPorNome(rows)
+        return {k: self[k] for k in self._busca.buscar(termo, grupo, limite)}
+
+    def stats(self) -> dict:
+        """Tamanho da base e uso do cache LRU"""
+        leituras = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "alimentos": len(self._chaves),
+            "path": self.path,
+            "csv": self.csv_path,
+            "cache_entradas": len(self._cache),
+            "cache_max": self.max_cache,
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "cache_hit_rate": round(self.hits / leituras, 3) if leituras else 0.0
+        }
+
+
+def _numero(texto: str):
+    """'84' -> 84, '1.5' ou '1,5' -> 1.5 (inteiros continuam inteiros, como na base)"""
+    texto = texto.strip().replace(',', '.')
+    try:
+        return int(texto)
+    except ValueError:
+        return float(texto)
+
+
+def _ler_csv(conteudo: str):
+    """Linhas do CSV -> (chave, valores na ordem de CAMPOS)"""
+    for n, linha in enumerate(csv.DictReader(conteudo.splitlines()), start=2):
+        nome = (linha.get('nome') or '').strip()
+        if not nome:
+            continue
+        try:
+            valores = {campo: _numero(linha[campo]) for campo in CAMPOS_NUMERICOS}
+            valores['gramas_porcao'] = _numero(linha.get('gramas_porcao') or '100')
+            # IG vazio = desconhecido (NULL): não passa em ig_max nem no limite de CG
+            ig = (linha.get('ig') or '').strip()
+            valores['ig'] = int(_numero(ig)) if ig else None
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Aviso: linha {n} do CSV de alimentos ignorada ({e})")
+            continue
+        valores['nome'] = nome
+        valores['grupo'] = (linha.get('grupo') or '').strip()
+        valores['porcao_usual'] = (linha.get('porcao_usual') or '').strip() or f"{valores['gramas_porcao']}g"
+        chave = (linha.get('chave') or '').strip() or '_'.join(palavras_do_nome(normalizar_nome(nome)))
+        yield chave, [valores[c] for c in CAMPOS]
@@ -0,0 +1,247 @@
+"""
+Snapshot binário da base de alimentos
+
+ALIMENTOS, ALIMENTOS_POR_REFEICAO e SUBSTITUICOES (app/data/fontes) são
+compilados em um arquivo compacto, mapeado em memória (mmap) no startup em
+vez de compilar os literais Python. Os dicionários são servidos de forma
+preguiçosa: cada alimento ou seção é decodificado no primeiro acesso.
+
+Compilação (depois de editar app/data/fontes):
+    python -m app.data.compilar_snapshot
+
+Formato (little-endian):
+- cabeçalho: MAGIC, versão, CRC32 das fontes, offsets das seções
+- strings: contagem, offsets (uint32) e bytes UTF-8 de todas as strings
+- alimentos: registros de tamanho fixo (struct) na ordem original
+- alimentos_por_refeicao / substituicoes: índice (chave, offset) por
+  entrada de primeiro nível e valores em codificação com tags
+
+Se o arquivo não existe, está corrompido ou foi gerado a partir de outra
+versão das fontes, carregar() retorna None e os módulos de dados usam os
+literais diretamente.
+"""
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from app.config.settings import settings
+
+DIR_DADOS = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO = os.path.join(DIR_DADOS, 'alimentos.snapshot')
+FONTES = (
+    os.path.join(DIR_DADOS, 'fontes', 'alimentos.py'),
+    os.path.join(DIR_DADOS, 'fontes', 'substituicoes.py'),
+)
+
+MAGIC = b'DIETSNAP'
+VERSAO = 1
+
+# MAGIC, versão, CRC32 das fontes, offsets (strings, alimentos, por_refeicao, substituicoes), nº alimentos
+CABECALHO = struct.Struct('<8sHI5I')
+# chave, nome, grupo, porcao_usual (índices de string), 6 valores numéricos, ig, máscara de inteiros
+REGISTRO = struct.Struct('<4I6dhB')
+CAMPOS_NUMERICOS = ('kcal', 'carb_g', 'prot_g', 'gord_g', 'fibra_g', 'gramas_porcao')
+# Ordem dos campos no dicionário original
+ORDEM_CAMPOS = (
+    'nome', 'grupo', 'kcal', 'carb_g', 'prot_g', 'gord_g', 'fibra_g',
+    'porcao_usual', 'gramas_porcao', 'ig'
+)
+
+U32 = struct.Struct('<I')
+I64 = struct.Struct('<q')
+F64 = struct.Struct('<d')
+PAR = struct.Struct('<2I')
+
+
+def checksum_fontes() -> int:
+    """CRC32 dos arquivos-fonte (detecta snapshot desatualizado)"""
+    crc = 0
+    for caminho in FONTES:
+        with open(caminho, 'rb') as f:
+            crc = zlib.crc32(f.read(), crc)
+    return crc
+
+
+class Snapshot:
+    """Arquivo de snapshot mapeado em memória"""
+
+    def __init__(self, caminho: str = ARQUIVO):
+        with open(caminho, 'rb') as f:
+            try:
+                self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # Sistemas de arquivos sem suporte a mmap
+                self._buf = f.read()
+
+        magic, versao, self.checksum, off_str, off_alim, off_ref, off_sub, n_alim = \
+            CABECALHO.unpack_from(self._buf, 0)
+        if magic != MAGIC or versao != VERSAO:
+            raise ValueError("Snapshot com formato incompatível")
+
+        n_strings = U32.unpack_from(self._buf, off_str)[0]
+        self._offsets_str = struct.unpack_from(f'<{n_strings + 1}I', self._buf, off_str + 4)
+        self._base_str = off_str + 4 + 4 * (n_strings + 1)
+        self._strings: List[Optional[str]] = [None] * n_strings
+
+        self.alimentos = _TabelaAlimentos(self, off_alim, n_alim)
+        self.alimentos_por_refeicao = _Secao(self, off_ref)
+        self.substituicoes = _Secao(self, off_sub)
+
+    def string(self, i: int) -> str:
+        s = self._strings[i]
+        if s is None:
+            inicio = self._base_str + self._offsets_str[i]
+            fim = self._base_str + self._offsets_str[i + 1]
+            s = self._strings[i] = bytes(self._buf[inicio:fim]).decode('utf-8')
+        return s
+
+    def valor(self, pos: int):
+        """Decodifica um valor com tags; retorna (valor, próxima posição)"""
+        buf = self._buf
+        tag = buf[pos:pos + 1]
+        pos += 1
+        if tag == b'd':
+            n = U32.unpack_from(buf, pos)[0]
+            pos += 4
+            d = {}
+            for _ in range(n):
+                k = self.string(U32.unpack_from(buf, pos)[0])
+                d[k], pos = self.valor(pos + 4)
+            return d, pos
+        if tag == b'l':
+            n = U32.unpack_from(buf, pos)[0]
+            pos += 4
+            lista = []
+            for _ in range(n):
+                v, pos = self.valor(pos)
+                lista.append(v)
+            return lista, pos
+        if tag == b's':
+            return self.string(U32.unpack_from(buf, pos)[0]), pos + 4
+        if tag == b'i':
+            return I64.unpack_from(buf, pos)[0], pos + 8
+        if tag == b'f':
+            return F64.unpack_from(buf, pos)[0], pos + 8
+        if tag == b'n':
+            return None, pos
+        if tag in (b't', b'F'):
+            return tag == b't', pos
+        raise ValueError(f"Tag inválida no snapshot: {tag!r}")
+
+
+class _TabelaAlimentos(Mapping):
+    """ALIMENTOS servido do snapshot (cada registro decodificado no 1º acesso)"""
+
+    def __init__(self, snapshot: Snapshot, offset: int, n: int):
+        self._snapshot = snapshot
+        self._offset = offset
+        self._cache: Dict[str, dict] = {}
+        buf = snapshot._buf
+        # Só as chaves são lidas no carregamento (ordem original preservada)
+        self._indices = {
+            snapshot.string(U32.unpack_from(buf, offset + i * REGISTRO.size)[0]): i
+            for i in range(n)
+        }
+
+    def _decodificar(self, i: int) -> dict:
+        s = self._snapshot
+        _, nome, grupo, porcao, *numeros, ig, mascara = REGISTRO.unpack_from(
+            s._buf, self._offset + i * REGISTRO.size
+        )
+        valores = {
+            campo: int(v) if mascara & (1 << bit) else v
+            for bit, (campo, v) in enumerate(zip(CAMPOS_NUMERICOS, numeros))
+        }
+        return {
+            'nome': s.string(nome),
+            'grupo': s.string(grupo),
+            'kcal': valores['kcal'],
+            'carb_g': valores['carb_g'],
+            'prot_g': valores['prot_g'],
+            'gord_g': valores['gord_g'],
+            'fibra_g': valores['fibra_g'],
+            'porcao_usual': s.string(porcao),
+            'gramas_porcao': valores['gramas_porcao'],
+            'ig': ig
+        }
+
+    def __getitem__(self, key: str) -> dict:
+        alimento = self._cache.get(key)
+        if alimento is None:
+            alimento = self._cache[key] = self._decodificar(self._indices[key])
+        return alimento
+
+    def __contains__(self, key) -> bool:
+        return key in self._indices
+
+    def __iter__(self):
+        return iter(self._indices)
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+
+class _Secao(Mapping):
+    """Dicionário de primeiro nível com valores decodificados no 1º acesso"""
+
+    def __init__(self, snapshot: Snapshot, offset: int):
+        self._snapshot = snapshot
+        self._cache: Dict[str, Any] = {}
+        buf = snapshot._buf
+        n = U32.unpack_from(buf, offset)[0]
+        base = offset + 4 + n * PAR.size
+        self._posicoes = {}
+        for i in range(n):
+            chave, rel = PAR.unpack_from(buf, offset + 4 + i * PAR.size)
+            self._posicoes[snapshot.string(chave)] = base + rel
+
+    def __getitem__(self, key: str):
+        if key in self._cache:
+            return self._cache[key]
+        valor, _ = self._snapshot.valor(self._posicoes[key])
+        self._cache[key] = valor
+        return valor
+
+    def __contains__(self, key) -> bool:
+        return key in self._posicoes
+
+    def __iter__(self):
+        return iter(self._posicoes)
+
+    def __len__(self) -> int:
+        return len(self._posicoes)
+
+
+@lru_cache(maxsize=1)
+def carregar() -> Optional[Snapshot]:
+    """
+    Snapshot da base (compartilhado pelos módulos de dados)
+
+    Returns:
+        Snapshot, ou None se desativado (FOOD_SNAPSHOT=0), ausente,
+        inválido ou desatualizado em relação às fontes
+    """
+    if not settings.food_snapshot_enabled:
+        return None
+    if not os.path.exists(ARQUIVO):
+        return None
+    try:
+        snapshot = Snapshot(ARQUIVO)
+    except (ValueError, OSError, struct.error) as e:
+        print(f"Aviso: snapshot da base de alimentos inválido ({e}), usando as fontes")
+        return None
+    try:
+        atualizado = snapshot.checksum == checksum_fontes()
+    except OSError:
+        # Fontes fora do pacote publicado: confia no snapshot
+        atualizado = True
+    if not atualizado:
+        print("Aviso: snapshot da base de alimentos desatualizado "
+              "(rode python -m app.data.compilar_snapshot), usando as fontes")
+        return None
+    return snapshot
+
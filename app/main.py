@@ -2,20 +2,39 @@
 FastAPI Application - Gerador de Dietas para Diabetes
 Sistema híbrido otimizado: Python + API Anthropic inteligente
 """
-from fastapi import FastAPI, Request, HTTPException, Query
-from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request, HTTPException, Query, UploadFile, File, Header
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from starlette.background import BackgroundTask
 from fastapi.templating import Jinja2Templates
 from datetime import datetime
 from typing import Optional
+import asyncio
 import os
+import tempfile
+from urllib.parse import quote
 from pathlib import Path
 
-from app.models import PatientData
+from app.models import PatientData, DietEditRequest, PlanDocument
 from app.services.nutrition_calc import NutritionCalculator
 from app.services.hybrid_system import HybridDietSystem
 from app.services.feegow_service import feegow_service
+from app.services.pdf_renderer import render_pdf
+from app.services.bulk_import import BulkDietImporter
+from app.services.cohort_forecast import CohortForecaster
+from app.services.process_pool import process_pool
+from app.services.substitution_index import substitution_index, CAMPOS_MACRO
+from app.data.alimentos_base import food_repository
+from app.services.plan_store import plan_store, plano_para_payload
+from app.services.plan_json import plano_estruturado, RespostaJSON
+from app.services.upload_queue import upload_queue
+from app.services.generation_jobs import generation_jobs, formatar_sse
 from app.config.settings import settings, GenerationMode
+from app.utils.cost_tracker import precos_do_modelo
+from app.utils.single_flight import chave_canonica
+from app.utils.compression import CompressionMiddleware
+from app.utils.static_page import PrerenderedPage
+from app.utils.static_assets import StaticAssets, FingerprintedStaticFiles
 
 # Detectar ambiente Vercel
 IS_VERCEL = os.environ.get('VERCEL', False)
@@ -32,28 +51,78 @@ app = FastAPI(
     version="2.0.0"
 )
 
-# Montar arquivos estáticos apenas em ambiente local
+# Comprimir respostas grandes (JSON, Markdown, HTML, CSS, JS)
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware)
+
+# Arquivos estáticos versionados pelo conteúdo (?v=hash, cache immutable)
+static_assets = StaticAssets(STATIC_DIR)
+
+# Montar arquivos estáticos apenas em ambiente local (no Vercel a CDN serve static/)
 if not IS_VERCEL and STATIC_DIR.exists():
-    app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+    app.mount(
+        "/static",
+        FingerprintedStaticFiles(directory=str(STATIC_DIR), assets=static_assets),
+        name="static"
+    )
 
 # Inicializar templates
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+templates.env.globals["static_url"] = static_assets.url
+# Página inicial renderizada uma vez (sem dados por requisição)
+pagina_inicial = PrerenderedPage(templates, "index.html")
 
 # Inicializar serviços
 calc = NutritionCalculator()
 hybrid_system = HybridDietSystem()
 
 
+@app.on_event("startup")
+async def startup():
+    """
+    Versiona os arquivos estáticos, pré-renderiza a página inicial e inicia o
+    pool de processos (EXECUTION_MODE=process_pool), os workers da fila de
+    uploads e a gravação em lote das estatísticas e dos eventos dos jobs
+    (fora do Vercel)
+    """
+    static_assets.manifesto()
+    pagina_inicial.renderizar()
+    if IS_VERCEL:
+        return
+    if settings.execution_mode == "process_pool":
+        process_pool.start()
+        hybrid_system.process_pool = process_pool
+    await upload_queue.start()
+    await hybrid_system.cost_tracker.start()
+    await generation_jobs.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """
+    Cancela os jobs de geração em andamento, drena o pool de processos e a
+    fila de uploads aguardando o que está em andamento, e grava as
+    estatísticas pendentes
+    """
+    await generation_jobs.stop()
+    await upload_queue.stop()
+    hybrid_system.process_pool = None
+    await run_in_threadpool(process_pool.shutdown, True)
+    hybrid_system.shutdown()
+    await hybrid_system.cost_tracker.stop()
+
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
-    """Página principal com formulário"""
-    return templates.TemplateResponse("index.html", {"request": request})
+    """Página principal com formulário (pré-renderizada, com ETag)"""
+    return pagina_inicial.resposta(request)
 
 
 @app.post("/gerar-dieta")
 async def gerar_dieta(
     patient: PatientData,
-    mode: Optional[str] = Query(None, description="Modo: python_only, auto, api_minimal, api_full")
+    mode: Optional[str] = Query(None, description="Modo: python_only, auto, api_minimal, api_full"),
+    formato: str = Query("markdown", pattern="^(markdown|json|ambos)$", description="Resposta: markdown, json ou ambos")
 ):
     """
     Endpoint principal: gera dieta usando sistema híbrido inteligente
@@ -64,43 +133,38 @@ async def gerar_dieta(
     - api_minimal: Python + API apenas para apresentação
     - api_full: API completa para casos complexos
 
+    Formatos de resposta:
+    - markdown: documento formatado e metadados (padrão)
+    - json: plano estruturado (refeições, alimentos, totais, referências de
+      substituição), sem renderizar o Markdown nem chamar a API
+    - ambos: documento formatado + plano estruturado em "dieta"
+
     Args:
         patient: Dados do paciente do formulário
         mode: Modo de geração (opcional, padrão: auto)
+        formato: Formato da resposta (opcional, padrão: markdown)
 
     Returns:
-        JSON com markdown formatado e metadados completos
+        JSON com markdown formatado e/ou plano estruturado e metadados
     """
 
     try:
-        # Converter string de mode para enum se fornecido
-        generation_mode = None
-        if mode:
-            try:
-                generation_mode = GenerationMode(mode)
-            except ValueError:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Modo inválido: {mode}. Use: python_only, auto, api_minimal, api_full"
-                )
+        generation_mode = _modo_de_geracao(mode)
 
-        # Gerar dieta usando sistema híbrido
-        markdown, metadata = hybrid_system.generate_diet(
+        # Gerar dieta usando sistema híbrido (pool de processos quando ativo)
+        plan = await hybrid_system.generate_plan_async(
             patient_data=patient,
-            mode=generation_mode
+            mode=generation_mode,
+            render_markdown=formato != "json"
         )
 
-        # Gerar nome do arquivo
-        nome_limpo = patient.nome.replace(" ", "_").replace(".", "")
-        data_atual = datetime.now().strftime('%Y-%m-%d')
-        filename = f"Dieta_{nome_limpo}_{data_atual}.md"
+        # Guardar para edição incremental (/api/editar-dieta)
+        plan_id = await run_in_threadpool(plan_store.salvar, plan)
 
-        return JSONResponse({
-            "success": True,
-            "markdown": markdown,
-            "filename": filename,
-            "metadata": metadata
-        })
+        resposta = _resposta_geracao(plan, plan_id, formato)
+        if formato == "markdown":
+            return JSONResponse(resposta)
+        return RespostaJSON(resposta)
 
     except HTTPException:
         raise
@@ -108,6 +172,336 @@ async def gerar_dieta(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _modo_de_geracao(mode: Optional[str]) -> Optional[GenerationMode]:
+    """Converte a string de mode para enum (400 se inválida)"""
+    if not mode:
+        return None
+    try:
+        return GenerationMode(mode)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Modo inválido: {mode}. Use: python_only, auto, api_minimal, api_full"
+        )
+
+
+def _resposta_geracao(plan, plan_id: str, formato: str) -> dict:
+    """Corpo da resposta de /gerar-dieta (também o resultado dos jobs)"""
+    if formato == "json":
+        return {"success": True, **plano_estruturado(plan, plan_id)}
+
+    resposta = {
+        "success": True,
+        "markdown": plan.markdown,
+        "filename": _nome_arquivo(plan.patient.nome),
+        "metadata": plan.metadata,
+        "plan_id": plan_id,
+        "plano": plano_para_payload(plan)
+    }
+    if formato == "ambos":
+        resposta["dieta"] = plano_estruturado(plan, plan_id)
+    return resposta
+
+
+@app.post("/api/jobs/gerar-dieta", status_code=202)
+async def criar_job_dieta(
+    patient: PatientData,
+    mode: Optional[str] = Query(None, description="Modo: python_only, auto, api_minimal, api_full"),
+    formato: str = Query("markdown", pattern="^(markdown|json|ambos)$", description="Resposta: markdown, json ou ambos")
+):
+    """
+    Gera a dieta em segundo plano e responde na hora com o job_id
+
+    O progresso (etapas nutricao, refeicoes, api com tokens e formatacao)
+    e o resultado final (mesmo JSON de /gerar-dieta) chegam por SSE em
+    /api/jobs/{job_id}/eventos; /api/jobs/{job_id} devolve o estado.
+    Requisições idênticas com um job em andamento recebem o mesmo job.
+
+    No Vercel a geração termina antes da resposta, que já traz o resultado.
+
+    Returns:
+        job_id, estado e URLs de eventos e status (202)
+    """
+    generation_mode = _modo_de_geracao(mode)
+
+    async def executar(progresso):
+        plan = await hybrid_system.generate_plan_async(
+            patient_data=patient,
+            mode=generation_mode,
+            render_markdown=formato != "json",
+            progresso=progresso
+        )
+        plan_id = await run_in_threadpool(plan_store.salvar, plan)
+        return _resposta_geracao(plan, plan_id, formato)
+
+    chave = chave_canonica({
+        'paciente': patient.model_dump(),
+        'modo': generation_mode.value if generation_mode else None,
+        'formato': formato
+    })
+    job, _ = await generation_jobs.criar(chave, executar)
+    if IS_VERCEL:
+        # Sem processo em segundo plano entre requisições
+        await asyncio.wait({job.tarefa})
+
+    return RespostaJSON(
+        {
+            "success": True,
+            **job.status(),
+            "eventos_url": f"/api/jobs/{job.job_id}/eventos",
+            "status_url": f"/api/jobs/{job.job_id}"
+        },
+        status_code=202
+    )
+
+
+@app.get("/api/jobs/{job_id}")
+async def status_job(job_id: str):
+    """Estado do job de geração (com o resultado quando concluído), de qualquer worker"""
+    status = await generation_jobs.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado ou expirado")
+    return RespostaJSON(status)
+
+
+@app.get("/api/jobs/{job_id}/eventos")
+async def eventos_job(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """
+    Progresso do job por Server-Sent Events
+
+    Eventos: "etapa" (etapa e dados dela), depois "resultado" ou "erro",
+    e o stream termina. Reconexões com Last-Event-ID recebem só os
+    eventos seguintes. Job de outro worker é acompanhado pelo SQLite
+    compartilhado.
+    """
+    if await generation_jobs.status(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado ou expirado")
+    apos = int(last_event_id) if last_event_id and last_event_id.isdigit() else -1
+
+    async def stream():
+        yield "retry: 3000\n\n"
+        async for evento in generation_jobs.eventos(job_id, apos):
+            yield formatar_sse(evento)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _nome_arquivo(nome: str, extensao: str = "md") -> str:
+    """Nome do arquivo da dieta (.md por padrão)"""
+    nome_limpo = nome.replace(" ", "_").replace(".", "")
+    data_atual = datetime.now().strftime('%Y-%m-%d')
+    return f"Dieta_{nome_limpo}_{data_atual}.{extensao}"
+
+
+@app.post("/api/editar-dieta")
+async def editar_dieta(edicao: DietEditRequest):
+    """
+    Edita uma refeição de um plano já gerado, sem gerar a dieta de novo
+
+    Só a refeição alterada é montada; os totais do dia são atualizados pela
+    diferença e apenas o bloco da refeição e o resumo diário do Markdown
+    são re-renderizados. Nenhuma chamada à API é feita.
+
+    Args:
+        edicao: plan_id (ou payload "plano"), refeição e troca desejada
+
+    Returns:
+        JSON no mesmo formato de /gerar-dieta
+    """
+    if edicao.plan_id:
+        plan = await run_in_threadpool(plan_store.obter, edicao.plan_id)
+        if plan is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Plano não encontrado (expirado?). Envie o payload 'plano' retornado por /gerar-dieta"
+            )
+    elif edicao.plano:
+        try:
+            plan = await run_in_threadpool(hybrid_system.plan_from_payload, edicao.plano)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        raise HTTPException(status_code=400, detail="Informe plan_id ou plano")
+
+    if edicao.macro and edicao.macro not in CAMPOS_MACRO:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Macro inválido: {edicao.macro}. Use: {', '.join(CAMPOS_MACRO)}"
+        )
+
+    try:
+        editado = await run_in_threadpool(
+            hybrid_system.edit_plan,
+            plan,
+            refeicao=edicao.refeicao,
+            posicao=edicao.posicao,
+            nova_chave=edicao.nova_chave,
+            macro=edicao.macro
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if edicao.plan_id:
+        plan_id = edicao.plan_id
+        await run_in_threadpool(plan_store.atualizar, plan_id, editado)
+    else:
+        plan_id = await run_in_threadpool(plan_store.salvar, editado)
+
+    return JSONResponse({
+        "success": True,
+        "markdown": editado.markdown,
+        "filename": _nome_arquivo(editado.patient.nome),
+        "metadata": editado.metadata,
+        "plan_id": plan_id,
+        "plano": plano_para_payload(editado)
+    })
+
+
+def _obter_plano(plan_id: str):
+    """Plano armazenado ou 404"""
+    plan = plan_store.obter(plan_id)
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Plano não encontrado")
+    return plan
+
+
+def _renderizar_pendente(plan_id: str, plan):
+    """Planos gerados com formato=json ganham o Markdown no primeiro uso"""
+    if plan.markdown:
+        return plan
+    renderizado = hybrid_system.rerender_plan(plan)
+    plan_store.atualizar(plan_id, renderizado)
+    return renderizado
+
+
+def _obter_documento(plan_id: str):
+    """(markdown, nome do paciente) do plano armazenado ou 404"""
+    documento = plan_store.obter_documento(plan_id)
+    if documento is None:
+        raise HTTPException(status_code=404, detail="Plano não encontrado")
+    if not documento[0]:
+        plan = _renderizar_pendente(plan_id, _obter_plano(plan_id))
+        return (plan.markdown, plan.patient.nome)
+    return documento
+
+
+async def _documento_ou_reenviado(plan_id: str, reenviado: Optional[PlanDocument]):
+    """
+    (markdown, nome) do plano armazenado; se não está neste servidor
+    (expirado, outra instância serverless), o documento reenviado pelo cliente
+    """
+    try:
+        return await run_in_threadpool(_obter_documento, plan_id)
+    except HTTPException as e:
+        if e.status_code != 404 or reenviado is None:
+            raise
+        return (reenviado.markdown, reenviado.patient_name)
+
+
+@app.get("/api/planos/{plan_id}")
+async def obter_plano(plan_id: str):
+    """
+    Plano armazenado (mesmo formato de /gerar-dieta)
+
+    Args:
+        plan_id: ID retornado por /gerar-dieta
+    """
+    plan = await run_in_threadpool(_obter_plano, plan_id)
+    plan = await run_in_threadpool(_renderizar_pendente, plan_id, plan)
+    return JSONResponse({
+        "success": True,
+        "markdown": plan.markdown,
+        "filename": _nome_arquivo(plan.patient.nome),
+        "metadata": plan.metadata,
+        "plan_id": plan_id,
+        "plano": plano_para_payload(plan)
+    })
+
+
+@app.get("/api/planos/{plan_id}/download")
+async def download_plano(plan_id: str):
+    """
+    Download do Markdown do plano armazenado
+
+    Args:
+        plan_id: ID retornado por /gerar-dieta
+    """
+    markdown, nome = await run_in_threadpool(_obter_documento, plan_id)
+    filename = _nome_arquivo(nome)
+    return Response(
+        content=markdown,
+        media_type="text/markdown",
+        headers={"Content-Disposition": f'attachment; filename="{quote(filename)}"'}
+    )
+
+
+@app.get("/api/planos/{plan_id}/pdf")
+async def download_plano_pdf(plan_id: str):
+    """
+    Download do plano armazenado em PDF
+
+    Renderizado no servidor a partir do Markdown (Python puro, em memória).
+
+    Args:
+        plan_id: ID retornado por /gerar-dieta
+    """
+    return await _resposta_pdf(*await run_in_threadpool(_obter_documento, plan_id))
+
+
+@app.post("/api/planos/{plan_id}/pdf")
+async def download_plano_pdf_reenviado(plan_id: str, documento: PlanDocument):
+    """
+    PDF do plano, com o documento no corpo para quando o GET responde 404
+
+    Usa o plano armazenado se ele estiver neste servidor; senão o Markdown
+    enviado pelo cliente (plano expirado ou gerado em outra instância).
+
+    Args:
+        plan_id: ID retornado por /gerar-dieta
+        documento: markdown e patient_name retornados por /gerar-dieta
+    """
+    return await _resposta_pdf(*await _documento_ou_reenviado(plan_id, documento))
+
+
+async def _resposta_pdf(markdown: str, nome: str) -> Response:
+    """Download do Markdown renderizado em PDF"""
+    pdf = await run_in_threadpool(render_pdf, markdown, f"Plano Alimentar - {nome}")
+    filename = _nome_arquivo(nome, "pdf")
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{quote(filename)}"'}
+    )
+
+
+@app.post("/api/planos/{plan_id}/renderizar")
+async def renderizar_plano(plan_id: str):
+    """
+    Re-renderiza o plano armazenado com os templates Python
+
+    Usa as refeições já montadas (sem novo sorteio nem API). Planos api_full
+    passam a ter seções e podem ser editados de forma incremental.
+
+    Args:
+        plan_id: ID retornado por /gerar-dieta
+    """
+    plan = await run_in_threadpool(_obter_plano, plan_id)
+    renderizado = await run_in_threadpool(hybrid_system.rerender_plan, plan)
+    await run_in_threadpool(plan_store.atualizar, plan_id, renderizado)
+
+    return JSONResponse({
+        "success": True,
+        "markdown": renderizado.markdown,
+        "filename": _nome_arquivo(renderizado.patient.nome),
+        "metadata": renderizado.metadata,
+        "plan_id": plan_id
+    })
+
+
 @app.get("/health")
 async def health():
     """
@@ -115,13 +509,37 @@ async def health():
 
     Verifica:
     - Status da aplicação
-    - Disponibilidade da API Anthropic
+    - Disponibilidade da API Anthropic (circuit breaker e modo hedged)
+    - Gerações idênticas simultâneas agrupadas (single-flight) e jobs de geração
+    - Estado do pool de processos
+    - Armazenamento de planos, fila de uploads e cache de pacientes FEEGOW
+    - Repositório da base de alimentos
+    - Página inicial pré-renderizada e versões dos arquivos estáticos
     - Versão do sistema
+
+    Os contadores vêm de SQLite e do disco: montados fora do event loop.
     """
+    return await run_in_threadpool(_health_status)
+
+
+def _health_status() -> dict:
+    """Conteúdo de /health (síncrono: consulta SQLite e arquivos)"""
     return {
         "status": "ok",
         "api_available": hybrid_system.api_available,
+        "api": hybrid_system.api_health(),
+        "single_flight": hybrid_system.single_flight.stats(),
+        "generation_jobs": generation_jobs.stats(),
         "default_mode": settings.default_generation_mode,
+        "execution_mode": settings.execution_mode,
+        "process_pool": process_pool.stats(),
+        "plan_store": plan_store.stats(),
+        "usage_stats": hybrid_system.cost_tracker.stats(),
+        "upload_queue": upload_queue.stats(),
+        "feegow_patient_cache": feegow_service.patient_cache.stats(),
+        "food_repository": food_repository.stats(),
+        "pagina_inicial": pagina_inicial.stats(),
+        "static_assets": static_assets.manifesto(),
         "version": "2.0.0",
         "timestamp": datetime.now().isoformat()
     }
@@ -198,16 +616,18 @@ async def get_stats(
     Returns:
         JSON com estatísticas de geração de dietas
     """
+    # Grava a fila de telemetria e consulta o SQLite: fora do event loop
     if month and year:
-        stats = hybrid_system.get_stats(month=month, year=year)
+        stats = await run_in_threadpool(hybrid_system.get_stats, month=month, year=year)
         period = f"{year}-{month:02d}"
     else:
-        stats = hybrid_system.get_stats()
+        stats = await run_in_threadpool(hybrid_system.get_stats)
         period = "all_time"
 
     return {
         "period": period,
-        "stats": stats
+        "stats": stats,
+        "auto_policy": await run_in_threadpool(hybrid_system.mode_policy.stats)
     }
 
 
@@ -230,8 +650,11 @@ async def get_config():
             "api_minimal": settings.cost_api_minimal,
             "api_full": settings.cost_api_full
         },
+        "monthly_budget_usd": settings.monthly_budget_usd or None,
         "api_available": hybrid_system.api_available,
-        "api_model": settings.anthropic_model
+        "api_model": settings.anthropic_model,
+        # USD por milhão de tokens (custo registrado); None = usa os custos fixos acima
+        "api_token_prices": precos_do_modelo(settings.anthropic_model)
     }
 
 
@@ -250,6 +673,12 @@ async def analyze_complexity(patient: PatientData):
     """
     try:
         analysis = hybrid_system.analyze_complexity(patient)
+        # Modo que o AUTO usaria agora (orçamento e saúde da API); o gasto do
+        # mês vem do SQLite, fora do event loop
+        auto_decision = await run_in_threadpool(
+            hybrid_system.mode_policy.decidir,
+            analysis['score'], hybrid_system.api_available, registrar=False
+        )
 
         return {
             "score": analysis['score'],
@@ -261,11 +690,165 @@ async def analyze_complexity(patient: PatientData):
                 "python_only": settings.cost_python_only,
                 "api_minimal": settings.cost_api_minimal,
                 "api_full": settings.cost_api_full
-            }[analysis['recommendation']]
+            }[analysis['recommendation']],
+            "auto_decision": auto_decision
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/substituicoes")
+async def substituicoes(
+    alimento: str = Query(..., description="Chave ou nome do alimento (ex.: arroz_integral_cozido, 'arroz integral')"),
+    gramas: Optional[float] = Query(None, gt=0, le=2000, description="Quantidade a substituir (padrão: porção usual)"),
+    macro: Optional[str] = Query(None, description="Macro equivalente: carb, prot, gord ou kcal (padrão: do grupo)"),
+    limite: Optional[int] = Query(None, ge=1, le=50, description="Máximo de equivalentes")
+):
+    """
+    Substituições equivalentes de um alimento
+
+    Consulta o índice compilado no startup: ex. "o que substitui 90 g de
+    arroz integral com os mesmos carboidratos?"
+
+    Returns:
+        JSON com os equivalentes da base (gramas já calculadas) e a lista
+        de substituição em medidas caseiras do grupo
+    """
+    if macro and macro not in CAMPOS_MACRO:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Macro inválido: {macro}. Use: {', '.join(CAMPOS_MACRO)}"
+        )
+
+    resultado = substitution_index.consultar(alimento, gramas=gramas, macro=macro, limite=limite)
+    if not resultado.get("success"):
+        raise HTTPException(status_code=404, detail=resultado.get("error"))
+    return resultado
+
+
+@app.get("/api/alimentos")
+async def alimentos(
+    q: Optional[str] = Query(None, max_length=100, description="Nome (sem acentos, aceita erros de digitação)"),
+    grupo: Optional[str] = Query(None, description="Grupo (cereal, proteina, fruta, ...)"),
+    ig_max: Optional[int] = Query(None, ge=0, description="IG máximo"),
+    kcal_max: Optional[float] = Query(None, ge=0, description="kcal máximas por 100 g"),
+    carb_max: Optional[float] = Query(None, ge=0, description="Carboidratos máximos por 100 g"),
+    prot_min: Optional[float] = Query(None, ge=0, description="Proteínas mínimas por 100 g"),
+    gord_max: Optional[float] = Query(None, ge=0, description="Gorduras máximas por 100 g"),
+    fibra_min: Optional[float] = Query(None, ge=0, description="Fibras mínimas por 100 g"),
+    limite: int = Query(20, ge=1, le=200, description="Máximo de resultados")
+):
+    """
+    Consulta à base de alimentos (valores por 100 g)
+
+    Com `q`, busca aproximada por nome em ordem de relevância; sem `q`,
+    filtro por grupo, macros e IG. A base depende de FOOD_REPOSITORY
+    (curada ou estendida via CSV).
+    """
+    if q:
+        encontrados = food_repository.buscar(q, grupo=grupo, limite=limite)
+        filtros = {
+            "ig_max": ig_max, "kcal_max": kcal_max, "carb_max": carb_max,
+            "prot_min": prot_min, "gord_max": gord_max, "fibra_min": fibra_min
         }
+        if any(v is not None for v in filtros.values()):
+            permitidos = food_repository.filtrar(grupo=grupo, limite=len(food_repository.alimentos), **filtros)
+            encontrados = {k: v for k, v in encontrados.items() if k in permitidos}
+    else:
+        encontrados = food_repository.filtrar(
+            grupo=grupo, limite=limite, ig_max=ig_max, kcal_max=kcal_max, carb_max=carb_max,
+            prot_min=prot_min, gord_max=gord_max, fibra_min=fibra_min
+        )
+
+    return {
+        "success": True,
+        "backend": food_repository.backend,
+        "total": len(encontrados),
+        "alimentos": [{"chave": k, **v} for k, v in encontrados.items()]
+    }
+
 
+@app.post("/api/importar-pacientes")
+async def importar_pacientes(
+    arquivo: UploadFile = File(..., description="Planilha de pacientes (.csv ou .parquet)"),
+    workers: Optional[int] = Query(None, ge=0, le=32, description="Processos do pool (0 = sem pool)")
+):
+    """
+    Importação em lote: gera planos python_only a partir de CSV/Parquet
+
+    As linhas são lidas em streaming e validadas em blocos; os planos são
+    gerados em pool de processos e gravados direto no zip.
+
+    Args:
+        arquivo: Planilha com colunas do PatientData (nome, sexo, idade, peso, altura, ...)
+        workers: Número de processos (opcional, padrão: settings.bulk_import_workers)
+
+    Returns:
+        Zip com um .md por paciente e resumo.csv
+    """
+    if IS_VERCEL and workers is None:
+        # Funções serverless não suportam bem multiprocessing
+        workers = 0
+
+    importer = BulkDietImporter(workers=workers)
+
+    # Zip em arquivo temporário (removido após o envio)
+    saida = tempfile.NamedTemporaryFile(suffix=".zip", delete=False)
+    try:
+        with saida:
+            resultado = await run_in_threadpool(
+                importer.processar_arquivo, arquivo.file, arquivo.filename or "", saida
+            )
+    except ValueError as e:
+        os.unlink(saida.name)
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
+        os.unlink(saida.name)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    data_atual = datetime.now().strftime('%Y-%m-%d')
+    return FileResponse(
+        saida.name,
+        media_type="application/zip",
+        filename=f"Dietas_lote_{data_atual}.zip",
+        headers={
+            "X-Total-Linhas": str(resultado['total_linhas']),
+            "X-Planos-Gerados": str(resultado['planos_gerados']),
+            "X-Linhas-Invalidas": str(resultado['linhas_invalidas']),
+            "X-Erros-Geracao": str(resultado['erros_geracao'])
+        },
+        background=BackgroundTask(os.unlink, saida.name)
+    )
+
+
+@app.post("/api/previsao-coorte")
+async def previsao_coorte(
+    arquivo: UploadFile = File(..., description="Planilha de pacientes (.csv ou .parquet)"),
+    pacientes_mes: Optional[int] = Query(None, ge=0, description="Planos gerados por mês (padrão: pacientes da planilha)")
+):
+    """
+    Previsão de complexidade e custo mensal do modo AUTO para uma coorte
+
+    Avalia as regras de complexidade coluna a coluna (sem gerar planos) e
+    projeta o custo com o custo medido por modo (ou settings.cost_*).
+
+    Args:
+        arquivo: Planilha com colunas do PatientData (nome, sexo, idade, peso, altura, ...)
+        pacientes_mes: Volume mensal para a projeção
+
+    Returns:
+        JSON com histograma de score, distribuição de modos, fatores e projeção mensal
+    """
+    forecaster = CohortForecaster(cost_tracker=hybrid_system.cost_tracker)
+    try:
+        return await run_in_threadpool(
+            forecaster.prever_arquivo, arquivo.file, arquivo.filename or "", pacientes_mes
+        )
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 # =============================================================================
@@ -282,7 +865,8 @@ async def feegow_status():
     """
     return {
         "configured": feegow_service.is_configured,
-        "message": "FEEGOW configurado" if feegow_service.is_configured else "Token FEEGOW não configurado"
+        "message": "FEEGOW configurado" if feegow_service.is_configured else "Token FEEGOW não configurado",
+        "patient_cache": feegow_service.patient_cache.stats()
     }
 
 
@@ -425,42 +1009,81 @@ async def feegow_get_patient(patient_id: int):
     return result
 
 
-@app.post("/api/feegow/upload-diet")
+@app.post("/api/feegow/upload-diet", status_code=202)
 async def feegow_upload_diet(
     patient_id: int = Query(..., description="ID do paciente no FEEGOW"),
-    diet_content: str = Query(..., description="Conteúdo da dieta em Markdown"),
-    patient_name: str = Query(..., description="Nome do paciente para o arquivo")
+    plan_id: Optional[str] = Query(None, description="ID do plano armazenado (retornado por /gerar-dieta)"),
+    diet_content: Optional[str] = Query(None, description="(Legado) Conteúdo da dieta em Markdown; prefira plan_id"),
+    patient_name: Optional[str] = Query(None, description="Nome do paciente para o arquivo (padrão: do plano)"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    documento: Optional[PlanDocument] = None
 ):
     """
-    Faz upload da dieta gerada para o prontuário do paciente no FEEGOW
+    Enfileira o upload da dieta para o prontuário do paciente no FEEGOW
+
+    Retorna na hora com o job_id; o envio acontece em segundo plano, com
+    novas tentativas em falhas transitórias. O mesmo plano enviado de novo
+    para o mesmo paciente retorna o job existente (sem arquivo duplicado).
 
     Args:
         patient_id: ID do paciente no FEEGOW
-        diet_content: Conteúdo da dieta em Markdown
+        plan_id: ID do plano armazenado
+        diet_content: Conteúdo da dieta em Markdown (legado, limitado pelo tamanho da URL)
         patient_name: Nome do paciente para compor o nome do arquivo
+        idempotency_key: Chave de idempotência do cliente (opcional)
+        documento: Corpo JSON com markdown e patient_name, usado quando o
+            plan_id não está neste servidor (ou sem plan_id)
 
     Returns:
-        JSON com resultado do upload
+        JSON com job_id e status (acompanhar em /api/feegow/uploads/{job_id})
     """
     if not feegow_service.is_configured:
         raise HTTPException(status_code=503, detail="FEEGOW não configurado")
 
-    # Gerar nome do arquivo
-    nome_limpo = patient_name.replace(" ", "_").replace(".", "")
-    data_atual = datetime.now().strftime('%Y-%m-%d')
-    filename = f"Dieta_{nome_limpo}_{data_atual}.md"
+    if plan_id:
+        diet_content, nome = await _documento_ou_reenviado(plan_id, documento)
+        patient_name = patient_name or nome
+    elif documento is not None:
+        diet_content = documento.markdown
+        patient_name = patient_name or documento.patient_name
+    elif not diet_content or not patient_name:
+        raise HTTPException(status_code=400, detail="Informe plan_id (ou diet_content e patient_name)")
 
-    result = await feegow_service.upload_diet_to_record(
+    job = await upload_queue.enfileirar(
         patient_id=patient_id,
-        diet_content=diet_content,
-        filename=filename,
-        description=f"Plano Alimentar Personalizado - {patient_name}"
+        conteudo=diet_content,
+        filename=_nome_arquivo(patient_name),
+        patient_name=patient_name,
+        plan_id=plan_id,
+        chave=idempotency_key
     )
 
-    if not result["success"]:
-        raise HTTPException(status_code=500, detail=result.get("error", "Erro no upload"))
+    # Sem workers em segundo plano (Vercel): primeira tentativa na própria requisição
+    if not upload_queue.running:
+        job = {**job, **await upload_queue.processar_job(job["job_id"])}
 
-    return result
+    return {"success": True, **job}
+
+
+@app.get("/api/feegow/uploads/{job_id}")
+async def feegow_upload_status(job_id: str):
+    """
+    Status de um upload enfileirado
+
+    Estados: pendente, enviando, concluido, falhou
+
+    Args:
+        job_id: ID retornado por /api/feegow/upload-diet
+    """
+    if upload_queue.running:
+        job = await run_in_threadpool(upload_queue.obter, job_id)
+    else:
+        # Sem workers (Vercel): novas tentativas acontecem nas consultas de status
+        job = await upload_queue.processar_job(job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Upload não encontrado")
+    return {"success": True, **job}
 
 
 @app.post("/api/feegow/patients/create")
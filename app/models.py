@@ -1,8 +1,9 @@
 """
 Pydantic models for the diabetes diet generator
 """
+from dataclasses import dataclass, field
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict
+from typing import Any, Optional, List, Dict, Tuple
 
 
 class PatientData(BaseModel):
@@ -46,6 +47,9 @@ class FoodItem(BaseModel):
     prot: float = Field(..., description="Proteínas em g")
     gord: float = Field(..., description="Gorduras em g")
     fibra: float = Field(0, description="Fibras em g")
+    ig: Optional[int] = Field(None, description="Índice glicêmico do alimento")
+    carga_glicemica: Optional[float] = Field(None, description="Carga glicêmica da porção")
+    chave: Optional[str] = Field(None, description="Chave do alimento na base (ALIMENTOS)")
 
 
 class Meal(BaseModel):
@@ -75,6 +79,11 @@ class Meal(BaseModel):
         """Calcula o total de gorduras da refeição"""
         return sum(a.gord for a in self.alimentos)
 
+    @property
+    def carga_glicemica_total(self) -> float:
+        """Calcula a carga glicêmica da refeição"""
+        return sum(a.carga_glicemica or 0 for a in self.alimentos)
+
 
 class DietPlan(BaseModel):
     """Plano alimentar completo estruturado"""
@@ -86,3 +95,188 @@ class DietPlan(BaseModel):
     def calorias_total(self) -> float:
         """Calcula o total de calorias do plano"""
         return sum(r.calorias_total for r in self.refeicoes)
+
+
+class DietEditRequest(BaseModel):
+    """Edição de uma refeição de um plano já gerado"""
+    plan_id: Optional[str] = Field(None, description="ID retornado por /gerar-dieta")
+    plano: Optional[Dict[str, Any]] = Field(None, description="Payload 'plano' retornado por /gerar-dieta (alternativa ao ID)")
+    refeicao: int = Field(..., ge=0, le=4, description="Refeição: 0 café, 1 almoço, 2 lanche, 3 jantar, 4 ceia")
+    posicao: Optional[int] = Field(None, ge=0, description="Item a trocar (vazio = montar a refeição de novo)")
+    nova_chave: Optional[str] = Field(None, description="Alimento substituto (vazio = equivalente sorteado)")
+    macro: Optional[str] = Field(None, description="Macro da equivalência: carb, prot, gord ou kcal")
+
+
+class PlanDocument(BaseModel):
+    """Documento do plano reenviado pelo cliente quando o plan_id não está no servidor"""
+    markdown: str = Field(..., min_length=1, description="Markdown retornado por /gerar-dieta")
+    patient_name: str = Field(..., min_length=1, description="Nome do paciente")
+
+
+@dataclass(frozen=True, slots=True)
+class DerivedMetrics:
+    """
+    Métricas derivadas dos dados do paciente, calculadas uma vez por requisição
+
+    Consumidas pela análise de complexidade e pelos cálculos nutricionais.
+    """
+    imc: float
+    idade: int
+    hba1c: Optional[float] = None
+    glicemia: Optional[float] = None
+    # Só com cintura informada
+    relacao_cintura_altura: Optional[float] = None
+    risco_cardiovascular: Optional[str] = None
+
+    @property
+    def risco_cardiovascular_alto(self) -> bool:
+        return self.risco_cardiovascular in ('Elevado', 'Risco muito aumentado')
+
+
+@dataclass(frozen=True, slots=True)
+class TokenUsage:
+    """Tokens de uma chamada à API, separados como na cobrança da Anthropic"""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+
+    @classmethod
+    def from_api(cls, usage) -> 'TokenUsage':
+        """A partir de message.usage (campos de cache só existem com prompt caching)"""
+        return cls(
+            input_tokens=usage.input_tokens or 0,
+            output_tokens=usage.output_tokens or 0,
+            cache_creation_input_tokens=getattr(usage, 'cache_creation_input_tokens', 0) or 0,
+            cache_read_input_tokens=getattr(usage, 'cache_read_input_tokens', 0) or 0
+        )
+
+    @property
+    def total(self) -> int:
+        return (self.input_tokens + self.output_tokens
+                + self.cache_creation_input_tokens + self.cache_read_input_tokens)
+
+    def to_dict(self) -> dict:
+        return {
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+            'cache_creation_input_tokens': self.cache_creation_input_tokens,
+            'cache_read_input_tokens': self.cache_read_input_tokens
+        }
+
+
+# =============================================================================
+# Modelos internos da montagem de refeições
+# Sem validação Pydantic e com totais calculados uma única vez na criação.
+# A conversão para FoodItem/Meal acontece apenas na fronteira da API.
+# =============================================================================
+
+@dataclass(frozen=True, slots=True)
+class FoodItemData:
+    """Item alimentar já calculado (imutável, pode ser compartilhado)"""
+    nome: str
+    porcao: str
+    gramas: float
+    kcal: float
+    carb: float
+    prot: float
+    gord: float
+    fibra: float = 0.0
+    ig: Optional[int] = 0           # None = IG desconhecido (base estendida)
+    carga_glicemica: float = 0.0
+    chave: str = ''
+
+    def to_model(self) -> FoodItem:
+        """Converte para o modelo Pydantic"""
+        return FoodItem.model_construct(
+            nome=self.nome,
+            porcao=self.porcao,
+            gramas=self.gramas,
+            kcal=self.kcal,
+            carb=self.carb,
+            prot=self.prot,
+            gord=self.gord,
+            fibra=self.fibra,
+            ig=self.ig,
+            carga_glicemica=self.carga_glicemica,
+            chave=self.chave or None
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class MealData:
+    """Refeição montada com totais pré-calculados"""
+    nome: str
+    horario: str
+    calorias_alvo: float
+    alimentos: Tuple[FoodItemData, ...] = ()
+    calorias_total: float = field(init=False)
+    carb_total: float = field(init=False)
+    prot_total: float = field(init=False)
+    gord_total: float = field(init=False)
+    fibra_total: float = field(init=False)
+    carga_glicemica: float = field(init=False)
+    ig_medio: float = field(init=False)
+
+    def __post_init__(self):
+        kcal = carb = prot = gord = fibra = cg = 0.0
+        for a in self.alimentos:
+            kcal += a.kcal
+            carb += a.carb
+            prot += a.prot
+            gord += a.gord
+            fibra += a.fibra
+            cg += a.carga_glicemica
+        object.__setattr__(self, 'calorias_total', kcal)
+        object.__setattr__(self, 'carb_total', carb)
+        object.__setattr__(self, 'prot_total', prot)
+        object.__setattr__(self, 'gord_total', gord)
+        object.__setattr__(self, 'fibra_total', fibra)
+        object.__setattr__(self, 'carga_glicemica', cg)
+        # IG médio ponderado pelos carboidratos da refeição
+        object.__setattr__(self, 'ig_medio', cg * 100 / carb if carb > 0 else 0.0)
+
+    def to_model(self) -> Meal:
+        """Converte para o modelo Pydantic"""
+        return Meal.model_construct(
+            nome=self.nome,
+            horario=self.horario,
+            calorias_alvo=self.calorias_alvo,
+            alimentos=[a.to_model() for a in self.alimentos]
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class PlanSections:
+    """
+    Markdown do plano dividido em seções
+
+    render() é idêntico ao documento completo; na edição só o bloco da
+    refeição alterada e o resumo do dia são substituídos.
+    """
+    cabecalho: str
+    refeicoes: Tuple[str, ...]
+    resumo: str
+    rodape: str
+
+    def render(self) -> str:
+        return self.cabecalho + ''.join(self.refeicoes) + self.resumo + self.rodape
+
+    def com_refeicao(self, indice: int, bloco: str, resumo: str) -> 'PlanSections':
+        """Cópia com o bloco da refeição e o resumo do dia substituídos"""
+        refeicoes = self.refeicoes[:indice] + (bloco,) + self.refeicoes[indice + 1:]
+        return PlanSections(self.cabecalho, refeicoes, resumo, self.rodape)
+
+
+@dataclass(slots=True)
+class GeneratedPlan:
+    """Plano gerado com o estado necessário para edições incrementais"""
+    patient: PatientData
+    nutrition: NutritionData
+    meals: Tuple[MealData, ...]
+    markdown: str
+    metadata: dict
+    # None quando o Markdown veio inteiro da API (api_full)
+    sections: Optional[PlanSections] = None
+    # Totais do dia sem arredondamento (atualizados por diferença na edição)
+    totais: Dict[str, float] = field(default_factory=dict)
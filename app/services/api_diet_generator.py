@@ -2,13 +2,21 @@
 Gerador via API Anthropic
 Modos: minimal (só apresentação) e full (dieta completa)
 """
-from typing import Tuple
+import time
+from typing import Callable, Optional, Tuple
 
 from anthropic import Anthropic
 
-from app.models import DietPlan, PatientData, NutritionData
+from app.models import DietPlan, PatientData, NutritionData, TokenUsage
 from app.config.settings import settings
 from app.data.substituicoes import formatar_todas_tabelas_markdown
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+# Intervalo mínimo entre avisos de progresso durante o streaming (s)
+INTERVALO_PROGRESSO = 0.25
+
+# Recebe (etapa, dados) durante a geração (jobs com SSE)
+Progresso = Callable[[str, dict], None]
 
 
 class APIDietGenerator:
@@ -21,58 +29,142 @@ class APIDietGenerator:
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY não configurada")
 
-        self.client = Anthropic(api_key=api_key)
+        self.client = Anthropic(api_key=api_key, timeout=settings.api_timeout_seconds)
         self.model = settings.anthropic_model
 
+        # Com a API falhando ou lenta, as chamadas são recusadas na hora
+        # (o sistema híbrido cai para Python puro sem esperar o timeout)
+        self.circuit_breaker = CircuitBreaker(
+            "anthropic",
+            janela=settings.circuit_breaker_window,
+            min_chamadas=settings.circuit_breaker_min_calls,
+            taxa_falhas=settings.circuit_breaker_failure_rate,
+            tempo_aberto=settings.circuit_breaker_open_seconds
+        )
+
+    def _create_message(
+        self, prompt: str, max_tokens: int, lenta_acima: float, progresso: Optional[Progresso] = None
+    ):
+        """
+        messages.create protegido pelo circuit breaker
+
+        Com progresso, a resposta vem por streaming e o avanço (tokens de
+        entrada e de saída) é repassado na etapa "api".
+
+        Raises:
+            CircuitOpenError: circuito aberto (nenhuma chamada é feita)
+        """
+        if not self.circuit_breaker.permitir():
+            raise CircuitOpenError("API Anthropic temporariamente desativada (circuit breaker aberto)")
+
+        inicio = time.perf_counter()
+        try:
+            if progresso is None:
+                message = self.client.messages.create(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    messages=[{"role": "user", "content": prompt}]
+                )
+            else:
+                message = self._stream_message(prompt, max_tokens, progresso)
+        except BaseException:
+            self.circuit_breaker.registrar(time.perf_counter() - inicio, False)
+            raise
+        self.circuit_breaker.registrar(time.perf_counter() - inicio, True, lenta_acima)
+        return message
+
+    def _stream_message(self, prompt: str, max_tokens: int, progresso: Progresso):
+        """
+        messages.stream avisando o progresso a cada INTERVALO_PROGRESSO
+
+        Durante o streaming a saída é estimada pelo texto recebido (~4
+        caracteres por token); o último aviso traz os tokens reais.
+        """
+        entrada = 0
+        saida = 0
+        caracteres = 0
+        ultimo_aviso = 0.0
+        with self.client.messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            for evento in stream:
+                if evento.type == "message_start":
+                    entrada = evento.message.usage.input_tokens
+                    progresso("api", {"tokens_entrada": entrada, "tokens_saida": 0})
+                elif evento.type == "content_block_delta" and evento.delta.type == "text_delta":
+                    caracteres += len(evento.delta.text)
+                    agora = time.perf_counter()
+                    if agora - ultimo_aviso >= INTERVALO_PROGRESSO:
+                        ultimo_aviso = agora
+                        progresso("api", {
+                            "tokens_entrada": entrada,
+                            "tokens_saida": caracteres // 4,
+                            "estimado": True
+                        })
+                elif evento.type == "message_delta":
+                    saida = evento.usage.output_tokens
+            message = stream.get_final_message()
+        # O acumulador do SDK não copia a saída do message_delta para a mensagem final
+        if saida > message.usage.output_tokens:
+            message.usage.output_tokens = saida
+        progresso("api", {
+            "tokens_entrada": message.usage.input_tokens,
+            "tokens_saida": message.usage.output_tokens
+        })
+        return message
+
     def generate_minimal(
         self,
         patient: PatientData,
-        nutrition: NutritionData
-    ) -> Tuple[str, int]:
+        nutrition: NutritionData,
+        progresso: Optional[Progresso] = None
+    ) -> Tuple[str, TokenUsage]:
         """
         Gera APENAS apresentação humanizada
 
+        Args:
+            progresso: Recebe o avanço do streaming (opcional)
+
         Returns:
             (texto_apresentacao, tokens_usados)
         """
 
         prompt = self._build_minimal_prompt(patient, nutrition)
 
-        message = self.client.messages.create(
-            model=self.model,
-            max_tokens=settings.max_tokens_minimal,
-            messages=[{"role": "user", "content": prompt}]
+        message = self._create_message(
+            prompt, settings.max_tokens_minimal, settings.circuit_breaker_slow_minimal, progresso
         )
 
         apresentacao = message.content[0].text
 
-        # Usar tokens reais da resposta
-        tokens = message.usage.input_tokens + message.usage.output_tokens
+        # Tokens reais da resposta (entrada, saída e cache separados)
+        return (apresentacao, TokenUsage.from_api(message.usage))
 
-        return (apresentacao, tokens)
-
-    def generate_full(self, diet_plan: DietPlan) -> Tuple[str, int]:
+    def generate_full(
+        self, diet_plan: DietPlan, progresso: Optional[Progresso] = None
+    ) -> Tuple[str, TokenUsage]:
         """
         Gera dieta COMPLETA
 
+        Args:
+            progresso: Recebe o avanço do streaming (opcional)
+
         Returns:
             (markdown_completo, tokens_usados)
         """
 
         prompt = self._build_full_prompt(diet_plan)
 
-        message = self.client.messages.create(
-            model=self.model,
-            max_tokens=settings.max_tokens_full,
-            messages=[{"role": "user", "content": prompt}]
+        message = self._create_message(
+            prompt, settings.max_tokens_full, settings.circuit_breaker_slow_full, progresso
         )
 
         markdown = message.content[0].text
 
-        # Usar tokens reais da resposta
-        tokens = message.usage.input_tokens + message.usage.output_tokens
-
-        return (markdown, tokens)
+        # Tokens reais da resposta (entrada, saída e cache separados)
+        return (markdown, TokenUsage.from_api(message.usage))
 
     def _build_minimal_prompt(
         self,
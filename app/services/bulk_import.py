@@ -0,0 +1,305 @@
+"""
+Importação em lote de pacientes (CSV/Parquet)
+Gera planos offline em modo python_only usando pool de processos
+
+Memória limitada: as linhas são lidas em streaming e validadas/processadas
+em blocos; cada plano é gravado no zip assim que fica pronto.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
+import csv
+import io
+import re
+import tempfile
+import zipfile
+
+from pydantic import ValidationError
+
+from app.models import PatientData
+from app.config.settings import settings
+from app.services.process_pool import inicializar_worker, gerar_dieta_worker
+
+
+# Colunas do resumo gravado dentro do zip
+COLUNAS_RESUMO = [
+    'linha', 'nome', 'status', 'arquivo', 'meta_calorica', 'calorias_reais',
+    'imc', 'classificacao_imc', 'carboidratos_g', 'proteinas_g', 'gorduras_g', 'erro'
+]
+
+# Campos booleanos do PatientData (planilhas usam sim/não, 1/0, true/false)
+CAMPOS_BOOLEANOS = {'contagem_cho'}
+VALORES_VERDADEIROS = {'1', 'true', 'sim', 's', 'yes', 'y', 'x'}
+
+
+# =============================================================================
+# Leitura em streaming
+# =============================================================================
+
+def iter_linhas_csv(stream: BinaryIO) -> Iterator[Dict[str, str]]:
+    """
+    Lê um CSV linha a linha (aceita ',', ';' ou tab como separador)
+
+    Args:
+        stream: Arquivo binário aberto (upload ou arquivo local)
+
+    Yields:
+        Dict com os valores crus de cada linha
+    """
+    texto = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    amostra = texto.read(4096)
+    try:
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=',;\t')
+    except csv.Error:
+        dialeto = csv.excel
+
+    # Reaproveitar a amostra já lida sem precisar de seek (stdin, uploads)
+    linhas = _encadear(io.StringIO(amostra), texto)
+    yield from csv.DictReader(linhas, dialect=dialeto)
+
+
+def _encadear(*fontes) -> Iterator[str]:
+    """Encadeia a amostra lida com o restante do arquivo, linha a linha"""
+    pendente = ""
+    for fonte in fontes:
+        for linha in fonte:
+            if pendente:
+                linha = pendente + linha
+                pendente = ""
+            if not linha.endswith("\n"):
+                pendente = linha
+                continue
+            yield linha
+    if pendente:
+        yield pendente
+
+
+def iter_linhas_parquet(stream: BinaryIO, tamanho_bloco: int = 1000) -> Iterator[Dict]:
+    """
+    Lê um arquivo Parquet em lotes de registros
+
+    Requer pyarrow (dependência opcional)
+
+    Args:
+        stream: Arquivo binário aberto
+        tamanho_bloco: Registros lidos por lote
+
+    Yields:
+        Dict com os valores de cada linha
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Leitura de Parquet requer o pacote pyarrow")
+
+    arquivo = pq.ParquetFile(stream)
+    for lote in arquivo.iter_batches(batch_size=tamanho_bloco):
+        yield from lote.to_pylist()
+
+
+def iter_linhas(stream: BinaryIO, nome_arquivo: str) -> Iterator[Dict]:
+    """Escolhe o leitor conforme a extensão do arquivo"""
+    if nome_arquivo.lower().endswith(('.parquet', '.pq')):
+        return iter_linhas_parquet(stream)
+    return iter_linhas_csv(stream)
+
+
+def iter_blocos(linhas: Iterable[Dict], tamanho: int) -> Iterator[List[Tuple[int, Dict]]]:
+    """
+    Agrupa linhas em blocos numerados (linha 2 = primeira após o cabeçalho)
+
+    Yields:
+        Lista de (numero_linha, dados)
+    """
+    bloco = []
+    for numero, linha in enumerate(linhas, start=2):
+        bloco.append((numero, linha))
+        if len(bloco) >= tamanho:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+
+# =============================================================================
+# Validação
+# =============================================================================
+
+def _normalizar_linha(linha: Dict) -> Dict:
+    """Normaliza cabeçalhos e valores vindos da planilha"""
+    dados = {}
+    for chave, valor in linha.items():
+        if chave is None:
+            continue
+        campo = chave.strip().lower()
+        if isinstance(valor, str):
+            valor = valor.strip()
+            if valor == "":
+                continue
+            if campo in CAMPOS_BOOLEANOS:
+                valor = valor.lower() in VALORES_VERDADEIROS
+            elif campo not in ('nome', 'sexo', 'tipo_dieta', 'nivel_deficit'):
+                # Planilhas brasileiras usam vírgula decimal
+                valor = valor.replace(",", ".")
+            elif campo == 'sexo':
+                valor = valor.upper()[:1]
+        elif valor is None:
+            continue
+        dados[campo] = valor
+    return dados
+
+
+def validar_bloco(bloco: List[Tuple[int, Dict]]) -> Tuple[List[Tuple[int, PatientData]], List[Tuple[int, str, str]]]:
+    """
+    Valida um bloco de linhas contra o modelo PatientData
+
+    Returns:
+        (validos, erros) - validos: [(linha, paciente)], erros: [(linha, nome, mensagem)]
+    """
+    validos = []
+    erros = []
+    for numero, linha in bloco:
+        dados = _normalizar_linha(linha)
+        try:
+            validos.append((numero, PatientData(**dados)))
+        except ValidationError as e:
+            mensagem = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            erros.append((numero, str(dados.get('nome', '')), mensagem))
+    return validos, erros
+
+
+def gerar_dieta_linha(patient: PatientData) -> Tuple[bool, str, object]:
+    """
+    Gera o plano de uma linha sem interromper o lote em caso de erro
+
+    Returns:
+        (True, markdown, metadata) ou (False, mensagem de erro, None)
+    """
+    try:
+        markdown, metadata = gerar_dieta_worker(patient)
+    except Exception as e:
+        return False, f"{type(e).__name__}: {e}", None
+    return True, markdown, metadata
+
+
+def nome_arquivo_seguro(nome: str, limite: int = 80) -> str:
+    """Nome do paciente usável como entrada do zip (sem "/", ".." nem separadores)"""
+    return re.sub(r'[^\w-]+', '_', nome).strip('_')[:limite] or 'paciente'
+
+
+class _ExecutorLocal:
+    """Executor síncrono usado quando workers=0 (ex.: Vercel)"""
+
+    def map(self, fn, iterable, chunksize: int = 1):
+        return map(fn, iterable)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+# =============================================================================
+# Importador
+# =============================================================================
+
+class BulkDietImporter:
+    """
+    Gera planos em lote a partir de uma planilha de pacientes
+    Saída: zip com um .md por paciente + resumo.csv
+    """
+
+    def __init__(self, workers: int = None, tamanho_bloco: int = None):
+        self.workers = settings.bulk_import_workers if workers is None else workers
+        self.tamanho_bloco = tamanho_bloco or settings.bulk_import_chunk_size
+
+    def _executor(self):
+        if self.workers <= 0:
+            return _ExecutorLocal()
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=inicializar_worker
+        )
+
+    def processar(self, linhas: Iterable[Dict], destino: BinaryIO) -> Dict:
+        """
+        Processa todas as linhas gravando o zip em `destino`
+
+        Args:
+            linhas: Iterador de linhas cruas (CSV ou Parquet)
+            destino: Arquivo binário de saída (zip)
+
+        Linhas cuja geração falha entram no resumo com status "erro" e a
+        mensagem; o restante do lote continua.
+
+        Returns:
+            Dict com totais (linhas, gerados, inválidas, erros de geração)
+        """
+        data_atual = datetime.now().strftime('%Y-%m-%d')
+        total = gerados = falhas = erros_geracao = 0
+
+        # Resumo vai para arquivo temporário (transborda para disco se crescer)
+        with tempfile.SpooledTemporaryFile(max_size=1024 * 1024, mode='w+', newline='', encoding='utf-8') as resumo, \
+                zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_DEFLATED) as zf, \
+                self._executor() as executor:
+
+            writer = csv.DictWriter(resumo, fieldnames=COLUNAS_RESUMO)
+            writer.writeheader()
+
+            for bloco in iter_blocos(linhas, self.tamanho_bloco):
+                validos, erros = validar_bloco(bloco)
+                total += len(bloco)
+
+                for numero, nome, mensagem in erros:
+                    falhas += 1
+                    writer.writerow({'linha': numero, 'nome': nome, 'status': 'invalido', 'erro': mensagem})
+
+                pacientes = [p for _, p in validos]
+                chunksize = max(1, len(pacientes) // (max(self.workers, 1) * 4))
+                resultados = executor.map(gerar_dieta_linha, pacientes, chunksize=chunksize)
+
+                for (numero, patient), (ok, markdown, metadata) in zip(validos, resultados):
+                    if not ok:
+                        erros_geracao += 1
+                        writer.writerow({'linha': numero, 'nome': patient.nome, 'status': 'erro', 'erro': markdown})
+                        continue
+
+                    arquivo = f"{numero:05d}_Dieta_{nome_arquivo_seguro(patient.nome)}_{data_atual}.md"
+                    zf.writestr(arquivo, markdown)
+                    gerados += 1
+
+                    writer.writerow({
+                        'linha': numero,
+                        'nome': patient.nome,
+                        'status': 'gerado',
+                        'arquivo': arquivo,
+                        'meta_calorica': metadata['meta_calorica'],
+                        'calorias_reais': metadata['calorias_reais'],
+                        'imc': metadata['imc'],
+                        'classificacao_imc': metadata['classificacao_imc'],
+                        'carboidratos_g': metadata['macros']['carboidratos_g'],
+                        'proteinas_g': metadata['macros']['proteinas_g'],
+                        'gorduras_g': metadata['macros']['gorduras_g'],
+                        'erro': ''
+                    })
+
+            resumo.seek(0)
+            with zf.open('resumo.csv', 'w') as saida:
+                saida.write('\ufeff'.encode('utf-8'))  # BOM para abrir certo no Excel
+                for trecho in iter(lambda: resumo.read(64 * 1024), ''):
+                    saida.write(trecho.encode('utf-8'))
+
+        return {
+            'total_linhas': total,
+            'planos_gerados': gerados,
+            'linhas_invalidas': falhas,
+            'erros_geracao': erros_geracao
+        }
+
+    def processar_arquivo(self, stream: BinaryIO, nome_arquivo: str, destino: BinaryIO) -> Dict:
+        """Atalho: lê CSV/Parquet de `stream` e grava o zip em `destino`"""
+        return self.processar(iter_linhas(stream, nome_arquivo), destino)
+
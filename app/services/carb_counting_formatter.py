@@ -4,7 +4,10 @@ Para pacientes em esquema basal-bolus de insulina
 """
 from typing import List, Optional
 
-from app.models import PatientData, NutritionData, Meal
+from app.models import PatientData, NutritionData, MealData, PlanSections
+from app.services.glycemic_load import (
+    classificar_carga_glicemica, classificar_carga_glicemica_diaria
+)
 
 
 class CarbCountingFormatter:
@@ -20,7 +23,7 @@ class CarbCountingFormatter:
         self,
         patient: PatientData,
         nutrition: NutritionData,
-        meals: List[Meal],
+        meals: List[MealData],
         razao_insulina_cho: Optional[float] = None
     ) -> str:
         """
@@ -33,29 +36,58 @@ class CarbCountingFormatter:
             razao_insulina_cho: Razão insulina/carboidrato (UI por 15g)
         """
 
+        return self.format_sections(patient, nutrition, meals, razao_insulina_cho).render()
+
+    def format_sections(
+        self,
+        patient: PatientData,
+        nutrition: NutritionData,
+        meals: List[MealData],
+        razao_insulina_cho: Optional[float] = None
+    ) -> PlanSections:
+        """
+        Gera o documento dividido em seções (cabeçalho, refeições, resumo, rodapé)
+
+        Permite que a edição de um plano re-renderize apenas a refeição alterada.
+        """
+
         titulo = "# PLANO ALIMENTAR COM CONTAGEM DE CARBOIDRATOS\n\n"
 
         apresentacao = self._get_apresentacao_cho(patient, nutrition)
         dados = self._format_patient_data(patient, nutrition)
         guia_cho = self._get_guia_contagem()
         calculos = self._format_nutrition_calculations(nutrition)
-        refeicoes = self._format_meals_cho(meals, razao_insulina_cho)
         tabela_cho = self._get_tabela_porcoes_cho()
         orientacoes = self._get_orientacoes_cho(patient, razao_insulina_cho)
         assinatura = self._get_assinatura()
 
-        return (
-            f"{titulo}"
-            f"{apresentacao}\n\n"
-            f"{dados}\n\n"
-            f"{guia_cho}\n\n"
-            f"{calculos}\n\n"
-            f"{refeicoes}\n\n"
-            f"{tabela_cho}\n\n"
-            f"{orientacoes}\n\n"
-            f"{assinatura}"
+        return PlanSections(
+            cabecalho=(
+                f"{titulo}"
+                f"{apresentacao}\n\n"
+                f"{dados}\n\n"
+                f"{guia_cho}\n\n"
+                f"{calculos}\n\n"
+                "## PLANO DE REFEIÇÕES COM CONTAGEM DE CHO\n"
+            ),
+            refeicoes=tuple(self._format_meal_cho(meal, razao_insulina_cho) for meal in meals),
+            resumo=self._format_resumo_cho(meals, razao_insulina_cho),
+            rodape=(
+                "\n\n"
+                f"{tabela_cho}\n\n"
+                f"{orientacoes}\n\n"
+                f"{assinatura}"
+            )
         )
 
+    def format_meal_section(self, meal: MealData, patient: PatientData) -> str:
+        """Bloco de uma refeição (razão insulina/CHO do paciente)"""
+        return self._format_meal_cho(meal, patient.razao_insulina_cho)
+
+    def format_resumo_section(self, meals: List[MealData], patient: PatientData) -> str:
+        """Resumo diário de carboidratos (razão insulina/CHO do paciente)"""
+        return self._format_resumo_cho(meals, patient.razao_insulina_cho)
+
     def _get_apresentacao_cho(
         self,
         patient: PatientData,
@@ -157,46 +189,53 @@ Sempre confirme sua razão insulina/carboidrato com seu médico, pois ela pode v
 | Proteínas | {m['prot_g']:.0f}g | {m['prot_percent']}% |
 | Gorduras | {m['gord_g']:.0f}g | {m['gord_percent']}% |"""
 
-    def _format_meals_cho(
+    def _format_meal_cho(
         self,
-        meals: List[Meal],
+        meal: MealData,
         razao_insulina_cho: Optional[float]
     ) -> str:
-        """Formata refeições com destaque para carboidratos"""
+        """Formata uma refeição com destaque para carboidratos"""
 
-        output = "## PLANO DE REFEIÇÕES COM CONTAGEM DE CHO\n"
+        total_kcal = meal.calorias_total
+        total_carb = meal.carb_total
+        porcoes_cho = total_carb / self.GRAMAS_POR_PORCAO
 
-        for meal in meals:
-            total_kcal = sum(a.kcal for a in meal.alimentos)
-            total_carb = sum(a.carb for a in meal.alimentos)
-            total_prot = sum(a.prot for a in meal.alimentos)
-            total_gord = sum(a.gord for a in meal.alimentos)
-            porcoes_cho = total_carb / self.GRAMAS_POR_PORCAO
+        output = f"\n### {meal.nome} ({meal.horario})\n"
+        output += f"**Carboidratos:** {total_carb:.0f}g = **{porcoes_cho:.1f} porções de CHO**\n"
+        output += f"**Carga glicêmica:** {meal.carga_glicemica:.0f} ({classificar_carga_glicemica(meal.carga_glicemica)})\n"
 
-            output += f"\n### {meal.nome} ({meal.horario})\n"
-            output += f"**Carboidratos:** {total_carb:.0f}g = **{porcoes_cho:.1f} porções de CHO**\n"
+        if razao_insulina_cho:
+            insulina_sugerida = total_carb / (15 / razao_insulina_cho)
+            output += f"**Insulina sugerida:** ~{insulina_sugerida:.0f} UI (razão 1:{int(15/razao_insulina_cho)})\n"
 
-            if razao_insulina_cho:
-                insulina_sugerida = total_carb / (15 / razao_insulina_cho)
-                output += f"**Insulina sugerida:** ~{insulina_sugerida:.0f} UI (razão 1:{int(15/razao_insulina_cho)})\n"
+        output += "\n| Alimento | Porção | **CHO (g)** | Porções | Kcal |\n"
+        output += "|----------|--------|-------------|---------|------|\n"
 
-            output += "\n| Alimento | Porção | **CHO (g)** | Porções | Kcal |\n"
-            output += "|----------|--------|-------------|---------|------|\n"
+        for alimento in meal.alimentos:
+            porcao_cho = alimento.carb / self.GRAMAS_POR_PORCAO
+            output += f"| {alimento.nome} | {alimento.porcao} | **{alimento.carb:.0f}g** | {porcao_cho:.1f} | {alimento.kcal:.0f} |\n"
 
-            for alimento in meal.alimentos:
-                porcao_cho = alimento.carb / self.GRAMAS_POR_PORCAO
-                output += f"| {alimento.nome} | {alimento.porcao} | **{alimento.carb:.0f}g** | {porcao_cho:.1f} | {alimento.kcal:.0f} |\n"
+        output += f"| **TOTAL** | | **{total_carb:.0f}g** | **{porcoes_cho:.1f}** | {total_kcal:.0f} |\n"
 
-            output += f"| **TOTAL** | | **{total_carb:.0f}g** | **{porcoes_cho:.1f}** | {total_kcal:.0f} |\n"
+        return output
 
-        # Resumo do dia
-        total_cho_dia = sum(sum(a.carb for a in meal.alimentos) for meal in meals)
+    def _format_resumo_cho(
+        self,
+        meals: List[MealData],
+        razao_insulina_cho: Optional[float]
+    ) -> str:
+        """Resumo diário de carboidratos"""
+
+        total_cho_dia = sum(meal.carb_total for meal in meals)
         porcoes_dia = total_cho_dia / self.GRAMAS_POR_PORCAO
 
-        output += f"\n### RESUMO DIÁRIO DE CARBOIDRATOS\n"
+        output = f"\n### RESUMO DIÁRIO DE CARBOIDRATOS\n"
         output += f"- **Total de CHO:** {total_cho_dia:.0f}g\n"
         output += f"- **Total de porções:** {porcoes_dia:.1f} porções\n"
 
+        cg_dia = sum(meal.carga_glicemica for meal in meals)
+        output += f"- **Carga glicêmica do dia:** {cg_dia:.0f} ({classificar_carga_glicemica_diaria(cg_dia)})\n"
+
         if razao_insulina_cho:
             insulina_total = total_cho_dia / (15 / razao_insulina_cho)
             output += f"- **Insulina rápida estimada:** ~{insulina_total:.0f} UI/dia\n"
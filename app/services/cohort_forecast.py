@@ -0,0 +1,161 @@
+"""
+Previsão de complexidade e custo para uma coorte de pacientes
+
+Antes de ligar o modo AUTO para uma nova clínica: lê a planilha de
+pacientes (CSV/Parquet, mesmas colunas e validação da importação em lote),
+avalia a tabela de regras de complexidade coluna a coluna
+(ComplexityAnalyzer.score_columns) e devolve o histograma de scores, a
+distribuição de modos do AUTO e a projeção do custo mensal.
+
+O custo unitário de cada modo é o medido no CostTracker (média por geração)
+quando há pelo menos FORECAST_MIN_SAMPLES gerações registradas no modo;
+senão, o configurado em settings.cost_*. A projeção considera o modo base
+(complexidade) com a API disponível: o rebaixamento por orçamento ou saúde
+da API não entra, mas o orçamento mensal é informado para comparação.
+"""
+import time
+from typing import Dict, Iterable, List
+
+from app.config.settings import settings
+from app.services.bulk_import import iter_blocos, iter_linhas, validar_bloco
+from app.services.complexity_analyzer import ComplexityAnalyzer
+from app.services.mode_policy import ORDEM_MODOS, AdaptiveModePolicy
+from app.utils.cost_tracker import CostTracker
+
+# Colunas usadas pelas regras de complexidade
+COLUNAS_COORTE = ('peso', 'altura', 'idade', 'sexo', 'hba1c', 'glicemia', 'cintura')
+
+# Erros de validação devolvidos (o total vem em linhas_invalidas)
+MAX_ERROS_LISTADOS = 20
+
+
+class CohortForecaster:
+    """
+    Histograma de complexidade, modos e custo mensal de uma coorte
+    """
+
+    def __init__(self, cost_tracker: CostTracker = None, tamanho_bloco: int = 1000):
+        """
+        Args:
+            cost_tracker: Fonte do custo medido por modo (None = só settings.cost_*)
+            tamanho_bloco: Linhas validadas por bloco
+        """
+        self.analyzer = ComplexityAnalyzer()
+        self.cost_tracker = cost_tracker
+        self.tamanho_bloco = tamanho_bloco
+
+    def ler_colunas(self, linhas: Iterable[Dict]) -> Dict:
+        """
+        Valida as linhas em blocos e monta as colunas da coorte
+
+        Returns:
+            {'colunas': {campo: lista}, 'total_linhas', 'linhas_invalidas', 'erros'}
+        """
+        colunas: Dict[str, List] = {campo: [] for campo in COLUNAS_COORTE}
+        total = invalidas = 0
+        erros = []
+        for bloco in iter_blocos(linhas, self.tamanho_bloco):
+            validos, invalidos = validar_bloco(bloco)
+            total += len(bloco)
+            invalidas += len(invalidos)
+            for numero, nome, mensagem in invalidos[:MAX_ERROS_LISTADOS - len(erros)]:
+                erros.append({'linha': numero, 'nome': nome, 'erro': mensagem})
+            for campo, coluna in colunas.items():
+                coluna.extend(getattr(p, campo) for _, p in validos)
+        return {
+            'colunas': colunas,
+            'total_linhas': total,
+            'linhas_invalidas': invalidas,
+            'erros': erros
+        }
+
+    def custos_por_modo(self) -> Dict[str, dict]:
+        """Custo unitário de cada modo: medido (CostTracker) ou configurado"""
+        medidos = self.cost_tracker.get_mode_averages() if self.cost_tracker else {}
+        configurados = {
+            'python_only': settings.cost_python_only,
+            'api_minimal': settings.cost_api_minimal,
+            'api_full': settings.cost_api_full,
+        }
+        custos = {}
+        for modo in ORDEM_MODOS:
+            medido = medidos.get(modo)
+            amostras = medido['count'] if medido else 0
+            usar_medido = amostras >= settings.forecast_min_samples
+            custos[modo] = {
+                'custo_unitario_usd': round(medido['avg_cost'] if usar_medido else configurados[modo], 6),
+                'fonte': 'medido' if usar_medido else 'configurado',
+                'amostras': amostras,
+                'tokens_medios': round(medido['avg_tokens']) if medido else None
+            }
+        return custos
+
+    def prever(self, linhas: Iterable[Dict], pacientes_mes: int = None) -> Dict:
+        """
+        Previsão para a coorte
+
+        Args:
+            linhas: Linhas cruas da planilha (iter_linhas)
+            pacientes_mes: Planos gerados por mês (padrão: pacientes válidos da coorte)
+
+        Returns:
+            Dict com histograma, distribuição de modos, fatores e projeção mensal
+        """
+        inicio = time.perf_counter()
+        leitura = self.ler_colunas(linhas)
+        n = len(leitura['colunas']['peso'])
+        if n == 0:
+            raise ValueError("Nenhum paciente válido na planilha")
+
+        avaliacao = self.analyzer.score_columns(leitura['colunas'])
+
+        histograma = [0] * (max(avaliacao['scores']) + 1)
+        for score in avaliacao['scores']:
+            histograma[score] += 1
+
+        pacientes_por_modo = dict.fromkeys(ORDEM_MODOS, 0)
+        for score, quantidade in enumerate(histograma):
+            if quantidade:
+                pacientes_por_modo[AdaptiveModePolicy.modo_base(score)] += quantidade
+
+        if pacientes_mes is None:
+            pacientes_mes = n
+        custos = self.custos_por_modo()
+        custo_total = 0.0
+        for modo, custo in custos.items():
+            geracoes = pacientes_mes * pacientes_por_modo[modo] / n
+            custo['geracoes_mes'] = round(geracoes, 1)
+            custo['custo_mes_usd'] = round(geracoes * custo['custo_unitario_usd'], 4)
+            custo_total += geracoes * custo['custo_unitario_usd']
+
+        orcamento = settings.monthly_budget_usd or None
+        return {
+            'success': True,
+            'total_linhas': leitura['total_linhas'],
+            'pacientes_validos': n,
+            'linhas_invalidas': leitura['linhas_invalidas'],
+            'erros': leitura['erros'],
+            'histograma_score': {str(score): quantidade for score, quantidade in enumerate(histograma)},
+            'score_medio': round(sum(avaliacao['scores']) / n, 2),
+            'distribuicao_modos': {
+                modo: {'pacientes': quantidade, 'percentual': round(100 * quantidade / n, 1)}
+                for modo, quantidade in pacientes_por_modo.items()
+            },
+            'fatores': {
+                nome: {'pacientes': quantidade, 'percentual': round(100 * quantidade / n, 1)}
+                for nome, quantidade in avaliacao['fatores'].items()
+            },
+            'projecao_mensal': {
+                'pacientes_mes': pacientes_mes,
+                'custo_por_modo': custos,
+                'custo_total_usd': round(custo_total, 2),
+                'custo_medio_por_plano_usd': round(custo_total / pacientes_mes, 4) if pacientes_mes else 0.0,
+                'orcamento_mes_usd': orcamento,
+                'excede_orcamento': custo_total > orcamento if orcamento else None
+            },
+            'duracao_s': round(time.perf_counter() - inicio, 2)
+        }
+
+    def prever_arquivo(self, stream, nome_arquivo: str, pacientes_mes: int = None) -> Dict:
+        """Atalho: lê CSV/Parquet de `stream` e faz a previsão"""
+        return self.prever(iter_linhas(stream, nome_arquivo), pacientes_mes)
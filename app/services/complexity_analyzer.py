@@ -1,9 +1,18 @@
 """
 Analisa complexidade de casos para decidir estratégia de geração
+
+Os fatores de complexidade são uma tabela de regras (REGRAS_COMPLEXIDADE)
+sobre as métricas derivadas do paciente (DerivedMetrics). A mesma tabela é
+avaliada de três formas:
+- analyze(): um paciente, com fatores e descrições (metadados, /api/analyze-complexity)
+- score(): um paciente, só o score (decisão do modo AUTO)
+- score_columns(): muitos pacientes de uma vez, coluna a coluna
 """
-from typing import Dict, List
+import operator
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
 
-from app.models import PatientData
+from app.models import DerivedMetrics, PatientData
 from app.services.nutrition_calc import NutritionCalculator
 
 
@@ -16,19 +25,102 @@ class ComplexityFactor:
         self.description = description
 
 
+@dataclass(frozen=True)
+class ComplexityRule:
+    """
+    Regra da tabela de complexidade
+
+    Regras do mesmo grupo são excludentes: vale a primeira que casar, na
+    ordem da tabela (ex.: faixas de IMC).
+    """
+    name: str
+    grupo: str
+    campo: str                      # atributo de DerivedMetrics
+    op: str                         # '>', '<' ou 'sim' (campo verdadeiro)
+    limite: float
+    score: int
+    descricao: str                  # format com valor= e m= (DerivedMetrics)
+    somente_sem: Optional[str] = None   # regra ignorada quando este campo está informado
+
+
+REGRAS_COMPLEXIDADE = (
+    # FATOR 1: IMC extremo
+    ComplexityRule("obesidade_grave", "imc", "imc", ">", 40, 2, "Obesidade grau III (IMC {valor:.1f})"),
+    ComplexityRule("obesidade_moderada", "imc", "imc", ">", 35, 1, "Obesidade grau II (IMC {valor:.1f})"),
+    ComplexityRule("baixo_peso", "imc", "imc", "<", 18.5, 2, "Baixo peso (IMC {valor:.1f})"),
+    # FATOR 2: HbA1c muito elevada
+    ComplexityRule("hba1c_muito_alta", "glicemico", "hba1c", ">", 10, 2, "HbA1c muito elevada ({valor}%)"),
+    ComplexityRule("hba1c_alta", "glicemico", "hba1c", ">", 8, 1, "HbA1c elevada ({valor}%)"),
+    # FATOR 3: Glicemia muito alta (alternativa a HbA1c)
+    ComplexityRule("glicemia_muito_alta", "glicemico", "glicemia", ">", 300, 2,
+                   "Glicemia muito elevada ({valor} mg/dL)", somente_sem="hba1c"),
+    ComplexityRule("glicemia_alta", "glicemico", "glicemia", ">", 200, 1,
+                   "Glicemia elevada ({valor} mg/dL)", somente_sem="hba1c"),
+    # FATOR 4: Idade avançada
+    ComplexityRule("idade_avancada", "idade_avancada", "idade", ">", 75, 1, "Idade avançada ({valor} anos)"),
+    # FATOR 5: Diabetes em idade muito jovem (atípico para DM2)
+    ComplexityRule("idade_jovem_dm", "idade_jovem", "idade", "<", 30, 1, "Diabetes em idade jovem ({valor} anos)"),
+    # FATOR 6: Risco cardiovascular elevado (se cintura informada)
+    ComplexityRule("risco_cardiovascular", "risco_cardiovascular", "risco_cardiovascular_alto", "sim", 0, 1,
+                   "Risco cardiovascular {m.risco_cardiovascular}"),
+)
+
+OPERADORES = {
+    '>': operator.gt,
+    '<': operator.lt,
+    'sim': lambda valor, _: bool(valor),
+}
+
+
 class ComplexityAnalyzer:
     """
     Analisa complexidade do caso clínico
     Score: 0-10 (quanto maior, mais complexo)
     """
 
-    def __init__(self):
+    def __init__(self, regras: Sequence[ComplexityRule] = REGRAS_COMPLEXIDADE):
         self.calc = NutritionCalculator()
+        self.regras = tuple(regras)
+        # Tabela compilada: operador resolvido uma vez, não a cada paciente
+        self._compiladas = tuple(
+            (regra, regra.grupo, regra.campo, OPERADORES[regra.op], regra.limite, regra.somente_sem)
+            for regra in self.regras
+        )
+
+    def _regras_que_casam(self, metricas: DerivedMetrics) -> List[tuple]:
+        """(regra, valor) das regras que valem para o paciente (no máximo uma por grupo)"""
+        casadas = []
+        grupos = set()
+        for regra, grupo, campo, op, limite, somente_sem in self._compiladas:
+            if grupo in grupos or (somente_sem and getattr(metricas, somente_sem)):
+                continue
+            valor = getattr(metricas, campo)
+            # Campos não informados nunca casam
+            if valor is not None and op(valor, limite):
+                grupos.add(grupo)
+                casadas.append((regra, valor))
+        return casadas
+
+    def score(self, patient: PatientData, metricas: DerivedMetrics = None) -> int:
+        """
+        Só o score (sem fatores nem textos): caminho rápido da decisão do AUTO
+
+        Args:
+            patient: Dados do paciente
+            metricas: Métricas já calculadas na requisição (opcional)
+        """
+        if metricas is None:
+            metricas = self.calc.calcular_metricas_derivadas(patient)
+        return sum(regra.score for regra, _ in self._regras_que_casam(metricas))
 
-    def analyze(self, patient: PatientData) -> Dict:
+    def analyze(self, patient: PatientData, metricas: DerivedMetrics = None) -> Dict:
         """
         Analisa complexidade retornando score e fatores
 
+        Args:
+            patient: Dados do paciente
+            metricas: Métricas já calculadas na requisição (opcional)
+
         Returns:
             {
                 'score': int (0-10),
@@ -38,110 +130,18 @@ class ComplexityAnalyzer:
                 'patient_summary': str
             }
         """
-
-        factors = []
-        total_score = 0
-
-        # Calcular IMC
-        imc = self.calc.calcular_imc(patient.peso, patient.altura)
-
-        # FATOR 1: IMC extremo
-        if imc > 40:
-            factor = ComplexityFactor(
-                name="obesidade_grave",
-                score=2,
-                description=f"Obesidade grau III (IMC {imc:.1f})"
-            )
-            factors.append(factor)
-            total_score += 2
-        elif imc > 35:
-            factor = ComplexityFactor(
-                name="obesidade_moderada",
-                score=1,
-                description=f"Obesidade grau II (IMC {imc:.1f})"
+        if metricas is None:
+            metricas = self.calc.calcular_metricas_derivadas(patient)
+
+        factors = [
+            ComplexityFactor(
+                name=regra.name,
+                score=regra.score,
+                description=regra.descricao.format(valor=valor, m=metricas)
             )
-            factors.append(factor)
-            total_score += 1
-        elif imc < 18.5:
-            factor = ComplexityFactor(
-                name="baixo_peso",
-                score=2,
-                description=f"Baixo peso (IMC {imc:.1f})"
-            )
-            factors.append(factor)
-            total_score += 2
-
-        # FATOR 2: HbA1c muito elevada
-        if patient.hba1c:
-            if patient.hba1c > 10:
-                factor = ComplexityFactor(
-                    name="hba1c_muito_alta",
-                    score=2,
-                    description=f"HbA1c muito elevada ({patient.hba1c}%)"
-                )
-                factors.append(factor)
-                total_score += 2
-            elif patient.hba1c > 8:
-                factor = ComplexityFactor(
-                    name="hba1c_alta",
-                    score=1,
-                    description=f"HbA1c elevada ({patient.hba1c}%)"
-                )
-                factors.append(factor)
-                total_score += 1
-
-        # FATOR 3: Glicemia muito alta (alternativa a HbA1c)
-        elif patient.glicemia:
-            if patient.glicemia > 300:
-                factor = ComplexityFactor(
-                    name="glicemia_muito_alta",
-                    score=2,
-                    description=f"Glicemia muito elevada ({patient.glicemia} mg/dL)"
-                )
-                factors.append(factor)
-                total_score += 2
-            elif patient.glicemia > 200:
-                factor = ComplexityFactor(
-                    name="glicemia_alta",
-                    score=1,
-                    description=f"Glicemia elevada ({patient.glicemia} mg/dL)"
-                )
-                factors.append(factor)
-                total_score += 1
-
-        # FATOR 4: Idade avançada
-        if patient.idade > 75:
-            factor = ComplexityFactor(
-                name="idade_avancada",
-                score=1,
-                description=f"Idade avançada ({patient.idade} anos)"
-            )
-            factors.append(factor)
-            total_score += 1
-
-        # FATOR 5: Diabetes em idade muito jovem (atípico para DM2)
-        if patient.idade < 30:
-            factor = ComplexityFactor(
-                name="idade_jovem_dm",
-                score=1,
-                description=f"Diabetes em idade jovem ({patient.idade} anos)"
-            )
-            factors.append(factor)
-            total_score += 1
-
-        # FATOR 6: Risco cardiovascular elevado (se cintura informada)
-        if patient.cintura:
-            risco_cv = self.calc.classificar_risco_cardiovascular(
-                patient.cintura, patient.altura, patient.sexo
-            )
-            if risco_cv['risco_cardiovascular'] in ['Elevado', 'Risco muito aumentado']:
-                factor = ComplexityFactor(
-                    name="risco_cardiovascular",
-                    score=1,
-                    description=f"Risco cardiovascular {risco_cv['risco_cardiovascular']}"
-                )
-                factors.append(factor)
-                total_score += 1
+            for regra, valor in self._regras_que_casam(metricas)
+        ]
+        total_score = sum(f.score for f in factors)
 
         # Determinar recomendação baseada no score
         if total_score <= 3:
@@ -156,7 +156,7 @@ class ComplexityAnalyzer:
 
         # Gerar resumo do paciente
         tratamento = "Sr." if patient.sexo == "M" else "Sra."
-        patient_summary = f"{tratamento} {patient.nome}, {patient.idade} anos, IMC {imc:.1f}"
+        patient_summary = f"{tratamento} {patient.nome}, {patient.idade} anos, IMC {metricas.imc:.1f}"
         if patient.hba1c:
             patient_summary += f", HbA1c {patient.hba1c}%"
         elif patient.glicemia:
@@ -169,3 +169,63 @@ class ComplexityAnalyzer:
             'rationale': rationale,
             'patient_summary': patient_summary
         }
+
+    def metric_columns(self, colunas: Dict[str, Sequence]) -> Dict[str, List]:
+        """
+        Métricas derivadas por coluna (mesmos nomes de DerivedMetrics)
+
+        Args:
+            colunas: peso, altura, idade, sexo e, opcionais, hba1c, glicemia
+                e cintura (None/0 = não informado), todas do mesmo tamanho
+        """
+        n = len(colunas['peso'])
+        vazia = [None] * n
+        cintura = colunas.get('cintura') or vazia
+        classificar = self.calc.classificar_risco_cardiovascular
+        risco = [
+            classificar(c, a, s)['risco_cardiovascular'] if c else None
+            for c, a, s in zip(cintura, colunas['altura'], colunas['sexo'])
+        ]
+        return {
+            'imc': [p / (a / 100) ** 2 for p, a in zip(colunas['peso'], colunas['altura'])],
+            'idade': list(colunas['idade']),
+            'hba1c': [v or None for v in (colunas.get('hba1c') or vazia)],
+            'glicemia': [v or None for v in (colunas.get('glicemia') or vazia)],
+            'risco_cardiovascular': risco,
+            'risco_cardiovascular_alto': [r in ('Elevado', 'Risco muito aumentado') for r in risco],
+        }
+
+    def score_columns(self, colunas: Dict[str, Sequence]) -> Dict:
+        """
+        Avalia a tabela de regras sobre muitos pacientes de uma vez
+
+        Cada regra percorre uma coluna inteira (sem criar PatientData,
+        ComplexityFactor nem textos por paciente).
+
+        Args:
+            colunas: Ver metric_columns()
+
+        Returns:
+            {'scores': List[int], 'fatores': {nome da regra: nº de pacientes}}
+        """
+        metricas = self.metric_columns(colunas)
+        n = len(metricas['imc'])
+        scores = [0] * n
+        fatores = {}
+        resolvidos: Dict[str, List[bool]] = {}
+
+        for regra in self.regras:
+            resolvido = resolvidos.setdefault(regra.grupo, [False] * n)
+            op = OPERADORES[regra.op]
+            limite = regra.limite
+            ausentes = metricas[regra.somente_sem] if regra.somente_sem else [None] * n
+            contagem = 0
+            for i, (valor, ausente) in enumerate(zip(metricas[regra.campo], ausentes)):
+                if resolvido[i] or valor is None or ausente or not op(valor, limite):
+                    continue
+                resolvido[i] = True
+                scores[i] += regra.score
+                contagem += 1
+            fatores[regra.name] = contagem
+
+        return {'scores': scores, 'fatores': fatores}
@@ -8,6 +8,7 @@ from datetime import datetime
 import base64
 
 from app.config.settings import settings
+from app.utils.ttl_cache import TTLCache
 
 
 class FeegowService:
@@ -23,6 +24,13 @@ class FeegowService:
             "x-access-token": self.token,
             "Content-Type": "application/json"
         }
+        # Pacientes por ID (só respostas com sucesso vão para o cache)
+        self.patient_cache = TTLCache(
+            ttl=settings.feegow_patient_cache_ttl,
+            stale=settings.feegow_patient_cache_stale,
+            max_entradas=settings.feegow_patient_cache_max,
+            armazenar=lambda result: result.get("success", False)
+        )
 
     @property
     def is_configured(self) -> bool:
@@ -197,6 +205,9 @@ class FeegowService:
         """
         Busca dados completos de um paciente pelo ID
 
+        Acessos repetidos ao mesmo paciente vêm do cache (TTL com
+        stale-while-revalidate, ver FEEGOW_PATIENT_CACHE_*).
+
         Args:
             patient_id: ID do paciente no FEEGOW
 
@@ -206,6 +217,16 @@ class FeegowService:
         if not self.is_configured:
             return {"success": False, "error": "FEEGOW não configurado"}
 
+        return await self.patient_cache.obter(
+            int(patient_id), lambda: self._fetch_patient(patient_id)
+        )
+
+    def invalidate_patient(self, patient_id: int = None):
+        """Descarta o paciente do cache (ou todos, sem ID)"""
+        self.patient_cache.invalidar(None if patient_id is None else int(patient_id))
+
+    async def _fetch_patient(self, patient_id: int) -> Dict[str, Any]:
+        """Busca o paciente direto na API (sem cache)"""
         try:
             async with httpx.AsyncClient(timeout=30.0) as client:
                 response = await client.get(
@@ -314,6 +335,7 @@ class FeegowService:
                     return {
                         "success": False,
                         "error": f"Erro no upload: {response.status_code}",
+                        "status_code": response.status_code,
                         "detail": response.text
                     }
 
@@ -422,6 +444,10 @@ class FeegowService:
                     data = response.json()
                     content = data.get("content", {})
 
+                    # A próxima leitura do ID vem da API, com os dados do cadastro
+                    if content.get("id") is not None:
+                        self.invalidate_patient(content.get("id"))
+
                     # Retornar dados do paciente criado
                     return {
                         "success": True,
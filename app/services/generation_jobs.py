@@ -0,0 +1,464 @@
+"""
+Jobs de geração de dieta com progresso por Server-Sent Events
+
+POST /api/jobs/gerar-dieta cria o job e responde na hora com o job_id; a
+geração roda em segundo plano e cada etapa (nutricao, refeicoes, api com
+contagem de tokens, formatacao) vira um evento. O cliente acompanha por
+GET /api/jobs/{job_id}/eventos (SSE), que repete os eventos já emitidos e
+termina com "resultado" (mesmo JSON de /gerar-dieta) ou "erro"; a conexão
+não ocupa thread enquanto espera. GET /api/jobs/{job_id} devolve o estado
+(e o resultado) para quem prefere consultar.
+
+Jobs idênticos em andamento (mesmo paciente, modo e formato) no mesmo
+processo são o mesmo job. Os jobs ficam em memória por GENERATION_JOBS_TTL
+segundos depois de concluídos; no Vercel a geração é feita na própria
+requisição de criação.
+
+Com vários workers (uvicorn --workers N), o status e os eventos de cada job
+também vão para um SQLite compartilhado (GENERATION_JOBS_PATH, gravado em
+lotes fora do event loop): o worker que não roda o job responde o status e
+repete os eventos lendo o arquivo. Job em andamento há mais de
+GENERATION_JOBS_TTL segundos (worker encerrado no meio) é dado como falho.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.utils.telemetry import TelemetrySink
+
+IS_VERCEL = os.environ.get('VERCEL', False)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Estados do job
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+FALHOU = "falhou"
+
+# Sem eventos por este tempo (s), o stream envia um comentário (mantém proxies abertos)
+INTERVALO_HEARTBEAT = 15.0
+
+# Intervalo entre leituras do SQLite ao acompanhar job de outro worker (s)
+INTERVALO_CONSULTA = 0.5
+
+# Intervalo máximo entre gravações dos eventos no SQLite (s)
+INTERVALO_GRAVACAO = 0.2
+
+# (id, tipo, dados); None = heartbeat
+Evento = Tuple[int, str, dict]
+
+
+def _json(dados) -> str:
+    if orjson is not None:
+        return orjson.dumps(dados, default=str).decode("utf-8")
+    return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+def formatar_sse(evento: Optional[Evento]) -> str:
+    """Evento no formato text/event-stream (None = comentário de heartbeat)"""
+    if evento is None:
+        return ": ping\n\n"
+    indice, tipo, dados = evento
+    return f"id: {indice}\nevent: {tipo}\ndata: {_json(dados)}\n\n"
+
+
+@dataclass
+class GenerationJob:
+    """Job em memória: eventos emitidos e resultado"""
+    job_id: str
+    chave: str
+    criado_em: float = field(default_factory=time.time)
+    estado: str = EXECUTANDO
+    etapa: Optional[str] = None
+    eventos: List[Evento] = field(default_factory=list)
+    resultado: Optional[dict] = None
+    erro: Optional[str] = None
+    concluido_em: Optional[float] = None
+    tarefa: Optional[asyncio.Task] = None
+    # Trocado a cada evento: quem espera acorda e lê os novos
+    mudou: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @property
+    def terminado(self) -> bool:
+        return self.estado != EXECUTANDO
+
+    def status(self) -> dict:
+        status = {
+            "job_id": self.job_id,
+            "estado": self.estado,
+            "etapa": self.etapa,
+            "eventos": len(self.eventos),
+            "criado_em": self.criado_em,
+            "concluido_em": self.concluido_em
+        }
+        if self.estado == CONCLUIDO:
+            status["resultado"] = self.resultado
+        elif self.estado == FALHOU:
+            status["erro"] = self.erro
+        return status
+
+
+class SQLiteJobStore:
+    """
+    Status e eventos dos jobs num SQLite compartilhado entre workers
+
+    Métodos síncronos (chamados via asyncio.to_thread ou pela gravação em lote).
+    """
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._inicializado = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        if self._inicializado:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    chave TEXT NOT NULL,
+                    estado TEXT NOT NULL,
+                    etapa TEXT,
+                    eventos INTEGER NOT NULL DEFAULT 0,
+                    resultado TEXT,
+                    erro TEXT,
+                    criado_em REAL NOT NULL,
+                    concluido_em REAL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS eventos (
+                    job_id TEXT NOT NULL,
+                    indice INTEGER NOT NULL,
+                    tipo TEXT NOT NULL,
+                    dados TEXT NOT NULL,
+                    PRIMARY KEY (job_id, indice)
+                )
+                """
+            )
+        self._inicializado = True
+
+    def criar(self, job: GenerationJob):
+        """Registra o job (e remove os vencidos)"""
+        self._init_db()
+        agora = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO jobs (job_id, chave, estado, criado_em) VALUES (?, ?, ?, ?)",
+                (job.job_id, job.chave, job.estado, job.criado_em)
+            )
+            # Concluídos há mais de ttl; em andamento há mais de 2 * ttl (interrompidos)
+            conn.execute(
+                "DELETE FROM jobs WHERE COALESCE(concluido_em, criado_em + ?) < ?",
+                (self.ttl, agora - self.ttl)
+            )
+            conn.execute("DELETE FROM eventos WHERE job_id NOT IN (SELECT job_id FROM jobs)")
+
+    def gravar(self, lote: List[dict]):
+        """Grava um lote de eventos e o estado do job depois de cada um"""
+        self._init_db()
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO eventos (job_id, indice, tipo, dados) VALUES (?, ?, ?, ?)",
+                [(e["job_id"], e["indice"], e["tipo"], _json(e["dados"])) for e in lote]
+            )
+            conn.executemany(
+                """
+                UPDATE jobs SET estado = ?, etapa = ?, eventos = MAX(eventos, ?),
+                    resultado = ?, erro = ?, concluido_em = ?
+                WHERE job_id = ?
+                """,
+                [
+                    (
+                        e["estado"], e["etapa"], e["indice"] + 1,
+                        _json(e["dados"]) if e["tipo"] == "resultado" else None,
+                        e["erro"], e["concluido_em"], e["job_id"]
+                    )
+                    for e in lote
+                ]
+            )
+
+    def _interrompido(self, linha: sqlite3.Row) -> bool:
+        return linha["estado"] == EXECUTANDO and time.time() - linha["criado_em"] > self.ttl
+
+    def status(self, job_id: str) -> Optional[dict]:
+        """Mesmo formato de GenerationJob.status(); None se não existe"""
+        self._init_db()
+        with closing(self._connect()) as conn:
+            linha = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if linha is None:
+            return None
+        status = {
+            "job_id": linha["job_id"],
+            "estado": linha["estado"],
+            "etapa": linha["etapa"],
+            "eventos": linha["eventos"],
+            "criado_em": linha["criado_em"],
+            "concluido_em": linha["concluido_em"]
+        }
+        if self._interrompido(linha):
+            status["estado"] = FALHOU
+            status["erro"] = "Job interrompido"
+        elif linha["estado"] == CONCLUIDO:
+            status["resultado"] = json.loads(linha["resultado"]) if linha["resultado"] else None
+        elif linha["estado"] == FALHOU:
+            status["erro"] = linha["erro"]
+        return status
+
+    def eventos(self, job_id: str, apos: int) -> Tuple[List[Evento], bool]:
+        """
+        Eventos gravados depois de `apos` e se o job terminou
+
+        Job interrompido recebe um evento "erro" final.
+        """
+        self._init_db()
+        with closing(self._connect()) as conn:
+            linha = conn.execute(
+                "SELECT estado, criado_em, eventos FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            linhas = conn.execute(
+                "SELECT indice, tipo, dados FROM eventos WHERE job_id = ? AND indice > ? ORDER BY indice",
+                (job_id, apos)
+            ).fetchall()
+        eventos = [(l["indice"], l["tipo"], json.loads(l["dados"])) for l in linhas]
+        if linha is None:
+            return eventos, True
+        if self._interrompido(linha):
+            eventos.append((max(apos + 1, linha["eventos"]), "erro", {"erro": "Job interrompido"}))
+            return eventos, True
+        return eventos, linha["estado"] != EXECUTANDO
+
+
+def criar_job_store(ttl: float = None) -> Optional[SQLiteJobStore]:
+    """SQLite compartilhado conforme a configuração; None no Vercel ou com backend memory"""
+    if IS_VERCEL or settings.generation_jobs_backend != "sqlite":
+        return None
+    ttl = ttl if ttl is not None else settings.generation_jobs_ttl
+    return SQLiteJobStore(settings.generation_jobs_path, ttl)
+
+
+class GenerationJobs:
+    """
+    Jobs de geração de um processo, com eventos para SSE e, opcionalmente,
+    status e eventos num SQLite compartilhado com os outros workers
+    """
+
+    def __init__(self, ttl: float = None, max_jobs: int = None, store: Optional[SQLiteJobStore] = None):
+        """
+        Args:
+            ttl: Segundos em que um job concluído continua consultável
+            max_jobs: Jobs mantidos (os concluídos mais antigos saem primeiro)
+            store: SQLite compartilhado entre workers (None = só memória)
+        """
+        self.ttl = ttl if ttl is not None else settings.generation_jobs_ttl
+        self.max_jobs = max_jobs or settings.generation_jobs_max
+        self.store = store
+        self._gravacao = (
+            TelemetrySink(store.gravar, nome="jobs de geração", intervalo=INTERVALO_GRAVACAO)
+            if store is not None else None
+        )
+        self._jobs: "OrderedDict[str, GenerationJob]" = OrderedDict()
+        # chave -> job_id dos jobs em andamento
+        self._em_andamento: Dict[str, str] = {}
+        self.criados = 0
+        self.agrupados = 0
+
+    async def start(self):
+        """Inicia a gravação em lote dos eventos no SQLite"""
+        if self._gravacao is not None:
+            await self._gravacao.start()
+
+    async def criar(
+        self,
+        chave: str,
+        executar: Callable[[Callable[[str, dict], None]], Awaitable[dict]]
+    ) -> Tuple[GenerationJob, bool]:
+        """
+        Cria o job (ou devolve o job idêntico em andamento)
+
+        Args:
+            chave: Identificação da geração (ex.: chave_canonica da requisição)
+            executar: Recebe a função de progresso (segura entre threads) e
+                devolve o resultado final
+
+        Returns:
+            (job, novo)
+        """
+        self._limpar()
+        job_id = self._em_andamento.get(chave)
+        if job_id is not None and job_id in self._jobs:
+            self.agrupados += 1
+            return self._jobs[job_id], False
+
+        job = GenerationJob(job_id=uuid.uuid4().hex, chave=chave)
+        self._jobs[job.job_id] = job
+        self._em_andamento[chave] = job.job_id
+        self.criados += 1
+        if self.store is not None:
+            # Gravado antes da resposta: o cliente pode consultar outro worker em seguida
+            await asyncio.to_thread(self.store.criar, job)
+
+        loop = asyncio.get_running_loop()
+
+        def progresso(etapa: str, dados: dict):
+            # Chamado da thread da geração: publicação no event loop
+            try:
+                loop.call_soon_threadsafe(self._etapa, job, etapa, dados)
+            except RuntimeError:
+                # Loop encerrado (shutdown)
+                pass
+
+        job.tarefa = loop.create_task(self._executar(job, executar, progresso))
+        return job, True
+
+    def obter(self, job_id: str) -> Optional[GenerationJob]:
+        """Job deste processo"""
+        return self._jobs.get(job_id)
+
+    async def status(self, job_id: str) -> Optional[dict]:
+        """Status do job deste processo ou, no SQLite, de outro worker"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.status()
+        if self.store is None:
+            return None
+        return await asyncio.to_thread(self.store.status, job_id)
+
+    async def _executar(self, job: GenerationJob, executar, progresso):
+        try:
+            resultado = await executar(progresso)
+        except asyncio.CancelledError:
+            self._terminar(job, FALHOU, "erro", {"erro": "Servidor encerrado"}, erro="Servidor encerrado")
+            raise
+        except Exception as e:
+            self._terminar(job, FALHOU, "erro", {"erro": str(e)}, erro=str(e))
+        else:
+            job.resultado = resultado
+            self._terminar(job, CONCLUIDO, "resultado", resultado)
+
+    def _publicar(self, job: GenerationJob, tipo: str, dados: dict):
+        indice = len(job.eventos)
+        job.eventos.append((indice, tipo, dados))
+        mudou, job.mudou = job.mudou, asyncio.Event()
+        mudou.set()
+        if self._gravacao is not None:
+            self._gravacao.enviar({
+                "job_id": job.job_id,
+                "indice": indice,
+                "tipo": tipo,
+                "dados": dados,
+                "estado": job.estado,
+                "etapa": job.etapa,
+                "erro": job.erro,
+                "concluido_em": job.concluido_em
+            })
+
+    def _etapa(self, job: GenerationJob, etapa: str, dados: dict):
+        if job.terminado:
+            # Ex.: chamada hedged que continua depois do fallback
+            return
+        job.etapa = etapa
+        self._publicar(job, "etapa", {"etapa": etapa, **dados})
+
+    def _terminar(self, job: GenerationJob, estado: str, tipo: str, dados: dict, erro: str = None):
+        job.estado = estado
+        job.erro = erro
+        job.concluido_em = time.time()
+        if self._em_andamento.get(job.chave) == job.job_id:
+            del self._em_andamento[job.chave]
+        self._publicar(job, tipo, dados)
+
+    async def eventos(self, job_id: str, apos: int = -1) -> AsyncIterator[Optional[Evento]]:
+        """
+        Eventos do job a partir do id seguinte a `apos` (Last-Event-ID)
+
+        Repete os já emitidos, espera os novos e termina depois do evento
+        final; sem eventos por INTERVALO_HEARTBEAT, produz None (heartbeat).
+        Job de outro worker é acompanhado lendo o SQLite.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            if self.store is not None:
+                async for evento in self._eventos_compartilhados(job_id, apos):
+                    yield evento
+            return
+
+        proximo = apos + 1
+        while True:
+            while proximo < len(job.eventos):
+                yield job.eventos[proximo]
+                proximo += 1
+            if job.terminado:
+                return
+            try:
+                await asyncio.wait_for(job.mudou.wait(), timeout=INTERVALO_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield None
+
+    async def _eventos_compartilhados(self, job_id: str, apos: int) -> AsyncIterator[Optional[Evento]]:
+        ultimo = time.monotonic()
+        while True:
+            eventos, terminado = await asyncio.to_thread(self.store.eventos, job_id, apos)
+            for evento in eventos:
+                yield evento
+                apos = evento[0]
+                ultimo = time.monotonic()
+            if terminado:
+                return
+            if time.monotonic() - ultimo >= INTERVALO_HEARTBEAT:
+                yield None
+                ultimo = time.monotonic()
+            await asyncio.sleep(INTERVALO_CONSULTA)
+
+    def _limpar(self):
+        """Remove jobs concluídos vencidos e, acima do limite, os concluídos mais antigos"""
+        agora = time.time()
+        concluidos = [j for j in self._jobs.values() if j.terminado]
+        for job in concluidos:
+            if agora - job.concluido_em > self.ttl or len(self._jobs) >= self.max_jobs:
+                del self._jobs[job.job_id]
+
+    async def stop(self):
+        """Cancela as gerações em andamento e grava os eventos pendentes (shutdown)"""
+        tarefas = [j.tarefa for j in self._jobs.values() if not j.terminado and j.tarefa]
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+        if self._gravacao is not None:
+            await self._gravacao.stop()
+
+    def stats(self) -> dict:
+        return {
+            "backend": "sqlite" if self.store is not None else "memory",
+            "jobs": len(self._jobs),
+            "em_andamento": len(self._em_andamento),
+            "criados": self.criados,
+            "agrupados": self.agrupados,
+            "gravacao": self._gravacao.stats() if self._gravacao is not None else None
+        }
+
+
+# Instância global
+generation_jobs = GenerationJobs(store=criar_job_store())
@@ -0,0 +1,164 @@
+"""
+Carga glicêmica (CG) dos alimentos e refeições
+
+CG = IG × carboidratos da porção (g) / 100
+
+Os coeficientes de todos os alimentos são calculados de uma vez a partir
+da base (CG por kcal e limites de porção), no primeiro uso, o que permite ao MealBuilder
+estimar a CG de cada opção para a meta calórica e descartar as opções que
+estourariam o limite da refeição ANTES de escolher o alimento.
+"""
+import threading
+from typing import Dict, List, Set, Tuple
+
+from app.data.alimentos_base import ALIMENTOS
+
+
+# Classificação por refeição (Sociedade Brasileira de Diabetes / Harvard)
+CG_BAIXA = 10       # <= 10: baixa
+CG_ALTA = 20        # >= 20: alta
+
+# Classificação diária
+CG_DIA_BAIXA = 80
+CG_DIA_ALTA = 120
+
+
+def classificar_carga_glicemica(cg: float) -> str:
+    """Classifica a carga glicêmica de uma refeição"""
+    if cg <= CG_BAIXA:
+        return "baixa"
+    elif cg < CG_ALTA:
+        return "média"
+    return "alta"
+
+
+def classificar_carga_glicemica_diaria(cg: float) -> str:
+    """Classifica a carga glicêmica total do dia"""
+    if cg < CG_DIA_BAIXA:
+        return "baixa"
+    elif cg <= CG_DIA_ALTA:
+        return "média"
+    return "alta"
+
+
+class GlycemicLoadIndex:
+    """
+    Coeficientes de CG por alimento, calculados em uma passada pela base
+    """
+
+    # Mesmos limites de porção do MealBuilder._ajustar_porcao
+    MIN_MULT = 0.3
+    MAX_MULT = 3.0
+
+    def __init__(self, alimentos: dict = None):
+        self.alimentos = alimentos if alimentos is not None else ALIMENTOS
+
+        # key -> (CG por kcal, kcal mínima da porção, kcal máxima da porção)
+        self._coeficientes: Dict[str, Tuple[float, float, float]] = {}
+        # key -> CG da porção usual
+        self._cg_porcao_usual: Dict[str, float] = {}
+        # Alimentos sem IG conhecido (base estendida): fora dos coeficientes
+        self._ig_desconhecido: Set[str] = set()
+        # opções -> limites do grupo (caminho rápido do filtro)
+        self._cache_grupos: Dict[Tuple[str, ...], Tuple[float, float]] = {}
+
+        # Calculados no primeiro uso (o import não decodifica a base inteira)
+        self._construido = False
+        self._lock = threading.Lock()
+
+    def _garantir(self):
+        """Calcula os coeficientes no primeiro uso"""
+        if not self._construido:
+            with self._lock:
+                if not self._construido:
+                    self._build()
+                    self._construido = True
+
+    def _build(self):
+        """Coeficientes de todos os alimentos (uma passada pela base)"""
+        for key, a in self.alimentos.items():
+            if a['ig'] is None:
+                self._ig_desconhecido.add(key)
+                continue
+            cg_100g = a['ig'] * a['carb_g'] / 100
+            kcal_100g = a['kcal']
+            self._cg_porcao_usual[key] = cg_100g * a['gramas_porcao'] / 100
+            if kcal_100g <= 0:
+                continue
+            fator_kcal = a['gramas_porcao'] * kcal_100g / 100
+            self._coeficientes[key] = (
+                cg_100g / kcal_100g,
+                fator_kcal * self.MIN_MULT,
+                fator_kcal * self.MAX_MULT
+            )
+
+    @property
+    def cg_porcao_usual(self) -> Dict[str, float]:
+        """key -> CG da porção usual"""
+        self._garantir()
+        return self._cg_porcao_usual
+
+    @property
+    def ig_desconhecido(self) -> Set[str]:
+        """Chaves dos alimentos sem IG conhecido"""
+        self._garantir()
+        return self._ig_desconhecido
+
+    def carga_estimada(self, key: str, calorias_alvo: float) -> float:
+        """
+        CG da porção que o MealBuilder montaria para a meta calórica
+
+        Args:
+            key: Chave do alimento
+            calorias_alvo: Meta calórica do item
+
+        Returns:
+            Carga glicêmica estimada (infinita se o IG é desconhecido: o
+            alimento não cabe em nenhum limite)
+        """
+        self._garantir()
+        if key in self._ig_desconhecido:
+            return float('inf')
+        coef = self._coeficientes.get(key)
+        if coef is None:
+            return self._cg_porcao_usual.get(key, 0.0)
+        cg_por_kcal, kcal_min, kcal_max = coef
+        return cg_por_kcal * max(kcal_min, min(calorias_alvo, kcal_max))
+
+    def _limites_grupo(self, opcoes: Tuple[str, ...]) -> Tuple[float, float]:
+        """Maior CG/kcal e maior kcal mínima entre as opções (memoizado)"""
+        limites = self._cache_grupos.get(opcoes)
+        if limites is None:
+            coefs = [self._coeficientes.get(k) for k in opcoes]
+            limites = (
+                max((c[0] for c in coefs if c), default=0.0),
+                max((c[1] for c in coefs if c), default=0.0)
+            )
+            # Alimentos sem kcal (bebidas) ou sem IG: avaliados um a um
+            if any(c is None for c in coefs):
+                limites = (float('inf'), limites[1])
+            self._cache_grupos[opcoes] = limites
+        return limites
+
+    def filtrar(self, opcoes: List[str], calorias_alvo: float, limite: float) -> List[str]:
+        """
+        Opções cuja CG estimada cabe no limite
+
+        Se nenhuma couber, retorna apenas a opção de menor CG (a refeição
+        nunca fica sem o item).
+        """
+        self._garantir()
+        # Caminho rápido: limite superior da CG do grupo de opções
+        maior_coef, maior_kcal_min = self._limites_grupo(tuple(opcoes))
+        if maior_coef * max(calorias_alvo, maior_kcal_min) <= limite:
+            return opcoes
+
+        cargas = [(self.carga_estimada(k, calorias_alvo), k) for k in opcoes]
+        permitidas = [k for cg, k in cargas if cg <= limite]
+        if permitidas:
+            return permitidas
+        return [min(cargas)[1]]
+
+
+# Instância global (calculada no primeiro uso)
+glycemic_index = GlycemicLoadIndex()
@@ -2,25 +2,54 @@
 Sistema híbrido: orquestra Python + API
 ESTE É O COMPONENTE PRINCIPAL
 """
+import asyncio
+import threading
 import time
-from typing import Tuple, Optional
+from dataclasses import replace
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Tuple, Optional
 
-from app.models import PatientData, DietPlan, NutritionData
+from pydantic import ValidationError
+
+from app.models import (
+    PatientData, DietPlan, NutritionData, GeneratedPlan, PlanSections,
+    MealData, FoodItemData, DerivedMetrics, TokenUsage
+)
+from app.data.alimentos_base import calcular_nutricao_porcao
 from app.services.complexity_analyzer import ComplexityAnalyzer
 from app.services.nutrition_calc import NutritionCalculator
 from app.services.meal_builder import MealBuilder
 from app.services.markdown_formatter import MarkdownFormatter
 from app.services.carb_counting_formatter import CarbCountingFormatter
-from app.services.api_diet_generator import APIDietGenerator
-from app.utils.cost_tracker import CostTracker
+from app.services.api_diet_generator import APIDietGenerator, Progresso
+from app.services.mode_policy import AdaptiveModePolicy
+from app.utils.circuit_breaker import CircuitOpenError
+from app.utils.cost_tracker import CostTracker, calcular_custo
+from app.utils.single_flight import SingleFlight, chave_canonica
 from app.config.settings import settings, GenerationMode
 
+# Geração sem chamada à API
+SEM_TOKENS = TokenUsage()
+
+
+def _sem_progresso(etapa: str, dados: dict):
+    pass
+
 
 class HybridDietSystem:
     """
     Orquestrador: decide Python vs API
     """
 
+    # Totais do dia mantidos no plano: campo -> atributo da MealData
+    CAMPOS_TOTAIS = {
+        'calorias': 'calorias_total',
+        'carboidratos_g': 'carb_total',
+        'proteinas_g': 'prot_total',
+        'gorduras_g': 'gord_total',
+        'carga_glicemica': 'carga_glicemica',
+    }
+
     def __init__(self):
         # Python components
         self.complexity_analyzer = ComplexityAnalyzer()
@@ -39,10 +68,28 @@ class HybridDietSystem:
         # Tracking
         self.cost_tracker = CostTracker()
 
+        # AUTO: orçamento do mês e saúde recente da API
+        self.mode_policy = AdaptiveModePolicy(
+            self.cost_tracker.get_current_month_cost,
+            circuit_breaker=self.api_generator.circuit_breaker if self.api_available else None
+        )
+
+        # Pool de processos (definido no startup quando EXECUTION_MODE=process_pool)
+        self.process_pool = None
+
+        # Requisições idênticas simultâneas compartilham a geração
+        self.single_flight = SingleFlight()
+
+        # Chamadas hedged à API (thread pool criado no primeiro uso)
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._hedge_lock = threading.Lock()
+        self.hedge_stats = {'api_no_prazo': 0, 'prazo_perdido': 0, 'atrasadas_concluidas': 0}
+
     def generate_diet(
         self,
         patient_data: PatientData,
-        mode: Optional[GenerationMode] = None
+        mode: Optional[GenerationMode] = None,
+        track_cost: bool = True
     ) -> Tuple[str, dict]:
         """
         Gera dieta usando estratégia híbrida
@@ -50,90 +97,135 @@ class HybridDietSystem:
         Args:
             patient_data: Dados do paciente
             mode: Modo de geração (None = usar padrão AUTO)
+            track_cost: Registrar a geração no CostTracker (desligado em lote)
 
         Returns:
             (markdown, metadata)
         """
+        plan = self.generate_plan(patient_data, mode, track_cost)
+        return (plan.markdown, plan.metadata)
+
+    def generate_plan(
+        self,
+        patient_data: PatientData,
+        mode: Optional[GenerationMode] = None,
+        track_cost: bool = True,
+        render_markdown: bool = True,
+        progresso: Optional[Progresso] = None
+    ) -> GeneratedPlan:
+        """
+        Gera dieta mantendo refeições e seções do Markdown (para edição)
+
+        Args:
+            render_markdown: False pula a renderização (e a API, que só
+                atua na apresentação): o plano sai só com os dados
+                estruturados e markdown vazio
+            progresso: Recebe (etapa, dados) no início de cada etapa
+                (nutricao, refeicoes, api, formatacao), na thread da geração
+
+        Returns:
+            GeneratedPlan
+        """
 
         start_time = time.time()
+        avisar = progresso or _sem_progresso
 
-        # Modo padrão
-        if mode is None:
-            mode = GenerationMode(settings.default_generation_mode)
+        # Métricas derivadas (IMC, risco CV) calculadas uma vez e compartilhadas
+        metricas = self.nutrition_calc.calcular_metricas_derivadas(patient_data)
 
         # Análise de complexidade
-        complexity = self.complexity_analyzer.analyze(patient_data)
+        complexity = self.complexity_analyzer.analyze(patient_data, metricas)
+
+        # Modo padrão; AUTO resolvido pela política adaptativa
+        decisao = None
+        if render_markdown:
+            mode, decisao = self.resolve_mode(patient_data, mode, complexity)
 
         # Calcular nutrição (sempre Python)
-        nutrition_data = self._calculate_nutrition(patient_data)
+        avisar("nutricao", {
+            "complexidade": complexity['score'],
+            "modo": GenerationMode(mode).value if render_markdown and mode else None
+        })
+        nutrition_data = self._calculate_nutrition(patient_data, metricas)
 
         # Criar MealBuilder com tipo de dieta específico
+        avisar("refeicoes", {"meta_calorica": round(nutrition_data.meta_calorica, 0)})
         meal_builder = MealBuilder(tipo_dieta=patient_data.tipo_dieta)
         meals = meal_builder.build_complete_plan(
             nutrition_data.distribuicao_refeicoes,
             nutrition_data.macros
         )
 
-        # Decidir estratégia
-        if mode == GenerationMode.PYTHON_ONLY:
-            markdown, cost, tokens = self._generate_python_only(
-                patient_data, nutrition_data, meals
-            )
-            mode_used = "python_only"
+        # Chamada hedged que responde depois do prazo também é cobrada
+        registrar_atrasada = None
+        if track_cost:
+            def registrar_atrasada(modo_api: str, usage: TokenUsage):
+                self._track_generation(patient_data.nome, modo_api, usage, complexity['score'])
 
-        elif mode == GenerationMode.AUTO:
-            # Inteligente - baseado no score de complexidade
-            if complexity['score'] <= settings.complexity_threshold_simple:
-                markdown, cost, tokens = self._generate_python_only(
-                    patient_data, nutrition_data, meals
-                )
-                mode_used = "python_only"
-            elif complexity['score'] <= settings.complexity_threshold_medium:
-                markdown, cost, tokens = self._generate_api_minimal(
-                    patient_data, nutrition_data, meals
-                )
-                mode_used = "api_minimal"
-            else:
-                markdown, cost, tokens = self._generate_api_full(
-                    patient_data, nutrition_data, meals
-                )
-                mode_used = "api_full"
+        # Decidir estratégia
+        mode_used = self._modo_usado(mode, render_markdown)
+        if not render_markdown:
+            markdown, cost, usage, sections = "", 0.0, SEM_TOKENS, None
 
-        elif mode == GenerationMode.API_MINIMAL:
-            markdown, cost, tokens = self._generate_api_minimal(
-                patient_data, nutrition_data, meals
+        elif mode_used == "api_minimal":
+            markdown, cost, usage, sections = self._generate_api_minimal(
+                patient_data, nutrition_data, meals, progresso, registrar_atrasada
             )
-            mode_used = "api_minimal"
 
-        elif mode == GenerationMode.API_FULL:
-            markdown, cost, tokens = self._generate_api_full(
-                patient_data, nutrition_data, meals
+        elif mode_used == "api_full":
+            markdown, cost, usage, sections = self._generate_api_full(
+                patient_data, nutrition_data, meals, progresso, registrar_atrasada
             )
-            mode_used = "api_full"
 
         else:
-            # Fallback
-            markdown, cost, tokens = self._generate_python_only(
+            avisar("formatacao", {"modo": "python_only"})
+            markdown, cost, usage, sections = self._generate_python_only(
                 patient_data, nutrition_data, meals
             )
-            mode_used = "python_only"
 
         # Tempo
         generation_time = time.time() - start_time
 
         # Tracking
-        if settings.enable_cost_tracking:
-            self.cost_tracker.record_generation(
-                patient_name=patient_data.nome,
-                mode=mode_used,
-                tokens_used=tokens,
-                complexity_score=complexity['score']
-            )
+        if track_cost:
+            self._track_generation(patient_data.nome, mode_used, usage, complexity['score'])
 
         # Calcular resumo nutricional
         resumo = meal_builder.get_resumo_nutricional(meals)
+        totais = {campo: resumo[campo] for campo in self.CAMPOS_TOTAIS}
 
-        # Metadata
+        metadata = self._build_metadata(
+            patient_data, nutrition_data, complexity, mode_used, cost, usage.total, totais,
+            generation_time
+        )
+        if not render_markdown:
+            metadata['renderizacao'] = 'nenhuma'
+        if decisao is not None:
+            metadata['decisao_modo'] = decisao
+        metadata.update(self._metadata_api(mode_used, usage))
+
+        return GeneratedPlan(
+            patient=patient_data,
+            nutrition=nutrition_data,
+            meals=tuple(meals),
+            markdown=markdown,
+            metadata=metadata,
+            sections=sections,
+            totais=totais
+        )
+
+    def _build_metadata(
+        self,
+        patient_data: PatientData,
+        nutrition_data: NutritionData,
+        complexity: dict,
+        mode_used: str,
+        cost: float,
+        tokens: int,
+        totais: dict,
+        generation_time: float = 0.0
+    ) -> dict:
+        """Metadados retornados junto com o Markdown"""
         metadata = {
             'mode_used': mode_used,
             'cost_usd': cost,
@@ -153,24 +245,333 @@ class HybridDietSystem:
             'razao_insulina_cho': patient_data.razao_insulina_cho,
             'risco_cardiovascular': nutrition_data.risco_cardiovascular,
             'relacao_cintura_altura': nutrition_data.relacao_cintura_altura,
-            'calorias_reais': round(resumo['calorias'], 0),
+        }
+        metadata.update(self._metadata_totais(totais))
+        return metadata
+
+    @staticmethod
+    def _modo_usado(mode: Optional[GenerationMode], render_markdown: bool) -> str:
+        """
+        mode_used reportado: o modo de API pedido, mesmo quando a geração
+        caiu para Python (marcado por fallback_python em _metadata_api)
+        """
+        if render_markdown and mode in (GenerationMode.API_MINIMAL, GenerationMode.API_FULL):
+            return GenerationMode(mode).value
+        return "python_only"
+
+    def _metadata_api(self, mode_used: str, usage: TokenUsage) -> dict:
+        """Tokens e modelo da chamada, ou fallback_python quando a API não respondeu"""
+        if usage.total:
+            return {'token_usage': usage.to_dict(), 'model': self.api_generator.model}
+        if mode_used != "python_only":
+            # API indisponível, falhou, perdeu o prazo ou o circuito estava aberto
+            return {'fallback_python': True}
+        return {}
+
+    def _metadata_totais(self, totais: dict) -> dict:
+        """Campos de metadados derivados dos totais do dia"""
+        return {
+            'calorias_reais': round(totais['calorias'], 0),
+            'carga_glicemica_dia': round(totais['carga_glicemica'], 0),
             'macros': {
-                'carboidratos_g': round(resumo['carboidratos_g'], 0),
-                'proteinas_g': round(resumo['proteinas_g'], 0),
-                'gorduras_g': round(resumo['gorduras_g'], 0)
+                'carboidratos_g': round(totais['carboidratos_g'], 0),
+                'proteinas_g': round(totais['proteinas_g'], 0),
+                'gorduras_g': round(totais['gorduras_g'], 0)
             }
         }
 
-        return (markdown, metadata)
+    def edit_plan(
+        self,
+        plan: GeneratedPlan,
+        refeicao: int,
+        posicao: Optional[int] = None,
+        nova_chave: Optional[str] = None,
+        macro: Optional[str] = None
+    ) -> GeneratedPlan:
+        """
+        Edita uma única refeição de um plano já gerado
+
+        Só a refeição alterada é montada de novo; os totais do dia são
+        atualizados pela diferença e apenas o bloco da refeição e o resumo
+        diário são re-renderizados. Planos cujo Markdown veio inteiro da API
+        (api_full) não têm seções e são re-renderizados com os templates Python.
+
+        Args:
+            plan: Plano gerado anteriormente
+            refeicao: Índice da refeição (0 = café da manhã ... 4 = ceia)
+            posicao: Item a trocar (None = montar a refeição inteira de novo)
+            nova_chave: Alimento substituto (None = equivalente sorteado)
+            macro: Macro da equivalência (carb, prot, gord, kcal)
+
+        Returns:
+            Novo GeneratedPlan (o original não é alterado)
+
+        Raises:
+            ValueError: refeição, posição ou troca inválida
+        """
+        start_time = time.time()
+
+        if not 0 <= refeicao < len(plan.meals):
+            raise ValueError(f"Refeição inválida: {refeicao}")
+
+        meal_builder = MealBuilder(tipo_dieta=plan.patient.tipo_dieta)
+        antiga = plan.meals[refeicao]
+        if posicao is None:
+            nova = meal_builder.rebuild_meal(refeicao, antiga.calorias_alvo, plan.nutrition.macros)
+        else:
+            nova = meal_builder.swap(antiga, posicao, nova_chave, macro)
+        meals = plan.meals[:refeicao] + (nova,) + plan.meals[refeicao + 1:]
+
+        # Totais do dia: apenas a diferença da refeição alterada
+        totais = {
+            campo: plan.totais[campo] + getattr(nova, attr) - getattr(antiga, attr)
+            for campo, attr in self.CAMPOS_TOTAIS.items()
+        }
+
+        if plan.sections is not None:
+            formatter = self._formatter(plan.patient)
+            sections = plan.sections.com_refeicao(
+                refeicao,
+                formatter.format_meal_section(nova, plan.patient),
+                formatter.format_resumo_section(meals, plan.patient)
+            )
+            renderizacao = "incremental"
+        else:
+            sections = self._render_sections(plan.patient, plan.nutrition, meals)
+            renderizacao = "completa"
+
+        metadata = {**plan.metadata, **self._metadata_totais(totais)}
+        edicao = plan.metadata.get('edicao', {})
+        metadata['edicao'] = {
+            'versao': edicao.get('versao', 0) + 1,
+            'refeicao': nova.nome,
+            'renderizacao': renderizacao,
+            'tempo_segundos': round(time.time() - start_time, 4)
+        }
+
+        return GeneratedPlan(
+            patient=plan.patient,
+            nutrition=plan.nutrition,
+            meals=meals,
+            markdown=sections.render(),
+            metadata=metadata,
+            sections=sections,
+            totais=totais
+        )
+
+    def rerender_plan(self, plan: GeneratedPlan) -> GeneratedPlan:
+        """
+        Re-renderiza o documento com os templates Python a partir das refeições
+
+        Nada é montado nem calculado de novo. Útil para planos api_full (o
+        Markdown da API não tem seções) antes de editar, ou após mudanças
+        nos templates.
+        """
+        sections = self._render_sections(plan.patient, plan.nutrition, plan.meals)
+        return GeneratedPlan(
+            patient=plan.patient,
+            nutrition=plan.nutrition,
+            meals=plan.meals,
+            markdown=sections.render(),
+            metadata={**plan.metadata, 'renderizacao': 'python'},
+            sections=sections,
+            totais=plan.totais
+        )
+
+    def plan_from_payload(self, payload: dict) -> GeneratedPlan:
+        """
+        Reconstrói um plano a partir do payload retornado por /gerar-dieta
+
+        Os alimentos vêm por chave e gramas (sem novo sorteio nem API); a
+        nutrição é recalculada a partir dos dados do paciente.
+
+        Raises:
+            ValueError: payload inválido
+        """
+        try:
+            patient = PatientData(**payload['paciente'])
+            meals = []
+            for r in payload['refeicoes']:
+                alimentos = []
+                for a in r['alimentos']:
+                    dados = calcular_nutricao_porcao(a['chave'], a['gramas'])
+                    if not dados:
+                        raise ValueError(f"Alimento desconhecido: {a['chave']}")
+                    alimentos.append(FoodItemData(chave=a['chave'], **dados))
+                meals.append(MealData(
+                    nome=r['nome'],
+                    horario=r['horario'],
+                    calorias_alvo=r['calorias_alvo'],
+                    alimentos=tuple(alimentos)
+                ))
+        except (KeyError, TypeError, ValidationError) as e:
+            raise ValueError(f"Plano inválido: {e}")
+
+        metricas = self.nutrition_calc.calcular_metricas_derivadas(patient)
+        nutrition = self._calculate_nutrition(patient, metricas)
+        complexity = self.complexity_analyzer.analyze(patient, metricas)
+        totais = {
+            campo: sum(getattr(m, attr) for m in meals)
+            for campo, attr in self.CAMPOS_TOTAIS.items()
+        }
+        metadata = self._build_metadata(
+            patient, nutrition, complexity, payload.get('modo', 'python_only'), 0.0, 0, totais
+        )
+
+        return GeneratedPlan(
+            patient=patient,
+            nutrition=nutrition,
+            meals=tuple(meals),
+            markdown="",
+            metadata=metadata,
+            sections=None,
+            totais=totais
+        )
 
-    def _calculate_nutrition(self, patient: PatientData) -> NutritionData:
+    async def generate_diet_async(
+        self,
+        patient_data: PatientData,
+        mode: Optional[GenerationMode] = None
+    ) -> Tuple[str, dict]:
+        """Versão assíncrona de generate_diet"""
+        plan = await self.generate_plan_async(patient_data, mode)
+        return (plan.markdown, plan.metadata)
+
+    async def generate_plan_async(
+        self,
+        patient_data: PatientData,
+        mode: Optional[GenerationMode] = None,
+        render_markdown: bool = True,
+        progresso: Optional[Progresso] = None
+    ) -> GeneratedPlan:
+        """
+        Versão assíncrona de generate_plan
+
+        Modos sem API (python_only, ou AUTO que resolve para python_only, ou
+        sem renderização) vão para o pool de processos quando ativo; os
+        demais rodam no threadpool para não bloquear o event loop durante a
+        chamada à API. O AUTO é resolvido uma única vez, aqui.
+
+        Requisições idênticas simultâneas (duplo envio, várias abas) são
+        agrupadas pelo hash canônico de paciente, modo e renderização: só a
+        primeira gera o plano (e paga a API); as demais recebem uma cópia
+        com metadata['coalescida'] = True. Com progresso (jobs), o
+        agrupamento é feito pelos próprios jobs.
+        """
+        if progresso is not None or not settings.single_flight_enabled:
+            return await self._generate_plan_async(patient_data, mode, render_markdown, progresso)
+
+        chave = chave_canonica({
+            'paciente': patient_data.model_dump(),
+            'modo': GenerationMode(mode).value if mode else None,
+            'render_markdown': render_markdown
+        })
+        plan, coalescida = await self.single_flight.executar(
+            chave, lambda: self._generate_plan_async(patient_data, mode, render_markdown)
+        )
+        if coalescida:
+            plan = replace(plan, metadata={**plan.metadata, 'coalescida': True})
+        return plan
+
+    async def _generate_plan_async(
+        self,
+        patient_data: PatientData,
+        mode: Optional[GenerationMode],
+        render_markdown: bool,
+        progresso: Optional[Progresso] = None
+    ) -> GeneratedPlan:
+        """Geração assíncrona propriamente dita (pool de processos ou threadpool)"""
+        decisao = None
+        if render_markdown:
+            # O AUTO consulta o gasto do mês (SQLite): fora do event loop
+            mode, decisao = await asyncio.to_thread(self.resolve_mode, patient_data, mode)
+        local = not render_markdown or mode == GenerationMode.PYTHON_ONLY or not self.api_available
+
+        if self.process_pool is not None and local:
+            # Etapas rodam no processo do pool: só o início é avisado
+            if progresso is not None:
+                progresso("processamento", {"modo": "python_only"})
+            plan = await self.process_pool.generate_plan(
+                patient_data, GenerationMode.PYTHON_ONLY, render_markdown
+            )
+            # Mesmo mode_used e fallback_python da geração na própria thread
+            mode_used = self._modo_usado(mode, render_markdown)
+            plan.metadata['mode_used'] = mode_used
+            plan.metadata.update(self._metadata_api(mode_used, SEM_TOKENS))
+            self._track_generation(
+                patient_data.nome,
+                mode_used,
+                SEM_TOKENS,
+                plan.metadata['complexity_score']
+            )
+        else:
+            plan = await asyncio.to_thread(
+                self.generate_plan, patient_data, mode, True, render_markdown, progresso
+            )
+        if decisao is not None:
+            plan.metadata['decisao_modo'] = decisao
+        return plan
+
+    def resolve_mode(
+        self,
+        patient_data: PatientData,
+        mode: Optional[GenerationMode] = None,
+        complexity: dict = None
+    ) -> Tuple[GenerationMode, Optional[dict]]:
+        """
+        Modo efetivo da geração
+
+        AUTO passa pela política adaptativa (complexidade, orçamento do mês,
+        erros e latência recentes da API); os demais modos são mantidos.
+
+        Returns:
+            (modo, decisão da política ou None se o modo não era AUTO)
+        """
+        if mode is None:
+            mode = GenerationMode(settings.default_generation_mode)
+        if mode != GenerationMode.AUTO:
+            return mode, None
+        if complexity is None:
+            score = self.complexity_analyzer.score(patient_data)
+        else:
+            score = complexity['score']
+        decisao = self.mode_policy.decidir(score, self.api_available)
+        return GenerationMode(decisao['modo']), decisao
+
+    def is_local_mode(self, patient_data: PatientData, mode: Optional[GenerationMode] = None) -> bool:
+        """Indica se a geração não fará chamada à API (100% CPU local)"""
+        if mode is None:
+            mode = GenerationMode(settings.default_generation_mode)
+
+        if mode == GenerationMode.PYTHON_ONLY or not self.api_available:
+            return True
+        if mode == GenerationMode.AUTO:
+            score = self.complexity_analyzer.score(patient_data)
+            decisao = self.mode_policy.decidir(score, self.api_available, registrar=False)
+            return decisao['modo'] == 'python_only'
+        return False
+
+    def _track_generation(self, patient_name: str, mode_used: str, usage: TokenUsage, complexity_score: int):
+        """Registra a geração no CostTracker (custo pelos tokens reais)"""
+        if settings.enable_cost_tracking:
+            self.cost_tracker.record_generation(
+                patient_name=patient_name,
+                mode=mode_used,
+                tokens_used=usage.total,
+                complexity_score=complexity_score,
+                usage=usage,
+                model=self.api_generator.model if self.api_available else None
+            )
+
+    def _calculate_nutrition(self, patient: PatientData, metricas: DerivedMetrics = None) -> NutritionData:
         """Cálculos nutricionais (Python)"""
+        if metricas is None:
+            metricas = self.nutrition_calc.calcular_metricas_derivadas(patient)
 
         tmb = self.nutrition_calc.calcular_tmb(
             patient.peso, patient.altura, patient.idade, patient.sexo
         )
         necessidade = self.nutrition_calc.necessidade_calorica(tmb, 'leve')
-        imc = self.nutrition_calc.calcular_imc(patient.peso, patient.altura)
 
         # Usar nível de déficit escolhido pelo usuário
         meta = self.nutrition_calc.calcular_meta_por_nivel(
@@ -181,94 +582,228 @@ class HybridDietSystem:
         macros = self.nutrition_calc.distribuir_macros(meta, tipo_dieta=patient.tipo_dieta)
         distribuicao = self.nutrition_calc.distribuir_por_refeicoes(meta)
 
-        # Calcular risco cardiovascular se cintura informada
-        risco_cardiovascular = None
-        relacao_cintura_altura = None
-        if patient.cintura:
-            risco_cv = self.nutrition_calc.classificar_risco_cardiovascular(
-                patient.cintura, patient.altura, patient.sexo
-            )
-            risco_cardiovascular = risco_cv['risco_cardiovascular']
-            relacao_cintura_altura = risco_cv['relacao_cintura_altura']
-
         return NutritionData(
             tmb=tmb,
             necessidade_calorica=necessidade,
             meta_calorica=meta,
-            imc=imc,
+            imc=metricas.imc,
             macros=macros,
             distribuicao_refeicoes=distribuicao,
-            risco_cardiovascular=risco_cardiovascular,
-            relacao_cintura_altura=relacao_cintura_altura
+            # Só com cintura informada
+            risco_cardiovascular=metricas.risco_cardiovascular,
+            relacao_cintura_altura=metricas.relacao_cintura_altura
         )
 
-    def _generate_python_only(
+    def _formatter(self, patient: PatientData):
+        """Formatador Python do plano (contagem de CHO ou padrão)"""
+        if patient.contagem_cho:
+            return self.carb_counting_formatter
+        return self.markdown_formatter
+
+    def _render_sections(
         self, patient: PatientData, nutrition: NutritionData, meals: list
-    ) -> Tuple[str, float, int]:
-        """100% Python - $0"""
+    ) -> PlanSections:
+        """Documento Python completo, dividido em seções"""
 
         # Usar formatador de contagem de CHO se habilitado
         if patient.contagem_cho:
-            markdown = self.carb_counting_formatter.format_carb_counting_diet(
+            return self.carb_counting_formatter.format_sections(
                 patient=patient,
                 nutrition=nutrition,
                 meals=meals,
                 razao_insulina_cho=patient.razao_insulina_cho
             )
-        else:
-            markdown = self.markdown_formatter.format_complete_diet(
-                patient=patient, nutrition=nutrition, meals=meals
-            )
-        return (markdown, 0.0, 0)
+        return self.markdown_formatter.format_sections(
+            patient=patient, nutrition=nutrition, meals=meals
+        )
 
-    def _generate_api_minimal(
+    def _generate_python_only(
         self, patient: PatientData, nutrition: NutritionData, meals: list
-    ) -> Tuple[str, float, int]:
+    ) -> Tuple[str, float, TokenUsage, Optional[PlanSections]]:
+        """100% Python - $0"""
+
+        sections = self._render_sections(patient, nutrition, meals)
+        return (sections.render(), 0.0, SEM_TOKENS, sections)
+
+    def _generate_api_minimal(
+        self, patient: PatientData, nutrition: NutritionData, meals: list,
+        progresso: Optional[Progresso] = None,
+        registrar_atrasada: Optional[Callable[[str, TokenUsage], None]] = None
+    ) -> Tuple[str, float, TokenUsage, Optional[PlanSections]]:
         """Python + API apenas para apresentação"""
+        avisar = progresso or _sem_progresso
 
         if not self.api_available:
+            avisar("formatacao", {"modo": "python_only"})
             return self._generate_python_only(patient, nutrition, meals)
 
         # Se contagem de CHO está ativada, usar o formatador específico
         # (API não é necessária para contagem de CHO - formato técnico)
         if patient.contagem_cho:
+            avisar("formatacao", {"modo": "python_only"})
             return self._generate_python_only(patient, nutrition, meals)
 
-        try:
-            # API só para apresentação personalizada
-            apresentacao, tokens = self.api_generator.generate_minimal(patient, nutrition)
-
-            # Python faz o resto
-            markdown = self.markdown_formatter.format_complete_diet(
-                patient=patient,
-                nutrition=nutrition,
-                meals=meals,
-                custom_presentation=apresentacao
-            )
+        # API só para apresentação personalizada
+        resultado, reserva = self._call_api(
+            'api_minimal',
+            lambda: self.api_generator.generate_minimal(patient, nutrition, progresso),
+            lambda: self._generate_python_only(patient, nutrition, meals),
+            registrar_atrasada
+        )
+        if resultado is None:
+            avisar("formatacao", {"modo": "python_only", "fallback_python": True})
+            return reserva
+        apresentacao, usage = resultado
+
+        # Python faz o resto
+        avisar("formatacao", {"modo": "api_minimal"})
+        sections = self.markdown_formatter.format_sections(
+            patient=patient,
+            nutrition=nutrition,
+            meals=meals,
+            custom_presentation=apresentacao
+        )
 
-            return (markdown, settings.cost_api_minimal, tokens)
-        except Exception as e:
-            print(f"Erro na API minimal: {e}. Usando Python puro.")
-            return self._generate_python_only(patient, nutrition, meals)
+        cost = calcular_custo('api_minimal', usage, self.api_generator.model)
+        return (sections.render(), cost, usage, sections)
 
     def _generate_api_full(
-        self, patient: PatientData, nutrition: NutritionData, meals: list
-    ) -> Tuple[str, float, int]:
+        self, patient: PatientData, nutrition: NutritionData, meals: list,
+        progresso: Optional[Progresso] = None,
+        registrar_atrasada: Optional[Callable[[str, TokenUsage], None]] = None
+    ) -> Tuple[str, float, TokenUsage, Optional[PlanSections]]:
         """API completa para casos complexos"""
+        avisar = progresso or _sem_progresso
 
         if not self.api_available:
+            avisar("formatacao", {"modo": "python_only"})
             return self._generate_python_only(patient, nutrition, meals)
 
-        try:
-            diet_plan = DietPlan(
-                paciente=patient, calculos=nutrition, refeicoes=meals
-            )
+        # Fronteira da API: converter modelos internos para Pydantic
+        diet_plan = DietPlan(
+            paciente=patient,
+            calculos=nutrition,
+            refeicoes=[m.to_model() for m in meals]
+        )
+
+        # Markdown escrito pela API: sem seções reaproveitáveis na edição
+        resultado, reserva = self._call_api(
+            'api_full',
+            lambda: self.api_generator.generate_full(diet_plan, progresso),
+            lambda: self._generate_python_only(patient, nutrition, meals),
+            registrar_atrasada
+        )
+        if resultado is None:
+            avisar("formatacao", {"modo": "python_only", "fallback_python": True})
+            return reserva
+        markdown, usage = resultado
+        cost = calcular_custo('api_full', usage, self.api_generator.model)
+        return (markdown, cost, usage, None)
+
+    def _call_api(
+        self,
+        modo: str,
+        chamada: Callable,
+        python_only: Callable,
+        registrar_atrasada: Optional[Callable[[str, TokenUsage], None]] = None
+    ):
+        """
+        Chamada à API com fallback para o plano Python
+
+        No modo hedged (API_HEDGE) a chamada vai para uma thread e o plano
+        Python é renderizado em paralelo; se a API não responde no prazo
+        do modo, o plano Python é devolvido na hora. A chamada termina em
+        segundo plano: alimenta as estatísticas e, se concluir, os tokens
+        cobrados vão para registrar_atrasada(modo, usage) (registro próprio
+        no CostTracker, contando no orçamento do mês).
 
-            markdown, tokens = self.api_generator.generate_full(diet_plan)
-            return (markdown, settings.cost_api_full, tokens)
+        Returns:
+            (resultado da API, None) ou (None, resultado de python_only())
+        """
+        prazo = {
+            'api_minimal': settings.api_hedge_deadline_minimal,
+            'api_full': settings.api_hedge_deadline_full,
+        }[modo]
+        label = modo.replace('api_', '')
+
+        if not (settings.api_hedge_enabled and prazo):
+            try:
+                return self._call_api_timed(modo, chamada), None
+            except Exception as e:
+                print(f"Erro na API {label}: {e}. Usando Python puro.")
+                return None, python_only()
+
+        inicio = time.perf_counter()
+        futuro = self._hedge_executor().submit(self._call_api_timed, modo, chamada)
+        reserva = python_only()
+        try:
+            resultado = futuro.result(timeout=max(0.0, prazo - (time.perf_counter() - inicio)))
+        except FutureTimeoutError:
+            with self._hedge_lock:
+                self.hedge_stats['prazo_perdido'] += 1
+            futuro.add_done_callback(lambda f: self._registrar_atrasada(modo, f, registrar_atrasada))
+            print(f"Aviso: API {label} sem resposta em {prazo:g}s. Usando Python puro.")
+            return None, reserva
         except Exception as e:
-            print(f"Erro na API full: {e}. Usando Python puro.")
-            return self._generate_python_only(patient, nutrition, meals)
+            print(f"Erro na API {label}: {e}. Usando Python puro.")
+            return None, reserva
+        with self._hedge_lock:
+            self.hedge_stats['api_no_prazo'] += 1
+        return resultado, None
+
+    def _registrar_atrasada(self, modo: str, futuro, registrar: Optional[Callable[[str, TokenUsage], None]]):
+        """Cobra a chamada hedged concluída depois do prazo (callback do futuro)"""
+        if futuro.cancelled() or futuro.exception() is not None:
+            return
+        with self._hedge_lock:
+            self.hedge_stats['atrasadas_concluidas'] += 1
+        if registrar is not None:
+            _, usage = futuro.result()
+            registrar(modo, usage)
+
+    def _call_api_timed(self, modo: str, chamada: Callable):
+        """Executa a chamada registrando latência e erro para a política do AUTO"""
+        inicio = time.perf_counter()
+        try:
+            resultado = chamada()
+        except CircuitOpenError:
+            # Recusada sem chamar a API: não diz nada sobre a latência
+            raise
+        except Exception:
+            self.mode_policy.api_stats.registrar(modo, time.perf_counter() - inicio, False)
+            raise
+        self.mode_policy.api_stats.registrar(modo, time.perf_counter() - inicio, True)
+        return resultado
+
+    def _hedge_executor(self) -> ThreadPoolExecutor:
+        """Threads das chamadas hedged (criadas no primeiro uso)"""
+        with self._hedge_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(
+                    max_workers=settings.api_hedge_workers, thread_name_prefix="api-hedge"
+                )
+            return self._hedge_pool
+
+    def shutdown(self):
+        """Libera as threads hedged (chamadas em andamento terminam sozinhas)"""
+        with self._hedge_lock:
+            pool, self._hedge_pool = self._hedge_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def api_health(self) -> dict:
+        """Circuit breaker da API e contadores do modo hedged (para /health)"""
+        with self._hedge_lock:
+            hedge = dict(self.hedge_stats)
+        return {
+            "circuit_breaker": self.api_generator.circuit_breaker.stats() if self.api_available else None,
+            "hedge": {
+                "enabled": settings.api_hedge_enabled,
+                "prazo_minimal_segundos": settings.api_hedge_deadline_minimal,
+                "prazo_full_segundos": settings.api_hedge_deadline_full,
+                **hedge
+            }
+        }
 
     def get_stats(self, month: int = None, year: int = None) -> dict:
         """Retorna estatísticas de uso"""
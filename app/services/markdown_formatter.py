@@ -4,8 +4,11 @@ SEM uso de API - Custo: $0
 """
 from typing import List
 
-from app.models import PatientData, NutritionData, Meal
+from app.models import PatientData, NutritionData, MealData, PlanSections
 from app.data.substituicoes import formatar_todas_tabelas_markdown
+from app.services.glycemic_load import (
+    classificar_carga_glicemica, classificar_carga_glicemica_diaria
+)
 
 
 class MarkdownFormatter:
@@ -18,7 +21,7 @@ class MarkdownFormatter:
         self,
         patient: PatientData,
         nutrition: NutritionData,
-        meals: List[Meal],
+        meals: List[MealData],
         custom_presentation: str = None
     ) -> str:
         """
@@ -30,6 +33,20 @@ class MarkdownFormatter:
             meals: Lista de refeições
             custom_presentation: Apresentação da API (opcional)
         """
+        return self.format_sections(patient, nutrition, meals, custom_presentation).render()
+
+    def format_sections(
+        self,
+        patient: PatientData,
+        nutrition: NutritionData,
+        meals: List[MealData],
+        custom_presentation: str = None
+    ) -> PlanSections:
+        """
+        Gera o documento dividido em seções (cabeçalho, refeições, resumo, rodapé)
+
+        Permite que a edição de um plano re-renderize apenas a refeição alterada.
+        """
 
         titulo = "# PLANO ALIMENTAR PERSONALIZADO\n\n"
 
@@ -40,24 +57,30 @@ class MarkdownFormatter:
 
         dados = self._format_patient_data(patient, nutrition)
         calculos = self._format_nutrition_calculations(nutrition)
-        refeicoes = self._format_meals(meals)
         substituicoes = self._get_substituicoes_completas()
         orientacoes = self._get_orientacoes_template(patient)
         suplementos = self._get_suplementos_template()
         dicas = self._get_dicas_template()
         assinatura = self._get_assinatura()
 
-        return (
-            f"{titulo}"
-            f"{apresentacao}\n\n"
-            f"{dados}\n\n"
-            f"{calculos}\n\n"
-            f"{refeicoes}\n\n"
-            f"{substituicoes}\n\n"
-            f"{orientacoes}\n\n"
-            f"{suplementos}\n\n"
-            f"{dicas}\n\n"
-            f"{assinatura}"
+        return PlanSections(
+            cabecalho=(
+                f"{titulo}"
+                f"{apresentacao}\n\n"
+                f"{dados}\n\n"
+                f"{calculos}\n\n"
+                "## PLANO DE REFEIÇÕES DIÁRIAS\n"
+            ),
+            refeicoes=tuple(self.format_meal_section(meal, patient) for meal in meals),
+            resumo=self.format_resumo_section(meals, patient),
+            rodape=(
+                "\n\n"
+                f"{substituicoes}\n\n"
+                f"{orientacoes}\n\n"
+                f"{suplementos}\n\n"
+                f"{dicas}\n\n"
+                f"{assinatura}"
+            )
         )
 
     def _get_apresentacao_template(
@@ -156,28 +179,30 @@ Este é um plano inicial que poderá ser ajustado conforme sua resposta individu
 | Proteínas | {m['prot_g']:.0f}g | {m['prot_percent']}% |
 | Gorduras | {m['gord_g']:.0f}g | {m['gord_percent']}% |"""
 
-    def _format_meals(self, meals: List[Meal]) -> str:
-        """Formata refeições em tabelas"""
+    def format_meal_section(self, meal: MealData, patient: PatientData = None) -> str:
+        """Formata uma refeição em tabela"""
 
-        output = "## PLANO DE REFEIÇÕES DIÁRIAS\n"
+        output = f"\n### {meal.nome} ({meal.horario})\n"
+        output += (
+            f"**Meta:** ~{meal.calorias_alvo:.0f} kcal | "
+            f"**Carga glicêmica:** {meal.carga_glicemica:.0f} "
+            f"({classificar_carga_glicemica(meal.carga_glicemica)})\n\n"
+        )
+        output += "| Alimento | Porção | Kcal | Carb | Prot | Gord |\n"
+        output += "|----------|--------|------|------|------|------|\n"
 
-        for meal in meals:
-            total_kcal = sum(a.kcal for a in meal.alimentos)
-            total_carb = sum(a.carb for a in meal.alimentos)
-            total_prot = sum(a.prot for a in meal.alimentos)
-            total_gord = sum(a.gord for a in meal.alimentos)
+        for alimento in meal.alimentos:
+            output += f"| {alimento.nome} | {alimento.porcao} | {alimento.kcal:.0f} | {alimento.carb:.1f}g | {alimento.prot:.1f}g | {alimento.gord:.1f}g |\n"
 
-            output += f"\n### {meal.nome} ({meal.horario})\n"
-            output += f"**Meta:** ~{meal.calorias_alvo:.0f} kcal\n\n"
-            output += "| Alimento | Porção | Kcal | Carb | Prot | Gord |\n"
-            output += "|----------|--------|------|------|------|------|\n"
+        output += f"| **TOTAL** | | **{meal.calorias_total:.0f}** | **{meal.carb_total:.1f}g** | **{meal.prot_total:.1f}g** | **{meal.gord_total:.1f}g** |\n"
 
-            for alimento in meal.alimentos:
-                output += f"| {alimento.nome} | {alimento.porcao} | {alimento.kcal:.0f} | {alimento.carb:.1f}g | {alimento.prot:.1f}g | {alimento.gord:.1f}g |\n"
+        return output
 
-            output += f"| **TOTAL** | | **{total_kcal:.0f}** | **{total_carb:.1f}g** | **{total_prot:.1f}g** | **{total_gord:.1f}g** |\n"
+    def format_resumo_section(self, meals: List[MealData], patient: PatientData = None) -> str:
+        """Resumo do dia abaixo das refeições"""
 
-        return output
+        cg_dia = sum(meal.carga_glicemica for meal in meals)
+        return f"\n**Carga glicêmica do dia:** {cg_dia:.0f} ({classificar_carga_glicemica_diaria(cg_dia)})\n"
 
     def _get_substituicoes_completas(self) -> str:
         """Retorna tabelas de substituições do módulo de substituições"""
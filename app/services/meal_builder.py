@@ -2,13 +2,18 @@
 Montador de refeições balanceadas
 Utiliza a base de alimentos para construir refeições que atendam às metas calóricas
 """
-from typing import List, Dict
+from typing import List, Dict, Optional
+from dataclasses import replace
 import random
 
 from app.data.alimentos_base import (
     ALIMENTOS, ALIMENTOS_POR_REFEICAO, calcular_nutricao_porcao
 )
-from app.models import Meal, FoodItem
+from app.models import MealData, FoodItemData
+from app.services.portion_table import portion_table
+from app.services.glycemic_load import glycemic_index
+from app.services.substitution_index import substitution_index
+from app.config.settings import settings
 
 
 class MealBuilder:
@@ -56,39 +61,71 @@ class MealBuilder:
         }
     }
 
-    def __init__(self, tipo_dieta: str = 'personalizado'):
+    # Ordem das refeições no plano: (chave da distribuição, método de montagem)
+    REFEICOES = (
+        ('cafe', 'build_cafe_manha'),
+        ('almoco', 'build_almoco'),
+        ('lanche', 'build_lanche'),
+        ('jantar', 'build_jantar'),
+        ('ceia', 'build_ceia'),
+    )
+
+    def __init__(self, tipo_dieta: str = 'personalizado', limite_carga_glicemica: Optional[float] = None):
+        """
+        Args:
+            tipo_dieta: Tipo de dieta (ajusta proporções dos grupos)
+            limite_carga_glicemica: CG máxima por refeição
+                (None = settings.max_glycemic_load_per_meal, 0 = sem limite)
+        """
         self.alimentos = ALIMENTOS
         self.alimentos_por_refeicao = ALIMENTOS_POR_REFEICAO
         self.tipo_dieta = tipo_dieta
         self.ajustes = self.AJUSTES_DIETA.get(tipo_dieta, self.AJUSTES_DIETA['personalizado'])
+        if limite_carga_glicemica is None:
+            limite_carga_glicemica = settings.max_glycemic_load_per_meal
+        self.limite_carga_glicemica = limite_carga_glicemica
 
-    def _criar_food_item(self, key: str, gramas: float = None) -> FoodItem:
+    def _escolher(self, opcoes: List[str], calorias_alvo: float, alimentos: List[FoodItemData]) -> str:
         """
-        Cria um FoodItem a partir da chave do alimento
+        Escolhe um alimento entre as opções respeitando o limite de CG
+
+        Opções que estourariam a carga glicêmica restante da refeição são
+        descartadas antes do sorteio (sem montar e depois rejeitar).
+
+        Args:
+            opcoes: Chaves candidatas
+            calorias_alvo: Meta calórica do item
+            alimentos: Itens já escolhidos na refeição
+
+        Returns:
+            Chave do alimento escolhido
+        """
+        if self.limite_carga_glicemica:
+            restante = self.limite_carga_glicemica - sum(a.carga_glicemica for a in alimentos)
+            opcoes = glycemic_index.filtrar(opcoes, calorias_alvo, restante)
+        return random.choice(opcoes)
+
+    def _criar_food_item(self, key: str, gramas: float = None) -> FoodItemData:
+        """
+        Cria um FoodItemData a partir da chave do alimento
 
         Args:
             key: Chave do alimento na base de dados
             gramas: Quantidade em gramas (opcional)
 
         Returns:
-            FoodItem com dados nutricionais calculados
+            FoodItemData com dados nutricionais calculados
         """
+        if gramas is None and self.alimentos is ALIMENTOS:
+            return portion_table.usual(key)
+
         dados = calcular_nutricao_porcao(key, gramas)
         if not dados:
             return None
 
-        return FoodItem(
-            nome=dados['nome'],
-            porcao=dados['porcao'],
-            gramas=dados['gramas'],
-            kcal=dados['kcal'],
-            carb=dados['carb'],
-            prot=dados['prot'],
-            gord=dados['gord'],
-            fibra=dados['fibra']
-        )
+        return FoodItemData(chave=key, **dados)
 
-    def _ajustar_porcao(self, key: str, calorias_alvo: float, min_mult: float = 0.3, max_mult: float = 3.0) -> FoodItem:
+    def _ajustar_porcao(self, key: str, calorias_alvo: float, min_mult: float = 0.3, max_mult: float = 3.0) -> FoodItemData:
         """
         Ajusta a porção de um alimento para atingir as calorias alvo
 
@@ -99,8 +136,15 @@ class MealBuilder:
             max_mult: Multiplicador máximo da porção padrão (default 3.0)
 
         Returns:
-            FoodItem com porção ajustada
+            FoodItemData com porção ajustada
         """
+        # Porção já resolvida na tabela pré-calculada (startup)
+        if self.alimentos is ALIMENTOS:
+            item = portion_table.porcao(key, calorias_alvo, min_mult, max_mult)
+            if item is not None:
+                return item
+
+        # Cálculo exato fora da grade
         alimento = self.alimentos.get(key)
         if not alimento:
             return None
@@ -120,7 +164,7 @@ class MealBuilder:
 
         return self._criar_food_item(key, gramas_ajustadas)
 
-    def build_cafe_manha(self, calorias_alvo: float, macros_dia: dict) -> Meal:
+    def build_cafe_manha(self, calorias_alvo: float, macros_dia: dict) -> MealData:
         """
         Monta café da manhã balanceado (~20% das calorias diárias)
 
@@ -135,7 +179,7 @@ class MealBuilder:
             macros_dia: Macros totais do dia (para referência)
 
         Returns:
-            Meal com alimentos balanceados
+            MealData com alimentos balanceados
         """
         alimentos = []
         aj = self.ajustes
@@ -159,7 +203,7 @@ class MealBuilder:
         # 1. Cereal/Pão
         cal_cereal = calorias_alvo * prop_cereal
         cereais_opcoes = self.alimentos_por_refeicao['cafe_manha']['cereais']
-        cereal_key = random.choice(cereais_opcoes)
+        cereal_key = self._escolher(cereais_opcoes, cal_cereal, alimentos)
         cereal = self._ajustar_porcao(cereal_key, cal_cereal)
         if cereal:
             alimentos.append(cereal)
@@ -167,7 +211,7 @@ class MealBuilder:
         # 2. Proteína/Ovo
         cal_proteina = calorias_alvo * prop_proteina
         proteinas_opcoes = self.alimentos_por_refeicao['cafe_manha']['proteinas']
-        proteina_key = random.choice(proteinas_opcoes)
+        proteina_key = self._escolher(proteinas_opcoes, cal_proteina, alimentos)
         proteina = self._ajustar_porcao(proteina_key, cal_proteina)
         if proteina:
             alimentos.append(proteina)
@@ -175,7 +219,7 @@ class MealBuilder:
         # 3. Laticínio
         cal_lacteo = calorias_alvo * prop_lacteo
         lacteos_opcoes = self.alimentos_por_refeicao['cafe_manha']['lacteos']
-        lacteo_key = random.choice(lacteos_opcoes)
+        lacteo_key = self._escolher(lacteos_opcoes, cal_lacteo, alimentos)
         lacteo = self._ajustar_porcao(lacteo_key, cal_lacteo)
         if lacteo:
             alimentos.append(lacteo)
@@ -183,7 +227,7 @@ class MealBuilder:
         # 4. Fruta
         cal_fruta = calorias_alvo * prop_fruta
         frutas_opcoes = self.alimentos_por_refeicao['cafe_manha']['frutas']
-        fruta_key = random.choice(frutas_opcoes)
+        fruta_key = self._escolher(frutas_opcoes, cal_fruta, alimentos)
         fruta = self._ajustar_porcao(fruta_key, cal_fruta)
         if fruta:
             alimentos.append(fruta)
@@ -191,7 +235,7 @@ class MealBuilder:
         # 5. Gordura saudável (sementes)
         cal_gordura = calorias_alvo * prop_gordura
         gorduras_opcoes = ['chia', 'linhaça']
-        gordura_key = random.choice(gorduras_opcoes)
+        gordura_key = self._escolher(gorduras_opcoes, cal_gordura, alimentos)
         gordura = self._ajustar_porcao(gordura_key, cal_gordura)
         if gordura:
             alimentos.append(gordura)
@@ -201,14 +245,14 @@ class MealBuilder:
         if cafe:
             alimentos.append(cafe)
 
-        return Meal(
+        return MealData(
             nome="Café da Manhã",
             horario="07:00",
             calorias_alvo=calorias_alvo,
-            alimentos=alimentos
+            alimentos=tuple(alimentos)
         )
 
-    def build_almoco(self, calorias_alvo: float, macros_dia: dict) -> Meal:
+    def build_almoco(self, calorias_alvo: float, macros_dia: dict) -> MealData:
         """
         Monta almoço balanceado (~30% das calorias diárias)
 
@@ -219,7 +263,7 @@ class MealBuilder:
             macros_dia: Macros totais do dia
 
         Returns:
-            Meal com alimentos balanceados
+            MealData com alimentos balanceados
         """
         alimentos = []
         aj = self.ajustes
@@ -243,7 +287,7 @@ class MealBuilder:
         # 1. Arroz/Cereal
         cal_cereal = calorias_alvo * prop_cereal
         cereais_opcoes = self.alimentos_por_refeicao['almoco']['cereais']
-        cereal_key = random.choice(cereais_opcoes)
+        cereal_key = self._escolher(cereais_opcoes, cal_cereal, alimentos)
         cereal = self._ajustar_porcao(cereal_key, cal_cereal)
         if cereal:
             alimentos.append(cereal)
@@ -251,7 +295,7 @@ class MealBuilder:
         # 2. Feijão/Leguminosa
         cal_leguminosa = calorias_alvo * prop_leguminosa
         leguminosas_opcoes = self.alimentos_por_refeicao['almoco']['leguminosas']
-        leguminosa_key = random.choice(leguminosas_opcoes)
+        leguminosa_key = self._escolher(leguminosas_opcoes, cal_leguminosa, alimentos)
         leguminosa = self._ajustar_porcao(leguminosa_key, cal_leguminosa)
         if leguminosa:
             alimentos.append(leguminosa)
@@ -259,7 +303,7 @@ class MealBuilder:
         # 3. Proteína
         cal_proteina = calorias_alvo * prop_proteina
         proteinas_opcoes = self.alimentos_por_refeicao['almoco']['proteinas']
-        proteina_key = random.choice(proteinas_opcoes)
+        proteina_key = self._escolher(proteinas_opcoes, cal_proteina, alimentos)
         proteina = self._ajustar_porcao(proteina_key, cal_proteina)
         if proteina:
             alimentos.append(proteina)
@@ -276,7 +320,7 @@ class MealBuilder:
         # 5. Legume cozido
         cal_legume = calorias_alvo * prop_legume
         legumes_opcoes = self.alimentos_por_refeicao['almoco']['legumes']
-        legume_key = random.choice(legumes_opcoes)
+        legume_key = self._escolher(legumes_opcoes, cal_legume, alimentos)
         legume = self._ajustar_porcao(legume_key, cal_legume)
         if legume:
             alimentos.append(legume)
@@ -292,14 +336,14 @@ class MealBuilder:
         if azeite:
             alimentos.append(azeite)
 
-        return Meal(
+        return MealData(
             nome="Almoço",
             horario="12:00",
             calorias_alvo=calorias_alvo,
-            alimentos=alimentos
+            alimentos=tuple(alimentos)
         )
 
-    def build_lanche(self, calorias_alvo: float, macros_dia: dict) -> Meal:
+    def build_lanche(self, calorias_alvo: float, macros_dia: dict) -> MealData:
         """
         Monta lanche da tarde (~15% das calorias diárias)
 
@@ -310,7 +354,7 @@ class MealBuilder:
             macros_dia: Macros totais do dia
 
         Returns:
-            Meal com alimentos balanceados
+            MealData com alimentos balanceados
         """
         alimentos = []
         aj = self.ajustes
@@ -330,7 +374,7 @@ class MealBuilder:
         # 1. Fruta
         cal_fruta = calorias_alvo * prop_fruta
         frutas_opcoes = self.alimentos_por_refeicao['lanche']['frutas']
-        fruta_key = random.choice(frutas_opcoes)
+        fruta_key = self._escolher(frutas_opcoes, cal_fruta, alimentos)
         fruta = self._ajustar_porcao(fruta_key, cal_fruta)
         if fruta:
             alimentos.append(fruta)
@@ -338,7 +382,7 @@ class MealBuilder:
         # 2. Iogurte
         cal_lacteo = calorias_alvo * prop_lacteo
         lacteos_opcoes = self.alimentos_por_refeicao['lanche']['lacteos']
-        lacteo_key = random.choice(lacteos_opcoes)
+        lacteo_key = self._escolher(lacteos_opcoes, cal_lacteo, alimentos)
         lacteo = self._ajustar_porcao(lacteo_key, cal_lacteo)
         if lacteo:
             alimentos.append(lacteo)
@@ -346,19 +390,19 @@ class MealBuilder:
         # 3. Castanhas
         cal_gordura = calorias_alvo * prop_gordura
         gorduras_opcoes = self.alimentos_por_refeicao['lanche']['gorduras']
-        gordura_key = random.choice(gorduras_opcoes)
+        gordura_key = self._escolher(gorduras_opcoes, cal_gordura, alimentos)
         gordura = self._ajustar_porcao(gordura_key, cal_gordura)
         if gordura:
             alimentos.append(gordura)
 
-        return Meal(
+        return MealData(
             nome="Lanche da Tarde",
             horario="15:00",
             calorias_alvo=calorias_alvo,
-            alimentos=alimentos
+            alimentos=tuple(alimentos)
         )
 
-    def build_jantar(self, calorias_alvo: float, macros_dia: dict) -> Meal:
+    def build_jantar(self, calorias_alvo: float, macros_dia: dict) -> MealData:
         """
         Monta jantar balanceado (~25% das calorias diárias)
 
@@ -369,7 +413,7 @@ class MealBuilder:
             macros_dia: Macros totais do dia
 
         Returns:
-            Meal com alimentos balanceados
+            MealData com alimentos balanceados
         """
         alimentos = []
         aj = self.ajustes
@@ -391,7 +435,7 @@ class MealBuilder:
         # 1. Arroz/Cereal
         cal_cereal = calorias_alvo * prop_cereal
         cereais_opcoes = self.alimentos_por_refeicao['jantar']['cereais']
-        cereal_key = random.choice(cereais_opcoes)
+        cereal_key = self._escolher(cereais_opcoes, cal_cereal, alimentos)
         cereal = self._ajustar_porcao(cereal_key, cal_cereal)
         if cereal:
             alimentos.append(cereal)
@@ -399,7 +443,7 @@ class MealBuilder:
         # 2. Proteína
         cal_proteina = calorias_alvo * prop_proteina
         proteinas_opcoes = self.alimentos_por_refeicao['jantar']['proteinas']
-        proteina_key = random.choice(proteinas_opcoes)
+        proteina_key = self._escolher(proteinas_opcoes, cal_proteina, alimentos)
         proteina = self._ajustar_porcao(proteina_key, cal_proteina)
         if proteina:
             alimentos.append(proteina)
@@ -415,7 +459,7 @@ class MealBuilder:
         # 4. Legume cozido
         cal_legume = calorias_alvo * prop_legume
         legumes_opcoes = self.alimentos_por_refeicao['jantar']['legumes']
-        legume_key = random.choice(legumes_opcoes)
+        legume_key = self._escolher(legumes_opcoes, cal_legume, alimentos)
         legume = self._ajustar_porcao(legume_key, cal_legume)
         if legume:
             alimentos.append(legume)
@@ -431,14 +475,14 @@ class MealBuilder:
         if azeite:
             alimentos.append(azeite)
 
-        return Meal(
+        return MealData(
             nome="Jantar",
             horario="19:00",
             calorias_alvo=calorias_alvo,
-            alimentos=alimentos
+            alimentos=tuple(alimentos)
         )
 
-    def build_ceia(self, calorias_alvo: float, macros_dia: dict) -> Meal:
+    def build_ceia(self, calorias_alvo: float, macros_dia: dict) -> MealData:
         """
         Monta ceia leve (~10% das calorias diárias)
 
@@ -449,7 +493,7 @@ class MealBuilder:
             macros_dia: Macros totais do dia
 
         Returns:
-            Meal com alimentos balanceados
+            MealData com alimentos balanceados
         """
         alimentos = []
         aj = self.ajustes
@@ -467,7 +511,7 @@ class MealBuilder:
         # 1. Iogurte ou leite
         cal_lacteo = calorias_alvo * prop_lacteo
         lacteos_opcoes = self.alimentos_por_refeicao['ceia']['lacteos']
-        lacteo_key = random.choice(lacteos_opcoes)
+        lacteo_key = self._escolher(lacteos_opcoes, cal_lacteo, alimentos)
         lacteo = self._ajustar_porcao(lacteo_key, cal_lacteo)
         if lacteo:
             alimentos.append(lacteo)
@@ -475,7 +519,7 @@ class MealBuilder:
         # 2. Fruta leve
         cal_fruta = calorias_alvo * prop_fruta
         frutas_opcoes = self.alimentos_por_refeicao['ceia']['frutas']
-        fruta_key = random.choice(frutas_opcoes)
+        fruta_key = self._escolher(frutas_opcoes, cal_fruta, alimentos)
         fruta = self._ajustar_porcao(fruta_key, cal_fruta)
         if fruta:
             alimentos.append(fruta)
@@ -485,14 +529,14 @@ class MealBuilder:
         if cha:
             alimentos.append(cha)
 
-        return Meal(
+        return MealData(
             nome="Ceia",
             horario="21:30",
             calorias_alvo=calorias_alvo,
-            alimentos=alimentos
+            alimentos=tuple(alimentos)
         )
 
-    def build_complete_plan(self, distribuicao: dict, macros_dia: dict) -> List[Meal]:
+    def build_complete_plan(self, distribuicao: dict, macros_dia: dict) -> List[MealData]:
         """
         Monta todas as 5 refeições do dia
 
@@ -501,20 +545,94 @@ class MealBuilder:
             macros_dia: Dict com macros totais do dia
 
         Returns:
-            Lista de 5 objetos Meal
+            Lista de 5 objetos MealData
         """
         # Usar seed baseada no dia para consistência (opcional)
         # random.seed(42)  # Descomente para reprodutibilidade
 
         return [
-            self.build_cafe_manha(distribuicao['cafe']['kcal'], macros_dia),
-            self.build_almoco(distribuicao['almoco']['kcal'], macros_dia),
-            self.build_lanche(distribuicao['lanche']['kcal'], macros_dia),
-            self.build_jantar(distribuicao['jantar']['kcal'], macros_dia),
-            self.build_ceia(distribuicao['ceia']['kcal'], macros_dia)
+            getattr(self, metodo)(distribuicao[chave]['kcal'], macros_dia)
+            for chave, metodo in self.REFEICOES
         ]
 
-    def get_resumo_nutricional(self, refeicoes: List[Meal]) -> dict:
+    def rebuild_meal(self, indice: int, calorias_alvo: float, macros_dia: dict) -> MealData:
+        """
+        Monta novamente uma única refeição do plano (novo sorteio de alimentos)
+
+        Args:
+            indice: Posição da refeição no plano (0 = café da manhã ... 4 = ceia)
+            calorias_alvo: Calorias da refeição
+            macros_dia: Macros totais do dia
+
+        Returns:
+            Nova MealData
+        """
+        if not 0 <= indice < len(self.REFEICOES):
+            raise ValueError(f"Refeição inválida: {indice}")
+        return getattr(self, self.REFEICOES[indice][1])(calorias_alvo, macros_dia)
+
+    def swap(
+        self,
+        meal: MealData,
+        posicao: int,
+        nova_chave: Optional[str] = None,
+        macro: Optional[str] = None
+    ) -> MealData:
+        """
+        Troca um único alimento da refeição por um equivalente
+
+        As demais porções são mantidas; só o item trocado é recalculado, com
+        as gramas do índice de substituições (mesma quantidade do macro de
+        referência do grupo).
+
+        Args:
+            meal: Refeição original
+            posicao: Índice do alimento em meal.alimentos
+            nova_chave: Alimento substituto (None = sorteia entre os equivalentes
+                que respeitam o limite de CG da refeição)
+            macro: carb, prot, gord ou kcal (padrão: macro do grupo)
+
+        Returns:
+            Nova MealData com os totais recalculados
+
+        Raises:
+            ValueError: posição inválida ou troca sem equivalência
+        """
+        if not 0 <= posicao < len(meal.alimentos):
+            raise ValueError(f"Posição inválida: {posicao}")
+
+        atual = meal.alimentos[posicao]
+        if not atual.chave:
+            raise ValueError(f"Alimento sem chave na base: {atual.nome}")
+
+        if nova_chave is None:
+            equivalentes = substitution_index.equivalentes(atual.chave, macro)
+            if not equivalentes:
+                raise ValueError(f"Nenhum equivalente para {atual.nome}")
+            opcoes = [k for k, _ in equivalentes]
+            if self.limite_carga_glicemica:
+                restante = self.limite_carga_glicemica - sum(
+                    a.carga_glicemica for i, a in enumerate(meal.alimentos) if i != posicao
+                )
+                # IG desconhecido (base estendida): CG não estimável, fora das permitidas
+                permitidas = [
+                    k for k, fator in equivalentes
+                    if self.alimentos[k]['ig'] is not None
+                    and self.alimentos[k]['ig'] * self.alimentos[k]['carb_g'] * atual.gramas * fator / 10000 <= restante
+                ]
+                # Equivalentes vêm ordenados por proximidade calórica
+                opcoes = permitidas or opcoes[:1]
+            nova_chave = random.choice(opcoes)
+
+        gramas = substitution_index.gramas_equivalentes(atual.chave, atual.gramas, nova_chave, macro)
+        if gramas is None:
+            raise ValueError(f"Troca sem equivalência: {atual.chave} -> {nova_chave}")
+
+        novo = self._criar_food_item(nova_chave, gramas)
+        alimentos = meal.alimentos[:posicao] + (novo,) + meal.alimentos[posicao + 1:]
+        return replace(meal, alimentos=alimentos)
+
+    def get_resumo_nutricional(self, refeicoes: List[MealData]) -> dict:
         """
         Calcula o resumo nutricional de todas as refeições
 
@@ -522,7 +640,7 @@ class MealBuilder:
             refeicoes: Lista de refeições
 
         Returns:
-            Dict com totais de calorias, carbs, proteínas e gorduras
+            Dict com totais de calorias, carbs, proteínas, gorduras e carga glicêmica
         """
         total_kcal = sum(r.calorias_total for r in refeicoes)
         total_carb = sum(r.carb_total for r in refeicoes)
@@ -534,6 +652,7 @@ class MealBuilder:
             'carboidratos_g': total_carb,
             'proteinas_g': total_prot,
             'gorduras_g': total_gord,
+            'carga_glicemica': sum(r.carga_glicemica for r in refeicoes),
             'carboidratos_percent': (total_carb * 4 / total_kcal * 100) if total_kcal > 0 else 0,
             'proteinas_percent': (total_prot * 4 / total_kcal * 100) if total_kcal > 0 else 0,
             'gorduras_percent': (total_gord * 9 / total_kcal * 100) if total_kcal > 0 else 0
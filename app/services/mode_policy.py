@@ -0,0 +1,195 @@
+"""
+Política adaptativa do modo AUTO
+
+O modo base continua vindo do score de complexidade (thresholds em
+settings), mas antes de chamar a API a política confere:
+- orçamento mensal (MONTHLY_BUDGET_USD, gasto do mês no CostTracker):
+  sem saldo para a chamada -> python_only; acima de AUTO_BUDGET_SOFT_LIMIT
+  do orçamento, api_full vira api_minimal
+- circuit breaker da API aberto -> python_only
+- taxa de erro recente da API (janela das últimas chamadas) acima de
+  AUTO_MAX_ERROR_RATE -> python_only
+- latência p95 recente do modo acima do limite (AUTO_MAX_LATENCY_FULL /
+  AUTO_MAX_LATENCY_MINIMAL) -> um modo abaixo (api_full -> api_minimal ->
+  python_only)
+
+As chamadas saem da janela depois de AUTO_STATS_MAX_AGE segundos: sem
+amostras suficientes a política volta a tentar a API.
+
+A decisão e o motivo vão para os metadados do plano (decisao_modo).
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict
+
+from app.config.settings import settings
+from app.utils.circuit_breaker import CircuitBreaker
+
+# Modos em ordem de custo (rebaixar = um passo para a esquerda)
+ORDEM_MODOS = ('python_only', 'api_minimal', 'api_full')
+
+
+class ApiCallStats:
+    """
+    Latência e erros das últimas chamadas à API, por modo
+    """
+
+    def __init__(self, janela: int = None, idade_max: float = None):
+        """
+        Args:
+            janela: Últimas chamadas mantidas por modo
+            idade_max: Segundos em que uma chamada ainda conta
+        """
+        self.janela = janela or settings.auto_stats_window
+        self.idade_max = idade_max if idade_max is not None else settings.auto_stats_max_age
+        self._chamadas: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, modo: str, segundos: float, sucesso: bool):
+        """Registra uma chamada (api_minimal ou api_full)"""
+        with self._lock:
+            chamadas = self._chamadas.get(modo)
+            if chamadas is None:
+                chamadas = self._chamadas[modo] = deque(maxlen=self.janela)
+            chamadas.append((time.monotonic(), segundos, sucesso))
+
+    def resumo(self, modo: str = None) -> dict:
+        """
+        Amostras, taxa de erro e latência p95 (chamadas com sucesso)
+
+        Args:
+            modo: api_minimal, api_full ou None (todas as chamadas)
+        """
+        desde = time.monotonic() - self.idade_max
+        with self._lock:
+            filas = self._chamadas.values() if modo is None else [self._chamadas.get(modo, ())]
+            chamadas = [(s, sucesso) for fila in filas for quando, s, sucesso in fila if quando >= desde]
+        latencias = sorted(s for s, sucesso in chamadas if sucesso)
+        erros = sum(1 for _, sucesso in chamadas if not sucesso)
+        p95 = latencias[min(len(latencias) - 1, int(0.95 * len(latencias)))] if latencias else None
+        return {
+            'amostras': len(chamadas),
+            'taxa_erro': round(erros / len(chamadas), 3) if chamadas else 0.0,
+            'latencia_p95_s': round(p95, 2) if p95 is not None else None
+        }
+
+
+class AdaptiveModePolicy:
+    """
+    Resolve o modo AUTO considerando orçamento, erros e latência da API
+    """
+
+    def __init__(
+        self,
+        gasto_mes: Callable[[], float],
+        api_stats: ApiCallStats = None,
+        circuit_breaker: CircuitBreaker = None
+    ):
+        """
+        Args:
+            gasto_mes: Função que devolve o gasto do mês corrente em USD
+            api_stats: Estatísticas das chamadas recentes à API
+            circuit_breaker: Circuit breaker da API (None = sem API)
+        """
+        self.gasto_mes = gasto_mes
+        self.api_stats = api_stats or ApiCallStats()
+        self.circuit_breaker = circuit_breaker
+        self.custos = {
+            'python_only': settings.cost_python_only,
+            'api_minimal': settings.cost_api_minimal,
+            'api_full': settings.cost_api_full,
+        }
+        self.latencia_max = {
+            'api_minimal': settings.auto_max_latency_minimal,
+            'api_full': settings.auto_max_latency_full,
+        }
+        # motivo -> nº de decisões
+        self.decisoes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def modo_base(complexity_score: int) -> str:
+        """Modo pelo score de complexidade (regra original do AUTO)"""
+        if complexity_score <= settings.complexity_threshold_simple:
+            return 'python_only'
+        if complexity_score <= settings.complexity_threshold_medium:
+            return 'api_minimal'
+        return 'api_full'
+
+    def decidir(self, complexity_score: int, api_available: bool = True, registrar: bool = True) -> dict:
+        """
+        Modo efetivo para o score informado
+
+        Args:
+            complexity_score: Score do ComplexityAnalyzer
+            api_available: Se a API está configurada
+            registrar: Contabilizar a decisão em stats() (False em consultas)
+
+        Returns:
+            Dict com modo, modo_base, motivo e os números considerados
+        """
+        base = self.modo_base(complexity_score)
+        modo, motivo = self._rebaixar_por_saude(base, api_available)
+        gasto = orcamento = None
+
+        if modo != 'python_only' and settings.monthly_budget_usd > 0:
+            orcamento = settings.monthly_budget_usd
+            gasto = self.gasto_mes()
+            if gasto + self.custos['api_minimal'] > orcamento:
+                modo, motivo = 'python_only', 'orcamento_esgotado'
+            elif modo == 'api_full' and (
+                gasto + self.custos['api_full'] > orcamento
+                or gasto >= orcamento * settings.auto_budget_soft_limit
+            ):
+                modo, motivo = 'api_minimal', 'orcamento_proximo_do_limite'
+
+        if registrar:
+            with self._lock:
+                self.decisoes[motivo] = self.decisoes.get(motivo, 0) + 1
+
+        return {
+            'modo': modo,
+            'modo_base': base,
+            'motivo': motivo,
+            'gasto_mes_usd': round(gasto, 4) if gasto is not None else None,
+            'orcamento_mes_usd': orcamento
+        }
+
+    def _rebaixar_por_saude(self, modo: str, api_available: bool):
+        """Aplica indisponibilidade, taxa de erro e latência; devolve (modo, motivo)"""
+        if modo == 'python_only':
+            return modo, 'complexidade'
+        if not api_available:
+            return 'python_only', 'api_indisponivel'
+        if self.circuit_breaker is not None and self.circuit_breaker.estado == CircuitBreaker.ABERTO:
+            return 'python_only', 'circuito_aberto'
+
+        geral = self.api_stats.resumo()
+        if (geral['amostras'] >= settings.auto_min_samples
+                and geral['taxa_erro'] > settings.auto_max_error_rate):
+            return 'python_only', 'taxa_de_erro_alta'
+
+        motivo = 'complexidade'
+        while modo != 'python_only':
+            resumo = self.api_stats.resumo(modo)
+            p95 = resumo['latencia_p95_s']
+            limite = self.latencia_max[modo]
+            if not limite or p95 is None or resumo['amostras'] < settings.auto_min_samples or p95 <= limite:
+                break
+            modo = ORDEM_MODOS[ORDEM_MODOS.index(modo) - 1]
+            motivo = 'api_lenta'
+        return modo, motivo
+
+    def stats(self) -> dict:
+        """Estado da política (orçamento, saúde da API e decisões por motivo)"""
+        with self._lock:
+            decisoes = dict(self.decisoes)
+        return {
+            'orcamento_mes_usd': settings.monthly_budget_usd or None,
+            'gasto_mes_usd': round(self.gasto_mes(), 4),
+            'limite_suave': settings.auto_budget_soft_limit,
+            'api_minimal': self.api_stats.resumo('api_minimal'),
+            'api_full': self.api_stats.resumo('api_full'),
+            'decisoes': decisoes
+        }
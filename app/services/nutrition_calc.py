@@ -2,7 +2,9 @@
 Calculadora de necessidades nutricionais
 Todos os cálculos são feitos localmente para minimizar uso de tokens da API
 """
-from typing import Dict
+from typing import Dict, Optional
+
+from app.models import DerivedMetrics, PatientData
 
 
 class NutritionCalculator:
@@ -102,6 +104,33 @@ class NutritionCalculator:
         altura_m = altura / 100
         return peso / (altura_m ** 2)
 
+    @classmethod
+    def calcular_metricas_derivadas(cls, patient: PatientData) -> DerivedMetrics:
+        """
+        IMC e risco cardiovascular do paciente (uma vez por requisição)
+
+        Args:
+            patient: Dados do paciente
+
+        Returns:
+            DerivedMetrics compartilhado pela análise de complexidade e pelos
+            cálculos nutricionais
+        """
+        relacao: Optional[float] = None
+        risco: Optional[str] = None
+        if patient.cintura:
+            risco_cv = cls.classificar_risco_cardiovascular(patient.cintura, patient.altura, patient.sexo)
+            relacao = risco_cv['relacao_cintura_altura']
+            risco = risco_cv['risco_cardiovascular']
+        return DerivedMetrics(
+            imc=cls.calcular_imc(patient.peso, patient.altura),
+            idade=patient.idade,
+            hba1c=patient.hba1c,
+            glicemia=patient.glicemia,
+            relacao_cintura_altura=relacao,
+            risco_cardiovascular=risco
+        )
+
     @staticmethod
     def classificar_imc(imc: float) -> str:
         """
@@ -0,0 +1,456 @@
+"""
+Exportação do plano para PDF (Python puro, sem rede nem navegador)
+
+Etapa depois do MarkdownFormatter/CarbCountingFormatter: interpreta o
+subconjunto de Markdown que os formatters produzem (títulos, tabelas,
+listas, negrito/itálico, separadores) e escreve o PDF direto em memória.
+
+Usa as fontes padrão do PDF (Helvetica, sem embutir arquivos de fonte) com
+codificação WinAnsi, que cobre os acentos do português. O que é caro e se
+repete entre requisições fica em cache:
+- métricas das fontes: tabelas de largura montadas no import
+- layout: cada bloco de Markdown (tabela, lista, parágrafo) vira uma lista
+  de linhas já quebradas e convertidas em operadores PDF, memoizada pelo
+  texto do bloco; as tabelas de substituição e orientações, iguais em todos
+  os planos, só são diagramadas uma vez
+- template da página: objetos fixos (catálogo, fontes) e rodapé
+"""
+import re
+import unicodedata
+import zlib
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Tuple
+
+# Página A4 em pontos
+LARGURA_PAGINA = 595.28
+ALTURA_PAGINA = 841.89
+MARGEM = 50.0
+MARGEM_INFERIOR = 60.0
+LARGURA_UTIL = LARGURA_PAGINA - 2 * MARGEM
+
+# Fontes (nome do recurso, BaseFont)
+FONTES = {
+    'F1': 'Helvetica',
+    'F2': 'Helvetica-Bold',
+    'F3': 'Helvetica-Oblique',
+}
+
+# Estilos: (fonte, tamanho, espaço antes, espaço depois)
+ESTILOS = {
+    'h1': ('F2', 16.0, 6.0, 8.0),
+    'h2': ('F2', 12.5, 12.0, 6.0),
+    'h3': ('F2', 10.5, 8.0, 4.0),
+    'texto': ('F1', 9.5, 0.0, 3.0),
+    'tabela': ('F1', 8.5, 2.0, 6.0),
+}
+ENTRELINHA = 1.3
+PADDING_CELULA = 3.0
+COR_TITULO = b"0.08 0.33 0.24 rg"
+COR_CABECALHO_TABELA = b"0.90 0.95 0.92 rg"
+
+# Larguras (1/1000 em) da Helvetica e Helvetica-Bold, ASCII 32-126 (AFM Adobe)
+_ASCII_REGULAR = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_ASCII_NEGRITO = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+# Símbolos WinAnsi sem letra base
+_SIMBOLOS = {
+    '•': 350, '–': 556, '—': 1000, '…': 1000, '“': 333,
+    '”': 333, '‘': 222, '’': 222, '°': 400, '²': 333,
+    '³': 333, '¹': 333, 'º': 365, 'ª': 370, '×': 584,
+    '±': 584, ' ': 278, '·': 278, '€': 556, '½': 834,
+    '¼': 834, '¾': 834, 'æ': 889, 'Æ': 1000, 'ß': 611,
+}
+
+
+def _tabela_larguras(ascii_larguras: tuple) -> Tuple[int, ...]:
+    """Larguras dos 256 códigos WinAnsi (acentuadas = largura da letra base)"""
+    larguras = [556] * 256
+    for i, w in enumerate(ascii_larguras):
+        larguras[32 + i] = w
+    for codigo in range(128, 256):
+        try:
+            caractere = bytes([codigo]).decode('cp1252')
+        except UnicodeDecodeError:
+            continue
+        if caractere in _SIMBOLOS:
+            larguras[codigo] = _SIMBOLOS[caractere]
+            continue
+        base = unicodedata.normalize('NFKD', caractere)[:1]
+        if base and 32 <= ord(base) < 127:
+            larguras[codigo] = larguras[ord(base)]
+    return tuple(larguras)
+
+
+# Métricas calculadas uma vez (Oblique tem as mesmas larguras da Regular)
+_LARGURAS = {
+    'F1': _tabela_larguras(_ASCII_REGULAR),
+    'F2': _tabela_larguras(_ASCII_NEGRITO),
+}
+_LARGURAS['F3'] = _LARGURAS['F1']
+
+_INLINE = re.compile(r'\*\*(.+?)\*\*|\*(.+?)\*')
+_ITEM_LISTA = re.compile(r'^(\s*)(?:[-*]|(\d+)\.)\s+(.*)$')
+_SEPARADOR_TABELA = re.compile(r'^\|?\s*:?-{2,}')
+
+
+def _codificar(texto: str) -> bytes:
+    """Texto em WinAnsi (caracteres fora dela, como emojis, são descartados)"""
+    return texto.encode('cp1252', 'ignore')
+
+
+def _largura(dados: bytes, fonte: str, tamanho: float) -> float:
+    """Largura em pontos do texto já codificado"""
+    return sum(map(_LARGURAS[fonte].__getitem__, dados)) * tamanho / 1000
+
+
+def _escapar(dados: bytes) -> bytes:
+    return dados.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def _texto(x: float, y: float, fonte: str, tamanho: float, dados: bytes) -> bytes:
+    """Operador de texto na posição (y relativo ao topo da linha)"""
+    return b"BT /%s %.1f Tf %.2f %.2f Td (%s) Tj ET\n" % (
+        fonte.encode(), tamanho, x, y, _escapar(dados)
+    )
+
+
+def _trechos(texto: str, fonte_base: str = 'F1') -> List[Tuple[str, bytes]]:
+    """Divide a linha em trechos (fonte, texto) conforme **negrito** e *itálico*"""
+    trechos = []
+    pos = 0
+    for m in _INLINE.finditer(texto):
+        if m.start() > pos:
+            trechos.append((fonte_base, _codificar(texto[pos:m.start()])))
+        if m.group(1) is not None:
+            trechos.append(('F2', _codificar(m.group(1))))
+        else:
+            trechos.append(('F3' if fonte_base == 'F1' else fonte_base, _codificar(m.group(2))))
+        pos = m.end()
+    if pos < len(texto):
+        trechos.append((fonte_base, _codificar(texto[pos:])))
+    return trechos
+
+
+def _quebrar(trechos: List[Tuple[str, bytes]], tamanho: float, largura_max: float):
+    """
+    Quebra os trechos em linhas que cabem na largura
+
+    Returns:
+        Lista de linhas; cada linha é uma lista de (x, fonte, texto)
+    """
+    linhas = [[]]
+    x = 0.0
+    fim = None          # x do fim da última palavra da linha
+    espaco = {f: _largura(b' ', f, tamanho) for f in FONTES}
+    for fonte, dados in trechos:
+        palavras = dados.split(b' ')
+        for i, palavra in enumerate(palavras):
+            if i > 0:
+                x += espaco[fonte]
+            if not palavra:
+                continue
+            w = _largura(palavra, fonte, tamanho)
+            if x + w > largura_max and linhas[-1]:
+                linhas.append([])
+                x = 0.0
+                fim = None
+            linha = linhas[-1]
+            # Junta com o segmento anterior da mesma fonte (menos operadores)
+            if linha and linha[-1][1] == fonte and fim is not None and abs(x - fim - espaco[fonte]) < 0.01:
+                x0, _, anterior = linha[-1]
+                linha[-1] = (x0, fonte, anterior + b' ' + palavra)
+            else:
+                linha.append((x, fonte, palavra))
+            x += w
+            fim = x
+    return [l for l in linhas if l] or [[]]
+
+
+# Linha diagramada: (altura, operadores relativos ao topo, manter com a próxima)
+Linha = Tuple[float, bytes, bool]
+
+
+def _layout_paragrafo(texto: str, estilo: str, recuo: float = 0.0, marcador: bytes = b'') -> List[Linha]:
+    fonte, tamanho, antes, depois = ESTILOS[estilo]
+    altura_linha = tamanho * ENTRELINHA
+    titulo = estilo.startswith('h')
+    linhas = _quebrar(_trechos(texto, fonte), tamanho, LARGURA_UTIL - recuo)
+
+    resultado = []
+    for i, segmentos in enumerate(linhas):
+        ops = [COR_TITULO + b"\n"] if titulo else []
+        base = -(altura_linha * 0.8) - (antes if i == 0 else 0.0)
+        if i == 0 and marcador:
+            ops.append(_texto(MARGEM + recuo - 10, base, 'F1', tamanho, marcador))
+        for x, f, dados in segmentos:
+            ops.append(_texto(MARGEM + recuo + x, base, f, tamanho, dados))
+        if titulo:
+            ops.append(b"0 g\n")
+        altura = altura_linha + (antes if i == 0 else 0.0)
+        if i == len(linhas) - 1:
+            altura += depois
+            if estilo == 'h2':
+                # Filete sob o título da seção
+                ops.append(b"0.75 G 0.6 w %.2f %.2f m %.2f %.2f l S 0 G\n" % (
+                    MARGEM, -altura + depois / 2, MARGEM + LARGURA_UTIL, -altura + depois / 2
+                ))
+        resultado.append((altura, b"".join(ops), titulo))
+    return resultado
+
+
+def _celulas(linha: str) -> List[str]:
+    linha = linha.strip()
+    if linha.startswith('|'):
+        linha = linha[1:]
+    if linha.endswith('|'):
+        linha = linha[:-1]
+    return [c.strip() for c in linha.split('|')]
+
+
+def _layout_tabela(linhas_md: List[str]) -> List[Linha]:
+    fonte, tamanho, antes, depois = ESTILOS['tabela']
+    altura_linha = tamanho * ENTRELINHA
+    linhas = [_celulas(l) for l in linhas_md if not _SEPARADOR_TABELA.match(l.strip())]
+    if not linhas:
+        return []
+    n_colunas = max(len(l) for l in linhas)
+    linhas = [l + [''] * (n_colunas - len(l)) for l in linhas]
+
+    # Larguras proporcionais ao maior conteúdo de cada coluna
+    naturais = []
+    for c in range(n_colunas):
+        maior = 0.0
+        for i, l in enumerate(linhas):
+            f = 'F2' if i == 0 else fonte
+            maior = max(maior, sum(_largura(d, ff, tamanho) for ff, d in _trechos(l[c], f)))
+        naturais.append(maior + 2 * PADDING_CELULA + 1)
+    total = sum(naturais)
+    if total <= LARGURA_UTIL:
+        larguras = naturais
+        # Sobra vai para a primeira coluna (nome do alimento)
+        larguras[0] += LARGURA_UTIL - total
+    else:
+        minimo = LARGURA_UTIL / n_colunas * 0.5
+        larguras = [max(minimo, w * LARGURA_UTIL / total) for w in naturais]
+        escala = LARGURA_UTIL / sum(larguras)
+        larguras = [w * escala for w in larguras]
+
+    resultado = []
+    for i, celulas in enumerate(linhas):
+        cabecalho = i == 0
+        f_base = 'F2' if cabecalho else fonte
+        quebradas = [
+            _quebrar(_trechos(texto, f_base), tamanho, larguras[c] - 2 * PADDING_CELULA)
+            for c, texto in enumerate(celulas)
+        ]
+        n = max(len(q) for q in quebradas)
+        altura = n * altura_linha + 2 * PADDING_CELULA
+        ops = []
+        if cabecalho:
+            ops.append(COR_CABECALHO_TABELA + b" %.2f %.2f %.2f %.2f re f 0 g\n" % (
+                MARGEM, -altura, LARGURA_UTIL, altura
+            ))
+        x_coluna = MARGEM
+        for c, q in enumerate(quebradas):
+            for j, segmentos in enumerate(q):
+                base = -PADDING_CELULA - altura_linha * (j + 0.8)
+                for x, f, dados in segmentos:
+                    ops.append(_texto(x_coluna + PADDING_CELULA + x, base, f, tamanho, dados))
+            x_coluna += larguras[c]
+        ops.append(b"0.8 G 0.4 w %.2f %.2f m %.2f %.2f l S 0 G\n" % (
+            MARGEM, -altura, MARGEM + LARGURA_UTIL, -altura
+        ))
+        extra = antes if cabecalho else 0.0
+        if extra:
+            ops.insert(0, b"q 1 0 0 1 0 %.2f cm\n" % -extra)
+            ops.append(b"Q\n")
+        extra_fim = depois if i == len(linhas) - 1 else 0.0
+        # Nem o cabeçalho fica sozinho no pé da página, nem a última linha
+        # (TOTAL) sozinha no topo da seguinte
+        manter = cabecalho or i == len(linhas) - 2
+        resultado.append((altura + extra + extra_fim, b"".join(ops), manter))
+    return resultado
+
+
+@lru_cache(maxsize=4096)
+def layout_bloco(bloco: str) -> Tuple[Linha, ...]:
+    """
+    Diagrama um bloco de Markdown (linhas sem linha em branco entre si)
+
+    Memoizado: blocos idênticos entre planos (tabelas de substituição,
+    orientações) são diagramados uma única vez por processo.
+    """
+    linhas = bloco.split('\n')
+    resultado: List[Linha] = []
+    tabela: List[str] = []
+
+    def fechar_tabela():
+        if tabela:
+            resultado.extend(_layout_tabela(tabela))
+            tabela.clear()
+
+    for linha in linhas:
+        s = linha.strip()
+        if s.startswith('|'):
+            tabela.append(s)
+            continue
+        fechar_tabela()
+        if not s:
+            continue
+        if s.startswith('### '):
+            resultado.extend(_layout_paragrafo(s[4:], 'h3'))
+        elif s.startswith('## '):
+            resultado.extend(_layout_paragrafo(s[3:], 'h2'))
+        elif s.startswith('# '):
+            resultado.extend(_layout_paragrafo(s[2:], 'h1'))
+        elif re.fullmatch(r'[-*_]{3,}', s):
+            resultado.append((12.0, b"0.75 G 0.6 w %.2f -6 m %.2f -6 l S 0 G\n" % (
+                MARGEM, MARGEM + LARGURA_UTIL
+            ), False))
+        else:
+            m = _ITEM_LISTA.match(linha)
+            if m:
+                recuo = 14.0 + min(len(m.group(1)), 8) * 4
+                marcador = b'%s.' % m.group(2).encode() if m.group(2) else b'\x95'
+                if m.group(2):
+                    recuo += 6
+                resultado.extend(_layout_paragrafo(m.group(3), 'texto', recuo, marcador))
+            else:
+                resultado.extend(_layout_paragrafo(s, 'texto'))
+    fechar_tabela()
+    return tuple(resultado)
+
+
+def _blocos(markdown: str) -> List[str]:
+    return [b for b in re.split(r'\n\s*\n', markdown) if b.strip()]
+
+
+@lru_cache(maxsize=1)
+def _objetos_fixos() -> Tuple[bytes, ...]:
+    """Dicionários das fontes (iguais em todo PDF)"""
+    return tuple(
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % base.encode()
+        for base in FONTES.values()
+    )
+
+
+def _rodape(titulo: bytes, pagina: int, total: int) -> bytes:
+    """Rodapé da página (título do documento e numeração)"""
+    numero = b"P\xe1gina %d de %d" % (pagina, total)
+    tamanho = 7.5
+    y = MARGEM_INFERIOR / 2
+    return (
+        b"0.75 G 0.4 w %.2f %.2f m %.2f %.2f l S 0 G\n" % (
+            MARGEM, y + 10, MARGEM + LARGURA_UTIL, y + 10
+        )
+        + b"0.45 g\n"
+        + _texto(MARGEM, y, 'F1', tamanho, titulo)
+        + _texto(MARGEM + LARGURA_UTIL - _largura(numero, 'F1', tamanho), y, 'F1', tamanho, numero)
+        + b"0 g\n"
+    )
+
+
+def _paginar(linhas: List[Linha]) -> List[List[Tuple[float, bytes]]]:
+    """Distribui as linhas nas páginas (títulos não ficam órfãos no pé)"""
+    topo = ALTURA_PAGINA - MARGEM
+    paginas: List[List[Tuple[float, bytes]]] = [[]]
+    y = topo
+    i = 0
+    while i < len(linhas):
+        # Grupo: linha + seguintes enquanto "manter com a próxima"
+        j = i
+        altura_grupo = linhas[i][0]
+        while linhas[j][2] and j + 1 < len(linhas) and j - i < 4:
+            j += 1
+            altura_grupo += linhas[j][0]
+        if y - altura_grupo < MARGEM_INFERIOR and paginas[-1]:
+            paginas.append([])
+            y = topo
+        for altura, ops, _ in linhas[i:j + 1]:
+            paginas[-1].append((y, ops))
+            y -= altura
+        i = j + 1
+    return paginas
+
+
+def render_pdf(markdown: str, titulo: str = "Plano Alimentar") -> bytes:
+    """
+    Renderiza o Markdown do plano como PDF
+
+    Args:
+        markdown: Documento gerado pelos formatters (ou pela API)
+        titulo: Título do documento (metadados e rodapé)
+
+    Returns:
+        Bytes do arquivo PDF (gerado em memória)
+    """
+    linhas: List[Linha] = []
+    for bloco in _blocos(markdown):
+        linhas.extend(layout_bloco(bloco))
+    paginas = _paginar(linhas)
+    titulo_pdf = _codificar(titulo)
+
+    fontes = _objetos_fixos()
+    # Numeração: 1 catálogo, 2 páginas, 3 info, fontes, depois (página, conteúdo)
+    primeiro_pagina = 4 + len(fontes)
+    ids_paginas = [primeiro_pagina + 2 * k for k in range(len(paginas))]
+    recursos = b"<< /Font << %s >> >>" % b" ".join(
+        b"/%s %d 0 R" % (nome.encode(), 4 + k) for k, nome in enumerate(FONTES)
+    )
+
+    objetos = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % n for n in ids_paginas), len(paginas)
+        ),
+        b"<< /Title (%s) /Producer (Sistema de Dietas) /CreationDate (D:%s) >>" % (
+            _escapar(titulo_pdf), datetime.now().strftime('%Y%m%d%H%M%S').encode()
+        ),
+        *fontes,
+    ]
+    for k, pagina in enumerate(paginas):
+        conteudo = b"".join(
+            b"q 1 0 0 1 0 %.2f cm\n%sQ\n" % (y, ops) for y, ops in pagina
+        ) + _rodape(titulo_pdf, k + 1, len(paginas))
+        comprimido = zlib.compress(conteudo, 6)
+        objetos.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] /Resources %s /Contents %d 0 R >>" % (
+                LARGURA_PAGINA, ALTURA_PAGINA, recursos, ids_paginas[k] + 1
+            )
+        )
+        objetos.append(
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(comprimido), comprimido)
+        )
+
+    saida = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for n, obj in enumerate(objetos, start=1):
+        offsets.append(len(saida))
+        saida += b"%d 0 obj\n%s\nendobj\n" % (n, obj)
+    inicio_xref = len(saida)
+    saida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    saida += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    saida += b"trailer\n<< /Size %d /Root 1 0 R /Info 3 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objetos) + 1, inicio_xref
+    )
+    return bytes(saida)
+
+
+def cache_stats() -> dict:
+    """Ocupação do cache de layout"""
+    info = layout_bloco.cache_info()
+    return {"blocos": info.currsize, "hits": info.hits, "misses": info.misses}
@@ -0,0 +1,75 @@
+"""
+Saída estruturada do plano (formato=json em /gerar-dieta)
+
+Mesmos campos do DietPlan (paciente, calculos, refeicoes), montados direto
+das dataclasses internas, sem passar pelo Markdown nem pela validação
+Pydantic. Cada refeição traz os totais e cada alimento a referência às
+substituições (lista de substituição do grupo e primeiros equivalentes da
+base, consultáveis em /api/substituicoes).
+
+A serialização usa orjson quando instalado (ORJSONResponse).
+"""
+from typing import Optional
+
+from fastapi.responses import JSONResponse
+
+from app.models import GeneratedPlan, MealData
+from app.services.substitution_index import substitution_index
+
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as RespostaJSON
+except ImportError:
+    RespostaJSON = JSONResponse
+
+
+def _refeicao(meal: MealData) -> dict:
+    return {
+        'nome': meal.nome,
+        'horario': meal.horario,
+        'calorias_alvo': round(meal.calorias_alvo, 1),
+        'alimentos': [
+            {
+                'chave': a.chave or None,
+                'nome': a.nome,
+                'porcao': a.porcao,
+                'gramas': round(a.gramas, 1),
+                'kcal': round(a.kcal, 1),
+                'carb': round(a.carb, 1),
+                'prot': round(a.prot, 1),
+                'gord': round(a.gord, 1),
+                'fibra': round(a.fibra, 1),
+                'ig': a.ig,
+                'carga_glicemica': round(a.carga_glicemica, 1),
+                'substituicoes': substitution_index.referencia(a.chave) if a.chave else None
+            }
+            for a in meal.alimentos
+        ],
+        'totais': {
+            'kcal': round(meal.calorias_total, 1),
+            'carb': round(meal.carb_total, 1),
+            'prot': round(meal.prot_total, 1),
+            'gord': round(meal.gord_total, 1),
+            'fibra': round(meal.fibra_total, 1),
+            'carga_glicemica': round(meal.carga_glicemica, 1),
+            'ig_medio': round(meal.ig_medio, 1)
+        }
+    }
+
+
+def plano_estruturado(plan: GeneratedPlan, plan_id: Optional[str] = None) -> dict:
+    """
+    DietPlan do plano gerado, pronto para serializar
+
+    Args:
+        plan: Plano gerado
+        plan_id: ID no armazenamento (incluído quando informado)
+    """
+    return {
+        'plan_id': plan_id,
+        'paciente': plan.patient.model_dump(),
+        'calculos': plan.nutrition.model_dump(),
+        'refeicoes': [_refeicao(meal) for meal in plan.meals],
+        'totais_dia': {campo: round(valor, 1) for campo, valor in plan.totais.items()},
+        'metadata': plan.metadata
+    }
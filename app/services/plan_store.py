@@ -0,0 +1,296 @@
+"""
+Armazenamento dos planos gerados
+
+Cada plano fica guardado no servidor sob um plan_id (retornado em
+/gerar-dieta), com refeições e seções do Markdown. Download, upload para o
+FEEGOW, re-renderização e edição referenciam o ID, de forma que o documento
+não precisa trafegar de novo pelo navegador nem pela URL.
+
+Backends:
+- sqlite: arquivo local (padrão), sobrevive a reinícios
+- memory: LRU em memória (Vercel, filesystem somente leitura)
+
+Quando o plano não está mais no servidor (expirado, outra instância
+serverless), o cliente pode enviar o payload compacto de
+plano_para_payload() no lugar do ID.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import closing
+from dataclasses import asdict
+from typing import Optional, Tuple
+
+from app.models import (
+    GeneratedPlan, PatientData, NutritionData, MealData, FoodItemData, PlanSections
+)
+from app.config.settings import settings
+
+# Detectar ambiente Vercel (read-only filesystem)
+IS_VERCEL = os.environ.get('VERCEL', False)
+
+
+def plano_para_payload(plan: GeneratedPlan) -> dict:
+    """
+    Representação compacta do plano (paciente + alimentos por chave e gramas)
+
+    Aceita de volta por /api/editar-dieta no campo "plano".
+    """
+    return {
+        'paciente': plan.patient.model_dump(),
+        'modo': plan.metadata.get('mode_used'),
+        'refeicoes': [
+            {
+                'nome': meal.nome,
+                'horario': meal.horario,
+                'calorias_alvo': meal.calorias_alvo,
+                'alimentos': [
+                    {'chave': a.chave, 'gramas': round(a.gramas, 1)}
+                    for a in meal.alimentos
+                ]
+            }
+            for meal in plan.meals
+        ]
+    }
+
+
+def _plano_para_json(plan: GeneratedPlan) -> str:
+    """Serializa o estado completo do plano (exceto o Markdown, gravado à parte)"""
+    sections = plan.sections
+    return json.dumps({
+        'patient': plan.patient.model_dump(),
+        'nutrition': plan.nutrition.model_dump(),
+        'meals': [
+            {
+                'nome': meal.nome,
+                'horario': meal.horario,
+                'calorias_alvo': meal.calorias_alvo,
+                'alimentos': [asdict(a) for a in meal.alimentos]
+            }
+            for meal in plan.meals
+        ],
+        'metadata': plan.metadata,
+        'sections': None if sections is None else {
+            'cabecalho': sections.cabecalho,
+            'refeicoes': list(sections.refeicoes),
+            'resumo': sections.resumo,
+            'rodape': sections.rodape
+        },
+        'totais': plan.totais
+    }, ensure_ascii=False)
+
+
+def _plano_de_json(dados: str, markdown: str) -> GeneratedPlan:
+    """Reconstrói o GeneratedPlan gravado por _plano_para_json"""
+    d = json.loads(dados)
+    sections = d['sections']
+    return GeneratedPlan(
+        patient=PatientData(**d['patient']),
+        nutrition=NutritionData(**d['nutrition']),
+        meals=tuple(
+            MealData(
+                nome=m['nome'],
+                horario=m['horario'],
+                calorias_alvo=m['calorias_alvo'],
+                alimentos=tuple(FoodItemData(**a) for a in m['alimentos'])
+            )
+            for m in d['meals']
+        ),
+        markdown=markdown,
+        metadata=d['metadata'],
+        sections=None if sections is None else PlanSections(
+            cabecalho=sections['cabecalho'],
+            refeicoes=tuple(sections['refeicoes']),
+            resumo=sections['resumo'],
+            rodape=sections['rodape']
+        ),
+        totais=d['totais']
+    )
+
+
+class MemoryPlanStore:
+    """
+    Planos em memória, com descarte dos menos usados (LRU)
+
+    Planos não atualizados há mais de PLAN_STORE_TTL_DAYS não são mais
+    devolvidos (removidos na consulta).
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_planos: int = None, ttl_dias: float = None):
+        self.max_planos = max_planos or settings.plan_store_max_plans
+        self.ttl_segundos = (ttl_dias if ttl_dias is not None else settings.plan_store_ttl_days) * 86400
+        # plan_id -> (plano, atualizado_em)
+        self._planos: "OrderedDict[str, Tuple[GeneratedPlan, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def salvar(self, plan: GeneratedPlan) -> str:
+        """
+        Armazena um novo plano
+
+        Returns:
+            plan_id
+        """
+        plan_id = uuid.uuid4().hex
+        self.atualizar(plan_id, plan)
+        return plan_id
+
+    def obter(self, plan_id: str) -> Optional[GeneratedPlan]:
+        """Plano pelo ID (None se não existe, expirou ou já foi descartado)"""
+        with self._lock:
+            registro = self._planos.get(plan_id)
+            if registro is None:
+                return None
+            plan, atualizado_em = registro
+            if self.ttl_segundos and time.time() - atualizado_em > self.ttl_segundos:
+                del self._planos[plan_id]
+                return None
+            self._planos.move_to_end(plan_id)
+            return plan
+
+    def obter_documento(self, plan_id: str) -> Optional[Tuple[str, str]]:
+        """(markdown, nome do paciente) do plano, sem reconstruir o estado"""
+        plan = self.obter(plan_id)
+        if plan is None:
+            return None
+        return (plan.markdown, plan.patient.nome)
+
+    def atualizar(self, plan_id: str, plan: GeneratedPlan):
+        """Grava (ou substitui) o plano com o ID informado"""
+        with self._lock:
+            self._planos[plan_id] = (plan, time.time())
+            self._planos.move_to_end(plan_id)
+            while len(self._planos) > self.max_planos:
+                self._planos.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Ocupação do armazenamento"""
+        return {
+            "backend": self.backend,
+            "planos": len(self._planos),
+            "max_planos": self.max_planos
+        }
+
+
+class SQLitePlanStore:
+    """
+    Planos em arquivo SQLite local
+
+    O Markdown fica em coluna própria: download e upload leem só o documento;
+    o estado completo (JSON) é decodificado apenas para edição/re-renderização.
+    Planos não atualizados há mais de PLAN_STORE_TTL_DAYS são removidos.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str = None, ttl_dias: float = None):
+        self.path = path or settings.plan_store_path
+        self.ttl_segundos = (ttl_dias if ttl_dias is not None else settings.plan_store_ttl_days) * 86400
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS planos (
+                    plan_id TEXT PRIMARY KEY,
+                    paciente TEXT NOT NULL,
+                    markdown TEXT NOT NULL,
+                    dados TEXT NOT NULL,
+                    criado_em REAL NOT NULL,
+                    atualizado_em REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_planos_atualizado ON planos (atualizado_em)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Uma conexão por operação: seguro entre threads do servidor
+        return sqlite3.connect(self.path, timeout=10)
+
+    def salvar(self, plan: GeneratedPlan) -> str:
+        """
+        Armazena um novo plano
+
+        Returns:
+            plan_id
+        """
+        plan_id = uuid.uuid4().hex
+        agora = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO planos VALUES (?, ?, ?, ?, ?, ?)",
+                (plan_id, plan.patient.nome, plan.markdown, _plano_para_json(plan), agora, agora)
+            )
+            if self.ttl_segundos:
+                conn.execute("DELETE FROM planos WHERE atualizado_em < ?", (agora - self.ttl_segundos,))
+        return plan_id
+
+    def _limite_validade(self) -> float:
+        """atualizado_em mínimo de um plano válido (a limpeza só roda ao salvar)"""
+        return time.time() - self.ttl_segundos if self.ttl_segundos else 0.0
+
+    def obter(self, plan_id: str) -> Optional[GeneratedPlan]:
+        """Plano pelo ID (None se não existe ou expirou)"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT dados, markdown FROM planos WHERE plan_id = ? AND atualizado_em >= ?",
+                (plan_id, self._limite_validade())
+            ).fetchone()
+        if row is None:
+            return None
+        return _plano_de_json(row[0], row[1])
+
+    def obter_documento(self, plan_id: str) -> Optional[Tuple[str, str]]:
+        """(markdown, nome do paciente) do plano, sem reconstruir o estado"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT markdown, paciente FROM planos WHERE plan_id = ? AND atualizado_em >= ?",
+                (plan_id, self._limite_validade())
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def atualizar(self, plan_id: str, plan: GeneratedPlan):
+        """Grava (ou substitui) o plano com o ID informado"""
+        agora = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                INSERT INTO planos VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(plan_id) DO UPDATE SET
+                    paciente = excluded.paciente,
+                    markdown = excluded.markdown,
+                    dados = excluded.dados,
+                    atualizado_em = excluded.atualizado_em
+                """,
+                (plan_id, plan.patient.nome, plan.markdown, _plano_para_json(plan), agora, agora)
+            )
+
+    def stats(self) -> dict:
+        """Ocupação do armazenamento"""
+        with closing(self._connect()) as conn:
+            total = conn.execute("SELECT COUNT(*) FROM planos").fetchone()[0]
+        return {
+            "backend": self.backend,
+            "planos": total,
+            "path": self.path
+        }
+
+
+def criar_plan_store():
+    """Backend conforme PLAN_STORE_BACKEND (sempre memória no Vercel)"""
+    if IS_VERCEL or settings.plan_store_backend == "memory":
+        return MemoryPlanStore()
+    try:
+        return SQLitePlanStore()
+    except (sqlite3.Error, OSError) as e:
+        print(f"Aviso: armazenamento SQLite indisponível ({e}), usando memória")
+        return MemoryPlanStore()
+
+
+# Instância global
+plan_store = criar_plan_store()
@@ -0,0 +1,134 @@
+"""
+Tabela pré-calculada de porções por alimento e faixa calórica
+
+As metas por alimento caem em uma faixa pequena (≈1200-3500 kcal/dia vezes
+percentuais fixos por refeição), então as porções ajustadas são resolvidas
+uma única vez, no primeiro uso (não no import: o startup não decodifica a
+base inteira), em degraus de PASSO_KCAL. O MealBuilder consulta a
+tabela em vez de recalcular gramas, limites e nutrientes a cada refeição;
+fora da grade (multiplicadores não padrão, metas acima do limite) a conta
+exata continua sendo feita pelo próprio MealBuilder.
+"""
+import math
+import threading
+from typing import Dict, Optional, Tuple
+
+from app.data.alimentos_base import ALIMENTOS, calcular_nutricao_porcao
+from app.models import FoodItemData
+
+
+class PortionTable:
+    """
+    Porções resolvidas (FoodItemData imutáveis e compartilhados) por alimento
+    """
+
+    PASSO_KCAL = 5          # Resolução da grade (kcal)
+    LIMITE_KCAL = 1500      # Metas acima disso usam o cálculo exato
+    MIN_MULT = 0.3          # Mesmos limites padrão do MealBuilder._ajustar_porcao
+    MAX_MULT = 3.0
+
+    def __init__(self, alimentos: dict = None):
+        self.alimentos = alimentos if alimentos is not None else ALIMENTOS
+        # key -> (indice_inicial, kcal_min, kcal_max, item_min, item_max, grade)
+        self._faixas: Dict[str, Tuple[int, float, float, FoodItemData, FoodItemData, tuple]] = {}
+        # key -> porção usual
+        self._usuais: Dict[str, FoodItemData] = {}
+        self._construida = False
+        self._lock = threading.Lock()
+
+    def _garantir(self):
+        """Resolve as porções no primeiro uso"""
+        if not self._construida:
+            with self._lock:
+                if not self._construida:
+                    self._build()
+                    self._construida = True
+
+    def _item(self, key: str, gramas: float = None) -> FoodItemData:
+        return FoodItemData(chave=key, **calcular_nutricao_porcao(key, gramas))
+
+    def _build(self):
+        """Resolve porções para todos os alimentos da base"""
+        passo = self.PASSO_KCAL
+
+        for key, alimento in self.alimentos.items():
+            self._usuais[key] = self._item(key)
+
+            kcal_100g = alimento['kcal']
+            if kcal_100g <= 0:
+                continue
+
+            porcao_padrao = alimento['gramas_porcao']
+            min_gramas = porcao_padrao * self.MIN_MULT
+            max_gramas = porcao_padrao * self.MAX_MULT
+            kcal_min = min_gramas * kcal_100g / 100
+            kcal_max = max_gramas * kcal_100g / 100
+
+            # Entre os limites a porção é linear na meta: um item por degrau
+            inicio = math.ceil(kcal_min / passo)
+            fim = math.floor(min(kcal_max, self.LIMITE_KCAL) / passo)
+            grade = tuple(
+                self._item(key, (i * passo / kcal_100g) * 100)
+                for i in range(inicio, fim + 1)
+            )
+
+            self._faixas[key] = (
+                inicio,
+                kcal_min,
+                kcal_max,
+                self._item(key, min_gramas),
+                self._item(key, max_gramas),
+                grade
+            )
+
+    def porcao(
+        self,
+        key: str,
+        calorias_alvo: float,
+        min_mult: float = MIN_MULT,
+        max_mult: float = MAX_MULT
+    ) -> Optional[FoodItemData]:
+        """
+        Porção ajustada para a meta calórica
+
+        Returns:
+            FoodItemData da tabela, ou None quando a meta está fora da grade
+            (o chamador deve fazer o cálculo exato)
+        """
+        if min_mult != self.MIN_MULT or max_mult != self.MAX_MULT:
+            return None
+
+        self._garantir()
+        faixa = self._faixas.get(key)
+        if faixa is None:
+            return None
+
+        inicio, kcal_min, kcal_max, item_min, item_max, grade = faixa
+
+        # Fora dos limites da porção o resultado é sempre o mesmo item
+        if calorias_alvo <= kcal_min:
+            return item_min
+        if calorias_alvo >= kcal_max:
+            return item_max
+
+        indice = round(calorias_alvo / self.PASSO_KCAL) - inicio
+        if 0 <= indice < len(grade):
+            return grade[indice]
+        return None
+
+    def usual(self, key: str) -> Optional[FoodItemData]:
+        """Porção usual (medida caseira) do alimento"""
+        self._garantir()
+        return self._usuais.get(key)
+
+    def stats(self) -> dict:
+        """Tamanho da tabela"""
+        self._garantir()
+        return {
+            'alimentos': len(self._usuais),
+            'porcoes': sum(len(f[5]) + 2 for f in self._faixas.values()) + len(self._usuais)
+        }
+
+
+# Instância global (construída no primeiro uso)
+portion_table = PortionTable()
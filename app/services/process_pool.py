@@ -0,0 +1,148 @@
+"""
+Pool de processos para geração CPU-bound (modos sem API)
+
+Construção dos modelos, montagem das refeições e formatação do Markdown são
+puro CPU: em um único worker uvicorn elas serializam com todas as outras
+requisições. Aqui essas etapas rodam em um ProcessPoolExecutor já aquecido
+com as tabelas de alimentos, deixando o event loop livre para I/O.
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from app.models import PatientData, GeneratedPlan
+from app.config.settings import settings, GenerationMode
+
+
+# =============================================================================
+# Funções executadas nos processos filhos
+# =============================================================================
+
+_worker_system = None
+
+
+def inicializar_worker():
+    """Aquece o processo: importa tabelas de alimentos, substituições e formatadores"""
+    global _worker_system
+    from app.services.hybrid_system import HybridDietSystem
+    _worker_system = HybridDietSystem()
+
+
+def gerar_dieta_worker(
+    patient: PatientData,
+    mode: GenerationMode = GenerationMode.PYTHON_ONLY
+) -> Tuple[str, dict]:
+    """
+    Gera a dieta no processo filho
+
+    O registro de custos fica a cargo do processo pai (o CostTracker
+    de cada filho teria uma visão parcial das estatísticas).
+    """
+    if _worker_system is None:
+        inicializar_worker()
+    return _worker_system.generate_diet(
+        patient_data=patient,
+        mode=mode,
+        track_cost=False
+    )
+
+
+def gerar_plano_worker(
+    patient: PatientData,
+    mode: GenerationMode = GenerationMode.PYTHON_ONLY,
+    render_markdown: bool = True
+) -> GeneratedPlan:
+    """Gera o plano completo (refeições e seções, para edição) no processo filho"""
+    if _worker_system is None:
+        inicializar_worker()
+    return _worker_system.generate_plan(
+        patient_data=patient,
+        mode=mode,
+        track_cost=False,
+        render_markdown=render_markdown
+    )
+
+
+# =============================================================================
+# Pool
+# =============================================================================
+
+class PlanProcessPool:
+    """
+    Gerencia o ProcessPoolExecutor compartilhado pela aplicação
+    Iniciado no startup e drenado no shutdown do FastAPI
+    """
+
+    def __init__(self, workers: int = None):
+        self.workers = workers or settings.process_pool_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def running(self) -> bool:
+        """Indica se o pool está ativo"""
+        return self._executor is not None
+
+    def start(self):
+        """Cria o pool e aquece todos os processos"""
+        if self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=inicializar_worker
+        )
+
+    def shutdown(self, wait: bool = True):
+        """Encerra o pool, aguardando as gerações em andamento"""
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=wait)
+        self._executor = None
+
+    async def _run(self, funcao, *args):
+        """Executa a função em um processo do pool"""
+        if self._executor is None:
+            self.start()
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, funcao, *args)
+        except BrokenProcessPool:
+            # Um processo morreu (ex.: OOM): recriar o pool e tentar uma vez
+            print("Aviso: pool de processos quebrado, recriando")
+            self.shutdown(wait=False)
+            self.start()
+            return await loop.run_in_executor(self._executor, funcao, *args)
+
+    async def generate_diet(
+        self,
+        patient: PatientData,
+        mode: GenerationMode = GenerationMode.PYTHON_ONLY
+    ) -> Tuple[str, dict]:
+        """
+        Executa generate_diet em um processo do pool
+
+        Returns:
+            (markdown, metadata)
+        """
+        return await self._run(gerar_dieta_worker, patient, mode)
+
+    async def generate_plan(
+        self,
+        patient: PatientData,
+        mode: GenerationMode = GenerationMode.PYTHON_ONLY,
+        render_markdown: bool = True
+    ) -> GeneratedPlan:
+        """Executa generate_plan em um processo do pool"""
+        return await self._run(gerar_plano_worker, patient, mode, render_markdown)
+
+    def stats(self) -> dict:
+        """Estado do pool (exposto em /health)"""
+        return {
+            "running": self.running,
+            "workers": self.workers
+        }
+
+
+# Instância global
+process_pool = PlanProcessPool()
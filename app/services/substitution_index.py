@@ -0,0 +1,326 @@
+"""
+Índice de equivalências para substituição de alimentos
+
+Compilado uma única vez, no primeiro uso, a partir de ALIMENTOS e SUBSTITUICOES:
+para cada alimento e perfil de macronutriente guarda os equivalentes do
+mesmo grupo com o fator de troca (gramas do equivalente por grama do
+original) já calculado. Uma consulta como "o que substitui 90 g de arroz
+integral com os mesmos carboidratos?" vira uma leitura de dicionário e uma
+multiplicação por item, sem percorrer os grupos.
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from app.data.alimentos_base import ALIMENTOS, calcular_nutricao_porcao
+from app.data.food_repository import normalizar_nome
+from app.data.substituicoes import SUBSTITUICOES
+
+
+# Macronutriente de referência da troca por grupo de ALIMENTOS
+MACRO_GRUPO = {
+    'cereal': 'carb',
+    'leguminosa': 'carb',
+    'fruta': 'carb',
+    'proteina': 'prot',
+    'lacteo': 'prot',
+    'gordura': 'gord',
+    'verdura': 'kcal',
+    'legume': 'kcal',
+    'bebida': 'kcal',
+}
+
+# Campo da base (por 100g) de cada perfil
+CAMPOS_MACRO = {
+    'carb': 'carb_g',
+    'prot': 'prot_g',
+    'gord': 'gord_g',
+    'kcal': 'kcal',
+}
+
+# Lista de substituição correspondente a cada grupo de ALIMENTOS
+TABELA_GRUPO = {
+    'cereal': 'cereais_paes',
+    'proteina': 'proteinas_carnes',
+    'fruta': 'frutas',
+    'verdura': 'verduras_legumes',
+    'legume': 'verduras_legumes',
+    'gordura': 'oleos_gorduras',
+    'leguminosa': 'leguminosas',
+    'lacteo': 'lacteos',
+}
+
+# Equivalentes com menos que isso do macro (por 100g) exigiriam porções absurdas
+MIN_MACRO_100G = 1.0
+
+
+def _prefixo_de(curto: str, longo: str) -> bool:
+    """'ovo cozido' é prefixo de 'ovo cozido/poche', mas 'maca' não é de 'macarrao'"""
+    if not longo.startswith(curto):
+        return False
+    return len(longo) == len(curto) or not longo[len(curto)].isalnum()
+
+
+class SubstitutionIndex:
+    """
+    Equivalências pré-calculadas por (alimento, macro)
+    """
+
+    def __init__(self, alimentos: dict = None, substituicoes: dict = None):
+        self.alimentos = alimentos if alimentos is not None else ALIMENTOS
+        self.substituicoes = substituicoes if substituicoes is not None else SUBSTITUICOES
+
+        # (key, macro) -> ((key_equivalente, fator_gramas), ...) ordenados por
+        # proximidade calórica
+        self._equivalentes: Dict[Tuple[str, str], Tuple[Tuple[str, float], ...]] = {}
+        # nome normalizado -> key (ALIMENTOS)
+        self._por_nome: Dict[str, str] = {}
+        # nome normalizado -> (grupo da lista de substituição, índice do item)
+        self._itens_tabela: Dict[str, Tuple[str, int]] = {}
+        # key -> (grupo da lista de substituição, índice do item)
+        self._tabela_alimento: Dict[str, Tuple[str, int]] = {}
+        # (key, limite) -> referência de substituição (saída estruturada)
+        self._referencias: Dict[Tuple[str, int], Optional[dict]] = {}
+
+        # Compilado no primeiro uso (o import não decodifica a base inteira)
+        self._construido = False
+        self._lock = threading.Lock()
+
+    def _garantir(self):
+        """Compila o índice no primeiro uso"""
+        if not self._construido:
+            with self._lock:
+                if not self._construido:
+                    self._build()
+                    self._construido = True
+
+    def _build(self):
+        """Compila o índice (uma passada por grupo)"""
+        por_grupo: Dict[str, List[str]] = {}
+        for key, a in self.alimentos.items():
+            por_grupo.setdefault(a['grupo'], []).append(key)
+            self._por_nome[normalizar_nome(a['nome'])] = key
+            self._por_nome[normalizar_nome(key.replace('_', ' '))] = key
+
+        for grupo, dados in self.substituicoes.items():
+            for i, item in enumerate(dados['itens']):
+                self._itens_tabela.setdefault(normalizar_nome(item['alimento']), (grupo, i))
+
+        # Equivalências por macro dentro do grupo
+        for grupo, keys in por_grupo.items():
+            for macro, campo in CAMPOS_MACRO.items():
+                for key in keys:
+                    origem = self.alimentos[key]
+                    if origem[campo] < MIN_MACRO_100G:
+                        continue
+                    candidatos = []
+                    for outro in keys:
+                        destino = self.alimentos[outro]
+                        if outro == key or destino[campo] < MIN_MACRO_100G:
+                            continue
+                        fator = origem[campo] / destino[campo]
+                        # Diferença de kcal da troca (critério de ordenação)
+                        desvio = abs(destino['kcal'] * fator - origem['kcal'])
+                        candidatos.append((desvio, outro, fator))
+                    candidatos.sort()
+                    self._equivalentes[(key, macro)] = tuple((k, f) for _, k, f in candidatos)
+
+        # Alimento da base -> item da lista de substituição (nome mais específico)
+        for key, a in self.alimentos.items():
+            nome = normalizar_nome(a['nome'])
+            preferido = TABELA_GRUPO.get(a['grupo'])
+            melhor = None
+            for nome_item, posicao in self._itens_tabela.items():
+                if not (_prefixo_de(nome_item, nome) or _prefixo_de(nome, nome_item)):
+                    continue
+                chave_ordem = (posicao[0] == preferido, len(nome_item))
+                if melhor is None or chave_ordem > melhor[0]:
+                    melhor = (chave_ordem, posicao)
+            if melhor:
+                self._tabela_alimento[key] = melhor[1]
+
+    def resolver(self, alimento: str) -> Optional[str]:
+        """
+        Chave do alimento na base a partir da chave ou do nome (sem acentos)
+
+        Returns:
+            Chave em ALIMENTOS, ou None se não encontrado
+        """
+        if alimento in self.alimentos:
+            return alimento
+        self._garantir()
+        nome = normalizar_nome(alimento)
+        key = self._por_nome.get(nome)
+        if key is None:
+            # Nome incompleto ("arroz integral"): o nome mais curto que começa por ele
+            candidatos = [n for n in self._por_nome if _prefixo_de(nome, n)]
+            if candidatos:
+                key = self._por_nome[min(candidatos, key=len)]
+        return key
+
+    def macro_padrao(self, key: str) -> str:
+        """Macronutriente de referência do grupo do alimento"""
+        return MACRO_GRUPO.get(self.alimentos[key]['grupo'], 'kcal')
+
+    def equivalentes(self, key: str, macro: str = None) -> Tuple[Tuple[str, float], ...]:
+        """
+        Equivalentes pré-calculados (key, fator_gramas) do alimento
+
+        Args:
+            key: Chave do alimento
+            macro: carb, prot, gord ou kcal (padrão: macro do grupo)
+        """
+        self._garantir()
+        return self._equivalentes.get((key, macro or self.macro_padrao(key)), ())
+
+    def gramas_equivalentes(self, key: str, gramas: float, destino: str, macro: str = None) -> Optional[float]:
+        """
+        Gramas de `destino` com o mesmo macro que `gramas` de `key`
+
+        Returns:
+            Gramas equivalentes, ou None se a troca não é possível
+        """
+        macro = macro or self.macro_padrao(key)
+        for outro, fator in self.equivalentes(key, macro):
+            if outro == destino:
+                return gramas * fator
+
+        # Fora do grupo: conta direta (ex.: troca escolhida pelo nutricionista)
+        campo = CAMPOS_MACRO[macro]
+        origem, alvo = self.alimentos.get(key), self.alimentos.get(destino)
+        if not origem or not alvo or alvo[campo] < MIN_MACRO_100G:
+            return None
+        return gramas * origem[campo] / alvo[campo]
+
+    def referencia(self, key: str, limite: int = 3) -> Optional[dict]:
+        """
+        Referência compacta às substituições do alimento (memoizada)
+
+        Returns:
+            {"grupo": lista de substituição ou None, "macro": perfil da troca,
+            "equivalentes": chaves dos primeiros equivalentes}, ou None se o
+            alimento não está na base
+        """
+        memo = (key, limite)
+        if memo in self._referencias:
+            return self._referencias[memo]
+        if key not in self.alimentos:
+            return None
+        self._garantir()
+        posicao = self._tabela_alimento.get(key)
+        macro = self.macro_padrao(key)
+        ref = {
+            "grupo": posicao[0] if posicao else None,
+            "macro": macro,
+            "equivalentes": [outro for outro, _ in self.equivalentes(key, macro)[:limite]]
+        }
+        self._referencias[memo] = ref
+        return ref
+
+    def _lista_substituicao(self, alimento: str, key: Optional[str], gramas: Optional[float]) -> Optional[dict]:
+        """Lista de substituição (porções caseiras) em que o alimento aparece"""
+        self._garantir()
+        posicao = self._tabela_alimento.get(key) if key else None
+        if posicao is None:
+            posicao = self._itens_tabela.get(normalizar_nome(alimento))
+        if posicao is None:
+            return None
+
+        grupo, indice = posicao
+        dados = self.substituicoes[grupo]
+        item = dados['itens'][indice]
+        # Itens "À vontade" (gramas 0) não têm porção para escalar
+        porcoes = gramas / item['gramas'] if gramas and item['gramas'] > 0 else 1.0
+
+        return {
+            'grupo': grupo,
+            'titulo': dados['titulo'],
+            'descricao': dados['descricao'],
+            'porcoes': round(porcoes, 2),
+            'itens': [
+                {
+                    'alimento': outro['alimento'],
+                    'porcao': outro['porcao'],
+                    'gramas': round(outro['gramas'] * porcoes, 0)
+                }
+                for outro in dados['itens'] if outro is not item
+            ]
+        }
+
+    def consultar(self, alimento: str, gramas: float = None, macro: str = None, limite: int = None) -> dict:
+        """
+        Substituições de uma quantidade de alimento
+
+        Args:
+            alimento: Chave ou nome do alimento
+            gramas: Quantidade a substituir (padrão: porção usual)
+            macro: carb, prot, gord ou kcal (padrão: macro do grupo)
+            limite: Máximo de equivalentes retornados
+
+        Returns:
+            Dict com success, alimento, equivalentes (base de alimentos) e
+            lista_substituicao (porções caseiras do grupo)
+        """
+        if macro and macro not in CAMPOS_MACRO:
+            return {
+                "success": False,
+                "error": f"Macro inválido: {macro}. Use: {', '.join(CAMPOS_MACRO)}"
+            }
+
+        key = self.resolver(alimento)
+        if key is None:
+            lista = self._lista_substituicao(alimento, None, gramas)
+            if lista is None:
+                return {"success": False, "error": f"Alimento não encontrado: {alimento}"}
+            # Só existe na lista de substituição (sem dados nutricionais na base)
+            return {
+                "success": True,
+                "alimento": {"chave": None, "nome": alimento, "grupo": lista['grupo']},
+                "gramas": gramas,
+                "macro": None,
+                "equivalentes": [],
+                "lista_substituicao": lista
+            }
+
+        origem = self.alimentos[key]
+        macro = macro or self.macro_padrao(key)
+        if gramas is None:
+            gramas = origem['gramas_porcao']
+        quantidade = origem[CAMPOS_MACRO[macro]] * gramas / 100
+
+        equivalentes = []
+        for outro, fator in self.equivalentes(key, macro)[:limite]:
+            dados = calcular_nutricao_porcao(outro, gramas * fator)
+            equivalentes.append({
+                "chave": outro,
+                "nome": dados['nome'],
+                "gramas": round(dados['gramas'], 0),
+                "porcao_usual": self.alimentos[outro]['porcao_usual'],
+                "kcal": round(dados['kcal'], 0),
+                "carb": round(dados['carb'], 1),
+                "prot": round(dados['prot'], 1),
+                "gord": round(dados['gord'], 1),
+                "carga_glicemica": round(dados['carga_glicemica'], 1)
+            })
+
+        return {
+            "success": True,
+            "alimento": {"chave": key, "nome": origem['nome'], "grupo": origem['grupo']},
+            "gramas": gramas,
+            "macro": macro,
+            "quantidade_macro": round(quantidade, 1),
+            "equivalentes": equivalentes,
+            "lista_substituicao": self._lista_substituicao(alimento, key, gramas)
+        }
+
+    def stats(self) -> dict:
+        """Tamanho do índice"""
+        self._garantir()
+        return {
+            'alimentos': len(self.alimentos),
+            'perfis': len(self._equivalentes),
+            'equivalencias': sum(len(v) for v in self._equivalentes.values())
+        }
+
+
+# Instância global (compilada no primeiro uso)
+substitution_index = SubstitutionIndex()
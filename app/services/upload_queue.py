@@ -0,0 +1,462 @@
+"""
+Fila de uploads de dietas para o prontuário FEEGOW
+
+O endpoint de upload só grava o job (SQLite local) e responde na hora com
+o job_id; workers assíncronos enviam o documento em segundo plano, com
+novas tentativas e backoff exponencial em falhas transitórias (rede,
+timeout, 5xx, 408/429).
+
+Idempotência: cada job tem uma chave (paciente + plano + hash do conteúdo,
+ou o header Idempotency-Key). Reenviar o mesmo plano para o mesmo paciente
+retorna o job existente em vez de criar outro arquivo. A chave também vai na
+descrição do arquivo no FEEGOW; antes de repetir um envio cujo resultado é
+desconhecido (timeout, processo interrompido), a fila procura a chave nos
+arquivos do prontuário e só reenvia se ela não estiver lá.
+
+Vários processos podem usar a mesma fila: o job reservado guarda o dono
+(processo) e um lease de UPLOAD_LEASE_SECONDS, renovado durante o envio. Só
+jobs 'enviando' com o lease vencido (dono encerrado no meio do envio) voltam
+para a fila.
+
+No Vercel não há processo em segundo plano: o envio é feito na própria
+requisição e as novas tentativas acontecem a cada consulta de status.
+"""
+import asyncio
+import hashlib
+import os
+import random
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from typing import Optional
+
+from app.services.feegow_service import feegow_service
+from app.config.settings import settings
+
+# Estados do job
+PENDENTE = "pendente"
+ENVIANDO = "enviando"
+CONCLUIDO = "concluido"
+FALHOU = "falhou"
+
+# Intervalo máximo entre verificações da fila pelos workers (s)
+INTERVALO_POLL = 5.0
+
+# Colunas retornadas no status (o conteúdo do documento fica de fora)
+COLUNAS_STATUS = (
+    "job_id", "status", "patient_id", "plan_id", "filename", "tentativas",
+    "proxima_tentativa", "ultimo_erro", "criado_em", "atualizado_em", "concluido_em"
+)
+
+
+def chave_idempotencia(patient_id: int, plan_id: Optional[str], conteudo: str) -> str:
+    """Chave do upload: mesmo paciente + mesmo plano + mesmo conteúdo"""
+    digest = hashlib.sha256()
+    digest.update(f"{patient_id}\0{plan_id or ''}\0".encode('utf-8'))
+    digest.update(conteudo.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def erro_transitorio(resultado: dict) -> bool:
+    """Falhas que valem nova tentativa: exceção/rede (sem status), 5xx, 408 e 429"""
+    status = resultado.get("status_code")
+    return status is None or status >= 500 or status in (408, 429)
+
+
+class UploadQueue:
+    """
+    Fila persistente (SQLite) de uploads para o FEEGOW
+    """
+
+    def __init__(self, path: str = None, workers: int = None, service=None):
+        self.path = path or settings.upload_queue_path
+        self.workers = workers if workers is not None else settings.upload_queue_workers
+        self.max_tentativas = settings.upload_max_attempts
+        self.lease = settings.upload_lease_seconds
+        self.service = service or feegow_service
+        # Identifica os jobs reservados por este processo
+        self.dono = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        self._tarefas = []
+        self._evento: Optional[asyncio.Event] = None
+        self._parar = False
+        self._inicializado = False
+
+    # =========================================================================
+    # Armazenamento (síncrono, chamado via asyncio.to_thread)
+    # =========================================================================
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        if self._inicializado:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS uploads (
+                    job_id TEXT PRIMARY KEY,
+                    chave TEXT NOT NULL UNIQUE,
+                    status TEXT NOT NULL,
+                    patient_id INTEGER NOT NULL,
+                    plan_id TEXT,
+                    filename TEXT NOT NULL,
+                    descricao TEXT NOT NULL,
+                    conteudo TEXT NOT NULL,
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    proxima_tentativa REAL NOT NULL,
+                    ultimo_status INTEGER,
+                    ultimo_erro TEXT,
+                    criado_em REAL NOT NULL,
+                    atualizado_em REAL NOT NULL,
+                    concluido_em REAL,
+                    dono TEXT,
+                    lease_ate REAL
+                )
+                """
+            )
+            # Filas criadas antes do lease
+            colunas = {row["name"] for row in conn.execute("PRAGMA table_info(uploads)")}
+            for coluna, tipo in (("dono", "TEXT"), ("lease_ate", "REAL")):
+                if coluna not in colunas:
+                    conn.execute(f"ALTER TABLE uploads ADD COLUMN {coluna} {tipo}")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_uploads_fila ON uploads (status, proxima_tentativa)"
+            )
+        self._inicializado = True
+
+    def _inserir(
+        self,
+        chave: str,
+        patient_id: int,
+        plan_id: Optional[str],
+        filename: str,
+        descricao: str,
+        conteudo: str
+    ) -> dict:
+        """Cria o job, ou retorna o existente com a mesma chave"""
+        self._init_db()
+        agora = time.time()
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                """
+                INSERT OR IGNORE INTO uploads
+                    (job_id, chave, status, patient_id, plan_id, filename, descricao,
+                     conteudo, proxima_tentativa, criado_em, atualizado_em)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (uuid.uuid4().hex, chave, PENDENTE, patient_id, plan_id, filename,
+                 descricao, conteudo, agora, agora, agora)
+            )
+            criado = cursor.rowcount == 1
+            if not criado:
+                # Job que já falhou definitivamente: pedido explícito de reenvio
+                conn.execute(
+                    """
+                    UPDATE uploads SET status = ?, tentativas = 0, proxima_tentativa = ?,
+                        ultimo_status = NULL, atualizado_em = ?
+                    WHERE chave = ? AND status = ?
+                    """,
+                    (PENDENTE, agora, agora, chave, FALHOU)
+                )
+            row = conn.execute("SELECT * FROM uploads WHERE chave = ?", (chave,)).fetchone()
+
+        job = self._status(row)
+        job["duplicado"] = not criado
+        return job
+
+    def _reservar(self, job_id: str = None) -> Optional[sqlite3.Row]:
+        """Marca como 'enviando' (dono e lease deste processo) o próximo job vencido (ou o job informado)"""
+        self._init_db()
+        agora = time.time()
+        with closing(self._connect()) as conn:
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if job_id:
+                    row = conn.execute(
+                        "SELECT * FROM uploads WHERE job_id = ? AND status = ? AND proxima_tentativa <= ?",
+                        (job_id, PENDENTE, agora)
+                    ).fetchone()
+                else:
+                    row = conn.execute(
+                        """
+                        SELECT * FROM uploads WHERE status = ? AND proxima_tentativa <= ?
+                        ORDER BY proxima_tentativa LIMIT 1
+                        """,
+                        (PENDENTE, agora)
+                    ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE uploads SET status = ?, dono = ?, lease_ate = ?, atualizado_em = ? WHERE job_id = ?",
+                        (ENVIANDO, self.dono, agora + self.lease, agora, row["job_id"])
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return row
+
+    def _finalizar(self, job_id: str, status: str, tentativas: int, erro: str = None,
+                   status_code: int = None, proxima: float = None):
+        """Grava o resultado de uma tentativa (se o job ainda é deste processo)"""
+        agora = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                UPDATE uploads SET status = ?, tentativas = ?, ultimo_erro = ?, ultimo_status = ?,
+                    proxima_tentativa = COALESCE(?, proxima_tentativa), atualizado_em = ?,
+                    concluido_em = CASE WHEN ? = ? THEN ? ELSE concluido_em END,
+                    dono = NULL, lease_ate = NULL
+                WHERE job_id = ? AND status = ? AND dono = ?
+                """,
+                (status, tentativas, erro, status_code, proxima, agora,
+                 status, CONCLUIDO, agora, job_id, ENVIANDO, self.dono)
+            )
+
+    def _renovar_lease(self, job_id: str) -> bool:
+        """Estende o lease do job em envio; False se ele não é mais deste processo"""
+        agora = time.time()
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE uploads SET lease_ate = ? WHERE job_id = ? AND status = ? AND dono = ?",
+                (agora + self.lease, job_id, ENVIANDO, self.dono)
+            )
+            return cursor.rowcount == 1
+
+    def _recuperar_interrompidos(self) -> int:
+        """
+        Jobs 'enviando' com o lease vencido (dono encerrado no meio do envio)
+        voltam para a fila; o resultado é desconhecido, então contam como
+        tentativa e passam pela verificação no prontuário antes de reenviar.
+        Jobs de outros processos em envio (lease em dia) não são tocados.
+        """
+        self._init_db()
+        agora = time.time()
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                """
+                UPDATE uploads SET status = ?, tentativas = tentativas + 1, ultimo_status = NULL,
+                    ultimo_erro = 'Envio interrompido', proxima_tentativa = ?, atualizado_em = ?,
+                    dono = NULL, lease_ate = NULL
+                WHERE status = ? AND (lease_ate IS NULL OR lease_ate < ?)
+                """,
+                (PENDENTE, agora, agora, ENVIANDO, agora)
+            )
+            return cursor.rowcount
+
+    def _segundos_ate_proximo(self) -> float:
+        """Tempo até o próximo job pendente vencer"""
+        self._init_db()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT MIN(proxima_tentativa) FROM uploads WHERE status = ?", (PENDENTE,)
+            ).fetchone()
+        if row[0] is None:
+            return INTERVALO_POLL
+        return max(0.0, min(row[0] - time.time(), INTERVALO_POLL))
+
+    def _status(self, row: sqlite3.Row) -> dict:
+        return {coluna: row[coluna] for coluna in COLUNAS_STATUS}
+
+    def obter(self, job_id: str) -> Optional[dict]:
+        """Status do job (None se não existe)"""
+        self._init_db()
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM uploads WHERE job_id = ?", (job_id,)).fetchone()
+        return self._status(row) if row else None
+
+    def stats(self) -> dict:
+        """Jobs por estado e workers ativos"""
+        self._init_db()
+        with closing(self._connect()) as conn:
+            contagem = dict(conn.execute("SELECT status, COUNT(*) FROM uploads GROUP BY status").fetchall())
+        return {
+            "running": self.running,
+            "workers": len(self._tarefas),
+            "jobs": {s: contagem.get(s, 0) for s in (PENDENTE, ENVIANDO, CONCLUIDO, FALHOU)}
+        }
+
+    # =========================================================================
+    # Envio
+    # =========================================================================
+
+    def _backoff(self, tentativas: int) -> float:
+        """Espera antes da próxima tentativa (exponencial com jitter de ±20%)"""
+        espera = settings.upload_backoff_base_seconds * (2 ** (tentativas - 1))
+        espera = min(espera, settings.upload_backoff_max_seconds)
+        return espera * random.uniform(0.8, 1.2)
+
+    async def _ja_enviado(self, row: sqlite3.Row) -> bool:
+        """Procura a chave do job nos arquivos do prontuário"""
+        resultado = await self.service.list_patient_files(row["patient_id"])
+        if not resultado.get("success"):
+            return False
+        referencia = row["chave"][:16]
+        return any(referencia in str(arquivo) for arquivo in resultado.get("files", []))
+
+    async def _manter_lease(self, job_id: str):
+        """Renova o lease a cada terço do prazo enquanto o envio roda"""
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                if not await asyncio.to_thread(self._renovar_lease, job_id):
+                    return
+            except sqlite3.Error as e:
+                print(f"Aviso: falha ao renovar o lease do upload {job_id}: {e}")
+
+    async def _processar(self, row: sqlite3.Row):
+        """Uma tentativa de envio do job reservado (com o lease renovado durante o envio)"""
+        lease = asyncio.create_task(self._manter_lease(row["job_id"]))
+        try:
+            await self._enviar(row)
+        finally:
+            lease.cancel()
+
+    async def _enviar(self, row: sqlite3.Row):
+        job_id = row["job_id"]
+        tentativas = row["tentativas"] + 1
+
+        try:
+            # Tentativa anterior com resultado desconhecido: conferir antes de reenviar
+            if row["tentativas"] > 0 and row["ultimo_status"] is None and await self._ja_enviado(row):
+                await asyncio.to_thread(self._finalizar, job_id, CONCLUIDO, row["tentativas"])
+                return
+
+            resultado = await self.service.upload_diet_to_record(
+                patient_id=row["patient_id"],
+                diet_content=row["conteudo"],
+                filename=row["filename"],
+                description=row["descricao"]
+            )
+        except Exception as e:
+            resultado = {"success": False, "error": str(e)}
+
+        if resultado.get("success"):
+            await asyncio.to_thread(self._finalizar, job_id, CONCLUIDO, tentativas)
+            return
+
+        erro = resultado.get("error", "Erro no upload")
+        status_code = resultado.get("status_code")
+        if erro_transitorio(resultado) and tentativas < self.max_tentativas:
+            proxima = time.time() + self._backoff(tentativas)
+            await asyncio.to_thread(
+                self._finalizar, job_id, PENDENTE, tentativas, erro, status_code, proxima
+            )
+            if self._evento is not None:
+                self._evento.set()
+        else:
+            print(f"Aviso: upload {job_id} falhou definitivamente: {erro}")
+            await asyncio.to_thread(self._finalizar, job_id, FALHOU, tentativas, erro, status_code)
+
+    async def processar_job(self, job_id: str) -> Optional[dict]:
+        """
+        Processa o job na hora, se estiver pendente e vencido
+
+        Usado quando não há workers (Vercel): o envio e as novas tentativas
+        acontecem dentro das próprias requisições.
+        """
+        row = await asyncio.to_thread(self._reservar, job_id)
+        if row is not None:
+            await self._processar(row)
+        return await asyncio.to_thread(self.obter, job_id)
+
+    async def enfileirar(
+        self,
+        patient_id: int,
+        conteudo: str,
+        filename: str,
+        patient_name: str,
+        plan_id: Optional[str] = None,
+        chave: Optional[str] = None
+    ) -> dict:
+        """
+        Grava o job de upload e acorda os workers
+
+        Args:
+            patient_id: ID do paciente no FEEGOW
+            conteudo: Markdown da dieta
+            filename: Nome do arquivo
+            patient_name: Nome do paciente (descrição do arquivo)
+            plan_id: ID do plano armazenado (compõe a chave de idempotência)
+            chave: Chave de idempotência do cliente (opcional)
+
+        Returns:
+            Status do job, com "duplicado" = True se já existia
+        """
+        if chave:
+            # Chave do cliente: combinada com o paciente e normalizada em hash
+            chave = hashlib.sha256(f"{patient_id}\0{chave}".encode('utf-8')).hexdigest()
+        else:
+            chave = chave_idempotencia(patient_id, plan_id, conteudo)
+        descricao = f"Plano Alimentar Personalizado - {patient_name} (ref. {chave[:16]})"
+
+        job = await asyncio.to_thread(
+            self._inserir, chave, patient_id, plan_id, filename, descricao, conteudo
+        )
+        if self._evento is not None:
+            self._evento.set()
+        return job
+
+    # =========================================================================
+    # Workers
+    # =========================================================================
+
+    @property
+    def running(self) -> bool:
+        """Indica se há workers em segundo plano"""
+        return bool(self._tarefas)
+
+    async def _worker(self):
+        while not self._parar:
+            self._evento.clear()
+            try:
+                row = await asyncio.to_thread(self._reservar)
+                if row is not None:
+                    await self._processar(row)
+                    continue
+                # Fila vazia: jobs de processos encerrados com o lease vencido
+                if await asyncio.to_thread(self._recuperar_interrompidos):
+                    continue
+                espera = await asyncio.to_thread(self._segundos_ate_proximo)
+            except sqlite3.Error as e:
+                print(f"Aviso: erro na fila de uploads: {e}")
+                espera = INTERVALO_POLL
+
+            try:
+                await asyncio.wait_for(self._evento.wait(), timeout=espera)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self):
+        """Recupera jobs interrompidos (lease vencido) e inicia os workers"""
+        if self._tarefas:
+            return
+        recuperados = await asyncio.to_thread(self._recuperar_interrompidos)
+        if recuperados:
+            print(f"Fila de uploads: {recuperados} job(s) interrompido(s) de volta à fila")
+
+        self._parar = False
+        self._evento = asyncio.Event()
+        self._tarefas = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0):
+        """Encerra os workers, aguardando envios em andamento até o timeout"""
+        if not self._tarefas:
+            return
+        self._parar = True
+        self._evento.set()
+        _, pendentes = await asyncio.wait(self._tarefas, timeout=timeout)
+        for tarefa in pendentes:
+            tarefa.cancel()
+        self._tarefas = []
+
+
+# Instância global
+upload_queue = UploadQueue()
@@ -0,0 +1,143 @@
+"""
+Circuit breaker para chamadas a serviços externos
+
+Estados:
+- fechado: chamadas liberadas; cada resultado entra na janela das últimas
+  chamadas. Com amostras suficientes e taxa de falhas (erros + chamadas
+  lentas) acima do limite, o circuito abre
+- aberto: chamadas recusadas na hora (sem esperar o timeout do serviço)
+  durante `tempo_aberto` segundos
+- meio-aberto: passado esse tempo, uma única chamada de teste é liberada;
+  sucesso fecha o circuito (janela zerada), falha abre de novo
+"""
+import threading
+import time
+from collections import deque
+
+
+class CircuitOpenError(Exception):
+    """Chamada recusada: circuito aberto"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por taxa de falhas e latência, com teste meio-aberto
+    """
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio_aberto"
+
+    def __init__(
+        self,
+        nome: str,
+        janela: int = 20,
+        min_chamadas: int = 5,
+        taxa_falhas: float = 0.5,
+        tempo_aberto: float = 30.0
+    ):
+        """
+        Args:
+            nome: Identificação (mensagens e stats)
+            janela: Últimas chamadas consideradas
+            min_chamadas: Amostras mínimas para abrir
+            taxa_falhas: Fração de falhas (erros + lentas) que abre o circuito
+            tempo_aberto: Segundos até liberar a chamada de teste
+        """
+        self.nome = nome
+        self.min_chamadas = min_chamadas
+        self.taxa_falhas = taxa_falhas
+        self.tempo_aberto = tempo_aberto
+
+        self._janela = deque(maxlen=janela)    # True = falha
+        self._estado = self.FECHADO
+        self._aberto_em = 0.0
+        self._teste_em_andamento = False
+        self._lock = threading.Lock()
+
+        self.recusadas = 0
+        self.aberturas = 0
+        self.lentas = 0
+
+    @property
+    def estado(self) -> str:
+        with self._lock:
+            if self._estado == self.ABERTO and time.monotonic() - self._aberto_em >= self.tempo_aberto:
+                return self.MEIO_ABERTO
+            return self._estado
+
+    def permitir(self) -> bool:
+        """
+        Reserva uma chamada (registrar() deve ser chamado depois dela)
+
+        Returns:
+            False se o circuito está aberto ou o teste meio-aberto já está em andamento
+        """
+        with self._lock:
+            if self._estado == self.FECHADO:
+                return True
+            if self._estado == self.ABERTO:
+                if time.monotonic() - self._aberto_em < self.tempo_aberto:
+                    self.recusadas += 1
+                    return False
+                self._estado = self.MEIO_ABERTO
+            if self._teste_em_andamento:
+                self.recusadas += 1
+                return False
+            self._teste_em_andamento = True
+            return True
+
+    def registrar(self, segundos: float, sucesso: bool, lenta_acima: float = 0):
+        """
+        Resultado de uma chamada liberada por permitir()
+
+        Args:
+            segundos: Duração da chamada
+            sucesso: Se a chamada terminou sem erro
+            lenta_acima: Chamadas com sucesso acima disso contam como falha (0 = sem limite)
+        """
+        lenta = sucesso and lenta_acima and segundos > lenta_acima
+        falha = not sucesso or bool(lenta)
+        with self._lock:
+            if lenta:
+                self.lentas += 1
+            if self._estado == self.MEIO_ABERTO:
+                self._teste_em_andamento = False
+                if falha:
+                    self._abrir()
+                else:
+                    self._estado = self.FECHADO
+                    self._janela.clear()
+                return
+
+            self._janela.append(falha)
+            if (self._estado == self.FECHADO
+                    and len(self._janela) >= self.min_chamadas
+                    and sum(self._janela) / len(self._janela) > self.taxa_falhas):
+                self._abrir()
+
+    def _abrir(self):
+        """Abre o circuito (chamado com o lock)"""
+        self._estado = self.ABERTO
+        self._aberto_em = time.monotonic()
+        self.aberturas += 1
+        print(f"Aviso: circuito '{self.nome}' aberto por {self.tempo_aberto:.0f}s")
+
+    def stats(self) -> dict:
+        """Estado e contadores"""
+        estado = self.estado
+        with self._lock:
+            falhas = sum(self._janela)
+            chamadas = len(self._janela)
+            aberto_ha = time.monotonic() - self._aberto_em if self._estado == self.ABERTO else None
+        return {
+            "estado": estado,
+            "chamadas_janela": chamadas,
+            "taxa_falhas": round(falhas / chamadas, 3) if chamadas else 0.0,
+            "limite_taxa_falhas": self.taxa_falhas,
+            "aberto_ha_segundos": round(aberto_ha, 1) if aberto_ha is not None else None,
+            "tempo_aberto_segundos": self.tempo_aberto,
+            "aberturas": self.aberturas,
+            "recusadas": self.recusadas,
+            "lentas": self.lentas
+        }
@@ -0,0 +1,137 @@
+"""
+Compressão das respostas HTTP (gzip e, com o pacote brotli instalado, br)
+
+O middleware comprime respostas de corpo único (JSON, Markdown, HTML, CSS,
+JS) a partir de COMPRESSION_MIN_SIZE bytes, conforme o Accept-Encoding do
+cliente. Respostas em partes (SSE, arquivos grandes) e já codificadas
+passam sem alteração, de forma que streams continuam chegando evento a
+evento.
+"""
+import gzip
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config.settings import settings
+
+try:
+    import brotli
+except ImportError:
+    # Opcional: sem o pacote, só gzip
+    brotli = None
+
+# Tipos de conteúdo que valem a compressão (PDF e imagens já são comprimidos)
+TIPOS_COMPRIMIVEIS = (
+    "text/", "application/json", "application/javascript", "application/xml", "image/svg+xml"
+)
+
+
+def escolher_codificacao(accept_encoding: str) -> Optional[str]:
+    """
+    Codificação preferida aceita pelo cliente: "br", "gzip" ou None
+
+    Respeita q=0 (codificação recusada); br só com o pacote brotli.
+    """
+    aceitas = {}
+    for parte in (accept_encoding or "").lower().split(","):
+        nome, _, parametros = parte.strip().partition(";")
+        q = 1.0
+        if parametros.strip().startswith("q="):
+            try:
+                q = float(parametros.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if nome:
+            aceitas[nome] = q
+    curinga = aceitas.get("*", 0.0)
+    if brotli is not None and aceitas.get("br", curinga) > 0:
+        return "br"
+    if aceitas.get("gzip", curinga) > 0:
+        return "gzip"
+    return None
+
+
+def comprimir(corpo: bytes, codificacao: str) -> bytes:
+    """Corpo comprimido com a codificação ("br" ou "gzip")"""
+    if codificacao == "br":
+        return brotli.compress(corpo, quality=settings.compression_brotli_quality)
+    # mtime=0: mesmo corpo, mesmos bytes (ETag estável)
+    return gzip.compress(corpo, compresslevel=settings.compression_gzip_level, mtime=0)
+
+
+def tipo_comprimivel(content_type: str) -> bool:
+    return content_type.startswith(TIPOS_COMPRIMIVEIS) and not content_type.startswith("text/event-stream")
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI de compressão das respostas de corpo único
+    """
+
+    def __init__(self, app, minimo: int = None):
+        """
+        Args:
+            app: Aplicação ASGI
+            minimo: Tamanho mínimo do corpo em bytes (padrão: COMPRESSION_MIN_SIZE)
+        """
+        self.app = app
+        self.minimo = minimo if minimo is not None else settings.compression_min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codificacao = escolher_codificacao(Headers(scope=scope).get("accept-encoding", ""))
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio = None
+        repassar = False
+
+        async def enviar(message):
+            nonlocal inicio, repassar
+            if repassar:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (
+                    message["status"] < 200 or message["status"] in (204, 304)
+                    or "content-encoding" in headers
+                    or not tipo_comprimivel(headers.get("content-type", ""))
+                ):
+                    repassar = True
+                    await send(message)
+                    return
+                # Segura o início até saber se o corpo vem inteiro
+                inicio = message
+                return
+
+            corpo = message.get("body", b"")
+            repassar = True
+            if message.get("more_body", False) or len(corpo) < self.minimo:
+                await send(inicio)
+                await send(message)
+                return
+
+            comprimido = comprimir(corpo, codificacao)
+            if len(comprimido) >= len(corpo):
+                await send(inicio)
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=inicio["headers"])
+            headers["content-encoding"] = codificacao
+            headers["content-length"] = str(len(comprimido))
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # Outra representação do mesmo conteúdo
+                headers["etag"] = f"W/{etag}"
+            await send(inicio)
+            await send({**message, "body": comprimido})
+
+        await self.app(scope, receive, enviar)
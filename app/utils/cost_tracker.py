@@ -1,18 +1,22 @@
 """
 Tracking de custos e estatísticas de uso
-Armazena dados em JSON local (quando possível)
-No Vercel, usa memória apenas (stats são perdidos entre requests)
+Armazena em SQLite local compartilhado entre workers (padrão) ou JSON
+(app/utils/usage_store.py); no Vercel, usa memória apenas (stats são
+perdidos entre requests)
+
+O custo de cada geração com API vem dos tokens reais da resposta (entrada,
+saída e cache) e da tabela de preços do modelo (settings.token_prices);
+os valores fixos por modo (settings.cost_*) só valem para modelos sem preço
+na tabela e para registros sem tokens.
 """
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Iterable, List, Optional
 from pydantic import BaseModel
-import json
-import os
 
 from app.config.settings import settings
-
-# Detectar ambiente Vercel (read-only filesystem)
-IS_VERCEL = os.environ.get('VERCEL', False)
+from app.models import TokenUsage
+from app.utils.telemetry import TelemetrySink
+from app.utils.usage_store import criar_usage_store
 
 
 class DietGeneration(BaseModel):
@@ -23,75 +27,160 @@ class DietGeneration(BaseModel):
     tokens_used: int
     cost_usd: float
     complexity_score: int
+    # Detalhe dos tokens (registros antigos não têm)
+    model: Optional[str] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+
+
+def precos_do_modelo(modelo: str) -> Optional[dict]:
+    """Preços por milhão de tokens do modelo (entrada de prefixo mais longo em token_prices)"""
+    if not modelo:
+        return None
+    prefixos = [p for p in settings.token_prices if modelo.startswith(p)]
+    return settings.token_prices[max(prefixos, key=len)] if prefixos else None
+
+
+def calcular_custo(mode: str, usage: TokenUsage = None, model: str = None) -> float:
+    """
+    Custo em USD de uma geração
+
+    Args:
+        mode: Modo usado (python_only, api_minimal, api_full)
+        usage: Tokens da chamada (None = registro sem tokens: custo fixo do modo)
+        model: Modelo chamado (preço em settings.token_prices)
+    """
+    precos = precos_do_modelo(model) if usage is not None else None
+    if precos is None:
+        if usage is not None and not usage.total:
+            # Nenhuma chamada cobrada (ex.: API caiu para Python puro)
+            return 0.0
+        return {
+            'python_only': settings.cost_python_only,
+            'api_minimal': settings.cost_api_minimal,
+            'api_full': settings.cost_api_full
+        }.get(mode, 0.0)
+    return (
+        usage.input_tokens * precos['input']
+        + usage.output_tokens * precos['output']
+        + usage.cache_creation_input_tokens * precos.get('cache_write', precos['input'])
+        + usage.cache_read_input_tokens * precos.get('cache_read', precos['input'])
+    ) / 1_000_000
+
+
+def _percentil(ordenados: List[float], q: float) -> float:
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+
+def distribuicao_por_modo(generations: Iterable[dict]) -> Dict:
+    """
+    Distribuição de custo e tokens por modo (p50/p95 por geração)
+
+    Returns:
+        {modo: {'count', 'cost_total', 'cost_mean', 'cost_p50', 'cost_p95', 'cost_max',
+                'tokens_p50', 'tokens_p95', 'input_tokens', 'output_tokens', 'cache_*'}}
+    """
+    por_modo: Dict[str, List[dict]] = {}
+    for gen in generations:
+        por_modo.setdefault(gen['mode'], []).append(gen)
+
+    resultado = {}
+    for mode, gens in por_modo.items():
+        custos = sorted(g['cost_usd'] for g in gens)
+        tokens = sorted(g['tokens_used'] for g in gens)
+        resultado[mode] = {
+            'count': len(gens),
+            'cost_total': round(sum(custos), 6),
+            'cost_mean': round(sum(custos) / len(custos), 6),
+            'cost_p50': round(_percentil(custos, 0.5), 6),
+            'cost_p95': round(_percentil(custos, 0.95), 6),
+            'cost_max': round(custos[-1], 6),
+            'tokens_p50': _percentil(tokens, 0.5),
+            'tokens_p95': _percentil(tokens, 0.95),
+            **{
+                campo: sum(g.get(campo, 0) for g in gens)
+                for campo in ('input_tokens', 'output_tokens',
+                              'cache_creation_input_tokens', 'cache_read_input_tokens')
+            }
+        }
+    return resultado
 
 
 class CostTracker:
     """
     Rastreia custos e estatísticas
-    No Vercel: apenas memória (não persiste entre requests)
-    Local: salva em arquivo JSON
+
+    Os registros vão para o armazenamento de uso (SQLite, JSON ou memória);
+    totais e gasto do mês são lidos dele, portanto consistentes entre workers
+    quando o backend é SQLite.
+
+    Com start() (startup do servidor), record_generation só enfileira o
+    registro e a gravação acontece em lotes em segundo plano; as consultas
+    gravam antes o que está pendente, e o gasto do mês soma os pendentes.
     """
 
-    def __init__(self, storage_path: str = "data/usage_stats.json"):
-        self.storage_path = storage_path
-        self.is_readonly = IS_VERCEL
-        self.stats = self._load_stats()
+    def __init__(self, store=None):
+        """
+        Args:
+            store: Armazenamento de uso (padrão: conforme USAGE_STATS_BACKEND)
+        """
+        self.store = store if store is not None else criar_usage_store()
+        self.telemetry = TelemetrySink(self.store.registrar, nome="estatísticas de uso")
+
+    async def start(self):
+        """Passa a gravar os registros em lote, em segundo plano"""
+        await self.telemetry.start()
+
+    async def stop(self):
+        """Grava os registros pendentes e volta à gravação imediata"""
+        await self.telemetry.stop()
 
     def record_generation(
         self,
         patient_name: str,
         mode: str,
         tokens_used: int,
-        complexity_score: int
+        complexity_score: int,
+        usage: TokenUsage = None,
+        model: str = None
     ):
-        """Registra uma geração de dieta"""
+        """
+        Registra uma geração de dieta
 
-        # Calcular custo baseado no modo
-        cost_map = {
-            'python_only': settings.cost_python_only,
-            'api_minimal': settings.cost_api_minimal,
-            'api_full': settings.cost_api_full
-        }
-        cost = cost_map.get(mode, 0.0)
+        Args:
+            tokens_used: Total de tokens (ignorado quando usage é informado)
+            usage: Tokens da chamada à API (custo calculado pelo preço do modelo)
+            model: Modelo chamado
+        """
+        cost = calcular_custo(mode, usage, model)
+        detalhe = usage.to_dict() if usage is not None else {}
 
         generation = DietGeneration(
             timestamp=datetime.now(),
             patient_name=patient_name,
             mode=mode,
-            tokens_used=tokens_used,
+            tokens_used=usage.total if usage is not None else tokens_used,
             cost_usd=cost,
-            complexity_score=complexity_score
+            complexity_score=complexity_score,
+            model=model if usage is not None and usage.total else None,
+            **detalhe
         )
-
-        # Atualizar estatísticas
-        self.stats['generations'].append(generation.model_dump())
-        self.stats['total_diets'] += 1
-        self.stats['total_cost_usd'] += cost
-        self.stats['total_tokens'] += tokens_used
-
-        # Contadores por modo
-        if mode not in self.stats['by_mode']:
-            self.stats['by_mode'][mode] = {'count': 0, 'cost': 0.0}
-
-        self.stats['by_mode'][mode]['count'] += 1
-        self.stats['by_mode'][mode]['cost'] += cost
-
-        self._save_stats()
+        self.telemetry.enviar(generation.model_dump())
 
     def get_monthly_stats(self, year: int, month: int) -> Dict:
         """Retorna estatísticas do mês"""
 
-        monthly_gens = [
-            g for g in self.stats['generations']
-            if datetime.fromisoformat(str(g['timestamp'])).year == year
-            and datetime.fromisoformat(str(g['timestamp'])).month == month
-        ]
+        self.telemetry.flush()
+        monthly_gens = self.store.geracoes(year, month)
 
         if not monthly_gens:
             return {
                 'total_diets': 0,
                 'total_cost': 0.0,
                 'by_mode': {},
+                'cost_distribution': {},
                 'average_cost': 0.0
             }
 
@@ -109,59 +198,51 @@ class CostTracker:
             'total_diets': len(monthly_gens),
             'total_cost': total_cost,
             'by_mode': by_mode,
+            'cost_distribution': distribuicao_por_modo(monthly_gens),
             'average_cost': total_cost / len(monthly_gens) if monthly_gens else 0.0
         }
 
+    def get_current_month_cost(self) -> float:
+        """Gasto do mês corrente em USD (consultado por requisição no AUTO)"""
+        agora = datetime.now()
+        pendente = sum(
+            g['cost_usd'] for g in self.telemetry.pendentes()
+            if g['timestamp'].year == agora.year and g['timestamp'].month == agora.month
+        )
+        return self.store.gasto_do_mes(agora.year, agora.month) + pendente
+
+    def get_mode_averages(self) -> Dict:
+        """
+        Médias medidas por modo em todo o histórico
+
+        Returns:
+            {modo: {'count', 'avg_tokens', 'avg_cost'}}
+        """
+        self.telemetry.flush()
+        somas = {}
+        for gen in self.store.geracoes():
+            soma = somas.setdefault(gen['mode'], [0, 0, 0.0])
+            soma[0] += 1
+            soma[1] += gen['tokens_used']
+            soma[2] += gen['cost_usd']
+        return {
+            mode: {'count': n, 'avg_tokens': tokens / n, 'avg_cost': cost / n}
+            for mode, (n, tokens, cost) in somas.items()
+        }
+
     def get_all_time_stats(self) -> Dict:
         """Retorna estatísticas totais"""
+        self.telemetry.flush()
+        totais = self.store.totais()
         return {
-            'total_diets': self.stats['total_diets'],
-            'total_cost_usd': self.stats['total_cost_usd'],
-            'total_tokens': self.stats['total_tokens'],
-            'by_mode': self.stats['by_mode'],
+            **totais,
+            'cost_distribution': distribuicao_por_modo(self.store.geracoes()),
             'average_cost': (
-                self.stats['total_cost_usd'] / self.stats['total_diets']
-                if self.stats['total_diets'] > 0 else 0.0
+                totais['total_cost_usd'] / totais['total_diets']
+                if totais['total_diets'] > 0 else 0.0
             )
         }
 
-    def _load_stats(self) -> Dict:
-        """Carrega estatísticas do arquivo (se disponível)"""
-
-        # Em ambiente Vercel, sempre começar vazio
-        if self.is_readonly:
-            return self._empty_stats()
-
-        if os.path.exists(self.storage_path):
-            try:
-                with open(self.storage_path, 'r') as f:
-                    return json.load(f)
-            except Exception:
-                return self._empty_stats()
-        else:
-            return self._empty_stats()
-
-    def _empty_stats(self) -> Dict:
-        """Estrutura vazia de estatísticas"""
-        return {
-            'generations': [],
-            'total_diets': 0,
-            'total_cost_usd': 0.0,
-            'total_tokens': 0,
-            'by_mode': {}
-        }
-
-    def _save_stats(self):
-        """Salva estatísticas no arquivo (apenas em ambiente local)"""
-
-        # Não salvar em ambiente Vercel (read-only filesystem)
-        if self.is_readonly:
-            return
-
-        try:
-            os.makedirs(os.path.dirname(self.storage_path), exist_ok=True)
-            with open(self.storage_path, 'w') as f:
-                json.dump(self.stats, f, indent=2, default=str)
-        except (OSError, IOError) as e:
-            # Ignorar erros de escrita silenciosamente
-            print(f"Aviso: Não foi possível salvar estatísticas: {e}")
+    def stats(self) -> dict:
+        """Backend de armazenamento, nº de registros e fila de gravação"""
+        return {**self.store.info(), "telemetria": self.telemetry.stats()}
@@ -0,0 +1,71 @@
+"""
+Agrupamento de chamadas idênticas simultâneas (single-flight)
+
+Enquanto uma chamada com determinada chave está em andamento, novas
+chamadas com a mesma chave aguardam o mesmo resultado em vez de repetir o
+trabalho. Terminada a chamada, a chave é liberada (não há cache).
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+def chave_canonica(dados: Any) -> str:
+    """SHA-256 do JSON canônico (chaves ordenadas) dos dados"""
+    texto = json.dumps(dados, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+class SingleFlight:
+    """
+    Uma execução por chave de cada vez; chamadas simultâneas compartilham o resultado
+    """
+
+    def __init__(self):
+        # chave -> tarefa em andamento
+        self._em_voo: Dict[Hashable, asyncio.Task] = {}
+        self.execucoes = 0
+        self.coalescidas = 0
+
+    async def executar(self, chave: Hashable, fabrica: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Resultado de `fabrica()` para a chave
+
+        Args:
+            chave: Identificação da chamada (ex.: chave_canonica da requisição)
+            fabrica: Cria a corrotina que faz o trabalho (só chamada pela primeira)
+
+        Returns:
+            (resultado, coalescida): coalescida=True quando outra chamada fez o trabalho
+        """
+        loop = asyncio.get_running_loop()
+        tarefa = self._em_voo.get(chave)
+        if tarefa is not None and tarefa.get_loop() is loop and not tarefa.done():
+            self.coalescidas += 1
+            return await asyncio.shield(tarefa), True
+
+        # Tarefa própria: se quem iniciou for cancelado (cliente desconectou),
+        # os demais continuam recebendo o resultado
+        tarefa = loop.create_task(fabrica())
+        self._em_voo[chave] = tarefa
+        self.execucoes += 1
+        tarefa.add_done_callback(lambda t: self._liberar(chave, t))
+        return await asyncio.shield(tarefa), False
+
+    def _liberar(self, chave: Hashable, tarefa: asyncio.Task):
+        if self._em_voo.get(chave) is tarefa:
+            del self._em_voo[chave]
+        # Evita "exception was never retrieved" quando ninguém mais esperava
+        if not tarefa.cancelled():
+            tarefa.exception()
+
+    def stats(self) -> dict:
+        """Contadores de uso"""
+        total = self.execucoes + self.coalescidas
+        return {
+            "em_andamento": len(self._em_voo),
+            "execucoes": self.execucoes,
+            "coalescidas": self.coalescidas,
+            "taxa_coalescidas": round(self.coalescidas / total, 3) if total else 0.0
+        }
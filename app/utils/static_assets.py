@@ -0,0 +1,95 @@
+"""
+Versionamento dos arquivos estáticos (CSS/JS) pelo conteúdo
+
+Os templates referenciam os arquivos por `static_url('css/style.css')`, que
+vira `/static/css/style.css?v=<hash do conteúdo>`. Como a URL muda quando o
+arquivo muda, a resposta versionada pode ser guardada pelo navegador sem
+revalidação (Cache-Control immutable, 1 ano); sem `v` ou com versão
+antiga, o arquivo é servido com no-cache.
+
+No Vercel os arquivos de static/ são servidos como estáticos pela CDN
+(vercel.json): immutable só com `v` na query, no-cache sem ela; aqui só se
+calcula a URL. (A CDN não confere se `v` é a versão atual.)
+"""
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+from urllib.parse import parse_qs
+
+from fastapi.staticfiles import StaticFiles
+
+CACHE_IMUTAVEL = "public, max-age=31536000, immutable"
+
+
+class StaticAssets:
+    """
+    Hash do conteúdo de cada arquivo estático (recalculado se o arquivo mudar)
+    """
+
+    def __init__(self, diretorio: Path, prefixo: str = "/static"):
+        """
+        Args:
+            diretorio: Pasta dos arquivos estáticos
+            prefixo: Caminho em que a pasta é servida
+        """
+        self.diretorio = Path(diretorio)
+        self.prefixo = prefixo.rstrip("/")
+        # caminho relativo -> ((mtime_ns, tamanho), hash)
+        self._versoes: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._lock = threading.Lock()
+
+    def versao(self, caminho: str) -> str:
+        """Hash curto do conteúdo ("" se o arquivo não existe)"""
+        arquivo = self.diretorio / caminho.lstrip("/")
+        try:
+            info = os.stat(arquivo)
+        except OSError:
+            return ""
+        assinatura = (info.st_mtime_ns, info.st_size)
+        with self._lock:
+            atual = self._versoes.get(caminho)
+        if atual is not None and atual[0] == assinatura:
+            return atual[1]
+        versao = hashlib.sha256(arquivo.read_bytes()).hexdigest()[:12]
+        with self._lock:
+            self._versoes[caminho] = (assinatura, versao)
+        return versao
+
+    def url(self, caminho: str) -> str:
+        """URL versionada do arquivo (usada nos templates como static_url)"""
+        versao = self.versao(caminho)
+        url = f"{self.prefixo}/{caminho.lstrip('/')}"
+        return f"{url}?v={versao}" if versao else url
+
+    def manifesto(self) -> Dict[str, str]:
+        """Versão de todos os arquivos da pasta (calcula e guarda os hashes)"""
+        if not self.diretorio.exists():
+            return {}
+        return {
+            arquivo.relative_to(self.diretorio).as_posix(): self.versao(
+                arquivo.relative_to(self.diretorio).as_posix()
+            )
+            for arquivo in sorted(self.diretorio.rglob("*")) if arquivo.is_file()
+        }
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """
+    StaticFiles com Cache-Control conforme a versão pedida na URL
+    """
+
+    def __init__(self, *args, assets: StaticAssets, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.assets = assets
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            pedida = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("v", [""])[0]
+            atual = self.assets.versao(path)
+            response.headers["Cache-Control"] = (
+                CACHE_IMUTAVEL if pedida and pedida == atual else "no-cache"
+            )
+        return response
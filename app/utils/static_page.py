@@ -0,0 +1,72 @@
+"""
+Página pré-renderizada (template Jinja sem dados por requisição)
+
+O template é renderizado uma vez (startup ou primeira requisição) para
+bytes, com ETag do conteúdo e as versões comprimidas já prontas; cada
+requisição só escolhe a versão pelo Accept-Encoding ou responde 304 quando
+o navegador já tem a página.
+"""
+import hashlib
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.templating import Jinja2Templates
+
+from app.utils.compression import brotli, comprimir, escolher_codificacao
+
+
+class PrerenderedPage:
+    """
+    HTML de um template renderizado uma vez, servido com ETag
+    """
+
+    def __init__(self, templates: Jinja2Templates, nome: str, contexto: Optional[dict] = None):
+        """
+        Args:
+            templates: Templates Jinja da aplicação
+            nome: Arquivo do template (ex.: "index.html")
+            contexto: Variáveis fixas do template
+        """
+        self.templates = templates
+        self.nome = nome
+        self.contexto = contexto or {}
+        self.etag: Optional[str] = None
+        # codificação ("identity", "gzip", "br") -> bytes
+        self.variantes: Dict[str, bytes] = {}
+
+    def renderizar(self):
+        """Renderiza o template e prepara as versões comprimidas"""
+        html = self.templates.get_template(self.nome).render(**self.contexto)
+        corpo = html.encode("utf-8")
+        variantes = {"identity": corpo, "gzip": comprimir(corpo, "gzip")}
+        if brotli is not None:
+            variantes["br"] = comprimir(corpo, "br")
+        # Atribuições por último: requisições simultâneas veem a versão antiga ou a nova inteira
+        self.variantes = variantes
+        self.etag = '"' + hashlib.sha256(corpo).hexdigest()[:20] + '"'
+
+    def resposta(self, request: Request) -> Response:
+        """Página (na codificação aceita pelo cliente) ou 304 se o ETag confere"""
+        if self.etag is None:
+            self.renderizar()
+        variantes, etag = self.variantes, self.etag
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        enviado = request.headers.get("if-none-match", "")
+        if enviado and etag in (t.strip().removeprefix("W/") for t in enviado.split(",")):
+            return Response(status_code=304, headers=headers)
+
+        codificacao = escolher_codificacao(request.headers.get("accept-encoding", ""))
+        if codificacao not in variantes:
+            codificacao = "identity"
+        else:
+            headers["Content-Encoding"] = codificacao
+        return Response(variantes[codificacao], media_type="text/html", headers=headers)
+
+    def stats(self) -> dict:
+        return {
+            "template": self.nome,
+            "etag": self.etag,
+            "bytes": {codificacao: len(corpo) for codificacao, corpo in self.variantes.items()}
+        }
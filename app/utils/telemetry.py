@@ -0,0 +1,171 @@
+"""
+Envio de eventos de telemetria fora do caminho da requisição
+
+A requisição só coloca o evento numa fila limitada em memória (sem I/O);
+uma tarefa em segundo plano grava os eventos em lotes quando a fila chega a
+TELEMETRY_BATCH_SIZE eventos ou a cada TELEMETRY_FLUSH_INTERVAL segundos, e
+grava o que sobrou no encerramento do servidor.
+
+Sem a tarefa em segundo plano (CLI, scripts, Vercel) cada evento é gravado
+na hora, como antes. Com a fila cheia (gravação parada ou muito lenta), os
+eventos mais antigos são descartados e contados em stats().
+"""
+import asyncio
+import threading
+from collections import deque
+from typing import Callable, List, Optional
+
+from app.config.settings import settings
+
+
+class TelemetrySink:
+    """
+    Fila limitada de eventos gravados em lote por uma tarefa assíncrona
+    """
+
+    def __init__(
+        self,
+        gravar: Callable[[List[dict]], None],
+        nome: str = "telemetria",
+        max_fila: int = None,
+        tamanho_lote: int = None,
+        intervalo: float = None
+    ):
+        """
+        Args:
+            gravar: Grava um lote de eventos (síncrona, executada em thread)
+            nome: Identificação nas mensagens
+            max_fila: Eventos pendentes mantidos em memória
+            tamanho_lote: Eventos que disparam a gravação antes do intervalo
+            intervalo: Segundos máximos entre gravações
+        """
+        self.gravar = gravar
+        self.nome = nome
+        self.max_fila = max_fila or settings.telemetry_max_queue
+        self.tamanho_lote = tamanho_lote or settings.telemetry_batch_size
+        self.intervalo = intervalo if intervalo is not None else settings.telemetry_flush_interval
+
+        self._fila: deque = deque()
+        self._lock = threading.Lock()
+        # Serializa gravações (tarefa, flush() e stop() não gravam ao mesmo tempo)
+        self._gravando = threading.Lock()
+        self._tarefa: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._evento: Optional[asyncio.Event] = None
+
+        self.enviados = 0
+        self.gravados = 0
+        self.lotes = 0
+        self.descartados = 0
+        self.erros = 0
+
+    @property
+    def running(self) -> bool:
+        """Indica se a gravação está em segundo plano"""
+        return self._tarefa is not None and not self._tarefa.done()
+
+    def enviar(self, evento: dict):
+        """
+        Registra um evento sem esperar a gravação (seguro entre threads)
+
+        Sem a tarefa em segundo plano, grava na hora.
+        """
+        if not self.running:
+            with self._lock:
+                self.enviados += 1
+            self._gravar_lote([evento])
+            return
+
+        with self._lock:
+            if len(self._fila) >= self.max_fila:
+                self._fila.popleft()
+                self.descartados += 1
+            self._fila.append(evento)
+            self.enviados += 1
+            cheio = len(self._fila) >= self.tamanho_lote
+        if cheio:
+            try:
+                self._loop.call_soon_threadsafe(self._evento.set)
+            except RuntimeError:
+                # Loop já encerrado: o stop() grava o que ficou
+                pass
+
+    def pendentes(self) -> List[dict]:
+        """Eventos ainda não gravados (cópia)"""
+        with self._lock:
+            return list(self._fila)
+
+    def _retirar_lote(self) -> List[dict]:
+        with self._lock:
+            return [self._fila.popleft() for _ in range(min(self.tamanho_lote, len(self._fila)))]
+
+    def _gravar_lote(self, lote: List[dict]) -> bool:
+        """Grava um lote; em erro devolve os eventos ao início da fila"""
+        with self._gravando:
+            try:
+                self.gravar(lote)
+            except Exception as e:
+                self.erros += 1
+                print(f"Aviso: falha ao gravar {len(lote)} evento(s) de {self.nome}: {e}")
+                with self._lock:
+                    espaco = self.max_fila - len(self._fila)
+                    self.descartados += max(0, len(lote) - espaco)
+                    self._fila.extendleft(reversed(lote[:max(0, espaco)]))
+                return False
+        self.gravados += len(lote)
+        self.lotes += 1
+        return True
+
+    def flush(self):
+        """Grava todos os eventos pendentes (síncrona)"""
+        while True:
+            lote = self._retirar_lote()
+            if not lote or not self._gravar_lote(lote):
+                return
+
+    async def _loop_gravacao(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._evento.wait(), timeout=self.intervalo)
+            except asyncio.TimeoutError:
+                pass
+            self._evento.clear()
+            while True:
+                lote = self._retirar_lote()
+                if not lote or not await asyncio.to_thread(self._gravar_lote, lote):
+                    break
+
+    async def start(self):
+        """Inicia a gravação em segundo plano"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._evento = asyncio.Event()
+        self._tarefa = asyncio.create_task(self._loop_gravacao())
+
+    async def stop(self):
+        """Encerra a tarefa e grava o que ficou na fila"""
+        if self._tarefa is None:
+            return
+        self._tarefa.cancel()
+        try:
+            await self._tarefa
+        except asyncio.CancelledError:
+            pass
+        self._tarefa = None
+        await asyncio.to_thread(self.flush)
+
+    def stats(self) -> dict:
+        """Contadores da fila"""
+        with self._lock:
+            pendentes = len(self._fila)
+        return {
+            "em_segundo_plano": self.running,
+            "pendentes": pendentes,
+            "max_fila": self.max_fila,
+            "enviados": self.enviados,
+            "gravados": self.gravados,
+            "lotes": self.lotes,
+            "descartados": self.descartados,
+            "erros": self.erros
+        }
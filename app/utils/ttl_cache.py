@@ -0,0 +1,170 @@
+"""
+Cache assíncrono com TTL e stale-while-revalidate
+
+Cada entrada tem duas validades:
+- fresca (ttl): devolvida direto do cache
+- vencida, mas dentro da janela stale: devolvida na hora, e uma atualização
+  roda em segundo plano (a próxima leitura já pega o valor novo)
+
+Depois da janela stale a leitura espera o carregamento. Carregamentos
+simultâneos da mesma chave são agrupados em uma única chamada.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    """
+    Cache LRU com TTL, stale-while-revalidate e invalidação explícita
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        stale: float = 0.0,
+        max_entradas: int = 1000,
+        armazenar: Callable[[Any], bool] = None
+    ):
+        """
+        Args:
+            ttl: Segundos em que a entrada é considerada fresca
+            stale: Segundos adicionais em que a entrada vencida ainda é servida
+            max_entradas: Limite de entradas (descarta as menos usadas)
+            armazenar: Predicado do que pode ir para o cache (padrão: tudo)
+        """
+        self.ttl = ttl
+        self.stale = stale
+        self.max_entradas = max_entradas
+        self._armazenar = armazenar or (lambda valor: True)
+
+        # chave -> (valor, gravado_em)
+        self._entradas: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        # chave -> carregamento em andamento
+        self._carregando: Dict[Hashable, asyncio.Future] = {}
+        # Atualizações em segundo plano (referência para não serem coletadas)
+        self._tarefas = set()
+        # Incrementado a cada invalidação
+        self._geracao = 0
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.atualizacoes = 0
+        self.erros_atualizacao = 0
+        self.invalidacoes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    async def obter(self, chave: Hashable, carregar: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Valor da chave, carregando com `carregar()` quando necessário
+
+        Args:
+            chave: Chave do cache
+            carregar: Corrotina que busca o valor na origem
+        """
+        if not self.enabled:
+            return await carregar()
+
+        entrada = self._entradas.get(chave)
+        if entrada is not None:
+            valor, gravado_em = entrada
+            idade = time.monotonic() - gravado_em
+            if idade < self.ttl:
+                self.hits += 1
+                self._entradas.move_to_end(chave)
+                return valor
+            if idade < self.ttl + self.stale:
+                self.stale_hits += 1
+                self._entradas.move_to_end(chave)
+                self._atualizar_em_segundo_plano(chave, carregar)
+                return valor
+
+        self.misses += 1
+        return await self._carregar(chave, carregar)
+
+    async def _carregar(self, chave: Hashable, carregar: Callable[[], Awaitable[Any]]) -> Any:
+        """Carrega e grava a chave (uma chamada por chave de cada vez)"""
+        loop = asyncio.get_running_loop()
+        pendente = self._carregando.get(chave)
+        if pendente is not None and pendente.get_loop() is loop:
+            return await asyncio.shield(pendente)
+
+        futuro = loop.create_future()
+        self._carregando[chave] = futuro
+        geracao = self._geracao
+        try:
+            valor = await carregar()
+        except asyncio.CancelledError:
+            futuro.cancel()
+            raise
+        except Exception as e:
+            futuro.set_exception(e)
+            # Evita "exception was never retrieved" quando ninguém mais esperava
+            futuro.exception()
+            raise
+        else:
+            futuro.set_result(valor)
+            # Invalidação durante o carregamento: o valor pode já estar velho
+            if geracao == self._geracao and self._armazenar(valor):
+                self.definir(chave, valor)
+            return valor
+        finally:
+            if self._carregando.get(chave) is futuro:
+                del self._carregando[chave]
+
+    def _atualizar_em_segundo_plano(self, chave: Hashable, carregar: Callable[[], Awaitable[Any]]):
+        """Dispara a revalidação de uma entrada vencida (no máximo uma por chave)"""
+        pendente = self._carregando.get(chave)
+        if pendente is not None and not pendente.done():
+            return
+
+        async def atualizar():
+            try:
+                await self._carregar(chave, carregar)
+                self.atualizacoes += 1
+            except Exception as e:
+                # Mantém o valor antigo; a próxima leitura tenta de novo
+                self.erros_atualizacao += 1
+                print(f"Aviso: falha ao atualizar cache ({chave}): {e}")
+
+        tarefa = asyncio.get_running_loop().create_task(atualizar())
+        self._tarefas.add(tarefa)
+        tarefa.add_done_callback(self._tarefas.discard)
+
+    def definir(self, chave: Hashable, valor: Any):
+        """Grava o valor (fresco) na chave"""
+        self._entradas[chave] = (valor, time.monotonic())
+        self._entradas.move_to_end(chave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+
+    def invalidar(self, chave: Hashable = None):
+        """Remove a chave (ou todo o cache, sem chave)"""
+        self.invalidacoes += 1
+        self._geracao += 1
+        if chave is None:
+            self._entradas.clear()
+        else:
+            self._entradas.pop(chave, None)
+
+    def stats(self) -> dict:
+        """Contadores de uso"""
+        leituras = self.hits + self.stale_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entradas": len(self._entradas),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / leituras, 3) if leituras else 0.0,
+            "atualizacoes": self.atualizacoes,
+            "erros_atualizacao": self.erros_atualizacao,
+            "invalidacoes": self.invalidacoes,
+            "ttl_segundos": self.ttl,
+            "stale_segundos": self.stale
+        }
@@ -0,0 +1,293 @@
+"""
+Armazenamento das estatísticas de uso (gerações registradas pelo CostTracker)
+
+Backends:
+- sqlite: arquivo local em modo WAL (padrão). Cada geração é uma linha e os
+  totais são calculados na consulta, de forma que vários workers
+  (uvicorn --workers N) gravam no mesmo arquivo sem sobrescrever a visão uns
+  dos outros e sem serializar as requisições em reescritas do arquivo inteiro
+- json: arquivo JSON reescrito a cada registro, como antes (um único processo)
+- memory: o backend json sem gravar em disco (Vercel, filesystem somente leitura)
+
+Na primeira abertura do SQLite, um usage_stats.json existente é importado.
+"""
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, List
+
+from app.config.settings import settings
+
+# Detectar ambiente Vercel (read-only filesystem)
+IS_VERCEL = os.environ.get('VERCEL', False)
+
+# Arquivo do backend json (e origem da importação para o SQLite)
+JSON_PATH = "data/usage_stats.json"
+
+# Colunas de cada geração (mesmos campos de DietGeneration)
+COLUNAS = (
+    'timestamp', 'patient_name', 'mode', 'tokens_used', 'cost_usd', 'complexity_score',
+    'model', 'input_tokens', 'output_tokens', 'cache_creation_input_tokens', 'cache_read_input_tokens'
+)
+
+
+def _limites_do_mes(ano: int, mes: int):
+    """(início, fim) do mês como texto ISO (compara em ordem cronológica)"""
+    inicio = datetime(ano, mes, 1)
+    fim = datetime(ano + 1, 1, 1) if mes == 12 else datetime(ano, mes + 1, 1)
+    return inicio.isoformat(), fim.isoformat()
+
+
+class JSONUsageStore:
+    """
+    Histórico em memória, gravado inteiro em JSON a cada registro
+
+    Com readonly=True (Vercel) nada é lido nem gravado em disco.
+    """
+
+    def __init__(self, path: str = JSON_PATH, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        self.backend = "memory" if readonly else "json"
+        self.stats = self._load_stats()
+        # (ano, mês) -> gasto, mantido a cada registro (consultado por requisição no AUTO)
+        self._gasto_mes = None
+        self._lock = threading.Lock()
+
+    def registrar(self, geracoes: List[dict]):
+        """Acrescenta gerações (dicts de DietGeneration.model_dump())"""
+        with self._lock:
+            for gen in geracoes:
+                self.stats['generations'].append(gen)
+                self.stats['total_diets'] += 1
+                self.stats['total_cost_usd'] += gen['cost_usd']
+                self.stats['total_tokens'] += gen['tokens_used']
+
+                # Contadores por modo
+                por_modo = self.stats['by_mode'].setdefault(gen['mode'], {'count': 0, 'cost': 0.0})
+                por_modo['count'] += 1
+                por_modo['cost'] += gen['cost_usd']
+
+                ts = gen['timestamp']
+                if self._gasto_mes is not None and self._gasto_mes[0] == (ts.year, ts.month):
+                    self._gasto_mes = (self._gasto_mes[0], self._gasto_mes[1] + gen['cost_usd'])
+
+            self._save_stats()
+
+    def geracoes(self, ano: int = None, mes: int = None) -> List[dict]:
+        """Gerações do mês (ou de todo o histórico)"""
+        with self._lock:
+            todas = list(self.stats['generations'])
+        if ano is None:
+            return todas
+        return [
+            g for g in todas
+            if datetime.fromisoformat(str(g['timestamp'])).year == ano
+            and datetime.fromisoformat(str(g['timestamp'])).month == mes
+        ]
+
+    def gasto_do_mes(self, ano: int, mes: int) -> float:
+        """Gasto do mês em USD (sem percorrer o histórico a cada chamada)"""
+        if self._gasto_mes is None or self._gasto_mes[0] != (ano, mes):
+            total = sum(g['cost_usd'] for g in self.geracoes(ano, mes))
+            self._gasto_mes = ((ano, mes), total)
+        return self._gasto_mes[1]
+
+    def totais(self) -> Dict:
+        """total_diets, total_cost_usd, total_tokens e by_mode de todo o histórico"""
+        with self._lock:
+            return {
+                'total_diets': self.stats['total_diets'],
+                'total_cost_usd': self.stats['total_cost_usd'],
+                'total_tokens': self.stats['total_tokens'],
+                'by_mode': {m: dict(v) for m, v in self.stats['by_mode'].items()}
+            }
+
+    def info(self) -> dict:
+        return {"backend": self.backend, "geracoes": self.stats['total_diets']}
+
+    def _load_stats(self) -> Dict:
+        """Carrega estatísticas do arquivo (se disponível)"""
+
+        # Em ambiente Vercel, sempre começar vazio
+        if self.readonly:
+            return self._empty_stats()
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    return json.load(f)
+            except Exception:
+                return self._empty_stats()
+        else:
+            return self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict:
+        """Estrutura vazia de estatísticas"""
+        return {
+            'generations': [],
+            'total_diets': 0,
+            'total_cost_usd': 0.0,
+            'total_tokens': 0,
+            'by_mode': {}
+        }
+
+    def _save_stats(self):
+        """Salva estatísticas no arquivo (apenas em ambiente local)"""
+
+        # Não salvar em ambiente Vercel (read-only filesystem)
+        if self.readonly:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, 'w') as f:
+                json.dump(self.stats, f, indent=2, default=str)
+        except (OSError, IOError) as e:
+            # Ignorar erros de escrita silenciosamente
+            print(f"Aviso: Não foi possível salvar estatísticas: {e}")
+
+
+class SQLiteUsageStore:
+    """
+    Uma linha por geração em SQLite (WAL), compartilhado entre processos
+
+    Gravações são um INSERT curto (sem reescrever o histórico); leitores não
+    bloqueiam quem grava. Totais, gasto do mês e distribuições são sempre
+    calculados sobre o arquivo, portanto iguais em todos os workers.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str = None, importar_de: str = JSON_PATH):
+        """
+        Args:
+            path: Arquivo SQLite (padrão: USAGE_STATS_PATH)
+            importar_de: JSON do backend antigo, importado se o banco estiver vazio
+        """
+        self.path = path or settings.usage_stats_path
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS geracoes (
+                    id INTEGER PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    patient_name TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    tokens_used INTEGER NOT NULL,
+                    cost_usd REAL NOT NULL,
+                    complexity_score INTEGER NOT NULL,
+                    model TEXT,
+                    input_tokens INTEGER NOT NULL DEFAULT 0,
+                    output_tokens INTEGER NOT NULL DEFAULT 0,
+                    cache_creation_input_tokens INTEGER NOT NULL DEFAULT 0,
+                    cache_read_input_tokens INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_geracoes_timestamp ON geracoes (timestamp)")
+        if importar_de and os.path.exists(importar_de):
+            self._importar_json(importar_de)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Uma conexão por operação: seguro entre threads e processos
+        conn = sqlite3.connect(self.path, timeout=10)
+        # Com WAL, NORMAL só sincroniza no checkpoint (sem fsync por registro)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _importar_json(self, path: str):
+        """Importa o histórico do backend json (só com o banco vazio)"""
+        try:
+            with open(path, 'r') as f:
+                geracoes = json.load(f).get('generations', [])
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Aviso: histórico {path} não importado ({e})")
+            return
+        conn = self._connect()
+        try:
+            # IMMEDIATE: outro worker iniciando junto espera e encontra o banco preenchido
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM geracoes LIMIT 1").fetchone() is None:
+                self._inserir(conn, geracoes)
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _inserir(conn: sqlite3.Connection, geracoes: List[dict]):
+        linhas = []
+        for g in geracoes:
+            # ISO com "T" em todas as linhas: a ordem do texto é a ordem cronológica
+            ts = g['timestamp']
+            if not isinstance(ts, datetime):
+                ts = datetime.fromisoformat(str(ts))
+            linhas.append((ts.isoformat(),) + tuple(
+                g.get(c, None if c == 'model' else 0) for c in COLUNAS[1:]
+            ))
+        conn.executemany(
+            f"INSERT INTO geracoes ({', '.join(COLUNAS)}) VALUES ({', '.join('?' * len(COLUNAS))})",
+            linhas
+        )
+
+    def registrar(self, geracoes: List[dict]):
+        """Acrescenta gerações (dicts de DietGeneration.model_dump()) numa transação"""
+        with closing(self._connect()) as conn, conn:
+            self._inserir(conn, geracoes)
+
+    def geracoes(self, ano: int = None, mes: int = None) -> List[dict]:
+        """Gerações do mês (ou de todo o histórico)"""
+        sql = f"SELECT {', '.join(COLUNAS)} FROM geracoes"
+        parametros = ()
+        if ano is not None:
+            sql += " WHERE timestamp >= ? AND timestamp < ?"
+            parametros = _limites_do_mes(ano, mes)
+        with closing(self._connect()) as conn:
+            linhas = conn.execute(sql + " ORDER BY id", parametros).fetchall()
+        return [dict(zip(COLUNAS, linha)) for linha in linhas]
+
+    def gasto_do_mes(self, ano: int, mes: int) -> float:
+        """Gasto do mês em USD (todos os workers)"""
+        with closing(self._connect()) as conn:
+            total = conn.execute(
+                "SELECT SUM(cost_usd) FROM geracoes WHERE timestamp >= ? AND timestamp < ?",
+                _limites_do_mes(ano, mes)
+            ).fetchone()[0]
+        return total or 0.0
+
+    def totais(self) -> Dict:
+        """total_diets, total_cost_usd, total_tokens e by_mode de todo o histórico"""
+        with closing(self._connect()) as conn:
+            linhas = conn.execute(
+                "SELECT mode, COUNT(*), SUM(cost_usd), SUM(tokens_used) FROM geracoes GROUP BY mode"
+            ).fetchall()
+        return {
+            'total_diets': sum(n for _, n, _, _ in linhas),
+            'total_cost_usd': sum(custo for _, _, custo, _ in linhas),
+            'total_tokens': sum(tokens for _, _, _, tokens in linhas),
+            'by_mode': {mode: {'count': n, 'cost': custo} for mode, n, custo, _ in linhas}
+        }
+
+    def info(self) -> dict:
+        with closing(self._connect()) as conn:
+            total = conn.execute("SELECT COUNT(*) FROM geracoes").fetchone()[0]
+        return {"backend": self.backend, "geracoes": total, "path": self.path}
+
+
+def criar_usage_store():
+    """Backend conforme USAGE_STATS_BACKEND (sempre memória no Vercel)"""
+    if IS_VERCEL:
+        return JSONUsageStore(readonly=True)
+    if settings.usage_stats_backend == "json":
+        return JSONUsageStore()
+    try:
+        return SQLiteUsageStore()
+    except (sqlite3.Error, OSError) as e:
+        print(f"Aviso: estatísticas em SQLite indisponíveis ({e}), usando JSON")
+        return JSONUsageStore()
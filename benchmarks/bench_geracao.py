@@ -0,0 +1,113 @@
+"""
+Benchmark da geração de planos (sem API)
+
+Uso:
+    python -m benchmarks.bench_geracao [--n 300]
+
+Mede, por plano: tempo de montagem das refeições (e memória retida, via
+tracemalloc), tempo do pipeline python_only completo com formatação e
+tempo da exportação do Markdown para PDF.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from app.models import PatientData
+from app.services.hybrid_system import HybridDietSystem
+from app.services.meal_builder import MealBuilder
+from app.services.pdf_renderer import render_pdf
+
+
+def _pacientes(n: int):
+    rnd = random.Random(42)
+    tipos = ['personalizado', 'low_carb', 'low_carb_moderado', 'mediterraneo', 'high_protein']
+    for i in range(n):
+        yield PatientData(
+            nome=f"Paciente {i}",
+            sexo=rnd.choice("MF"),
+            idade=rnd.randint(18, 90),
+            peso=rnd.uniform(45, 160),
+            altura=rnd.uniform(145, 200),
+            tipo_dieta=rnd.choice(tipos),
+            contagem_cho=rnd.random() < 0.3
+        )
+
+
+def bench_montagem(system: HybridDietSystem, pacientes) -> dict:
+    """Tempo da montagem das 5 refeições + resumo e memória retida por plano"""
+    dados = [(p, system._calculate_nutrition(p)) for p in pacientes]
+
+    inicio = time.perf_counter()
+    for p, nutrition in dados:
+        builder = MealBuilder(tipo_dieta=p.tipo_dieta)
+        meals = builder.build_complete_plan(nutrition.distribuicao_refeicoes, nutrition.macros)
+        builder.get_resumo_nutricional(meals)
+    duracao = time.perf_counter() - inicio
+
+    # Memória: manter todos os planos vivos e medir o total alocado
+    planos = []
+    tracemalloc.start()
+    for p, nutrition in dados:
+        builder = MealBuilder(tipo_dieta=p.tipo_dieta)
+        planos.append(builder.build_complete_plan(nutrition.distribuicao_refeicoes, nutrition.macros))
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'ms_por_plano': duracao / len(dados) * 1000, 'kb_por_plano': atual / len(dados) / 1024}
+
+
+def bench_pipeline(system: HybridDietSystem, pacientes) -> dict:
+    """Tempo do generate_diet completo em python_only"""
+    inicio = time.perf_counter()
+    tamanho = 0
+    for p in pacientes:
+        markdown, _ = system.generate_diet(p, mode='python_only', track_cost=False)
+        tamanho += len(markdown.encode('utf-8'))
+    duracao = time.perf_counter() - inicio
+    return {
+        'ms_por_plano': duracao / len(pacientes) * 1000,
+        'markdown_kb_medio': tamanho / len(pacientes) / 1024
+    }
+
+
+def bench_pdf(system: HybridDietSystem, pacientes) -> dict:
+    """Tempo da renderização PDF (Markdown já gerado, cache de layout aquecido no 1º plano)"""
+    documentos = [
+        (system.generate_diet(p, mode='python_only', track_cost=False)[0], p.nome)
+        for p in pacientes
+    ]
+    inicio = time.perf_counter()
+    tamanho = 0
+    for markdown, nome in documentos:
+        tamanho += len(render_pdf(markdown, f"Plano Alimentar - {nome}"))
+    duracao = time.perf_counter() - inicio
+    return {
+        'ms_por_plano': duracao / len(documentos) * 1000,
+        'pdf_kb_medio': tamanho / len(documentos) / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=300, help="Número de planos")
+    args = parser.parse_args()
+
+    system = HybridDietSystem()
+    pacientes = list(_pacientes(args.n))
+
+    random.seed(0)
+    montagem = bench_montagem(system, pacientes)
+    print(f"montagem:  {montagem['ms_por_plano']:.3f} ms/plano, {montagem['kb_por_plano']:.1f} KB retidos/plano")
+
+    random.seed(0)
+    pipeline = bench_pipeline(system, pacientes)
+    print(f"pipeline:  {pipeline['ms_por_plano']:.3f} ms/plano, markdown {pipeline['markdown_kb_medio']:.1f} KB")
+
+    random.seed(0)
+    pdf = bench_pdf(system, pacientes)
+    print(f"pdf:       {pdf['ms_por_plano']:.3f} ms/plano, {pdf['pdf_kb_medio']:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark das respostas HTTP (tamanho e TTFB, com e sem compressão)
+
+Uso:
+    python -m benchmarks.bench_http [--n 20] [--url http://localhost:8000]
+
+Para a página inicial e /gerar-dieta (python_only, formatos markdown, json
+e ambos), reporta o tamanho transferido sem compressão, com gzip e com br
+(se o pacote brotli estiver instalado) e a mediana do TTFB (tempo até os
+cabeçalhos) e do tempo total. Sem --url, roda em processo com o TestClient
+(o TTFB inclui o corpo inteiro, já que o cliente lê a resposta toda).
+"""
+import argparse
+import statistics
+import time
+
+import httpx
+
+from app.utils.compression import brotli
+
+PACIENTE = {
+    "nome": "Paciente Benchmark", "sexo": "F", "idade": 54, "peso": 82.5, "altura": 163,
+    "hba1c": 7.8, "cintura": 98
+}
+
+CASOS = [
+    ("GET /", "GET", "/", None),
+    ("gerar-dieta markdown", "POST", "/gerar-dieta?mode=python_only&formato=markdown", PACIENTE),
+    ("gerar-dieta json", "POST", "/gerar-dieta?mode=python_only&formato=json", PACIENTE),
+    ("gerar-dieta ambos", "POST", "/gerar-dieta?mode=python_only&formato=ambos", PACIENTE),
+]
+
+
+def medir(cliente, metodo: str, caminho: str, corpo, codificacao: str, n: int) -> dict:
+    """Mediana de TTFB e tempo total e bytes transferidos na codificação pedida"""
+    ttfb, total = [], []
+    transferido = 0
+    for _ in range(n):
+        inicio = time.perf_counter()
+        with cliente.stream(metodo, caminho, json=corpo, headers={"Accept-Encoding": codificacao}) as r:
+            ttfb.append(time.perf_counter() - inicio)
+            transferido = sum(len(parte) for parte in r.iter_raw())
+            total.append(time.perf_counter() - inicio)
+            r.raise_for_status()
+            usada = r.headers.get("content-encoding", "identity")
+    return {
+        'bytes': transferido,
+        'codificacao': usada,
+        'ttfb_ms': statistics.median(ttfb) * 1000,
+        'total_ms': statistics.median(total) * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20, help="Requisições por medição")
+    parser.add_argument("--url", default=None, help="Servidor em execução (padrão: TestClient em processo)")
+    args = parser.parse_args()
+
+    if args.url:
+        cliente = httpx.Client(base_url=args.url, timeout=120)
+    else:
+        from fastapi.testclient import TestClient
+        from app.main import app
+        cliente = TestClient(app).__enter__()
+
+    codificacoes = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+    try:
+        for nome, metodo, caminho, corpo in CASOS:
+            medicoes = {c: medir(cliente, metodo, caminho, corpo, c, args.n) for c in codificacoes}
+            original = medicoes["identity"]['bytes']
+            partes = [
+                f"{m['codificacao']} {m['bytes'] / 1024:.1f} KB ({m['bytes'] / original:.0%}) "
+                f"ttfb {m['ttfb_ms']:.1f} ms total {m['total_ms']:.1f} ms"
+                for m in medicoes.values()
+            ]
+            print(f"{nome:22s} " + " | ".join(partes))
+    finally:
+        if args.url:
+            cliente.close()
+        else:
+            cliente.__exit__(None, None, None)
+
+
+if __name__ == "__main__":
+    main()
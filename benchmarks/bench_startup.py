@@ -0,0 +1,79 @@
+"""
+Benchmark do cold start (base de alimentos: snapshot x literais Python)
+
+Uso:
+    python -m benchmarks.bench_startup [--n 10]
+
+Cada medição roda em um processo novo, sem bytecode em cache
+(PYTHONDONTWRITEBYTECODE, como em um deploy sem .pyc), e reporta a mediana:
+tempo de import dos módulos de dados (após settings/pydantic), memória
+alocada por eles (tracemalloc), tempo de import de app.main e RSS máximo
+do processo.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_MEDICAO = r"""
+import json, resource, sys, time, tracemalloc
+memoria = sys.argv[1] == 'memoria'
+inicio_total = time.perf_counter()
+import app.config.settings
+if memoria:
+    tracemalloc.start()
+inicio = time.perf_counter()
+import app.data.alimentos_base, app.data.substituicoes
+dados_ms = (time.perf_counter() - inicio) * 1000
+if memoria:
+    print(json.dumps({'dados_kb': tracemalloc.get_traced_memory()[0] / 1024}))
+    sys.exit()
+import app.main
+print(json.dumps({
+    'dados_ms': dados_ms,
+    'app_ms': (time.perf_counter() - inicio_total) * 1000,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def medir(snapshot: bool, n: int) -> dict:
+    """Mediana de n processos com o snapshot ativado ou desativado"""
+    env = {
+        **os.environ,
+        'PYTHONDONTWRITEBYTECODE': '1',
+        'FOOD_SNAPSHOT': '1' if snapshot else '0',
+    }
+    env.pop('ANTHROPIC_API_KEY', None)
+    mediana = {}
+    # Tempo sem tracemalloc (o rastreamento distorce o import)
+    for modo in ('tempo', 'memoria'):
+        resultados = []
+        for _ in range(n):
+            saida = subprocess.run(
+                [sys.executable, '-c', _MEDICAO, modo],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            resultados.append(json.loads(saida.strip().splitlines()[-1]))
+        for campo in resultados[0]:
+            mediana[campo] = statistics.median(r[campo] for r in resultados)
+    return mediana
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=10, help="Processos por configuração")
+    args = parser.parse_args()
+
+    for nome, snapshot in (("literais", False), ("snapshot", True)):
+        r = medir(snapshot, args.n)
+        print(
+            f"{nome:9s} dados: {r['dados_ms']:.2f} ms, {r['dados_kb']:.0f} KB | "
+            f"app.main: {r['app_ms']:.0f} ms, RSS {r['rss_mb']:.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,199 +3,183 @@
  * Frontend JavaScript
  */
 
-// Elementos do DOM
 const form = document.getElementById('dietForm');
 const submitBtn = document.getElementById('submitBtn');
+const clearBtn = document.getElementById('clearBtn');
 const btnText = submitBtn.querySelector('.btn-text');
 const btnLoading = submitBtn.querySelector('.btn-loading');
+const btnLoadingText = submitBtn.querySelector('.btn-loading-text');
 const preview = document.getElementById('preview');
-
-// Inputs para preview
+const contagemChoCheckbox = document.getElementById('contagem_cho');
+const choOptions = document.getElementById('cho_options');
+const checkIcon = contagemChoCheckbox.parentElement.querySelector('.check-icon');
+
+// Toggle carb counting options
+contagemChoCheckbox.addEventListener('change', function() {
+    choOptions.classList.toggle('hidden', !this.checked);
+    checkIcon.classList.toggle('hidden', !this.checked);
+});
 const idadeInput = document.getElementById('idade');
 const pesoInput = document.getElementById('peso');
 const alturaInput = document.getElementById('altura');
+const cinturaInput = document.getElementById('cintura');
 const sexoInputs = document.querySelectorAll('input[name="sexo"]');
-
-// Elementos de preview
+const tipoDietaSelect = document.getElementById('tipo_dieta');
+const nivelDeficitSelect = document.getElementById('nivel_deficit');
 const previewImc = document.getElementById('preview-imc');
 const previewClassificacao = document.getElementById('preview-classificacao');
 const previewMeta = document.getElementById('preview-meta');
 const previewAgua = document.getElementById('preview-agua');
+const riscoCvDiv = document.getElementById('risco-cv');
+const previewRisco = document.getElementById('preview-risco');
 
-/**
- * Debounce para limitar chamadas de função
- */
 function debounce(func, wait) {
     let timeout;
-    return function executedFunction(...args) {
-        const later = () => {
-            clearTimeout(timeout);
-            func(...args);
-        };
+    return function(...args) {
         clearTimeout(timeout);
-        timeout = setTimeout(later, wait);
+        timeout = setTimeout(() => func(...args), wait);
     };
 }
 
-/**
- * Atualiza o preview dos cálculos
- */
 async function updatePreview() {
     const peso = parseFloat(pesoInput.value);
     const altura = parseFloat(alturaInput.value);
     const idade = parseInt(idadeInput.value);
     const sexo = document.querySelector('input[name="sexo"]:checked')?.value;
+    const cintura = cinturaInput.value ? parseFloat(cinturaInput.value) : null;
+    const nivelDeficit = nivelDeficitSelect.value;
 
-    // Verificar se todos os campos necessários estão preenchidos
-    if (!peso || !altura || !idade || !sexo) {
-        preview.classList.add('hidden');
-        return;
-    }
-
-    // Validar ranges
-    if (peso < 40 || peso > 300 || altura < 140 || altura > 220 || idade < 18 || idade > 100) {
+    if (!peso || !altura || !idade || !sexo || peso < 40 || peso > 300 || altura < 140 || altura > 220 || idade < 18 || idade > 100) {
         preview.classList.add('hidden');
         return;
     }
 
     try {
-        const response = await fetch(`/api/calcular-preview?peso=${peso}&altura=${altura}&idade=${idade}&sexo=${sexo}`);
-
-        if (!response.ok) {
-            throw new Error('Erro ao calcular preview');
-        }
+        let url = `/api/calcular-preview?peso=${peso}&altura=${altura}&idade=${idade}&sexo=${sexo}&nivel_deficit=${nivelDeficit}`;
+        if (cintura) url += `&cintura=${cintura}`;
 
+        const response = await fetch(url);
+        if (!response.ok) throw new Error('Erro');
         const data = await response.json();
 
-        // Atualizar elementos de preview
         previewImc.textContent = `${data.imc} kg/m²`;
         previewClassificacao.textContent = data.classificacao_imc;
         previewMeta.textContent = `${data.meta_calorica} kcal`;
         previewAgua.textContent = `${data.agua_litros} L`;
+        previewImc.style.color = data.imc < 18.5 ? '#ffc107' : data.imc < 25 ? '#28a745' : data.imc < 30 ? '#fd7e14' : '#dc3545';
 
-        // Colorir IMC de acordo com classificação
-        if (data.imc < 18.5) {
-            previewImc.style.color = '#ffc107'; // Amarelo
-        } else if (data.imc < 25) {
-            previewImc.style.color = '#28a745'; // Verde
-        } else if (data.imc < 30) {
-            previewImc.style.color = '#fd7e14'; // Laranja
+        if (data.risco_cardiovascular) {
+            previewRisco.textContent = `${data.risco_cardiovascular} (Cintura/Altura: ${data.relacao_cintura_altura})`;
+            riscoCvDiv.classList.remove('hidden');
         } else {
-            previewImc.style.color = '#dc3545'; // Vermelho
+            riscoCvDiv.classList.add('hidden');
         }
 
         preview.classList.remove('hidden');
-
     } catch (error) {
-        console.error('Erro no preview:', error);
         preview.classList.add('hidden');
     }
 }
 
-// Debounced version da função de preview
 const debouncedUpdatePreview = debounce(updatePreview, 500);
+[idadeInput, pesoInput, alturaInput, cinturaInput].forEach(input => input.addEventListener('input', debouncedUpdatePreview));
+sexoInputs.forEach(input => input.addEventListener('change', debouncedUpdatePreview));
+nivelDeficitSelect.addEventListener('change', debouncedUpdatePreview);
 
-// Event listeners para preview
-[idadeInput, pesoInput, alturaInput].forEach(input => {
-    input.addEventListener('input', debouncedUpdatePreview);
-});
-
-sexoInputs.forEach(input => {
-    input.addEventListener('change', debouncedUpdatePreview);
-});
-
-/**
- * Define o estado de loading do botão
- */
 function setLoadingState(isLoading) {
     submitBtn.disabled = isLoading;
     btnText.classList.toggle('hidden', isLoading);
     btnLoading.classList.toggle('hidden', !isLoading);
+    btnLoadingText.textContent = 'Gerando dieta...';
 }
 
-/**
- * Mostra mensagem de erro ao usuário
- */
-function showError(message) {
-    // Criar elemento de alerta
-    const alert = document.createElement('div');
-    alert.className = 'alert alert-error';
-    alert.style.cssText = `
-        position: fixed;
-        top: 20px;
-        right: 20px;
-        padding: 16px 24px;
-        background: #fee2e2;
-        border: 1px solid #fecaca;
-        border-radius: 8px;
-        color: #991b1b;
-        font-size: 14px;
-        max-width: 400px;
-        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
-        z-index: 1000;
-        animation: slideIn 0.3s ease;
-    `;
-    alert.textContent = message;
-
-    // Adicionar animação
-    const style = document.createElement('style');
-    style.textContent = `
-        @keyframes slideIn {
-            from { transform: translateX(100%); opacity: 0; }
-            to { transform: translateX(0); opacity: 1; }
-        }
-    `;
-    document.head.appendChild(style);
+// Texto do botão em cada etapa do job de geração
+const etapaLabels = {
+    nutricao: 'Calculando nutrição...',
+    refeicoes: 'Montando refeições...',
+    formatacao: 'Formatando plano...',
+    processamento: 'Gerando dieta...'
+};
+
+function showEtapa(dados) {
+    if (dados.etapa === 'api') {
+        const saida = dados.estimado ? `~${dados.tokens_saida}` : dados.tokens_saida;
+        btnLoadingText.textContent = `IA escrevendo... ${saida} tokens`;
+    } else {
+        btnLoadingText.textContent = etapaLabels[dados.etapa] || 'Gerando dieta...';
+    }
+}
 
-    document.body.appendChild(alert);
+async function gerarDietaDireto(formData) {
+    const response = await fetch('/gerar-dieta', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(formData)
+    });
+    if (!response.ok) {
+        const err = await response.json().catch(() => ({}));
+        throw new Error(err.detail || 'Erro ao gerar dieta');
+    }
+    return response.json();
+}
+
+// Gera a dieta por job com progresso via SSE (/api/jobs/gerar-dieta);
+// sem EventSource ou sem a API de jobs, usa /gerar-dieta direto
+async function gerarDieta(formData) {
+    if (!window.EventSource) return gerarDietaDireto(formData);
 
-    // Remover após 5 segundos
-    setTimeout(() => {
-        alert.style.animation = 'slideIn 0.3s ease reverse';
-        setTimeout(() => alert.remove(), 300);
-    }, 5000);
+    const response = await fetch('/api/jobs/gerar-dieta', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(formData)
+    });
+    if (response.status === 404 || response.status === 405) return gerarDietaDireto(formData);
+    if (!response.ok) {
+        const err = await response.json().catch(() => ({}));
+        throw new Error(err.detail || 'Erro ao gerar dieta');
+    }
+    const job = await response.json();
+    if (job.estado === 'concluido') return job.resultado;
+    if (job.estado === 'falhou') throw new Error(job.erro || 'Erro ao gerar dieta');
+
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(job.eventos_url);
+        source.addEventListener('etapa', (e) => showEtapa(JSON.parse(e.data)));
+        source.addEventListener('resultado', (e) => {
+            source.close();
+            resolve(JSON.parse(e.data));
+        });
+        source.addEventListener('erro', (e) => {
+            source.close();
+            reject(new Error(JSON.parse(e.data).erro || 'Erro ao gerar dieta'));
+        });
+        source.onerror = () => {
+            // Queda de conexão: o EventSource reconecta sozinho (Last-Event-ID).
+            // Fechado de vez (ex.: job expirado): consultar o status uma vez;
+            // job desconhecido neste servidor (404): gerar por /gerar-dieta
+            if (source.readyState !== EventSource.CLOSED) return;
+            fetch(job.status_url)
+                .then(r => {
+                    if (r.status === 404) return gerarDietaDireto(formData);
+                    if (!r.ok) throw new Error('Conexão com o servidor perdida');
+                    return r.json().then(s => {
+                        if (s.estado === 'concluido') return s.resultado;
+                        throw new Error(s.erro || 'Conexão com o servidor perdida');
+                    });
+                })
+                .then(resolve, reject);
+        };
+    });
 }
 
-/**
- * Mostra mensagem de sucesso ao usuário
- */
-function showSuccess(message, metadata) {
+function showAlert(message, isError = true) {
     const alert = document.createElement('div');
-    alert.style.cssText = `
-        position: fixed;
-        top: 20px;
-        right: 20px;
-        padding: 16px 24px;
-        background: #d1fae5;
-        border: 1px solid #a7f3d0;
-        border-radius: 8px;
-        color: #065f46;
-        font-size: 14px;
-        max-width: 400px;
-        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
-        z-index: 1000;
-        animation: slideIn 0.3s ease;
-    `;
-
-    alert.innerHTML = `
-        <strong>Dieta gerada com sucesso!</strong><br>
-        <small>
-            IMC: ${metadata.imc} (${metadata.classificacao_imc})<br>
-            Meta calórica: ${metadata.meta_calorica} kcal/dia
-        </small>
-    `;
-
+    alert.style.cssText = `position:fixed;top:20px;right:20px;padding:16px 24px;background:${isError?'#fee2e2':'#d1fae5'};border:1px solid ${isError?'#fecaca':'#a7f3d0'};border-radius:8px;color:${isError?'#991b1b':'#065f46'};font-size:14px;max-width:400px;box-shadow:0 4px 6px -1px rgba(0,0,0,0.1);z-index:1000;`;
+    alert.innerHTML = message;
     document.body.appendChild(alert);
-
-    setTimeout(() => {
-        alert.style.animation = 'slideIn 0.3s ease reverse';
-        setTimeout(() => alert.remove(), 300);
-    }, 5000);
+    setTimeout(() => alert.remove(), 5000);
 }
 
-/**
- * Faz o download do arquivo Markdown
- */
 function downloadMarkdown(content, filename) {
     const blob = new Blob([content], { type: 'text/markdown;charset=utf-8' });
     const url = URL.createObjectURL(blob);
@@ -208,131 +192,538 @@ function downloadMarkdown(content, filename) {
     URL.revokeObjectURL(url);
 }
 
-/**
- * Valida o formulário antes de enviar
- */
-function validateForm(formData) {
-    const errors = [];
+function clearForm() {
+    form.reset();
+    preview.classList.add('hidden');
+    riscoCvDiv.classList.add('hidden');
+    choOptions.classList.add('hidden');
+    checkIcon.classList.add('hidden');
+    document.getElementById('nome').focus();
+}
+
+clearBtn.addEventListener('click', clearForm);
+
+async function handleSubmit(event) {
+    event.preventDefault();
+    const formData = {
+        nome: document.getElementById('nome').value.trim(),
+        sexo: document.querySelector('input[name="sexo"]:checked')?.value || '',
+        idade: parseInt(document.getElementById('idade').value) || 0,
+        peso: parseFloat(document.getElementById('peso').value) || 0,
+        altura: parseFloat(document.getElementById('altura').value) || 0,
+        hba1c: document.getElementById('hba1c').value ? parseFloat(document.getElementById('hba1c').value) : null,
+        glicemia: document.getElementById('glicemia').value ? parseFloat(document.getElementById('glicemia').value) : null,
+        cintura: document.getElementById('cintura').value ? parseFloat(document.getElementById('cintura').value) : null,
+        tipo_dieta: document.getElementById('tipo_dieta').value,
+        nivel_deficit: document.getElementById('nivel_deficit').value,
+        contagem_cho: document.getElementById('contagem_cho').checked,
+        razao_insulina_cho: document.getElementById('razao_insulina_cho').value ? parseFloat(document.getElementById('razao_insulina_cho').value) : null
+    };
 
-    if (!formData.nome || formData.nome.trim().length < 3) {
-        errors.push('Nome deve ter pelo menos 3 caracteres');
+    if (!formData.nome || formData.nome.length < 3) { showAlert('Nome deve ter pelo menos 3 caracteres'); return; }
+    if (!formData.sexo) { showAlert('Selecione o sexo'); return; }
+    if (formData.idade < 18 || formData.idade > 100) { showAlert('Idade deve estar entre 18 e 100 anos'); return; }
+    if (formData.peso < 40 || formData.peso > 300) { showAlert('Peso deve estar entre 40 e 300 kg'); return; }
+    if (formData.altura < 140 || formData.altura > 220) { showAlert('Altura deve estar entre 140 e 220 cm'); return; }
+
+    setLoadingState(true);
+    try {
+        const data = await gerarDieta(formData);
+        if (data.success) {
+            downloadMarkdown(data.markdown, data.filename);
+            const m = data.metadata;
+            const modeLabels = {
+                'python_only': '🐍 Python (Gratuito)',
+                'api_minimal': '🤖 API Minimal',
+                'api_full': '🤖 API Completa'
+            };
+            const modeLabel = modeLabels[m.mode_used] || m.mode_used;
+            const costText = m.cost_usd > 0 ? `$${m.cost_usd.toFixed(3)}` : 'Gratuito';
+            const choText = m.contagem_cho ? '<br><strong>📊 Contagem de CHO:</strong> Ativada' : '';
+            showAlert(`<strong>Dieta gerada com sucesso!</strong><br>
+                <small>
+                <strong>Modo:</strong> ${modeLabel}<br>
+                <strong>Custo:</strong> ${costText}<br>
+                <strong>Complexidade:</strong> ${m.complexity_score}/10<br>
+                <strong>Tempo:</strong> ${m.generation_time_seconds}s<br>
+                <strong>IMC:</strong> ${m.imc} (${m.classificacao_imc})<br>
+                <strong>Meta:</strong> ${m.meta_calorica} kcal/dia${choText}
+                </small>`, false);
+        }
+    } catch (error) {
+        showAlert(`Erro ao gerar dieta: ${error.message}`);
+    } finally {
+        setLoadingState(false);
     }
+}
 
-    if (!formData.sexo) {
-        errors.push('Selecione o sexo');
+// Event listener será adicionado após a integração FEEGOW
+
+// ============================================================
+// FEEGOW Integration
+// ============================================================
+const feegowSection = document.getElementById('feegowSection');
+const feegowSearchInput = document.getElementById('feegowSearch');
+const feegowSearchBtn = document.getElementById('feegowSearchBtn');
+const feegowResults = document.getElementById('feegowResults');
+const feegowStatus = document.getElementById('feegowStatus');
+const feegowPatientIdInput = document.getElementById('feegow_patient_id');
+
+let feegowConfigured = false;
+let lastGeneratedDiet = null;
+
+// Check FEEGOW status on page load
+async function checkFeegowStatus() {
+    try {
+        const response = await fetch('/api/feegow/status');
+        const data = await response.json();
+        feegowConfigured = data.configured;
+        if (feegowConfigured) {
+            feegowSection.classList.remove('hidden');
+            feegowStatus.textContent = '';
+        } else {
+            feegowSection.classList.add('hidden');
+        }
+    } catch (error) {
+        feegowSection.classList.add('hidden');
     }
+}
 
-    if (!formData.idade || formData.idade < 18 || formData.idade > 100) {
-        errors.push('Idade deve estar entre 18 e 100 anos');
+// Search patients in FEEGOW
+async function searchFeegowPatients() {
+    const query = feegowSearchInput.value.trim();
+    if (!query || query.length < 2) {
+        feegowStatus.textContent = 'Digite pelo menos 2 caracteres para buscar';
+        feegowResults.classList.add('hidden');
+        return;
     }
 
-    if (!formData.peso || formData.peso < 40 || formData.peso > 300) {
-        errors.push('Peso deve estar entre 40 e 300 kg');
+    feegowSearchBtn.disabled = true;
+    feegowSearchBtn.innerHTML = '<svg class="spinner" viewBox="0 0 24 24" width="14" height="14" style="display:inline;vertical-align:middle"><circle class="spinner-circle" cx="12" cy="12" r="10" fill="none" stroke="currentColor" stroke-width="3"></circle></svg> Buscando...';
+    feegowStatus.textContent = '';
+    feegowResults.classList.add('hidden');
+
+    try {
+        // Determine search type
+        let url = '/api/feegow/patients/search?';
+        const cleanQuery = query.replace(/[.-]/g, '');
+        if (/^\d+$/.test(cleanQuery) && cleanQuery.length === 11) {
+            url += `cpf=${query}`;
+        } else if (/^\d+$/.test(cleanQuery)) {
+            url += `prontuario=${query}`;
+        } else {
+            url += `nome=${encodeURIComponent(query)}`;
+        }
+
+        const response = await fetch(url);
+        if (!response.ok) {
+            const err = await response.json().catch(() => ({}));
+            throw new Error(err.detail || 'Erro na busca');
+        }
+
+        const data = await response.json();
+        if (data.patients && data.patients.length > 0) {
+            renderFeegowPatients(data.patients);
+        } else {
+            feegowStatus.textContent = 'Nenhum paciente encontrado';
+            feegowResults.classList.add('hidden');
+        }
+    } catch (error) {
+        feegowStatus.textContent = `Erro: ${error.message}`;
+        feegowResults.classList.add('hidden');
+    } finally {
+        feegowSearchBtn.disabled = false;
+        feegowSearchBtn.innerHTML = '<svg xmlns="http://www.w3.org/2000/svg" width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" style="display:inline;vertical-align:middle;margin-right:4px"><circle cx="11" cy="11" r="8"></circle><path d="m21 21-4.35-4.35"></path></svg> Buscar';
     }
+}
+
+// Render patient search results
+function renderFeegowPatients(patients) {
+    feegowResults.innerHTML = patients.map(p => `
+        <div class="feegow-patient" data-id="${p.id}" data-patient='${JSON.stringify(p).replace(/'/g, "&#39;")}'>
+            <div class="feegow-patient-info">
+                <div class="feegow-patient-name">${p.nome}</div>
+                <div class="feegow-patient-details">
+                    ${p.prontuario ? `Prontuário: ${p.prontuario} | ` : ''}
+                    ${p.data_nascimento ? `Nasc: ${formatDate(p.data_nascimento)}` : ''}
+                    ${p.sexo ? ` | ${p.sexo === 'M' ? 'Masculino' : 'Feminino'}` : ''}
+                </div>
+            </div>
+            <span class="feegow-patient-select">Selecionar →</span>
+        </div>
+    `).join('');
+    feegowResults.classList.remove('hidden');
+
+    // Add click handlers
+    feegowResults.querySelectorAll('.feegow-patient').forEach(el => {
+        el.addEventListener('click', () => selectFeegowPatient(JSON.parse(el.dataset.patient.replace(/&#39;/g, "'"))));
+    });
+}
 
-    if (!formData.altura || formData.altura < 140 || formData.altura > 220) {
-        errors.push('Altura deve estar entre 140 e 220 cm');
+// Format date from YYYY-MM-DD to DD/MM/YYYY
+function formatDate(dateStr) {
+    if (!dateStr) return '';
+    const parts = dateStr.split('-');
+    if (parts.length === 3) {
+        return `${parts[2]}/${parts[1]}/${parts[0]}`;
     }
+    return dateStr;
+}
 
-    // Validar HbA1c se preenchido
-    if (formData.hba1c !== null && (formData.hba1c < 4 || formData.hba1c > 15)) {
-        errors.push('HbA1c deve estar entre 4% e 15%');
+// Calculate age from birth date
+function calculateAge(birthDateStr) {
+    if (!birthDateStr) return null;
+    const birthDate = new Date(birthDateStr);
+    const today = new Date();
+    let age = today.getFullYear() - birthDate.getFullYear();
+    const monthDiff = today.getMonth() - birthDate.getMonth();
+    if (monthDiff < 0 || (monthDiff === 0 && today.getDate() < birthDate.getDate())) {
+        age--;
     }
+    return age;
+}
+
+// Select and auto-fill patient data
+function selectFeegowPatient(patient) {
+    // Store FEEGOW patient ID
+    feegowPatientIdInput.value = patient.id;
 
-    // Validar glicemia se preenchida
-    if (formData.glicemia !== null && (formData.glicemia < 70 || formData.glicemia > 400)) {
-        errors.push('Glicemia deve estar entre 70 e 400 mg/dL');
+    // Auto-fill form fields
+    if (patient.nome) document.getElementById('nome').value = patient.nome;
+    if (patient.sexo) {
+        const sexoRadio = document.querySelector(`input[name="sexo"][value="${patient.sexo}"]`);
+        if (sexoRadio) sexoRadio.checked = true;
     }
 
-    return errors;
-}
+    // Calculate and fill age
+    if (patient.data_nascimento) {
+        const age = calculateAge(patient.data_nascimento);
+        if (age && age >= 18 && age <= 100) {
+            document.getElementById('idade').value = age;
+        }
+    }
 
-/**
- * Handler do envio do formulário
- */
-async function handleSubmit(event) {
-    event.preventDefault();
+    // Fill weight and height if available
+    if (patient.peso && patient.peso >= 40 && patient.peso <= 300) {
+        document.getElementById('peso').value = patient.peso;
+    }
+    if (patient.altura) {
+        // FEEGOW might return height in meters or cm
+        let altura = patient.altura;
+        if (altura < 3) altura = altura * 100; // Convert m to cm
+        if (altura >= 140 && altura <= 220) {
+            document.getElementById('altura').value = Math.round(altura);
+        }
+    }
 
-    // Coletar dados do formulário
-    const formData = {
-        nome: document.getElementById('nome').value.trim(),
-        sexo: document.querySelector('input[name="sexo"]:checked')?.value || '',
-        idade: parseInt(document.getElementById('idade').value) || 0,
-        peso: parseFloat(document.getElementById('peso').value) || 0,
-        altura: parseFloat(document.getElementById('altura').value) || 0,
-        hba1c: document.getElementById('hba1c').value ? parseFloat(document.getElementById('hba1c').value) : null,
-        glicemia: document.getElementById('glicemia').value ? parseFloat(document.getElementById('glicemia').value) : null
+    // Hide results and show success
+    feegowResults.classList.add('hidden');
+    feegowSearchInput.value = '';
+    feegowStatus.innerHTML = `<span style="color:#059669">✓ Paciente <strong>${patient.nome}</strong> selecionado</span>`;
+
+    // Trigger preview update
+    updatePreview();
+}
+
+// Plano fora deste servidor (expirado ou outra instância serverless): o
+// documento vai no corpo da requisição, junto com o plan_id
+function documentoDoPlano() {
+    return {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            markdown: lastGeneratedDiet.markdown,
+            patient_name: lastGeneratedDiet.patientName
+        })
     };
+}
 
-    // Validar
-    const errors = validateForm(formData);
-    if (errors.length > 0) {
-        showError(errors.join('. '));
+// Download do PDF pelo ID do plano, reenviando o documento se o servidor não o tiver
+async function baixarPdf(event) {
+    event.preventDefault();
+    const url = `/api/planos/${lastGeneratedDiet.planId}/pdf`;
+    try {
+        let response = await fetch(url);
+        if (response.status === 404) {
+            response = await fetch(url, documentoDoPlano());
+        }
+        if (!response.ok) {
+            const err = await response.json().catch(() => ({}));
+            throw new Error(err.detail || 'Erro ao gerar PDF');
+        }
+        const blob = await response.blob();
+        const link = document.createElement('a');
+        link.href = URL.createObjectURL(blob);
+        link.download = lastGeneratedDiet.filename.replace(/\.md$/, '.pdf');
+        document.body.appendChild(link);
+        link.click();
+        document.body.removeChild(link);
+        URL.revokeObjectURL(link.href);
+    } catch (error) {
+        showAlert(`Erro ao baixar PDF: ${error.message}`);
+    }
+}
+
+// Upload diet to FEEGOW
+async function uploadDietToFeegow() {
+    if (!lastGeneratedDiet || !feegowPatientIdInput.value) {
+        showAlert('Selecione um paciente do FEEGOW e gere a dieta primeiro');
         return;
     }
 
-    // Ativar estado de loading
-    setLoadingState(true);
+    const uploadBtn = document.getElementById('feegowUploadBtn');
+    if (uploadBtn) {
+        uploadBtn.disabled = true;
+        uploadBtn.innerHTML = '<svg class="spinner" viewBox="0 0 24 24" width="14" height="14" style="display:inline;vertical-align:middle"><circle class="spinner-circle" cx="12" cy="12" r="10" fill="none" stroke="currentColor" stroke-width="3"></circle></svg> Enviando...';
+    }
 
     try {
-        // Enviar para o backend
-        const response = await fetch('/gerar-dieta', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify(formData)
+        // Documento lido do servidor pelo ID do plano (não trafega de novo pela URL)
+        const params = new URLSearchParams({
+            patient_id: feegowPatientIdInput.value,
+            plan_id: lastGeneratedDiet.planId,
+            patient_name: lastGeneratedDiet.patientName
         });
 
+        let response = await fetch(`/api/feegow/upload-diet?${params}`, {
+            method: 'POST'
+        });
+        if (response.status === 404) {
+            response = await fetch(`/api/feegow/upload-diet?${params}`, documentoDoPlano());
+        }
+
         if (!response.ok) {
-            const errorData = await response.json().catch(() => ({}));
-            throw new Error(errorData.detail || 'Erro ao gerar dieta');
+            const err = await response.json().catch(() => ({}));
+            throw new Error(err.detail || 'Erro no upload');
         }
 
-        const data = await response.json();
+        // Upload enfileirado: acompanhar o job até concluir (ou desistir de esperar)
+        let job = await response.json();
+        for (let i = 0; i < 20 && (job.status === 'pendente' || job.status === 'enviando'); i++) {
+            await new Promise(resolve => setTimeout(resolve, 1500));
+            const statusResponse = await fetch(`/api/feegow/uploads/${job.job_id}`);
+            if (statusResponse.ok) job = await statusResponse.json();
+        }
 
-        if (data.success) {
-            // Download do arquivo .md
-            downloadMarkdown(data.markdown, data.filename);
+        if (job.status === 'falhou') {
+            throw new Error(job.ultimo_erro || 'Erro no upload');
+        }
 
-            // Mostrar sucesso
-            showSuccess('Dieta gerada com sucesso!', data.metadata);
+        if (job.status === 'concluido') {
+            showAlert('<strong>Dieta enviada para o FEEGOW!</strong><br>O plano alimentar foi adicionado ao prontuário do paciente.', false);
         } else {
-            throw new Error('Resposta inválida do servidor');
+            showAlert('<strong>Upload em andamento</strong><br>O envio para o FEEGOW continua em segundo plano.', false);
         }
 
+        // Remove upload button after success
+        const uploadDiv = document.querySelector('.feegow-upload');
+        if (uploadDiv) uploadDiv.remove();
+
     } catch (error) {
-        console.error('Erro:', error);
-        showError(`Erro ao gerar dieta: ${error.message}`);
-    } finally {
-        // Desativar estado de loading
-        setLoadingState(false);
+        showAlert(`Erro ao enviar para FEEGOW: ${error.message}`);
+        if (uploadBtn) {
+            uploadBtn.disabled = false;
+            uploadBtn.innerHTML = '<svg xmlns="http://www.w3.org/2000/svg" width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" style="display:inline;vertical-align:middle;margin-right:4px"><path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"></path><polyline points="17 8 12 3 7 8"></polyline><line x1="12" y1="3" x2="12" y2="15"></line></svg> Enviar para FEEGOW';
+        }
     }
 }
 
-// Event listener do formulário
-form.addEventListener('submit', handleSubmit);
+// Show FEEGOW upload option after diet generation
+function showFeegowUploadOption() {
+    // Remove any existing upload div
+    const existingUpload = document.querySelector('.feegow-upload');
+    if (existingUpload) existingUpload.remove();
+
+    if (feegowConfigured && feegowPatientIdInput.value && lastGeneratedDiet) {
+        const uploadDiv = document.createElement('div');
+        uploadDiv.className = 'feegow-upload';
+        uploadDiv.innerHTML = `
+            <div style="display:flex;align-items:center;gap:0.75rem;">
+                <svg xmlns="http://www.w3.org/2000/svg" width="20" height="20" viewBox="0 0 24 24" fill="none" stroke="#059669" stroke-width="2"><path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"></path><polyline points="17 8 12 3 7 8"></polyline><line x1="12" y1="3" x2="12" y2="15"></line></svg>
+                <div style="flex:1">
+                    <div style="font-weight:600;color:#065f46;font-size:0.875rem;">Enviar para prontuário FEEGOW?</div>
+                    <div style="font-size:0.75rem;color:#047857;">A dieta será anexada ao prontuário do paciente</div>
+                </div>
+                <button type="button" id="feegowUploadBtn" class="btn" style="padding:0.5rem 1rem;font-size:0.875rem;background:#059669;color:white;border:none;border-radius:0.375rem;cursor:pointer;" onclick="uploadDietToFeegow()">
+                    <svg xmlns="http://www.w3.org/2000/svg" width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" style="display:inline;vertical-align:middle;margin-right:4px"><path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"></path><polyline points="17 8 12 3 7 8"></polyline><line x1="12" y1="3" x2="12" y2="15"></line></svg>
+                    Enviar para FEEGOW
+                </button>
+            </div>
+        `;
+        feegowSection.appendChild(uploadDiv);
+    }
+}
+
+// Event listeners for FEEGOW
+feegowSearchBtn.addEventListener('click', searchFeegowPatients);
+feegowSearchInput.addEventListener('keypress', (e) => {
+    if (e.key === 'Enter') {
+        e.preventDefault();
+        searchFeegowPatients();
+    }
+});
 
-// Prevenir submissão com Enter em campos numéricos (exceto quando está no último campo)
-document.querySelectorAll('input[type="number"]').forEach(input => {
-    input.addEventListener('keypress', (e) => {
-        if (e.key === 'Enter') {
-            e.preventDefault();
-            // Mover para o próximo campo
-            const inputs = Array.from(form.querySelectorAll('input:not([type="radio"])'));
-            const currentIndex = inputs.indexOf(e.target);
-            if (currentIndex < inputs.length - 1) {
-                inputs[currentIndex + 1].focus();
-            }
+// Create patient functionality
+const feegowCreateLink = document.getElementById('feegowCreateLink');
+const feegowCreateForm = document.getElementById('feegowCreateForm');
+const feegowCancelCreate = document.getElementById('feegowCancelCreate');
+const feegowSubmitCreate = document.getElementById('feegowSubmitCreate');
+
+// Show create form
+feegowCreateLink.addEventListener('click', () => {
+    feegowCreateForm.classList.remove('hidden');
+    feegowCreateLink.classList.add('hidden');
+    feegowResults.classList.add('hidden');
+    feegowStatus.textContent = '';
+});
+
+// Cancel create
+feegowCancelCreate.addEventListener('click', () => {
+    feegowCreateForm.classList.add('hidden');
+    feegowCreateLink.classList.remove('hidden');
+    clearCreateForm();
+});
+
+// Clear create form
+function clearCreateForm() {
+    document.getElementById('feegow_nome').value = '';
+    document.getElementById('feegow_sexo').value = '';
+    document.getElementById('feegow_nascimento').value = '';
+    document.getElementById('feegow_cpf').value = '';
+    document.getElementById('feegow_telefone').value = '';
+    document.getElementById('feegow_email').value = '';
+}
+
+// Submit create patient
+feegowSubmitCreate.addEventListener('click', async () => {
+    const nome = document.getElementById('feegow_nome').value.trim();
+    const sexo = document.getElementById('feegow_sexo').value;
+    const nascimento = document.getElementById('feegow_nascimento').value;
+    const cpf = document.getElementById('feegow_cpf').value.trim();
+    const telefone = document.getElementById('feegow_telefone').value.trim();
+    const email = document.getElementById('feegow_email').value.trim();
+
+    // Validation
+    if (!nome || nome.length < 3) {
+        showAlert('Nome deve ter pelo menos 3 caracteres');
+        return;
+    }
+    if (!sexo) {
+        showAlert('Selecione o sexo do paciente');
+        return;
+    }
+
+    feegowSubmitCreate.disabled = true;
+    feegowSubmitCreate.innerHTML = '<svg class="spinner" viewBox="0 0 24 24" width="14" height="14" style="display:inline;vertical-align:middle"><circle class="spinner-circle" cx="12" cy="12" r="10" fill="none" stroke="currentColor" stroke-width="3"></circle></svg> Cadastrando...';
+
+    try {
+        const params = new URLSearchParams({ nome, sexo });
+        if (nascimento) params.append('data_nascimento', nascimento);
+        if (cpf) params.append('cpf', cpf);
+        if (telefone) params.append('telefone', telefone);
+        if (email) params.append('email', email);
+
+        const response = await fetch(`/api/feegow/patients/create?${params}`, {
+            method: 'POST'
+        });
+
+        if (!response.ok) {
+            const err = await response.json().catch(() => ({}));
+            throw new Error(err.detail || 'Erro ao cadastrar paciente');
         }
-    });
+
+        const data = await response.json();
+        if (data.success && data.patient) {
+            showAlert('<strong>Paciente cadastrado com sucesso!</strong>', false);
+
+            // Auto-select the newly created patient
+            selectFeegowPatient(data.patient);
+
+            // Hide create form
+            feegowCreateForm.classList.add('hidden');
+            feegowCreateLink.classList.remove('hidden');
+            clearCreateForm();
+        }
+    } catch (error) {
+        showAlert(`Erro: ${error.message}`);
+    } finally {
+        feegowSubmitCreate.disabled = false;
+        feegowSubmitCreate.innerHTML = '<svg xmlns="http://www.w3.org/2000/svg" width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" style="display:inline;vertical-align:middle;margin-right:4px"><path d="M19 21H5a2 2 0 0 1-2-2V5a2 2 0 0 1 2-2h11l5 5v11a2 2 0 0 1-2 2z"></path><polyline points="17 21 17 13 7 13 7 21"></polyline><polyline points="7 3 7 8 15 8"></polyline></svg> Cadastrar e Selecionar';
+    }
 });
 
-// Inicialização
+// Modify handleSubmit to store diet for FEEGOW upload
+const originalHandleSubmit = handleSubmit;
+handleSubmit = async function(event) {
+    event.preventDefault();
+    const formData = {
+        nome: document.getElementById('nome').value.trim(),
+        sexo: document.querySelector('input[name="sexo"]:checked')?.value || '',
+        idade: parseInt(document.getElementById('idade').value) || 0,
+        peso: parseFloat(document.getElementById('peso').value) || 0,
+        altura: parseFloat(document.getElementById('altura').value) || 0,
+        hba1c: document.getElementById('hba1c').value ? parseFloat(document.getElementById('hba1c').value) : null,
+        glicemia: document.getElementById('glicemia').value ? parseFloat(document.getElementById('glicemia').value) : null,
+        cintura: document.getElementById('cintura').value ? parseFloat(document.getElementById('cintura').value) : null,
+        tipo_dieta: document.getElementById('tipo_dieta').value,
+        nivel_deficit: document.getElementById('nivel_deficit').value,
+        contagem_cho: document.getElementById('contagem_cho').checked,
+        razao_insulina_cho: document.getElementById('razao_insulina_cho').value ? parseFloat(document.getElementById('razao_insulina_cho').value) : null
+    };
+
+    if (!formData.nome || formData.nome.length < 3) { showAlert('Nome deve ter pelo menos 3 caracteres'); return; }
+    if (!formData.sexo) { showAlert('Selecione o sexo'); return; }
+    if (formData.idade < 18 || formData.idade > 100) { showAlert('Idade deve estar entre 18 e 100 anos'); return; }
+    if (formData.peso < 40 || formData.peso > 300) { showAlert('Peso deve estar entre 40 e 300 kg'); return; }
+    if (formData.altura < 140 || formData.altura > 220) { showAlert('Altura deve estar entre 140 e 220 cm'); return; }
+
+    setLoadingState(true);
+    try {
+        const data = await gerarDieta(formData);
+        if (data.success) {
+            // Store for FEEGOW upload
+            lastGeneratedDiet = {
+                planId: data.plan_id,
+                markdown: data.markdown,
+                filename: data.filename,
+                patientName: formData.nome
+            };
+
+            downloadMarkdown(data.markdown, data.filename);
+            const m = data.metadata;
+            const modeLabels = {
+                'python_only': '🐍 Python (Gratuito)',
+                'api_minimal': '🤖 API Minimal',
+                'api_full': '🤖 API Completa'
+            };
+            const modeLabel = modeLabels[m.mode_used] || m.mode_used;
+            const costText = m.cost_usd > 0 ? `$${m.cost_usd.toFixed(3)}` : 'Gratuito';
+            const choText = m.contagem_cho ? '<br><strong>📊 Contagem de CHO:</strong> Ativada' : '';
+            const pdfLink = data.plan_id ? `<br><a href="/api/planos/${data.plan_id}/pdf" onclick="baixarPdf(event)" style="color:inherit;font-weight:600;">Baixar PDF</a>` : '';
+            showAlert(`<strong>Dieta gerada com sucesso!</strong><br>
+                <small>
+                <strong>Modo:</strong> ${modeLabel}<br>
+                <strong>Custo:</strong> ${costText}<br>
+                <strong>Complexidade:</strong> ${m.complexity_score}/10<br>
+                <strong>Tempo:</strong> ${m.generation_time_seconds}s<br>
+                <strong>IMC:</strong> ${m.imc} (${m.classificacao_imc})<br>
+                <strong>Meta:</strong> ${m.meta_calorica} kcal/dia${choText}
+                </small>${pdfLink}`, false);
+
+            // Show FEEGOW upload option
+            showFeegowUploadOption();
+        }
+    } catch (error) {
+        showAlert(`Erro ao gerar dieta: ${error.message}`);
+    } finally {
+        setLoadingState(false);
+    }
+};
+
+// Adicionar event listener APÓS a função handleSubmit ser definida
+form.addEventListener('submit', handleSubmit);
+
 document.addEventListener('DOMContentLoaded', () => {
-    // Focar no primeiro campo
     document.getElementById('nome').focus();
-
-    // Verificar preview inicial se campos já estiverem preenchidos
-    updatePreview();
+    checkFeegowStatus();
 });
@@ -0,0 +1,56 @@
+"""
+Testes da importação em lote (app/services/bulk_import.py)
+"""
+import csv
+import io
+import zipfile
+
+import app.services.bulk_import as bulk_import
+from app.services.bulk_import import BulkDietImporter, nome_arquivo_seguro
+
+LINHAS = [
+    {'nome': 'Ana Souza', 'sexo': 'F', 'idade': '45', 'peso': '70', 'altura': '162'},
+    {'nome': 'Falha Proposital', 'sexo': 'M', 'idade': '50', 'peso': '90', 'altura': '175'},
+    {'nome': '../../etc/Jo/ão Jr.', 'sexo': 'M', 'idade': '60', 'peso': '85', 'altura': '170'},
+    {'nome': 'X', 'sexo': 'F', 'idade': '45', 'peso': '70', 'altura': '162'},
+]
+
+
+def _processar(linhas):
+    destino = io.BytesIO()
+    resultado = BulkDietImporter(workers=0).processar(iter(linhas), destino)
+    zf = zipfile.ZipFile(destino)
+    resumo = list(csv.DictReader(io.StringIO(zf.read('resumo.csv').decode('utf-8-sig'))))
+    return resultado, zf, resumo
+
+
+def test_erro_em_uma_linha_nao_interrompe_o_lote(monkeypatch):
+    original = bulk_import.gerar_dieta_worker
+
+    def falha_em_uma(patient):
+        if patient.nome == 'Falha Proposital':
+            raise RuntimeError("falha simulada")
+        return original(patient)
+
+    monkeypatch.setattr(bulk_import, 'gerar_dieta_worker', falha_em_uma)
+    resultado, zf, resumo = _processar(LINHAS)
+
+    assert resultado == {'total_linhas': 4, 'planos_gerados': 2, 'linhas_invalidas': 1, 'erros_geracao': 1}
+    status = {linha['nome']: (linha['status'], linha['erro']) for linha in resumo}
+    assert status['Falha Proposital'] == ('erro', 'RuntimeError: falha simulada')
+    assert status['Ana Souza'][0] == 'gerado'
+    assert status['X'][0] == 'invalido'
+    assert len([n for n in zf.namelist() if n.endswith('.md')]) == 2
+
+
+def test_nomes_de_arquivo_no_zip_sao_planos():
+    _, zf, _ = _processar(LINHAS[2:3])
+    arquivos = [n for n in zf.namelist() if n.endswith('.md')]
+    assert len(arquivos) == 1
+    assert '/' not in arquivos[0] and '..' not in arquivos[0]
+
+
+def test_nome_arquivo_seguro():
+    assert nome_arquivo_seguro('Maria da Silva') == 'Maria_da_Silva'
+    assert nome_arquivo_seguro('Dr. João Jr.') == 'Dr_João_Jr'
+    assert nome_arquivo_seguro('../..') == 'paciente'
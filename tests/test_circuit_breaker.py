@@ -0,0 +1,91 @@
+"""
+Testes das transições de estado do circuit breaker (app/utils/circuit_breaker.py)
+"""
+import time
+
+import pytest
+
+from app.utils.circuit_breaker import CircuitBreaker
+
+
+class Relogio:
+    """time.monotonic controlado pelo teste"""
+
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(time, "monotonic", relogio)
+    return relogio
+
+
+@pytest.fixture
+def circuito(relogio):
+    return CircuitBreaker("teste", janela=4, min_chamadas=4, taxa_falhas=0.5, tempo_aberto=30)
+
+
+def _chamadas(circuito, resultados, segundos=0.1, lenta_acima=0):
+    for sucesso in resultados:
+        assert circuito.permitir()
+        circuito.registrar(segundos, sucesso, lenta_acima)
+
+
+def test_nao_abre_antes_do_minimo_de_chamadas(circuito):
+    _chamadas(circuito, [False, False, False])
+    assert circuito.estado == CircuitBreaker.FECHADO
+
+
+def test_nao_abre_com_taxa_no_limite(circuito):
+    _chamadas(circuito, [False, False, True, True])
+    assert circuito.estado == CircuitBreaker.FECHADO
+
+
+def test_abre_acima_da_taxa_e_recusa(circuito):
+    _chamadas(circuito, [True, False, False, False])
+    assert circuito.estado == CircuitBreaker.ABERTO
+    assert not circuito.permitir()
+    assert circuito.stats()['recusadas'] == 1
+    assert circuito.stats()['aberturas'] == 1
+
+
+def test_chamadas_lentas_contam_como_falha(circuito):
+    _chamadas(circuito, [True, True, True, True], segundos=5, lenta_acima=2)
+    assert circuito.estado == CircuitBreaker.ABERTO
+    assert circuito.stats()['lentas'] == 4
+
+
+def test_meio_aberto_libera_uma_unica_chamada_de_teste(circuito, relogio):
+    _chamadas(circuito, [False] * 4)
+    relogio.agora += 30
+    assert circuito.estado == CircuitBreaker.MEIO_ABERTO
+    assert circuito.permitir()
+    assert not circuito.permitir()
+
+
+def test_teste_com_sucesso_fecha_e_zera_a_janela(circuito, relogio):
+    _chamadas(circuito, [False] * 4)
+    relogio.agora += 30
+    _chamadas(circuito, [True])
+    assert circuito.estado == CircuitBreaker.FECHADO
+    assert circuito.stats()['chamadas_janela'] == 0
+    # Janela zerada: falhas antigas não reabrem o circuito
+    _chamadas(circuito, [False, False, False])
+    assert circuito.estado == CircuitBreaker.FECHADO
+
+
+def test_teste_com_falha_abre_de_novo(circuito, relogio):
+    _chamadas(circuito, [False] * 4)
+    relogio.agora += 30
+    _chamadas(circuito, [False])
+    assert circuito.estado == CircuitBreaker.ABERTO
+    assert circuito.stats()['aberturas'] == 2
+    relogio.agora += 29
+    assert not circuito.permitir()
+    relogio.agora += 1
+    assert circuito.permitir()
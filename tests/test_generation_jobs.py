@@ -0,0 +1,108 @@
+"""
+Testes dos jobs de geração compartilhados entre workers (app/services/generation_jobs.py)
+"""
+import asyncio
+import time
+
+from app.services.generation_jobs import CONCLUIDO, FALHOU, GenerationJobs, SQLiteJobStore
+
+
+def _workers(tmp_path):
+    """Dois processos simulados com o mesmo arquivo SQLite"""
+    path = str(tmp_path / "jobs.sqlite3")
+    return GenerationJobs(store=SQLiteJobStore(path, ttl=600)), GenerationJobs(store=SQLiteJobStore(path, ttl=600))
+
+
+def test_outro_worker_responde_status_e_repete_eventos(tmp_path):
+    async def cenario():
+        dono, outro = _workers(tmp_path)
+        await dono.start()
+        liberar = asyncio.Event()
+
+        async def executar(progresso):
+            progresso("nutricao", {})
+            await liberar.wait()
+            progresso("refeicoes", {"refeicoes": 5})
+            # progresso() agenda a publicação no loop (como vindo da thread da geração)
+            await asyncio.sleep(0)
+            return {"success": True, "plano": "ok"}
+
+        job, novo = await dono.criar("k", executar)
+        # Criado no SQLite antes da resposta: o outro worker já encontra
+        em_andamento = await outro.status(job.job_id)
+        liberar.set()
+        eventos = [e async for e in outro.eventos(job.job_id) if e is not None]
+        final = await outro.status(job.job_id)
+        await dono.stop()
+        return novo, em_andamento, eventos, final
+
+    novo, em_andamento, eventos, final = asyncio.run(cenario())
+    assert novo is True
+    assert em_andamento["estado"] == "executando"
+    assert [(i, tipo) for i, tipo, _ in eventos] == [(0, "etapa"), (1, "etapa"), (2, "resultado")]
+    assert eventos[1][2] == {"etapa": "refeicoes", "refeicoes": 5}
+    assert final["estado"] == CONCLUIDO
+    assert final["resultado"] == {"success": True, "plano": "ok"}
+    assert final["eventos"] == 3
+
+
+def test_reconexao_no_outro_worker_recebe_so_os_eventos_seguintes(tmp_path):
+    async def cenario():
+        dono, outro = _workers(tmp_path)
+
+        async def executar(progresso):
+            progresso("nutricao", {})
+            await asyncio.sleep(0)
+            raise RuntimeError("falha simulada")
+
+        job, _ = await dono.criar("k", executar)
+        await job.tarefa
+        await dono.stop()
+        eventos = [e async for e in outro.eventos(job.job_id, apos=0)]
+        return eventos, await outro.status(job.job_id)
+
+    eventos, status = asyncio.run(cenario())
+    assert eventos == [(1, "erro", {"erro": "falha simulada"})]
+    assert status["estado"] == FALHOU
+    assert status["erro"] == "falha simulada"
+
+
+def test_job_inexistente_e_job_de_worker_encerrado(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"), ttl=60)
+    jobs = GenerationJobs(store=store)
+
+    class JobAntigo:
+        job_id = "antigo"
+        chave = "k"
+        estado = "executando"
+        criado_em = time.time() - 90
+
+    store.criar(JobAntigo)
+
+    async def cenario():
+        return (
+            await jobs.status("nenhum"),
+            await jobs.status("antigo"),
+            [e async for e in jobs.eventos("antigo")]
+        )
+
+    inexistente, antigo, eventos = asyncio.run(cenario())
+    assert inexistente is None
+    assert antigo["estado"] == FALHOU and antigo["erro"] == "Job interrompido"
+    assert eventos == [(0, "erro", {"erro": "Job interrompido"})]
+
+
+def test_sem_store_jobs_ficam_so_no_processo():
+    async def cenario():
+        dono, outro = GenerationJobs(), GenerationJobs()
+
+        async def executar(progresso):
+            return {"success": True}
+
+        job, _ = await dono.criar("k", executar)
+        await job.tarefa
+        return await dono.status(job.job_id), await outro.status(job.job_id)
+
+    local, remoto = asyncio.run(cenario())
+    assert local["estado"] == CONCLUIDO
+    assert remoto is None
@@ -0,0 +1,74 @@
+"""
+Testes da chamada hedged à API (HybridDietSystem._call_api)
+"""
+import threading
+import time
+
+import pytest
+
+from app.config.settings import settings
+from app.models import TokenUsage
+from app.services.hybrid_system import HybridDietSystem
+
+USO = TokenUsage(input_tokens=1000, output_tokens=500)
+
+
+@pytest.fixture
+def sistema(monkeypatch):
+    monkeypatch.setattr(settings, 'api_hedge_enabled', True)
+    monkeypatch.setattr(settings, 'api_hedge_deadline_minimal', 0.05)
+    sistema = HybridDietSystem()
+    yield sistema
+    sistema.shutdown()
+
+
+def test_chamada_no_prazo_nao_usa_reserva(sistema):
+    registros = []
+    resultado, reserva = sistema._call_api(
+        'api_minimal', lambda: ("apresentacao", USO), lambda: "python",
+        lambda modo, usage: registros.append((modo, usage))
+    )
+    assert resultado == ("apresentacao", USO)
+    assert reserva is None
+    assert registros == []
+    assert sistema.hedge_stats['api_no_prazo'] == 1
+
+
+def test_chamada_atrasada_e_cobrada_quando_termina(sistema):
+    registrada = threading.Event()
+    registros = []
+
+    def chamada_lenta():
+        time.sleep(0.3)
+        return "apresentacao", USO
+
+    def registrar(modo, usage):
+        registros.append((modo, usage))
+        registrada.set()
+
+    resultado, reserva = sistema._call_api('api_minimal', chamada_lenta, lambda: "python", registrar)
+    assert resultado is None
+    assert reserva == "python"
+    assert registros == []
+
+    assert registrada.wait(timeout=5)
+    assert registros == [('api_minimal', USO)]
+    assert sistema.hedge_stats['prazo_perdido'] == 1
+    assert sistema.hedge_stats['atrasadas_concluidas'] == 1
+
+
+def test_chamada_atrasada_com_erro_nao_e_cobrada(sistema):
+    registros = []
+
+    def chamada_com_erro():
+        time.sleep(0.2)
+        raise RuntimeError("falha simulada")
+
+    resultado, reserva = sistema._call_api(
+        'api_minimal', chamada_com_erro, lambda: "python",
+        lambda modo, usage: registros.append((modo, usage))
+    )
+    assert (resultado, reserva) == (None, "python")
+    time.sleep(0.4)
+    assert registros == []
+    assert sistema.hedge_stats['atrasadas_concluidas'] == 0
@@ -0,0 +1,42 @@
+"""
+Alimentos da base estendida sem IG no CSV (app/data/food_repository_sqlite.py)
+"""
+import pytest
+
+from app.data.food_repository import MemoryFoodRepository
+from app.data.food_repository_sqlite import SQLiteFoodRepository
+from app.services.glycemic_load import GlycemicLoadIndex
+
+CSV = """chave,nome,grupo,kcal,carb_g,prot_g,gord_g,fibra_g,porcao_usual,gramas_porcao,ig
+quinoa_cozida,Quinoa cozida,cereal,120,21.3,4.4,1.9,2.8,3 colheres de sopa,90,53
+cuscuz_milho,Cuscuz de milho,cereal,113,25.3,2.2,0.7,2.1,1 pedaço,100,
+frango_grelhado,Frango grelhado,proteina,159,0.0,32.0,3.6,0.0,1 filé,100,0
+"""
+
+
+@pytest.fixture
+def repositorio(tmp_path):
+    csv_path = tmp_path / "alimentos.csv"
+    csv_path.write_text(CSV, encoding="utf-8")
+    return SQLiteFoodRepository({}, csv_path=str(csv_path), path=str(tmp_path / "alimentos.sqlite3"))
+
+
+def test_ig_vazio_e_gravado_como_desconhecido(repositorio):
+    assert repositorio['cuscuz_milho']['ig'] is None
+    assert repositorio['quinoa_cozida']['ig'] == 53
+    # IG 0 informado continua sendo 0 (alimento sem carboidrato)
+    assert repositorio['frango_grelhado']['ig'] == 0
+
+
+def test_filtro_de_ig_nao_aceita_ig_desconhecido(repositorio):
+    assert set(repositorio.filtrar(ig_max=100)) == {'quinoa_cozida', 'frango_grelhado'}
+    memoria = MemoryFoodRepository(dict(repositorio.items()))
+    assert set(memoria.filtrar(ig_max=100)) == {'quinoa_cozida', 'frango_grelhado'}
+
+
+def test_limite_de_carga_glicemica_nao_aceita_ig_desconhecido(repositorio):
+    indice = GlycemicLoadIndex(repositorio)
+    assert indice.ig_desconhecido == {'cuscuz_milho'}
+    assert indice.filtrar(['quinoa_cozida', 'cuscuz_milho'], 150, 1000) == ['quinoa_cozida']
+    # Sem opção conhecida que caiba, fica a de menor CG estimada
+    assert indice.filtrar(['cuscuz_milho', 'quinoa_cozida'], 150, 0.1) == ['quinoa_cozida']
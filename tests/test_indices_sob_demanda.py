@@ -0,0 +1,58 @@
+"""
+Índices derivados da base (porções, CG, substituições) são montados no primeiro uso
+"""
+from app.services.glycemic_load import GlycemicLoadIndex
+from app.services.portion_table import PortionTable
+from app.services.substitution_index import SubstitutionIndex
+
+
+class _Contador(dict):
+    """Base de alimentos que conta as leituras de valores"""
+
+    def __init__(self, dados):
+        super().__init__(dados)
+        self.leituras = 0
+
+    def items(self):
+        self.leituras += 1
+        return super().items()
+
+    def __getitem__(self, key):
+        self.leituras += 1
+        return super().__getitem__(key)
+
+
+BASE = {
+    'arroz_integral': {
+        'nome': 'Arroz integral cozido', 'grupo': 'cereal', 'kcal': 124, 'carb_g': 25.8,
+        'prot_g': 2.6, 'gord_g': 1.0, 'fibra_g': 2.7, 'porcao_usual': '4 col. sopa',
+        'gramas_porcao': 100, 'ig': 50
+    },
+    'batata_doce': {
+        'nome': 'Batata doce cozida', 'grupo': 'cereal', 'kcal': 77, 'carb_g': 18.4,
+        'prot_g': 0.6, 'gord_g': 0.1, 'fibra_g': 2.2, 'porcao_usual': '1 unid. média',
+        'gramas_porcao': 150, 'ig': 63
+    },
+}
+
+
+def test_construcao_nao_le_a_base():
+    base = _Contador(BASE)
+    GlycemicLoadIndex(base)
+    SubstitutionIndex(base, {})
+    PortionTable(base)
+    assert base.leituras == 0
+
+
+def test_indice_de_carga_glicemica_no_primeiro_uso():
+    base = _Contador(BASE)
+    indice = GlycemicLoadIndex(base)
+    assert indice.cg_porcao_usual['arroz_integral'] == 50 * 25.8 / 100
+    assert base.leituras > 0
+    assert indice.filtrar(['arroz_integral', 'batata_doce'], 100, 100) == ['arroz_integral', 'batata_doce']
+
+
+def test_indice_de_substituicao_no_primeiro_uso():
+    indice = SubstitutionIndex(BASE, {})
+    assert [k for k, _ in indice.equivalentes('arroz_integral')] == ['batata_doce']
+    assert indice.resolver('batata doce') == 'batata_doce'
@@ -0,0 +1,44 @@
+"""
+mode_used e fallback_python iguais na geração em thread e no pool de processos
+"""
+import asyncio
+
+import pytest
+
+from app.config.settings import GenerationMode
+from app.models import PatientData
+from app.services.hybrid_system import HybridDietSystem
+from app.services.process_pool import PlanProcessPool
+
+PACIENTE = PatientData(nome="Maria Teste", sexo="F", idade=45, peso=70, altura=162)
+CAMPOS = ('mode_used', 'fallback_python', 'cost_usd', 'tokens_used')
+
+
+@pytest.fixture(scope="module")
+def sistemas():
+    em_thread = HybridDietSystem()
+    com_pool = HybridDietSystem()
+    com_pool.process_pool = PlanProcessPool(workers=1)
+    for sistema in (em_thread, com_pool):
+        sistema.api_available = False
+        sistema._track_generation = lambda *args: None
+    yield em_thread, com_pool
+    com_pool.process_pool.shutdown()
+
+
+@pytest.mark.parametrize("modo,esperado", [
+    (GenerationMode.PYTHON_ONLY, {'mode_used': 'python_only', 'fallback_python': None}),
+    (GenerationMode.API_MINIMAL, {'mode_used': 'api_minimal', 'fallback_python': True}),
+    (GenerationMode.API_FULL, {'mode_used': 'api_full', 'fallback_python': True}),
+])
+def test_api_indisponivel_reporta_o_mesmo_modo(sistemas, modo, esperado):
+    em_thread, com_pool = sistemas
+
+    async def gerar(sistema):
+        return await sistema._generate_plan_async(PACIENTE, modo, True)
+
+    metadados = [asyncio.run(gerar(s)).metadata for s in (em_thread, com_pool)]
+    resumos = [{campo: m.get(campo) for campo in CAMPOS} for m in metadados]
+    assert resumos[0] == resumos[1]
+    assert {campo: resumos[0][campo] for campo in esperado} == esperado
+    assert resumos[0]['cost_usd'] == 0
@@ -0,0 +1,65 @@
+"""
+Testes do armazenamento de planos (app/services/plan_store.py)
+"""
+import time
+
+import pytest
+
+from app.models import PatientData
+from app.config.settings import GenerationMode
+from app.services.hybrid_system import HybridDietSystem
+from app.services.plan_store import MemoryPlanStore, SQLitePlanStore
+
+
+@pytest.fixture(scope="module")
+def plano():
+    paciente = PatientData(nome="Maria Teste", sexo="F", idade=45, peso=70, altura=162)
+    return HybridDietSystem().generate_plan(paciente, GenerationMode.PYTHON_ONLY, track_cost=False)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def criar_store(request, tmp_path):
+    def criar(ttl_dias):
+        if request.param == "memory":
+            return MemoryPlanStore(ttl_dias=ttl_dias)
+        return SQLitePlanStore(path=str(tmp_path / "planos.sqlite3"), ttl_dias=ttl_dias)
+    return criar
+
+
+INICIO = time.time()
+
+
+def _envelhecer(monkeypatch, segundos):
+    """Relógio em INICIO + segundos (o plano foi salvo perto de INICIO)"""
+    monkeypatch.setattr(time, "time", lambda: INICIO + segundos)
+
+
+def test_plano_dentro_do_prazo(criar_store, plano):
+    store = criar_store(1)
+    plan_id = store.salvar(plano)
+    assert store.obter(plan_id).markdown == plano.markdown
+    assert store.obter_documento(plan_id) == (plano.markdown, "Maria Teste")
+
+
+def test_plano_expirado_nao_e_devolvido(criar_store, plano, monkeypatch):
+    store = criar_store(1)
+    plan_id = store.salvar(plano)
+    _envelhecer(monkeypatch, 86400 + 60)
+    assert store.obter(plan_id) is None
+    assert store.obter_documento(plan_id) is None
+
+
+def test_atualizacao_renova_o_prazo(criar_store, plano, monkeypatch):
+    store = criar_store(1)
+    plan_id = store.salvar(plano)
+    _envelhecer(monkeypatch, 86400 - 60)
+    store.atualizar(plan_id, plano)
+    _envelhecer(monkeypatch, 86400 + 60)
+    assert store.obter(plan_id) is not None
+
+
+def test_ttl_zero_nao_expira(criar_store, plano, monkeypatch):
+    store = criar_store(0)
+    plan_id = store.salvar(plano)
+    _envelhecer(monkeypatch, 365 * 86400)
+    assert store.obter(plan_id) is not None
@@ -0,0 +1,88 @@
+"""
+Testes do agrupamento de chamadas idênticas (app/utils/single_flight.py)
+"""
+import asyncio
+
+import pytest
+
+from app.utils.single_flight import SingleFlight, chave_canonica
+
+
+def test_chave_canonica_independe_da_ordem():
+    assert chave_canonica({'a': 1, 'b': [1, 2]}) == chave_canonica({'b': [1, 2], 'a': 1})
+    assert chave_canonica({'a': 1}) != chave_canonica({'a': 2})
+
+
+def test_chamadas_simultaneas_compartilham_o_resultado():
+    async def cenario():
+        sf = SingleFlight()
+        execucoes = []
+
+        async def trabalho():
+            execucoes.append(1)
+            await asyncio.sleep(0.05)
+            return "plano"
+
+        resultados = await asyncio.gather(*(sf.executar("k", trabalho) for _ in range(5)))
+        return sf, execucoes, resultados
+
+    sf, execucoes, resultados = asyncio.run(cenario())
+    assert len(execucoes) == 1
+    assert [r for r, _ in resultados] == ["plano"] * 5
+    assert sorted(c for _, c in resultados) == [False, True, True, True, True]
+    assert sf.stats() == {"em_andamento": 0, "execucoes": 1, "coalescidas": 4, "taxa_coalescidas": 0.8}
+
+
+def test_chaves_diferentes_e_chamadas_sequenciais_executam_de_novo():
+    async def cenario():
+        sf = SingleFlight()
+
+        async def trabalho(valor):
+            await asyncio.sleep(0.01)
+            return valor
+
+        a, b = await asyncio.gather(sf.executar("a", lambda: trabalho(1)), sf.executar("b", lambda: trabalho(2)))
+        c = await sf.executar("a", lambda: trabalho(3))
+        return sf, a, b, c
+
+    sf, a, b, c = asyncio.run(cenario())
+    assert (a, b, c) == ((1, False), (2, False), (3, False))
+    assert sf.stats()["execucoes"] == 3
+
+
+def test_erro_e_repassado_a_todos_e_libera_a_chave():
+    async def cenario():
+        sf = SingleFlight()
+
+        async def falha():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("falha simulada")
+
+        resultados = await asyncio.gather(
+            sf.executar("k", falha), sf.executar("k", falha), return_exceptions=True
+        )
+        return sf, resultados
+
+    sf, resultados = asyncio.run(cenario())
+    assert all(isinstance(r, RuntimeError) for r in resultados)
+    assert sf.stats()["em_andamento"] == 0
+
+
+def test_cancelar_quem_iniciou_nao_cancela_os_demais():
+    async def cenario():
+        sf = SingleFlight()
+
+        async def trabalho():
+            await asyncio.sleep(0.05)
+            return "plano"
+
+        primeira = asyncio.ensure_future(sf.executar("k", trabalho))
+        await asyncio.sleep(0)
+        segunda = asyncio.ensure_future(sf.executar("k", trabalho))
+        await asyncio.sleep(0)
+        primeira.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await primeira
+        return await segunda
+
+    assert asyncio.run(cenario()) == ("plano", True)
@@ -0,0 +1,39 @@
+"""
+Testes do índice de substituições (app/services/substitution_index.py)
+"""
+import pytest
+
+from app.data.alimentos_base import ALIMENTOS
+from app.data.substituicoes import SUBSTITUICOES
+from app.services.substitution_index import substitution_index
+
+ITENS_SUBSTITUICAO = [
+    item['alimento'] for dados in SUBSTITUICOES.values() for item in dados['itens']
+]
+
+
+@pytest.mark.parametrize("alimento", ITENS_SUBSTITUICAO)
+@pytest.mark.parametrize("gramas", [None, 100.0])
+def test_consulta_todos_os_itens_das_listas(alimento, gramas):
+    resultado = substitution_index.consultar(alimento, gramas=gramas)
+    assert resultado['success'], resultado
+    assert resultado['lista_substituicao'] is not None
+
+
+@pytest.mark.parametrize("chave", sorted(ALIMENTOS))
+@pytest.mark.parametrize("gramas", [None, 100.0])
+def test_consulta_todos_os_alimentos_da_base(chave, gramas):
+    resultado = substitution_index.consultar(chave, gramas=gramas)
+    assert resultado['success'], resultado
+
+
+@pytest.mark.parametrize("chave", ["alface", "rucula", "agriao", "espinafre", "couve_manteiga", "repolho"])
+def test_itens_a_vontade_nao_escalam(chave):
+    if chave not in ALIMENTOS:
+        pytest.skip(f"{chave} não está na base")
+    lista = substitution_index.consultar(chave, gramas=80.0)['lista_substituicao']
+    assert lista['porcoes'] == 1.0
+
+
+def test_alimento_desconhecido():
+    assert substitution_index.consultar("alimento que não existe")['success'] is False
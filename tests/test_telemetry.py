@@ -0,0 +1,111 @@
+"""
+Testes da fila de telemetria (app/utils/telemetry.py)
+"""
+import asyncio
+
+from app.utils.telemetry import TelemetrySink
+
+
+class Destino:
+    """Gravação em memória que pode falhar sob demanda"""
+
+    def __init__(self):
+        self.lotes = []
+        self.falhar = False
+
+    def __call__(self, lote):
+        if self.falhar:
+            raise OSError("disco cheio")
+        self.lotes.append(list(lote))
+
+    @property
+    def eventos(self):
+        return [e for lote in self.lotes for e in lote]
+
+
+def _sink(destino, **kwargs):
+    # Intervalo longo: só grava quando o teste pede
+    return TelemetrySink(destino, intervalo=3600, **{'tamanho_lote': 3, 'max_fila': 100, **kwargs})
+
+
+def test_sem_tarefa_grava_na_hora():
+    destino = Destino()
+    sink = _sink(destino)
+    sink.enviar({'n': 1})
+    assert destino.lotes == [[{'n': 1}]]
+    assert sink.stats()['pendentes'] == 0
+
+
+def test_flush_grava_a_fila_em_lotes():
+    async def cenario():
+        destino = Destino()
+        sink = _sink(destino, tamanho_lote=100)
+        await sink.start()
+        for n in range(5):
+            sink.enviar({'n': n})
+        assert destino.lotes == []
+        assert len(sink.pendentes()) == 5
+        sink.tamanho_lote = 2
+        sink.flush()
+        await sink.stop()
+        return destino, sink
+
+    destino, sink = asyncio.run(cenario())
+    assert [len(lote) for lote in destino.lotes] == [2, 2, 1]
+    assert destino.eventos == [{'n': n} for n in range(5)]
+    assert sink.stats()['gravados'] == 5
+
+
+def test_falha_devolve_os_eventos_para_a_fila_em_ordem():
+    async def cenario():
+        destino = Destino()
+        sink = _sink(destino, tamanho_lote=100)
+        await sink.start()
+        for n in range(4):
+            sink.enviar({'n': n})
+        destino.falhar = True
+        sink.flush()
+        assert sink.pendentes() == [{'n': n} for n in range(4)]
+        assert sink.stats()['erros'] == 1
+        sink.enviar({'n': 4})
+        destino.falhar = False
+        await sink.stop()
+        return destino, sink
+
+    destino, sink = asyncio.run(cenario())
+    assert destino.eventos == [{'n': n} for n in range(5)]
+    assert sink.stats()['pendentes'] == 0
+
+
+def test_fila_cheia_descarta_os_mais_antigos():
+    async def cenario():
+        destino = Destino()
+        sink = _sink(destino, tamanho_lote=100, max_fila=3)
+        await sink.start()
+        for n in range(5):
+            sink.enviar({'n': n})
+        pendentes = sink.pendentes()
+        await sink.stop()
+        return destino, sink, pendentes
+
+    destino, sink, pendentes = asyncio.run(cenario())
+    assert pendentes == [{'n': 2}, {'n': 3}, {'n': 4}]
+    assert sink.stats()['descartados'] == 2
+    assert destino.eventos == pendentes
+
+
+def test_lote_cheio_acorda_a_gravacao():
+    async def cenario():
+        destino = Destino()
+        sink = _sink(destino, tamanho_lote=2)
+        await sink.start()
+        sink.enviar({'n': 0})
+        sink.enviar({'n': 1})
+        for _ in range(50):
+            if destino.lotes:
+                break
+            await asyncio.sleep(0.01)
+        await sink.stop()
+        return destino
+
+    assert asyncio.run(cenario()).lotes[0] == [{'n': 0}, {'n': 1}]
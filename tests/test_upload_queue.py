@@ -0,0 +1,87 @@
+"""
+Testes da reserva com lease da fila de uploads (app/services/upload_queue.py)
+"""
+import sqlite3
+import time
+from contextlib import closing
+
+from app.services.upload_queue import CONCLUIDO, ENVIANDO, PENDENTE, UploadQueue
+
+
+def _filas(tmp_path):
+    """Dois processos simulados com o mesmo arquivo da fila"""
+    path = str(tmp_path / "uploads.sqlite3")
+    return UploadQueue(path=path, workers=0), UploadQueue(path=path, workers=0)
+
+
+def _job(fila):
+    return fila._inserir("chave", 1, None, "dieta.md", "Plano (ref. chave)", "# Dieta")
+
+
+def test_envio_em_andamento_de_outro_processo_nao_e_recuperado(tmp_path):
+    dono, outro = _filas(tmp_path)
+    job = _job(dono)
+    row = dono._reservar()
+
+    assert row["job_id"] == job["job_id"]
+    assert outro._recuperar_interrompidos() == 0
+    assert outro.obter(job["job_id"])["status"] == ENVIANDO
+
+    dono._finalizar(job["job_id"], CONCLUIDO, 1)
+    assert outro.obter(job["job_id"])["status"] == CONCLUIDO
+
+
+def test_lease_vencido_volta_para_a_fila_e_dono_antigo_nao_sobrescreve(tmp_path):
+    dono, outro = _filas(tmp_path)
+    job = _job(dono)
+    dono.lease = -1    # reserva já vencida: processo encerrado no meio do envio
+    dono._reservar()
+
+    assert outro._recuperar_interrompidos() == 1
+    status = outro.obter(job["job_id"])
+    assert status["status"] == PENDENTE
+    assert status["tentativas"] == 1
+    assert status["ultimo_erro"] == "Envio interrompido"
+
+    # O dono antigo perdeu o job: nem renova o lease nem grava o resultado
+    assert dono._renovar_lease(job["job_id"]) is False
+    dono._finalizar(job["job_id"], CONCLUIDO, 1)
+    assert outro.obter(job["job_id"])["status"] == PENDENTE
+
+
+def test_renovacao_estende_o_lease(tmp_path):
+    dono, outro = _filas(tmp_path)
+    job = _job(dono)
+    dono.lease = 0.01
+    dono._reservar()
+    time.sleep(0.02)
+    dono.lease = 60
+
+    assert dono._renovar_lease(job["job_id"]) is True
+    assert outro._recuperar_interrompidos() == 0
+
+
+def test_fila_antiga_ganha_as_colunas_do_lease(tmp_path):
+    path = str(tmp_path / "uploads.sqlite3")
+    with closing(sqlite3.connect(path)) as conn, conn:
+        conn.execute(
+            """
+            CREATE TABLE uploads (
+                job_id TEXT PRIMARY KEY, chave TEXT NOT NULL UNIQUE, status TEXT NOT NULL,
+                patient_id INTEGER NOT NULL, plan_id TEXT, filename TEXT NOT NULL,
+                descricao TEXT NOT NULL, conteudo TEXT NOT NULL,
+                tentativas INTEGER NOT NULL DEFAULT 0, proxima_tentativa REAL NOT NULL,
+                ultimo_status INTEGER, ultimo_erro TEXT, criado_em REAL NOT NULL,
+                atualizado_em REAL NOT NULL, concluido_em REAL
+            )
+            """
+        )
+        conn.execute(
+            "INSERT INTO uploads VALUES ('j1', 'c1', ?, 1, NULL, 'd.md', 'd', 'x', 0, 0, NULL, NULL, 0, 0, NULL)",
+            (ENVIANDO,)
+        )
+
+    fila = UploadQueue(path=path, workers=0)
+    # Sem lease registrado (versão anterior): tratado como vencido
+    assert fila._recuperar_interrompidos() == 1
+    assert fila.obter("j1")["status"] == PENDENTE